@@ -13,6 +13,8 @@ import difflib
 from typing import Dict, List, Optional, Tuple
 from dataclasses import dataclass
 from config_manager import config_manager
+from shared_cache import get_shared_namespace
+from lazy_imports import LazySingleton
 
 logger = logging.getLogger(__name__)
 
@@ -67,6 +69,9 @@ class ContextualCacheManager:
         # In-memory cache
         self.cache: Dict[str, CacheEntry] = {}
         self.similarity_index: Dict[str, List[str]] = {}  # similarity_hash -> list of cache_keys
+
+        # Cross-process store for exact contextual hits from other workers/runs
+        self.shared = get_shared_namespace('contextual_translations') if self.enabled else None
         
         if self.enabled:
             self.load_cache()
@@ -151,6 +156,14 @@ class ContextualCacheManager:
             entry.usage_count += 1
             logger.debug(f"Direct cache hit for text: {text[:50]}...")
             return entry.translated_text
+
+        # Entry written by another process sharing this run
+        if self.shared is not None:
+            entry = self.shared.get(cache_key)
+            if entry is not None:
+                self.cache[cache_key] = entry
+                self._update_similarity_index(cache_key, entry)
+                return entry.translated_text
         
         # Fuzzy matching if enabled
         if self.enable_fuzzy_matching:
@@ -190,6 +203,8 @@ class ContextualCacheManager:
         # Add to cache
         self.cache[cache_key] = entry
         self._update_similarity_index(cache_key, entry)
+        if self.shared is not None:
+            self.shared.set(cache_key, entry)
         
         # Manage cache size
         if len(self.cache) > self.max_cache_size:
@@ -343,5 +358,5 @@ class ContextualCacheManager:
             'similarity_threshold': self.similarity_threshold
         }
 
-# Global advanced cache manager instance
-advanced_cache_manager = ContextualCacheManager()
+# Global advanced cache manager instance (the JSON cache is parsed on first use)
+advanced_cache_manager = LazySingleton(ContextualCacheManager)
@@ -159,13 +159,17 @@ class AdvancedDocumentAnalyzer:
             logger.warning("PyMuPDF not available, using basic analysis")
             return self._basic_analysis(filepath)
 
+        from stage_cache import get_stage_cache
+        stage_cache = get_stage_cache()
+        cached_analysis = stage_cache.get(filepath, 'document_analysis')
+        if cached_analysis is not None:
+            return cached_analysis
+
         try:
             doc = fitz.open(filepath)
             
-            # Analyze each page
-            for page_num in range(len(doc)):
-                page_profile = self._analyze_single_page(filepath, doc, page_num)
-                analysis['page_profiles'].append(page_profile)
+            # Profile pages once per worker (sharded, cached on disk by PDF hash)
+            analysis['page_profiles'] = self.get_page_profiles(filepath, page_count=len(doc))
             
             # Generate overall analysis
             analysis['metadata'] = self._extract_document_metadata(doc)
@@ -178,32 +182,45 @@ class AdvancedDocumentAnalyzer:
             doc.close()
             
             logger.info(f"✅ Document analysis completed: {len(analysis['page_profiles'])} pages analyzed")
+            stage_cache.put(filepath, 'document_analysis', analysis)
             return analysis
             
         except Exception as e:
             logger.error(f"Error in document analysis: {e}")
             return self._basic_analysis(filepath)
     
-    def _analyze_single_page(self, filepath: str, doc, page_num: int) -> PageProfile:
-        """Analyze a single page with comprehensive content profiling"""
+    def get_page_profiles(self, filepath: str, page_count: Optional[int] = None) -> List[PageProfile]:
+        """Get page profiles from the shared profiling engine, reusing cached results"""
+        from document_profiler import get_document_profiler
+        return get_document_profiler().profile_document(filepath, page_count=page_count)
+    
+    def _analyze_single_page(self, filepath: str, doc, page_num: int, plumber_pdf=None) -> PageProfile:
+        """Analyze a single page with comprehensive content profiling.
+
+        ``plumber_pdf`` is an already-open pdfplumber document; when it is given
+        the page layout is read from it instead of re-opening ``filepath``.
+        """
         page = doc[page_num]
 
         # Initialize analysis structures
         layout_analysis = LayoutAnalysis()
         math_analysis = MathAnalysis()
 
-        # Extract text content
-        text_content = page.get_text()
-        text_blocks = len(page.get_text("dict")["blocks"])
+        # Extract text content (the dict is parsed once and reused for the plain text)
+        page_dict = page.get_text("dict")
+        text_content = self._text_from_page_dict(page_dict)
+        text_blocks = len(page_dict["blocks"])
 
         # Perform mathematical content analysis
         math_analysis = self._analyze_mathematical_content(text_content)
 
         # Perform layout analysis with pdfplumber if available
-        if PDFPLUMBER_AVAILABLE:
+        if plumber_pdf is not None:
+            layout_analysis = self._analyze_plumber_page(plumber_pdf, page_num)
+        elif PDFPLUMBER_AVAILABLE:
             layout_analysis = self._analyze_page_layout_with_pdfplumber(filepath, page_num)
         else:
-            layout_analysis = self._analyze_page_layout_basic(page)
+            layout_analysis = self._analyze_page_layout_basic(page, page_dict)
 
         # Determine content type
         content_type = self._classify_page_content_type(text_content, layout_analysis, math_analysis)
@@ -225,6 +242,15 @@ class AdvancedDocumentAnalyzer:
             complexity_score=complexity_score,
             processing_recommendation=processing_recommendation
         )
+
+    @staticmethod
+    def _text_from_page_dict(page_dict: Dict) -> str:
+        """Rebuild the plain page text from a PyMuPDF ``get_text("dict")`` result"""
+        lines = []
+        for block in page_dict.get("blocks", []):
+            for line in block.get("lines", []):
+                lines.append("".join(span.get("text", "") for span in line.get("spans", [])))
+        return "\n".join(lines)
     
     def _analyze_mathematical_content(self, text: str) -> MathAnalysis:
         """Analyze mathematical content in text"""
@@ -267,45 +293,58 @@ class AdvancedDocumentAnalyzer:
         """Analyze page layout using pdfplumber"""
         try:
             with pdfplumber.open(filepath) as pdf:
-                if page_num < len(pdf.pages):
-                    page = pdf.pages[page_num]
-                    
-                    # Analyze tables
-                    tables = page.find_tables()
-                    has_tables = len(tables) > 0
-                    
-                    # Analyze images
-                    images = page.images
-                    image_coverage = sum(img['width'] * img['height'] for img in images) / (page.width * page.height) if images else 0
-                    
-                    # Analyze text density
-                    text_objects = page.chars
-                    text_coverage = len(text_objects) / (page.width * page.height) if text_objects else 0
-                    
-                    # Determine complexity
-                    complexity = LayoutComplexity.SIMPLE
-                    if has_tables or image_coverage > 0.3:
-                        complexity = LayoutComplexity.MODERATE
-                    if len(tables) > 2 or image_coverage > 0.5:
-                        complexity = LayoutComplexity.COMPLEX
-                    if len(tables) > 5 or image_coverage > 0.7:
-                        complexity = LayoutComplexity.VERY_COMPLEX
-                    
-                    return LayoutAnalysis(
-                        column_count=1,  # Could be enhanced with column detection
-                        has_tables=has_tables,
-                        has_figures=len(images) > 0,
-                        has_equations=False,  # Detected separately
-                        text_density=text_coverage,
-                        image_coverage=image_coverage,
-                        complexity=complexity
-                    )
+                return self._analyze_plumber_page(pdf, page_num)
+        except Exception as e:
+            logger.warning(f"pdfplumber analysis failed: {e}")
+        
+        return LayoutAnalysis()
+
+    def _analyze_plumber_page(self, pdf, page_num: int) -> LayoutAnalysis:
+        """Analyze the layout of one page of an already-open pdfplumber document"""
+        try:
+            if page_num < len(pdf.pages):
+                page = pdf.pages[page_num]
+                
+                # Analyze tables
+                tables = page.find_tables()
+                has_tables = len(tables) > 0
+                
+                # Analyze images
+                images = page.images
+                image_coverage = sum(img['width'] * img['height'] for img in images) / (page.width * page.height) if images else 0
+                
+                # Analyze text density
+                text_objects = page.chars
+                text_coverage = len(text_objects) / (page.width * page.height) if text_objects else 0
+                
+                # Determine complexity
+                complexity = LayoutComplexity.SIMPLE
+                if has_tables or image_coverage > 0.3:
+                    complexity = LayoutComplexity.MODERATE
+                if len(tables) > 2 or image_coverage > 0.5:
+                    complexity = LayoutComplexity.COMPLEX
+                if len(tables) > 5 or image_coverage > 0.7:
+                    complexity = LayoutComplexity.VERY_COMPLEX
+                
+                # Release the cached page objects so long documents stay flat in memory
+                if hasattr(page, 'flush_cache'):
+                    page.flush_cache()
+                
+                return LayoutAnalysis(
+                    column_count=1,  # Could be enhanced with column detection
+                    has_tables=has_tables,
+                    has_figures=len(images) > 0,
+                    has_equations=False,  # Detected separately
+                    text_density=text_coverage,
+                    image_coverage=image_coverage,
+                    complexity=complexity
+                )
         except Exception as e:
             logger.warning(f"pdfplumber analysis failed: {e}")
         
         return LayoutAnalysis()
     
-    def _analyze_page_layout_basic(self, page) -> LayoutAnalysis:
+    def _analyze_page_layout_basic(self, page, page_dict: Optional[Dict] = None) -> LayoutAnalysis:
         """Basic layout analysis using PyMuPDF"""
         try:
             # Get page dimensions
@@ -313,7 +352,7 @@ class AdvancedDocumentAnalyzer:
             page_area = rect.width * rect.height
             
             # Analyze blocks
-            blocks = page.get_text("dict")["blocks"]
+            blocks = (page_dict or page.get_text("dict"))["blocks"]
             
             image_area = 0
             text_area = 0
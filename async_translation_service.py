@@ -15,6 +15,9 @@ from typing import List, Dict, Optional, Tuple
 from dataclasses import dataclass
 from config_manager import config_manager
 from advanced_caching import advanced_cache_manager
+from shared_cache import get_shared_namespace
+from lazy_imports import LazySingleton
+from request_coalescing import request_key
 
 # Optional imports for enhanced error handling
 try:
@@ -63,21 +66,37 @@ class TranslationTask:
             ).hexdigest()[:8]
 
 class InMemoryCache:
-    """Fast in-memory cache for current translation session"""
+    """Fast in-memory cache for current translation session, backed by the shared cache"""
     
-    def __init__(self, max_size: int = 1000):
+    def __init__(self, max_size: int = 1000, shared_namespace=None):
         self.cache: Dict[str, str] = {}
         self.access_times: Dict[str, float] = {}
         self.max_size = max_size
+        self.shared = shared_namespace
+        self._hit_count = 0
+        self._total_requests = 0
     
     def get(self, key: str) -> Optional[str]:
+        self._total_requests += 1
         if key in self.cache:
             self.access_times[key] = time.time()
+            self._hit_count += 1
             return self.cache[key]
+        if self.shared is not None:
+            value = self.shared.get(key)
+            if value is not None:
+                self._hit_count += 1
+                self._store_local(key, value)
+                return value
         return None
     
     def set(self, key: str, value: str):
-        if len(self.cache) >= self.max_size:
+        self._store_local(key, value)
+        if self.shared is not None:
+            self.shared.set(key, value)
+
+    def _store_local(self, key: str, value: str):
+        if key not in self.cache and len(self.cache) >= self.max_size:
             self._evict_oldest()
         
         self.cache[key] = value
@@ -150,7 +169,8 @@ class AsyncTranslationService:
         except Exception:
             cache_size = 1000
 
-        self.memory_cache = InMemoryCache(max_size=cache_size)
+        self.memory_cache = InMemoryCache(max_size=cache_size,
+                                          shared_namespace=get_shared_namespace('session_translations'))
         self.persistent_cache = advanced_cache_manager
         
         # Performance tracking
@@ -159,6 +179,7 @@ class AsyncTranslationService:
             'cache_hits_memory': 0,
             'cache_hits_persistent': 0,
             'api_calls': 0,
+            'duplicate_requests': 0,
             'total_time': 0.0,
             'concurrent_batches': 0
         }
@@ -244,6 +265,20 @@ class AsyncTranslationService:
         """Execute translation tasks concurrently with rate limiting"""
         # Sort tasks by priority (high priority first)
         sorted_tasks = sorted(tasks, key=lambda t: t.priority)
+
+        # One request per distinct text; repeats get the result of its first (highest priority) task
+        leaders = {}
+        followers = []
+        for task in sorted_tasks:
+            key = request_key(task.text, task.target_language, self.settings['model_name'])
+            if key in leaders:
+                followers.append((task, leaders[key]))
+            else:
+                leaders[key] = task
+        sorted_tasks = list(leaders.values())
+        if followers:
+            self.stats['duplicate_requests'] += len(followers)
+            logger.info(f"♻️ {len(followers)} duplicate tasks reuse the translation of an identical task")
         
         # Create semaphore-controlled coroutines
         async def translate_with_semaphore(task):
@@ -261,14 +296,23 @@ class AsyncTranslationService:
         
         # Process results
         task_results = {}
+        failed_task_ids = set()
         for task, result in zip(sorted_tasks, results):
             if isinstance(result, Exception):
                 logger.error(f"Translation failed for task {task.task_id}: {result}")
                 task_results[task.task_id] = task.text  # Fallback to original
+                failed_task_ids.add(task.task_id)
             else:
                 task_results[task.task_id] = result
                 # Cache the successful result
                 self._cache_result(task, result)
+
+        for task, leader in followers:
+            if leader.task_id in failed_task_ids:
+                task_results[task.task_id] = task.text
+            else:
+                task_results[task.task_id] = task_results[leader.task_id]
+                self._cache_result(task, task_results[task.task_id])
         
         return task_results
     
@@ -673,42 +717,37 @@ class PreemptiveImageFilter:
         """
         try:
             import os
-            from PIL import Image
+            from image_features import get_image_features
 
             # Check file size first (fastest check)
             file_size = os.path.getsize(image_path)
             if file_size < self.min_size_bytes:
                 return False, f"Too small ({file_size} bytes)"
 
-            # Load image for analysis
-            with Image.open(image_path) as img:
-                # Check dimensions
-                width, height = img.size
-                if width < 50 or height < 50:
-                    return False, f"Dimensions too small ({width}x{height})"
+            # One decode to a thumbnail, shared with the image classifier
+            features = get_image_features(image_path)
 
-                # Check color complexity
-                if img.mode in ['RGB', 'RGBA']:
-                    # Sample the image to check color diversity
-                    sampled = img.resize((50, 50))  # Small sample for speed
-                    colors = sampled.getcolors(maxcolors=256)
+            # Check dimensions
+            width, height = features.width, features.height
+            if width < 50 or height < 50:
+                return False, f"Dimensions too small ({width}x{height})"
 
-                    if colors and len(colors) <= self.max_simple_colors:
-                        return False, f"Too few colors ({len(colors)})"
+            # Check color complexity
+            if features.mode in ['RGB', 'RGBA'] and features.color_count is not None:
+                if features.color_count <= self.max_simple_colors:
+                    return False, f"Too few colors ({features.color_count})"
 
-                    # Check for single-color or very simple images
-                    if colors:
-                        dominant_color_ratio = max(count for count, _ in colors) / (50 * 50)
-                        if dominant_color_ratio > 0.9:
-                            return False, f"Single color dominates ({dominant_color_ratio:.1%})"
+                # Check for single-color or very simple images
+                if features.dominant_color_ratio > 0.9:
+                    return False, f"Single color dominates ({features.dominant_color_ratio:.1%})"
 
-                # Check aspect ratio for likely decorative elements
-                aspect_ratio = max(width, height) / min(width, height)
-                if aspect_ratio > 10:  # Very thin/wide images are often decorative
-                    return False, f"Extreme aspect ratio ({aspect_ratio:.1f})"
+            # Check aspect ratio for likely decorative elements
+            aspect_ratio = max(width, height) / min(width, height)
+            if aspect_ratio > 10:  # Very thin/wide images are often decorative
+                return False, f"Extreme aspect ratio ({aspect_ratio:.1f})"
 
-                # If we get here, the image passed all quick filters
-                return True, "Passed complexity checks"
+            # If we get here, the image passed all quick filters
+            return True, "Passed complexity checks"
 
         except Exception as e:
             logger.warning(f"Error analyzing image {image_path}: {e}")
@@ -742,6 +781,6 @@ class PreemptiveImageFilter:
 
         return analyze_list, skip_list
 
-# Global instances
-async_translation_service = AsyncTranslationService()
-preemptive_image_filter = PreemptiveImageFilter()
+# Global instances (built on first use)
+async_translation_service = LazySingleton(AsyncTranslationService)
+preemptive_image_filter = LazySingleton(PreemptiveImageFilter)
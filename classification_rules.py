@@ -0,0 +1,423 @@
+"""
+Compiled Rule Engine for Block Classification
+
+The block classification heuristics (heading, caption, list, code, equation,
+table and skip-translation patterns) used to live as pattern lists inside
+each helper, evaluated one pattern at a time for every block. Here each rule
+set is compiled once into a single alternation regex, so "does any rule
+match" is one regex scan per rule set, and keyword lists become one
+alternation instead of a Python loop. ClassificationEngine evaluates all rule
+sets for a block in one pass and caches the resulting BlockFeatures by a hash
+of the block text; classify_batch() does this for a whole page or document at
+once, so later per-block helpers are cache lookups.
+
+Each feature reproduces the helper it replaces exactly, including which text
+transform (raw, stripped, lowercased) the original patterns ran against.
+"""
+
+import re
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from config_manager import config_manager
+from lazy_imports import LazySingleton
+
+logger = logging.getLogger(__name__)
+
+# Inline letters for the flags rules may carry, used to scope them per rule
+_SCOPED_FLAGS = ((re.IGNORECASE, 'i'), (re.MULTILINE, 'm'), (re.DOTALL, 's'), (re.VERBOSE, 'x'))
+_BACKREFERENCE = re.compile(r'\\[1-9]|\(\?P=')
+
+
+@dataclass(frozen=True)
+class Rule:
+    """One pattern; anchored rules use re.match semantics, others re.search"""
+    name: str
+    pattern: str
+    flags: int = 0
+    anchored: bool = False
+
+
+def _is_start_anchored(pattern: str, flags: int) -> bool:
+    """True when every alternative of the pattern can only match at position 0"""
+    if flags & re.MULTILINE or not pattern.startswith('^'):
+        return False
+    depth, index, in_class = 0, 1, False
+    while index < len(pattern):
+        char = pattern[index]
+        if char == '\\':
+            index += 2
+            continue
+        if in_class:
+            in_class = char != ']'
+        elif char == '[':
+            in_class = True
+        elif char == '(':
+            depth += 1
+        elif char == ')':
+            depth -= 1
+        elif char == '|' and depth == 0:
+            return False
+        index += 1
+    return True
+
+
+class RuleSet:
+    """
+    Rules compiled into one alternation: matches(text) is True when any rule
+    would match on its own. Rules anchored at the start of the text go into a
+    separate alternation tried only at position 0, so they keep the regex
+    engine's start-anchor shortcut. Rules that cannot be combined
+    (backreferences) are kept as separate patterns.
+    """
+
+    def __init__(self, name: str, rules: Sequence[Rule]):
+        self.name = name
+        self.rules = list(rules)
+        prefix_parts, search_parts = [], []
+        self._standalone = []
+        for index, rule in enumerate(self.rules):
+            if _BACKREFERENCE.search(rule.pattern):
+                self._standalone.append((rule.name, re.compile(rule.pattern, rule.flags), rule.anchored))
+                continue
+            body = f"(?:{rule.pattern})"
+            letters = ''.join(letter for flag, letter in _SCOPED_FLAGS if rule.flags & flag)
+            if letters:
+                body = f"(?{letters}:{body})"
+            parts = prefix_parts if rule.anchored or _is_start_anchored(rule.pattern, rule.flags) else search_parts
+            parts.append(f"(?P<r{index}>{body})")
+        self._prefix = re.compile('|'.join(prefix_parts)) if prefix_parts else None
+        self._search = re.compile('|'.join(search_parts)) if search_parts else None
+
+    def first_match(self, text: str) -> Optional[str]:
+        """Name of a matching rule, or None"""
+        match = self._prefix is not None and self._prefix.match(text)
+        if not match and self._search is not None:
+            match = self._search.search(text)
+        if match:
+            return self.rules[int(match.lastgroup[1:])].name
+        for name, pattern, anchored in self._standalone:
+            if (pattern.match(text) if anchored else pattern.search(text)):
+                return name
+        return None
+
+    def matches(self, text: str) -> bool:
+        if self._prefix is not None and self._prefix.match(text):
+            return True
+        if self._search is not None and self._search.search(text):
+            return True
+        return any(pattern.match(text) if anchored else pattern.search(text)
+                   for _, pattern, anchored in self._standalone)
+
+
+def keyword_rule(name: str, keywords: Iterable[str]) -> Rule:
+    """Substring test for any keyword, as a single alternation (longest first)"""
+    alternatives = sorted({re.escape(keyword) for keyword in keywords}, key=len, reverse=True)
+    return Rule(name, '|'.join(alternatives))
+
+
+# ----------------------------------------------------------------------
+# Rule sets
+# ----------------------------------------------------------------------
+
+HEADING_RULES = RuleSet('heading', [
+    Rule('numbered_title', r'^\d+\.?\s+[A-Z]'),  # "1. Introduction" or "1 Introduction"
+    # ALL CAPS headings (max 5 words) - Constrained to avoid long capitalized sentences.
+    Rule('all_caps', r'^([A-Z]+\s){0,4}[A-Z]+$'),
+    # Title Case (max 7 words) - Constrained to avoid long title-cased sentences.
+    Rule('title_case', r'^([A-Z][a-z]+\s){0,6}[A-Z][a-z]+$'),
+    Rule('chapter_section', r'^(Chapter|Section|Part|Appendix)\s+\d+'),
+    Rule('numbered_section', r'^\d+\.\d+'),  # Numbered sections like "2.1"
+    Rule('roman_numeral', r'^[IVX]+\.\s+[A-Z]'),
+    Rule('letter_section', r'^[A-Z]\.\s+[A-Z]'),  # Single letter sections "A."
+])
+
+# Matched against lowercased text
+SECTION_START_RULES = RuleSet('section_start', [
+    Rule('front_matter', r'^(introduction|conclusion|abstract|summary|overview)'),
+    Rule('body_sections', r'^(background|methodology|results|discussion)'),
+    Rule('back_matter', r'^(references|bibliography|appendix|glossary)'),
+    Rule('numbered_intro', r'^\d+\.\s*(introduction|background|method)'),
+])
+
+LIST_MARKER_RULES = RuleSet('list_marker', [
+    Rule('bullet', r'^\s*[•\-\*]\s+', anchored=True),
+    Rule('numbered', r'^\s*\d+[\.\)]\s+', anchored=True),
+    Rule('lettered', r'^\s*[a-zA-Z][\.\)]\s+', anchored=True),
+])
+
+# Same markers plus roman numerals, case-insensitive (Nougat-first parsing)
+LIST_ITEM_RULES = RuleSet('list_item', [
+    Rule('bullet', r'^\s*[•\-\*]\s+', re.IGNORECASE, anchored=True),
+    Rule('numbered', r'^\s*\d+[\.\)]\s+', re.IGNORECASE, anchored=True),
+    Rule('lettered', r'^\s*[a-zA-Z][\.\)]\s+', re.IGNORECASE, anchored=True),
+    Rule('roman', r'^\s*[ivxlcdm]+[\.\)]\s+', re.IGNORECASE, anchored=True),
+])
+
+# Matched against lowercased, stripped text
+CAPTION_RULES = RuleSet('caption', [
+    # Standard figure/table references
+    Rule('figure_label', r'^(figure|fig|image|diagram|chart|graph|table|schema|plate|exhibit)\s*\d*[:\.\-\s]'),
+    Rule('figure_number', r'^(fig\.|figure\.|table\.|chart\.|diagram\.)?\s*\d+[:\.\-\s]'),
+    # Source and attribution patterns
+    Rule('attribution', r'^(source|credit|copyright|adapted from|modified from)[:.\-\s]'),
+    Rule('photo_credit', r'^(photo|image)\s+(by|from|courtesy)'),
+    # Parenthetical captions
+    Rule('parenthetical', r'^\([^)]+\)$'),
+    # Academic/technical patterns
+    Rule('step', r'^(step|phase|stage|example|case)\s*\d*[:\.]'),
+    Rule('direction', r'^(above|below|left|right)[:.\-\s]'),
+    # Multi-language support
+    Rule('spanish_portuguese', r'^(figura|tabela|esquema|gráfico)\s*\d*[:\.]'),
+    Rule('german', r'^(abbildung|tabelle|diagramm)\s*\d*[:\.]'),
+    Rule('japanese', r'^(図|表|グラフ)\s*\d*[:\.]'),
+])
+
+CAPTION_KEYWORD_RULES = RuleSet('caption_keyword', [keyword_rule('descriptive', [
+    'showing', 'depicting', 'illustrating', 'displaying',
+    'overview', 'comparison', 'analysis', 'structure',
+    'process', 'workflow', 'system', 'model', 'framework'
+])])
+
+_CAPTION_ENUMERATION = re.compile(r'^\([a-z0-9]+\)')
+
+CODE_RULES = RuleSet('code', [
+    Rule('fence', r'```', re.MULTILINE),
+    Rule('python_def', r'^\s*def\s+\w+\(', re.MULTILINE),
+    Rule('class', r'^\s*class\s+\w+', re.MULTILINE),
+    Rule('import', r'^\s*import\s+\w+', re.MULTILINE),
+    Rule('from_import', r'^\s*from\s+\w+\s+import', re.MULTILINE),
+    Rule('js_function', r'^\s*function\s+\w+\(', re.MULTILINE),
+    Rule('js_var', r'^\s*var\s+\w+\s*=', re.MULTILINE),
+    Rule('function_expression', r'^\s*\w+\s*=\s*function\(', re.MULTILINE),
+])
+
+EQUATION_RULES = RuleSet('equation', [
+    Rule('inline_math', r'\$.*?\$'),  # LaTeX inline math
+    Rule('display_math', r'\\\[.*?\\\]'),  # LaTeX display math
+    Rule('equation_env', r'\\begin\{equation\}'),
+    Rule('align_env', r'\\begin\{align\}'),
+    Rule('math_symbols', r'[∑∏∫∂∇±×÷≤≥≠≈∞]'),  # Mathematical symbols
+    Rule('greek_letters', r'[αβγδεζηθικλμνξοπρστυφχψω]'),  # Greek letters
+])
+
+# Matched against lowercased, stripped text
+SKIP_TRANSLATION_RULES = RuleSet('skip_translation', [
+    Rule('rights_reserved', r'^\s*all rights reserved\s*$', re.IGNORECASE, anchored=True),
+    Rule('copyright', r'^\s*copyright\s+\d{4}', re.IGNORECASE, anchored=True),
+    Rule('confidential', r'^\s*confidential\s*$', re.IGNORECASE, anchored=True),
+    Rule('confidential_el', r'^\s*εμπιστευτικό\s*$', re.IGNORECASE, anchored=True),
+    Rule('page_number', r'^\s*page\s+\d+\s*$', re.IGNORECASE, anchored=True),
+    Rule('page_number_el', r'^\s*σελίδα\s+\d+\s*$', re.IGNORECASE, anchored=True),
+    Rule('number_only', r'^\s*\d+\s*$', re.IGNORECASE, anchored=True),  # Just numbers
+    Rule('roman_only', r'^\s*[ivxlcdm]+\s*$', re.IGNORECASE, anchored=True),  # Roman numerals only
+])
+
+# Matched against the raw text
+SKIP_CODE_RULES = RuleSet('skip_code', [
+    Rule('keyword', r'^\s*(def|class|import|from|if|for|while|try|except)\s+', re.MULTILINE, anchored=True),
+    Rule('assignment', r'^\s*[a-zA-Z_][a-zA-Z0-9_]*\s*=\s*', re.MULTILINE, anchored=True),
+    Rule('comment', r'^\s*#.*$', re.MULTILINE, anchored=True),  # Comments
+    Rule('line_comment', r'^\s*//.*$', re.MULTILINE, anchored=True),  # C++ style comments
+    Rule('block_comment', r'^\s*/\*.*\*/\s*$', re.MULTILINE, anchored=True),  # Block comments
+    Rule('markup_tag', r'^\s*<[^>]+>\s*$', re.MULTILINE, anchored=True),  # HTML/XML tags
+])
+
+# Structured content kinds for translation validation, in priority order
+STRUCTURED_CONTENT_RULES = (
+    ('table', RuleSet('structured_table', [Rule('markdown_table', r'\|.*\|', re.MULTILINE)])),
+    ('code_block', RuleSet('structured_code', [Rule('code_block', r'```[\s\S]*?```', re.MULTILINE)])),
+    ('latex_formula', RuleSet('structured_latex', [
+        Rule('display_math', r'\$\$[\s\S]*?\$\$'),
+        Rule('latex_env', r'\\begin\{(\w+)\}[\s\S]*?\\end\{\1\}'),
+    ])),
+    ('list', RuleSet('structured_list', [
+        Rule('bullet_list', r'^[\s]*[-*+]\s+', re.MULTILINE),
+        Rule('numbered_list', r'^[\s]*\d+\.\s+', re.MULTILINE),
+    ])),
+)
+
+# Substrings that suggest tabular text (note '  +' is the literal two spaces and a plus)
+TABLE_INDICATORS = ('|', '\t', '  +')
+
+
+# ----------------------------------------------------------------------
+# Features
+# ----------------------------------------------------------------------
+
+@dataclass(frozen=True)
+class BlockFeatures:
+    """Text-only classification features of one block"""
+    length: int                 # stripped length
+    word_count: int
+    heading_pattern: bool
+    section_start: bool
+    list_marker: bool
+    list_item: bool
+    caption: bool
+    code_block: bool
+    equation: bool
+    skip_translation: bool
+    table_like: bool
+    structured_type: Optional[str]
+
+
+def _is_caption(text: str, text_clean: str, text_lower: str, word_count: int) -> bool:
+    if not text or len(text_clean) < 5:
+        return False
+
+    # Check explicit caption patterns
+    if CAPTION_RULES.matches(text_lower):
+        return True
+
+    # Short descriptive text without sentence endings, with descriptive keywords
+    if (word_count <= 15 and not text_clean.endswith(('.', '!', '?'))
+            and CAPTION_KEYWORD_RULES.matches(text_lower)):
+        return True
+
+    # Check for numbered/lettered items (a), (b), (1), (2)
+    if _CAPTION_ENUMERATION.match(text_lower):
+        return True
+
+    # Check for colon-separated descriptive text
+    if ':' in text_clean and word_count <= 20:
+        return True
+
+    # Italic or emphasized text patterns (common in captions)
+    return (word_count <= 25 and
+            ('*' in text_clean or '_' in text_clean or text_clean.isupper() or text_clean.islower()))
+
+
+def _should_skip_translation(text: str, text_clean: str, text_lower: str) -> bool:
+    if SKIP_TRANSLATION_RULES.matches(text_lower) or SKIP_CODE_RULES.matches(text):
+        return True
+
+    # Skip very short non-meaningful text
+    if len(text_clean) < 3:
+        return True
+
+    # Skip if mostly numbers and symbols
+    alpha_chars = sum(map(str.isalpha, text))
+    return len(text) > 0 and (alpha_chars / len(text)) < 0.3
+
+
+def _is_table_like(text: str) -> bool:
+    lines = text.split('\n')
+    if len(lines) > 1:
+        # Multiple lines with similar structure
+        structured_lines = [line for line in lines if any(indicator in line for indicator in TABLE_INDICATORS)]
+        return len(structured_lines) >= 2
+    return sum(1 for indicator in TABLE_INDICATORS if indicator in text) >= 2
+
+
+def compute_features(text: str) -> BlockFeatures:
+    """Evaluate every rule set against one block"""
+    text_clean = text.strip()
+    text_lower = text.lower().strip()
+    word_count = len(text_clean.split())
+    structured_type = None
+    for kind, rules in STRUCTURED_CONTENT_RULES:
+        if rules.matches(text):
+            structured_type = kind
+            break
+
+    return BlockFeatures(
+        length=len(text_clean),
+        word_count=word_count,
+        heading_pattern=HEADING_RULES.matches(text_clean),
+        section_start=SECTION_START_RULES.matches(text_clean.lower()),
+        list_marker=LIST_MARKER_RULES.matches(text_clean),
+        list_item=LIST_ITEM_RULES.matches(text),
+        caption=_is_caption(text, text_clean, text_lower, word_count),
+        code_block=CODE_RULES.matches(text),
+        equation=EQUATION_RULES.matches(text),
+        skip_translation=_should_skip_translation(text, text_clean, text_lower),
+        table_like=_is_table_like(text),
+        structured_type=structured_type,
+    )
+
+
+def _text_key(text: str) -> bytes:
+    return hashlib.blake2b(text.encode('utf-8', 'surrogatepass'), digest_size=16).digest()
+
+
+class ClassificationEngine:
+    """Batch evaluation of all rule sets with an LRU feature cache keyed by block hash"""
+
+    def __init__(self, max_cache_entries: int = 200000):
+        self.max_cache_entries = max_cache_entries
+        self._cache: "OrderedDict[bytes, BlockFeatures]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.stats = {'hits': 0, 'misses': 0}
+
+    def _store(self, entries: List[Tuple[bytes, BlockFeatures]]):
+        if self.max_cache_entries <= 0:
+            return
+        with self._lock:
+            for key, features in entries:
+                self._cache[key] = features
+            while len(self._cache) > self.max_cache_entries:
+                self._cache.popitem(last=False)
+
+    def features(self, text: str) -> BlockFeatures:
+        key = _text_key(text)
+        with self._lock:
+            features = self._cache.get(key)
+            if features is not None:
+                self._cache.move_to_end(key)
+                self.stats['hits'] += 1
+                return features
+            self.stats['misses'] += 1
+        features = compute_features(text)
+        self._store([(key, features)])
+        return features
+
+    def classify_batch(self, texts: Iterable[str]) -> List[BlockFeatures]:
+        """Features for every text, evaluating each distinct text once"""
+        texts = list(texts)
+        keys = [_text_key(text) for text in texts]
+        results: Dict[bytes, BlockFeatures] = {}
+        with self._lock:
+            for key in keys:
+                if key not in results:
+                    features = self._cache.get(key)
+                    if features is not None:
+                        self._cache.move_to_end(key)
+                        results[key] = features
+
+        computed = []
+        for key, text in zip(keys, texts):
+            if key not in results:
+                results[key] = compute_features(text)
+                computed.append((key, results[key]))
+        with self._lock:
+            self.stats['hits'] += len(keys) - len(computed)
+            self.stats['misses'] += len(computed)
+        self._store(computed)
+        return [results[key] for key in keys]
+
+    def clear(self):
+        with self._lock:
+            self._cache.clear()
+
+    def get_statistics(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.stats['hits'] + self.stats['misses']
+            return dict(self.stats, cached_blocks=len(self._cache),
+                        hit_rate=self.stats['hits'] / lookups if lookups else 0.0)
+
+
+def _create_classification_engine() -> ClassificationEngine:
+    return ClassificationEngine(**config_manager.classification_settings)
+
+
+_classification_engine = LazySingleton(_create_classification_engine, name='classification_engine')
+
+
+def get_classification_engine() -> ClassificationEngine:
+    """Process-wide classification engine (created on first use)"""
+    return _classification_engine.get_instance()
@@ -8,7 +8,6 @@ import os
 import configparser
 import logging
 from dotenv import load_dotenv
-import google.generativeai as genai
 
 # Setup logging
 logger = logging.getLogger(__name__)
@@ -46,6 +45,12 @@ class ConfigManager:
     def _initialize_api(self):
         """Initialize Gemini API if key is available"""
         if self.api_key:
+            # Imported here: the Gemini SDK (grpc/protobuf) dominates startup time
+            try:
+                import google.generativeai as genai
+            except ImportError:
+                logger.warning("google-generativeai not installed - Gemini API not configured")
+                return
             genai.configure(api_key=self.api_key)
             logger.info("Gemini API configured successfully")
     
@@ -147,7 +152,9 @@ class ConfigManager:
             'list_indent_per_level_inches': self.get_config_value('WordOutput', 'list_indent_per_level_inches', 0.25, float),
             'heading_space_before_pt': self.get_config_value('WordOutput', 'heading_space_before_pt', 6, int),
             'paragraph_first_line_indent_inches': self.get_config_value('WordOutput', 'paragraph_first_line_indent_inches', 0.0, float),
-            'paragraph_space_after_pt': self.get_config_value('WordOutput', 'paragraph_space_after_pt', 6, int)
+            'paragraph_space_after_pt': self.get_config_value('WordOutput', 'paragraph_space_after_pt', 6, int),
+            'docx_writer': self.get_config_value('WordOutput', 'docx_writer', "auto").strip().lower(),
+            'streaming_writer_min_blocks': self.get_config_value('WordOutput', 'streaming_writer_min_blocks', 5000, int)
         }
     
     @property
@@ -155,6 +162,8 @@ class ConfigManager:
         """Get translation enhancement settings"""
         return {
             'target_language': self.get_config_value('TranslationEnhancements', 'target_language', "Ελληνικά"),
+            'target_languages': [language.strip() for language in self.get_config_value(
+                'TranslationEnhancements', 'target_languages', "").split(',') if language.strip()],
             'use_glossary': self.get_config_value('TranslationEnhancements', 'use_glossary', False, bool),
             'glossary_file_path': self.get_config_value('TranslationEnhancements', 'glossary_file_path', "glossary.json"),
             'use_translation_cache': self.get_config_value('TranslationEnhancements', 'use_translation_cache', True, bool),
@@ -186,7 +195,23 @@ class ConfigManager:
         folder_id = self.get_config_value('GoogleDrive', 'gdrive_target_folder_id', "")
         return {
             'target_folder_id': folder_id if folder_id and folder_id.lower() != "none" else None,
-            'credentials_file': "mycreds.txt"
+            'credentials_file': "mycreds.txt",
+            'max_concurrent_uploads': self.get_config_value('GoogleDrive', 'max_concurrent_uploads', 3, int),
+            'upload_chunk_size_mb': self.get_config_value('GoogleDrive', 'upload_chunk_size_mb', 8.0, float),
+            'upload_max_retries': self.get_config_value('GoogleDrive', 'upload_max_retries', 5, int),
+            'upload_retry_base_delay': self.get_config_value('GoogleDrive', 'upload_retry_base_delay', 1.0, float),
+            'upload_sessions_file': self.get_config_value('GoogleDrive', 'upload_sessions_file', "drive_upload_sessions.json"),
+            'background_uploads': self.get_config_value('GoogleDrive', 'background_uploads', True, bool)
+        }
+
+    @property
+    def markdown_batching_settings(self):
+        """Get Markdown node batching settings"""
+        return {
+            'enabled': self.get_config_value('APIOptimization', 'enable_markdown_node_batching', True, bool),
+            'max_tokens_per_request': self.get_config_value('APIOptimization', 'markdown_batch_max_tokens', 3000, int),
+            'max_nodes_per_request': self.get_config_value('APIOptimization', 'markdown_batch_max_nodes', 60, int),
+            'max_concurrent_requests': self.get_config_value('APIOptimization', 'markdown_max_concurrent_requests', 5, int),
         }
 
     @property
@@ -234,7 +259,116 @@ class ConfigManager:
             'upscale_factor': self.get_config_value('OCRPreprocessing', 'upscale_factor', 2.0, float),
             'ocr_dpi': self.get_config_value('OCRPreprocessing', 'ocr_dpi', 300, int),
         }
-    
+
+    @property
+    def stage_cache_settings(self):
+        """Get pipeline stage cache settings"""
+        return {
+            'enabled': self.get_config_value('StageCache', 'enable_stage_cache', True, bool),
+            'cache_dir': self.get_config_value('StageCache', 'cache_dir', "stage_cache"),
+            'max_size_mb': self.get_config_value('StageCache', 'max_size_mb', 2048.0, float),
+        }
+
+    @property
+    def shared_cache_settings(self):
+        """Get cross-process shared cache settings"""
+        # Only the namespace limits present in config.ini; the rest keep their built-in budgets
+        budget_overrides = {}
+        if self.config.has_section('SharedCache'):
+            for option in self.config.options('SharedCache'):
+                for suffix in ('_max_entries', '_max_mb'):
+                    if option.endswith(suffix):
+                        value = self.get_config_value('SharedCache', option, None, int)
+                        if value is not None:
+                            budget_overrides.setdefault(option[:-len(suffix)], {})[suffix[1:]] = value
+        return {
+            'enabled': self.get_config_value('SharedCache', 'enable_shared_cache', True, bool),
+            'db_path': self.get_config_value('SharedCache', 'shared_cache_path', os.path.join('shared_cache', 'shared_cache.sqlite3')),
+            'budget_overrides': budget_overrides,
+        }
+
+    @property
+    def token_accounting_settings(self):
+        """Get token counting, calibration and budgeting settings"""
+        return {
+            'tokenizer': self.get_config_value('TokenAccounting', 'tokenizer', 'estimator'),
+            'tokenizer_model_path': self.get_config_value('TokenAccounting', 'tokenizer_model_path', ''),
+            'tiktoken_encoding': self.get_config_value('TokenAccounting', 'tiktoken_encoding', 'cl100k_base'),
+            'calibration_path': self.get_config_value('TokenAccounting', 'calibration_path', os.path.join('token_calibration', 'token_calibration.json')),
+            'max_request_tokens': self.get_config_value('TokenAccounting', 'max_request_tokens', 4000, int),
+            'max_output_tokens': self.get_config_value('TokenAccounting', 'max_output_tokens', 8192, int),
+            'default_output_ratio': self.get_config_value('TokenAccounting', 'default_output_ratio', 1.8, float),
+            'safety_margin': self.get_config_value('TokenAccounting', 'safety_margin', 0.8, float),
+            'chunk_max_tokens': self.get_config_value('TokenAccounting', 'chunk_max_tokens', 2000, int),
+            'tokens_per_minute': self.get_config_value('TokenAccounting', 'tokens_per_minute', 1000000, int),
+            'refit_interval': self.get_config_value('TokenAccounting', 'refit_interval', 50, int),
+            'save_interval': self.get_config_value('TokenAccounting', 'save_interval', 20, int),
+        }
+
+    @property
+    def image_optimization_settings(self):
+        """Get image resampling and recompression settings"""
+        return {
+            'enabled': self.get_config_value('ImageOptimization', 'enable_image_optimization', True, bool),
+            'target_dpi': self.get_config_value('ImageOptimization', 'target_dpi', 200, int),
+            'jpeg_quality': self.get_config_value('ImageOptimization', 'jpeg_quality', 85, int),
+            'photo_color_threshold': self.get_config_value('ImageOptimization', 'photo_color_threshold', 256, int),
+            'min_size_reduction': self.get_config_value('ImageOptimization', 'min_size_reduction', 0.9, float),
+            'max_workers': self.get_config_value('ImageOptimization', 'max_workers', min(4, os.cpu_count() or 1), int),
+            'cache_dir': self.get_config_value('ImageOptimization', 'cache_dir', "image_cache"),
+            'max_cache_size_mb': self.get_config_value('ImageOptimization', 'max_cache_size_mb', 1024.0, float),
+        }
+
+    @property
+    def office_conversion_settings(self):
+        """Get LibreOffice DOCX-to-PDF conversion settings"""
+        return {
+            'enabled': self.get_config_value('PDFConversion', 'enable_office_conversion', True, bool),
+            'soffice_path': self.get_config_value('PDFConversion', 'soffice_path', "").strip(),
+            'workers': self.get_config_value('PDFConversion', 'office_workers', min(2, os.cpu_count() or 1), int),
+            'conversion_timeout': self.get_config_value('PDFConversion', 'conversion_timeout_seconds', 180.0, float),
+            'max_retries': self.get_config_value('PDFConversion', 'max_retries', 1, int),
+            'max_conversions_per_process': self.get_config_value('PDFConversion', 'max_conversions_per_process', 200, int),
+        }
+
+    @property
+    def classification_settings(self):
+        """Get text block classification settings"""
+        return {
+            'max_cache_entries': self.get_config_value('PDFProcessing', 'classification_cache_max_blocks', 200000, int),
+        }
+
+    @property
+    def hot_path_logging_settings(self):
+        """Get sampling and rate limits for per-item log events"""
+        return {
+            'sampling': self.get_config_value('Reporting', 'sample_hot_path_logs', True, bool),
+            'always_log_first': self.get_config_value('Reporting', 'hot_path_always_log_first', 5, int),
+            'sample_every': self.get_config_value('Reporting', 'hot_path_sample_every', 100, int),
+            'max_events_per_second': self.get_config_value('Reporting', 'hot_path_max_events_per_second', 20.0, float),
+        }
+
+    @property
+    def image_classification_settings(self):
+        """Get ONNX image classification settings"""
+        models_path = self.get_config_value('IntelligentPipeline', 'onnx_models_path', 'onnx_models')
+        model_file = self.get_config_value('IntelligentPipeline', 'onnx_image_classifier_model', 'image_classifier.onnx')
+        return {
+            'enabled': self.get_config_value('IntelligentPipeline', 'enable_onnx_image_classification', False, bool),
+            'model_path': os.path.join(models_path, model_file),
+            'batch_size': self.get_config_value('IntelligentPipeline', 'image_classification_batch_size', 32, int),
+            'max_workers': self.get_config_value('IntelligentPipeline', 'image_classification_workers', min(8, os.cpu_count() or 4), int),
+            'class_labels': self._parse_keyword_list('IntelligentPipeline', 'onnx_class_labels', "high,medium,low,skip"),
+        }
+
+    @property
+    def request_coalescing_settings(self):
+        """Get duplicate translation request coalescing settings"""
+        return {
+            'enabled': self.get_config_value('TranslationEnhancements', 'coalesce_duplicate_requests', True, bool),
+            'max_remembered': self.get_config_value('TranslationEnhancements', 'coalesced_results_max_entries', 20000, int),
+        }
+
     def _parse_keyword_list(self, section, key, default):
         """Parse comma-separated keyword list"""
         keywords_str = self.get_config_value(section, key, default)
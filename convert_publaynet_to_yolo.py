@@ -4,6 +4,12 @@ Convert PubLayNet Dataset to YOLOv8 Format
 This script converts the PubLayNet dataset from COCO format to YOLOv8 format
 for fine-tuning YOLOv8 on document layout analysis.
 
+The annotations are streamed rather than loaded whole, images are hardlinked
+(or symlinked) instead of copied, label files are written by parallel worker
+processes, and a progress manifest lets interrupted runs resume:
+
+    python convert_publaynet_to_yolo.py <publaynet_dir> <output_dir> [--workers N] [--link-mode symlink]
+
 PubLayNet Classes:
 0: text
 1: title  
@@ -13,11 +19,21 @@ PubLayNet Classes:
 """
 
 import os
+import re
 import json
 import shutil
+import argparse
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from pathlib import Path
 import logging
 
+# Optional C-accelerated streaming JSON parser
+try:
+    import ijson
+    IJSON_AVAILABLE = True
+except ImportError:
+    IJSON_AVAILABLE = False
+
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
@@ -42,89 +58,352 @@ def convert_coco_to_yolo_bbox(coco_bbox, img_width, img_height):
     
     return [x_center_norm, y_center_norm, w_norm, h_norm]
 
-def convert_publaynet_split(publaynet_dir, split_name, output_dir):
-    """Convert a single split (train/val/test) from PubLayNet to YOLO format"""
-    
+# ----------------------------------------------------------------------
+# Streaming COCO parsing
+# ----------------------------------------------------------------------
+
+JSON_READ_CHUNK_SIZE = 1 << 20
+_JSON_WHITESPACE = re.compile(r'[ \t\n\r]*')
+
+
+class _JsonStreamReader:
+    """
+    Incremental reader for one large JSON document. Values are decoded one at
+    a time with the C decoder from a sliding buffer, so a multi-gigabyte
+    annotations file never has to be in memory at once.
+    """
+
+    def __init__(self, file_obj):
+        self.file_obj = file_obj
+        self.decoder = json.JSONDecoder()
+        self.buffer = ''
+        self.pos = 0
+        self.eof = False
+
+    def _fill(self):
+        if self.eof:
+            return False
+        chunk = self.file_obj.read(JSON_READ_CHUNK_SIZE)
+        if not chunk:
+            self.eof = True
+            return False
+        self.buffer = self.buffer[self.pos:] + chunk
+        self.pos = 0
+        return True
+
+    def peek(self):
+        """Next non-whitespace character ('' at end of file)"""
+        while True:
+            self.pos = _JSON_WHITESPACE.match(self.buffer, self.pos).end()
+            if self.pos < len(self.buffer):
+                return self.buffer[self.pos]
+            if not self._fill():
+                return ''
+
+    def expect(self, char):
+        found = self.peek()
+        if found != char:
+            raise ValueError(f"Malformed JSON: expected '{char}', found '{found or 'EOF'}'")
+        self.pos += 1
+
+    def decode_value(self):
+        self.peek()
+        while True:
+            try:
+                value, end = self.decoder.raw_decode(self.buffer, self.pos)
+            except json.JSONDecodeError:
+                if not self._fill():
+                    raise
+                continue
+            # A number ending exactly at the buffer edge may continue in the next chunk
+            if end == len(self.buffer) and self._fill():
+                continue
+            self.pos = end
+            return value
+
+    def iter_array(self):
+        self.expect('[')
+        if self.peek() == ']':
+            self.pos += 1
+            return
+        while True:
+            yield self.decode_value()
+            separator = self.peek()
+            self.pos += 1
+            if separator == ']':
+                return
+            if separator != ',':
+                raise ValueError(f"Malformed JSON array: unexpected '{separator or 'EOF'}'")
+
+    def skip_value(self):
+        if self.peek() == '[':
+            for _ in self.iter_array():
+                pass
+        else:
+            self.decode_value()
+
+
+def iter_coco_section(annotations_file, section):
+    """
+    Yield the entries of a top-level COCO array ('images', 'annotations', ...)
+    one at a time. Uses ijson when installed, otherwise the built-in
+    incremental reader; other top-level arrays are skipped without being kept.
+    """
+    if IJSON_AVAILABLE:
+        with open(annotations_file, 'rb') as f:
+            yield from ijson.items(f, f'{section}.item', use_float=True)
+        return
+
+    with open(annotations_file, 'r', encoding='utf-8') as f:
+        reader = _JsonStreamReader(f)
+        reader.expect('{')
+        while reader.peek() not in ('}', ''):
+            key = reader.decode_value()
+            reader.expect(':')
+            if key == section:
+                yield from reader.iter_array()
+                return
+            reader.skip_value()
+            if reader.peek() == ',':
+                reader.pos += 1
+
+
+# ----------------------------------------------------------------------
+# Resumable, sharded conversion
+# ----------------------------------------------------------------------
+
+DEFAULT_NUM_SHARDS = 64
+MANIFEST_FILENAME = "conversion_manifest.json"
+LINK_MODES = ('hardlink', 'symlink', 'copy')
+
+
+def _annotations_fingerprint(annotations_file, num_shards):
+    stat = os.stat(annotations_file)
+    return f"{stat.st_size}:{int(stat.st_mtime)}:{num_shards}"
+
+
+def _load_manifest(output_dir):
+    manifest_path = os.path.join(output_dir, MANIFEST_FILENAME)
+    if not os.path.exists(manifest_path):
+        return {}
+    try:
+        with open(manifest_path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError) as e:
+        logger.warning(f"Ignoring unreadable manifest {manifest_path}: {e}")
+        return {}
+
+
+def _save_manifest(output_dir, manifest):
+    manifest_path = os.path.join(output_dir, MANIFEST_FILENAME)
+    temp_path = f"{manifest_path}.tmp"
+    with open(temp_path, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(temp_path, manifest_path)
+
+
+def _spool_paths(spool_dir, shard):
+    return (os.path.join(spool_dir, f"images_{shard:04d}.jsonl"),
+            os.path.join(spool_dir, f"annotations_{shard:04d}.jsonl"))
+
+
+def _spool_split(annotations_file, spool_dir, num_shards):
+    """
+    Stream the COCO file once per section and partition images and
+    annotations into per-shard spool files by image id.
+    """
+    os.makedirs(spool_dir, exist_ok=True)
+    image_files = []
+    annotation_files = []
+    try:
+        for shard in range(num_shards):
+            images_path, annotations_path = _spool_paths(spool_dir, shard)
+            image_files.append(open(images_path, 'w', encoding='utf-8'))
+            annotation_files.append(open(annotations_path, 'w', encoding='utf-8'))
+
+        image_count = 0
+        for img in iter_coco_section(annotations_file, 'images'):
+            image_files[img['id'] % num_shards].write(
+                json.dumps([img['id'], img['file_name'], img['width'], img['height']]) + '\n')
+            image_count += 1
+
+        annotation_count = 0
+        for ann in iter_coco_section(annotations_file, 'annotations'):
+            annotation_files[ann['image_id'] % num_shards].write(
+                json.dumps([ann['image_id'], ann['category_id'], list(ann['bbox'])]) + '\n')
+            annotation_count += 1
+    finally:
+        for spool_file in image_files + annotation_files:
+            spool_file.close()
+
+    return image_count, annotation_count
+
+
+def _link_image(src_path, dst_path, link_mode):
+    """
+    Place src_path at dst_path without duplicating data where possible.
+    Falls back from hardlink to symlink (e.g. across filesystems) to copy.
+    Returns the mode actually used, or None if dst_path already exists.
+    """
+    if os.path.lexists(dst_path):
+        return None
+    modes = LINK_MODES[LINK_MODES.index(link_mode):]
+    for mode in modes:
+        try:
+            if mode == 'hardlink':
+                os.link(src_path, dst_path)
+            elif mode == 'symlink':
+                os.symlink(os.path.abspath(src_path), dst_path)
+            else:
+                shutil.copy2(src_path, dst_path)
+            return mode
+        except OSError:
+            if mode == modes[-1]:
+                raise
+    return None
+
+
+def _convert_shard(task):
+    """
+    Convert one shard of a split: link its images and write its label files.
+    This function must be at module level to be pickable by ProcessPoolExecutor.
+    """
+    images = {}
+    with open(task['images_spool'], 'r', encoding='utf-8') as f:
+        for line in f:
+            img_id, file_name, width, height = json.loads(line)
+            images[img_id] = (file_name, width, height)
+
+    labels = {img_id: [] for img_id in images}
+    with open(task['annotations_spool'], 'r', encoding='utf-8') as f:
+        for line in f:
+            img_id, category_id, bbox = json.loads(line)
+            if img_id not in images:
+                continue
+            _, width, height = images[img_id]
+            # PubLayNet categories are 1-indexed
+            yolo_bbox = convert_coco_to_yolo_bbox(bbox, width, height)
+            labels[img_id].append(f"{category_id - 1} {' '.join(map(str, yolo_bbox))}")
+
+    result = {'shard': task['shard'], 'converted': 0, 'missing': 0, 'errors': 0,
+              'link_modes': {}}
+    for img_id, (file_name, _, _) in images.items():
+        try:
+            src_img_path = os.path.join(task['images_dir'], file_name)
+            if not os.path.exists(src_img_path):
+                result['missing'] += 1
+                continue
+
+            dst_img_path = os.path.join(task['output_images_dir'], file_name)
+            mode = _link_image(src_img_path, dst_img_path, task['link_mode'])
+            if mode:
+                result['link_modes'][mode] = result['link_modes'].get(mode, 0) + 1
+
+            label_path = os.path.join(task['output_labels_dir'], Path(file_name).stem + '.txt')
+            with open(label_path, 'w') as f:
+                f.write('\n'.join(labels[img_id]))
+            result['converted'] += 1
+        except Exception as e:
+            logger.error(f"Error converting image {file_name}: {e}")
+            result['errors'] += 1
+    return result
+
+
+def convert_publaynet_split(publaynet_dir, split_name, output_dir, workers=None,
+                            link_mode='hardlink', num_shards=DEFAULT_NUM_SHARDS):
+    """
+    Convert a single split (train/val/test) from PubLayNet to YOLO format.
+
+    The annotations file is streamed into per-shard spool files, shards are
+    converted in parallel worker processes, and images are hardlinked (or
+    symlinked) instead of copied. Progress is kept in conversion_manifest.json
+    so an interrupted or repeated run skips finished shards and splits.
+    """
+    if link_mode not in LINK_MODES:
+        raise ValueError(f"link_mode must be one of {LINK_MODES}, got '{link_mode}'")
+
     logger.info(f"Converting {split_name} split...")
-    
+
     # Paths
     images_dir = os.path.join(publaynet_dir, split_name)
     annotations_file = os.path.join(publaynet_dir, f"{split_name}.json")
-    
+
     output_images_dir = os.path.join(output_dir, "images", split_name)
     output_labels_dir = os.path.join(output_dir, "labels", split_name)
-    
+    spool_dir = os.path.join(output_dir, ".conversion", split_name)
+
     # Create output directories
     os.makedirs(output_images_dir, exist_ok=True)
     os.makedirs(output_labels_dir, exist_ok=True)
-    
-    # Load COCO annotations
-    with open(annotations_file, 'r') as f:
-        coco_data = json.load(f)
-    
-    # Create image ID to filename mapping
-    images = {img['id']: img for img in coco_data['images']}
-    
-    # Group annotations by image
-    annotations_by_image = {}
-    for ann in coco_data['annotations']:
-        img_id = ann['image_id']
-        if img_id not in annotations_by_image:
-            annotations_by_image[img_id] = []
-        annotations_by_image[img_id].append(ann)
-    
-    # Convert each image and its annotations
-    converted_count = 0
-    
-    for img_id, img_info in images.items():
-        try:
-            # Source image path
-            src_img_path = os.path.join(images_dir, img_info['file_name'])
-            
-            if not os.path.exists(src_img_path):
-                logger.warning(f"Image not found: {src_img_path}")
-                continue
-            
-            # Copy image to output directory
-            dst_img_path = os.path.join(output_images_dir, img_info['file_name'])
-            shutil.copy2(src_img_path, dst_img_path)
-            
-            # Create YOLO label file
-            label_filename = Path(img_info['file_name']).stem + '.txt'
-            label_path = os.path.join(output_labels_dir, label_filename)
-            
-            # Convert annotations for this image
-            yolo_annotations = []
-            
-            if img_id in annotations_by_image:
-                for ann in annotations_by_image[img_id]:
-                    # PubLayNet category mapping (already 0-indexed)
-                    category_id = ann['category_id'] - 1  # Convert to 0-indexed
-                    
-                    # Convert bbox to YOLO format
-                    yolo_bbox = convert_coco_to_yolo_bbox(
-                        ann['bbox'], 
-                        img_info['width'], 
-                        img_info['height']
-                    )
-                    
-                    # Create YOLO annotation line
-                    yolo_line = f"{category_id} {' '.join(map(str, yolo_bbox))}"
-                    yolo_annotations.append(yolo_line)
-            
-            # Write YOLO label file
-            with open(label_path, 'w') as f:
-                f.write('\n'.join(yolo_annotations))
-            
-            converted_count += 1
-            
-            if converted_count % 1000 == 0:
-                logger.info(f"Converted {converted_count} images for {split_name}")
-                
-        except Exception as e:
-            logger.error(f"Error converting image {img_info['file_name']}: {e}")
-            continue
-    
+
+    manifest = _load_manifest(output_dir)
+    fingerprint = _annotations_fingerprint(annotations_file, num_shards)
+    state = manifest.get(split_name)
+    if not state or state.get('fingerprint') != fingerprint:
+        state = {'fingerprint': fingerprint, 'num_shards': num_shards, 'spooled': False,
+                 'completed_shards': {}, 'complete': False}
+
+    if state['complete']:
+        converted = sum(shard['converted'] for shard in state['completed_shards'].values())
+        logger.info(f"⏭️ {split_name} already converted ({converted} images), skipping")
+        return converted
+
+    spool_ready = state['spooled'] and all(
+        os.path.exists(path) for shard in range(num_shards) for path in _spool_paths(spool_dir, shard))
+    if not spool_ready:
+        logger.info(f"📖 Streaming {annotations_file} into {num_shards} shards...")
+        image_count, annotation_count = _spool_split(annotations_file, spool_dir, num_shards)
+        logger.info(f"   {image_count} images, {annotation_count} annotations")
+        state.update({'spooled': True, 'image_count': image_count, 'annotation_count': annotation_count})
+        manifest[split_name] = state
+        _save_manifest(output_dir, manifest)
+
+    pending = [shard for shard in range(num_shards) if str(shard) not in state['completed_shards']]
+    if len(pending) < num_shards:
+        logger.info(f"⏭️ Resuming {split_name}: {num_shards - len(pending)} of {num_shards} shards already done")
+
+    tasks = []
+    for shard in pending:
+        images_spool, annotations_spool = _spool_paths(spool_dir, shard)
+        tasks.append({
+            'shard': shard,
+            'images_spool': images_spool,
+            'annotations_spool': annotations_spool,
+            'images_dir': images_dir,
+            'output_images_dir': output_images_dir,
+            'output_labels_dir': output_labels_dir,
+            'link_mode': link_mode
+        })
+
+    def record(result):
+        state['completed_shards'][str(result['shard'])] = {
+            'converted': result['converted'], 'missing': result['missing'],
+            'errors': result['errors'], 'link_modes': result['link_modes']
+        }
+        manifest[split_name] = state
+        _save_manifest(output_dir, manifest)
+        if result['missing']:
+            logger.warning(f"Shard {result['shard']}: {result['missing']} images not found")
+        done = sum(shard['converted'] for shard in state['completed_shards'].values())
+        logger.info(f"Converted {done} images for {split_name} "
+                    f"({len(state['completed_shards'])}/{num_shards} shards)")
+
+    workers = workers or os.cpu_count() or 1
+    if workers > 1 and len(tasks) > 1:
+        with ProcessPoolExecutor(max_workers=min(workers, len(tasks))) as executor:
+            futures = [executor.submit(_convert_shard, task) for task in tasks]
+            for future in as_completed(futures):
+                record(future.result())
+    else:
+        for task in tasks:
+            record(_convert_shard(task))
+
+    state['complete'] = True
+    manifest[split_name] = state
+    _save_manifest(output_dir, manifest)
+    shutil.rmtree(spool_dir, ignore_errors=True)
+
+    converted_count = sum(shard['converted'] for shard in state['completed_shards'].values())
     logger.info(f"Completed {split_name}: {converted_count} images converted")
     return converted_count
 
@@ -174,17 +453,26 @@ def main():
     """Main conversion function"""
 
     # Configuration - allow command line arguments or interactive input
-    import sys
-
-    if len(sys.argv) >= 2:
-        publaynet_dir = sys.argv[1]
+    parser = argparse.ArgumentParser(description="Convert PubLayNet (COCO) to YOLOv8 format")
+    parser.add_argument('publaynet_dir', nargs='?', help="PubLayNet dataset directory")
+    parser.add_argument('output_dir', nargs='?', help="Output directory for the YOLOv8 dataset")
+    parser.add_argument('--workers', type=int, default=None,
+                        help="Worker processes for label writing (default: CPU count)")
+    parser.add_argument('--link-mode', choices=LINK_MODES, default='hardlink',
+                        help="How images are placed in the output (default: hardlink)")
+    parser.add_argument('--shards', type=int, default=DEFAULT_NUM_SHARDS,
+                        help="Number of resumable work shards per split")
+    args = parser.parse_args()
+
+    if args.publaynet_dir:
+        publaynet_dir = args.publaynet_dir
     else:
         publaynet_dir = input("Enter path to PubLayNet dataset directory: ").strip()
         if not publaynet_dir:
             publaynet_dir = os.path.expanduser("~/datasets/publaynet")
 
-    if len(sys.argv) >= 3:
-        output_dir = sys.argv[2]
+    if args.output_dir:
+        output_dir = args.output_dir
     else:
         output_dir = input("Enter output directory for YOLOv8 format (default: ./publaynet_yolo): ").strip()
         if not output_dir:
@@ -226,7 +514,8 @@ def main():
 
     for split in available_splits:
         if os.path.exists(os.path.join(publaynet_dir, split)):
-            count = convert_publaynet_split(publaynet_dir, split, output_dir)
+            count = convert_publaynet_split(publaynet_dir, split, output_dir, workers=args.workers,
+                                            link_mode=args.link_mode, num_shards=args.shards)
             total_converted += count
         else:
             logger.warning(f"Split directory not found: {split}")
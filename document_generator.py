@@ -7,15 +7,21 @@ Handles Word document creation and PDF conversion with proper formatting and str
 import os
 import logging
 import re
+import functools
 from docx import Document
 from docx.shared import Pt, Inches, RGBColor
 from docx.enum.text import WD_ALIGN_PARAGRAPH
+from docx.text.run import Run
 from docx.enum.style import WD_STYLE_TYPE
 from docx.oxml import OxmlElement
 from docx.oxml.ns import qn # Ensure qn is imported
 
 from config_manager import config_manager
 from utils import sanitize_for_xml, sanitize_filepath
+from lazy_imports import LazySingleton
+from image_optimizer import get_image_optimizer
+from office_converter import get_office_converter
+from streaming_docx_writer import StreamingDocxWriter, body_elements as streaming_body_elements
 
 logger = logging.getLogger(__name__)
 
@@ -44,6 +50,34 @@ class WordDocumentGenerator:
         self.word_settings = config_manager.word_output_settings
         self.toc_entries = []
         self.bookmark_id = 0
+        self.optimized_image_paths = {}
+
+    def _image_width_inches(self):
+        return self.word_settings.get('image_width_inches', 6.0)
+
+    def _resolve_image_path(self, image_filename, image_folder_path):
+        if image_folder_path and not os.path.isabs(image_filename):
+            return os.path.join(image_folder_path, image_filename)
+        return image_filename
+
+    def _prepare_images(self, blocks, image_folder_path):
+        """Optimize every image the document embeds, in parallel, before blocks are added."""
+        image_paths = []
+        for block_item in blocks:
+            image_filename = None
+            if STRUCTURED_MODEL_AVAILABLE and isinstance(block_item, ImagePlaceholder):
+                image_filename = block_item.image_path
+            elif isinstance(block_item, dict) and block_item.get('type', '').lower() in ['image', 'img', 'imageplaceholder']:
+                image_filename = block_item.get('image_path') or block_item.get('filepath')
+            if image_filename:
+                image_path = self._resolve_image_path(image_filename, image_folder_path)
+                if os.path.exists(image_path):
+                    image_paths.append(image_path)
+
+        width_inches = self._image_width_inches()
+        self.optimized_image_paths = get_image_optimizer().optimize_many(
+            (image_path, width_inches) for image_path in image_paths
+        )
     
     def _add_heading_block(self, doc, block_item):
         text_content = None
@@ -131,13 +165,14 @@ class WordDocumentGenerator:
             logger.warning("Skipping image block with no image_path/filename.")
             return
 
-        actual_image_path = image_filename
-        if image_folder_path and not os.path.isabs(image_filename):
-            actual_image_path = os.path.join(image_folder_path, image_filename)
+        actual_image_path = self._resolve_image_path(image_filename, image_folder_path)
 
         if os.path.exists(actual_image_path):
             try:
-                doc.add_picture(actual_image_path, width=Inches(self.word_settings.get('image_width_inches', 6.0)))
+                width_inches = self._image_width_inches()
+                embed_path = (self.optimized_image_paths.get(actual_image_path)
+                              or get_image_optimizer().optimize(actual_image_path, width_inches))
+                doc.add_picture(embed_path, width=Inches(width_inches))
                 if caption_text:
                     safe_caption = sanitize_for_xml(caption_text)
                     caption_style_name = self.word_settings.get('caption_style', 'Caption')
@@ -259,7 +294,7 @@ class WordDocumentGenerator:
             
             # Add heading text with hyperlink
             try:
-                hyperlink_run = self._add_hyperlink(p, text_for_display, bookmark)
+                hyperlink_run = self._add_hyperlink(p, bookmark, text_for_display)
                 if level == 1:
                     hyperlink_run.bold = True
                     hyperlink_run.font.size = Pt(12)
@@ -301,9 +336,9 @@ class WordDocumentGenerator:
         # Add spacing after TOC
         toc_doc.add_paragraph()
         
-        # Insert TOC at the beginning of the document
-        for element in toc_doc.element.body:
-            doc.element.body.insert(0, element)
+        # Insert TOC at the beginning of the document, in order and without toc_doc's sectPr
+        for index, element in enumerate(streaming_body_elements(toc_doc)):
+            doc.element.body.insert(index, element)
         
         logger.info(f"Successfully generated TOC with {len(sorted_entries)} entries")
 
@@ -340,6 +375,9 @@ class WordDocumentGenerator:
         #     self._add_table_of_contents(doc, structured_content_list) # OLD ToC call
         #     doc.add_page_break()
         
+        # Downsample and recompress all images up front, in parallel
+        self._prepare_images(structured_content_list, image_folder_path)
+
         # Process content items (blocks)
         # Assuming items in structured_content_list are compatible with _add_content_block
         for item_block in structured_content_list: # Renamed 'item' to 'item_block' for clarity
@@ -400,19 +438,12 @@ class WordDocumentGenerator:
         logger.info(f"--- Creating Word Document from Structured Document: {structured_document.title} ---")
         logger.info(f"📊 Processing {len(structured_document.content_blocks)} content blocks")
 
-        doc = Document()
-
-        # Add document title as first heading
-        if structured_document.title:
-            # Sanitize title before adding as heading
-            safe_title = sanitize_for_xml(structured_document.title)
-            title_heading = doc.add_heading(safe_title, level=0)
-            title_heading.alignment = WD_ALIGN_PARAGRAPH.CENTER
+        if self._use_streaming_writer(structured_document):
+            return self._create_word_document_streaming(
+                structured_document, output_filepath, image_folder_path, cover_page_data
+            )
 
-        # Add cover page if provided
-        if cover_page_data:
-            self._add_cover_page(doc, cover_page_data, image_folder_path)
-            doc.add_page_break()
+        doc = Document()
 
         # --- Remove existing ToC generation logic ---
         # if self.word_settings['generate_toc']:
@@ -426,10 +457,9 @@ class WordDocumentGenerator:
         #     # Single pass if TOC is disabled
         #     for block in structured_document.content_blocks:
         #         self._add_content_block(doc, block, image_folder_path)
-        
+
         # --- New main content processing loop (Implicit Pass 1 for ToC) ---
-        for block in structured_document.content_blocks:
-            self._add_content_block(doc, block, image_folder_path) # This will call _add_heading_block for headings
+        self._write_structured_document_body(doc, structured_document, image_folder_path, cover_page_data)
 
         # --- PASS 2: All content is added, now insert the ToC (Step 4) ---
         self._insert_toc(doc)
@@ -437,15 +467,7 @@ class WordDocumentGenerator:
 
         # Save document
         try:
-            # Use centralized sanitization from utils
-            sanitized_filepath = sanitize_filepath(output_filepath)
-
-            # Ensure the output directory exists before saving
-            output_dir = os.path.dirname(sanitized_filepath)
-            if output_dir and not os.path.exists(output_dir):
-                os.makedirs(output_dir, exist_ok=True)
-                logger.info(f"Created output directory: {output_dir}")
-
+            sanitized_filepath = self._prepare_output_path(output_filepath)
             doc.save(sanitized_filepath)
             logger.info(f"Word document saved successfully: {sanitized_filepath}")
             # Return the actual file path used for saving
@@ -455,6 +477,75 @@ class WordDocumentGenerator:
             logger.error(f"Attempted path: {output_filepath}")
             return None
 
+    def _write_structured_document_body(self, doc, structured_document, image_folder_path,
+                                        cover_page_data=None, after_block=None):
+        """Add title, cover page and all content blocks; after_block() runs after each one."""
+        # Add document title as first heading
+        if structured_document.title:
+            # Sanitize title before adding as heading
+            safe_title = sanitize_for_xml(structured_document.title)
+            title_heading = doc.add_heading(safe_title, level=0)
+            title_heading.alignment = WD_ALIGN_PARAGRAPH.CENTER
+
+        # Add cover page if provided
+        if cover_page_data:
+            self._add_cover_page(doc, cover_page_data, image_folder_path)
+            doc.add_page_break()
+
+        # Downsample and recompress all images up front, in parallel
+        self._prepare_images(structured_document.content_blocks, image_folder_path)
+
+        for block in structured_document.content_blocks:
+            self._add_content_block(doc, block, image_folder_path) # This will call _add_heading_block for headings
+            if after_block:
+                after_block()
+
+    def _prepare_output_path(self, output_filepath):
+        # Use centralized sanitization from utils
+        sanitized_filepath = sanitize_filepath(output_filepath)
+
+        # Ensure the output directory exists before saving
+        output_dir = os.path.dirname(sanitized_filepath)
+        if output_dir and not os.path.exists(output_dir):
+            os.makedirs(output_dir, exist_ok=True)
+            logger.info(f"Created output directory: {output_dir}")
+        return sanitized_filepath
+
+    def _use_streaming_writer(self, structured_document):
+        writer = self.word_settings.get('docx_writer', 'dom')
+        if writer == 'auto':
+            return len(structured_document.content_blocks) >= self.word_settings.get('streaming_writer_min_blocks', 5000)
+        return writer == 'streaming'
+
+    def _create_word_document_streaming(self, structured_document, output_filepath,
+                                        image_folder_path, cover_page_data=None):
+        """
+        Same output as the in-memory path, but body XML is streamed to disk as
+        blocks are added and the ToC is substituted in when the file is written.
+        """
+        try:
+            sanitized_filepath = self._prepare_output_path(output_filepath)
+        except Exception as e:
+            logger.error(f"Error preparing Word output path {output_filepath}: {e}")
+            return None
+
+        writer = StreamingDocxWriter(sanitized_filepath)
+        try:
+            self._write_structured_document_body(writer.document, structured_document, image_folder_path,
+                                                 cover_page_data, after_block=writer.flush)
+
+            # The ToC is built last but placed first
+            toc_holder = Document()
+            self._insert_toc(toc_holder)
+            writer.finalize(front_matter=streaming_body_elements(toc_holder))
+            logger.info(f"Word document saved successfully (streaming writer): {sanitized_filepath}")
+            return sanitized_filepath
+        except Exception as e:
+            writer.abort()
+            logger.error(f"Error saving Word document: {e}")
+            logger.error(f"Attempted path: {output_filepath}")
+            return None
+
     def _add_table_of_contents_from_document(self, doc, structured_document):
         """Add table of contents from structured document headings"""
         try:
@@ -521,7 +612,7 @@ class WordDocumentGenerator:
             # Add heading text with hyperlink
             try:
                 bookmark_name = f"heading_{entry_number}_{level}"
-                hyperlink_run = self._add_hyperlink(toc_paragraph, safe_text, bookmark_name)
+                hyperlink_run = self._add_hyperlink(toc_paragraph, bookmark_name, safe_text)
                 if level == 1:
                     hyperlink_run.bold = True
                     hyperlink_run.font.size = Pt(12)
@@ -683,6 +774,7 @@ class WordDocumentGenerator:
         
         # Add the hyperlink to the paragraph
         paragraph._p.append(hyperlink)
+        return Run(new_run, paragraph)
 
     def _add_content_block(self, doc, block_item, image_folder_path):
         """Add various content block types to the document. Handles both model objects and dicts."""
@@ -756,7 +848,7 @@ class WordDocumentGenerator:
                 cover_image_path = cover_page_data.get('filepath')
                 if cover_image_path and os.path.exists(cover_image_path):
                     run = cover_paragraph.add_run()
-                    run.add_picture(cover_image_path, width=Inches(6))
+                    run.add_picture(get_image_optimizer().optimize(cover_image_path, 6), width=Inches(6))
                     logger.info("Cover page image added")
                 else:
                     cover_paragraph.add_run("Cover Page").font.size = Pt(24)
@@ -1061,13 +1153,39 @@ class WordDocumentGenerator:
             logger.error(f"Error checking translation status: {e}")
             return False
 
+@functools.lru_cache(maxsize=1)
+def _register_unicode_pdf_font():
+    """Register a Greek-capable font with ReportLab once per process; returns its name"""
+    from reportlab.lib.fonts import addMapping
+    from reportlab.pdfbase import pdfmetrics
+    from reportlab.pdfbase.ttfonts import TTFont
+
+    # Try to register Arial Unicode MS or fallback to DejaVu Sans which supports Greek
+    for font_name, font_file in (('ArialUnicode', 'arial.ttf'), ('DejaVuSans', 'DejaVuSans.ttf')):
+        try:
+            pdfmetrics.registerFont(TTFont(font_name, font_file))
+            addMapping(font_name, 0, 0, font_name)
+            return font_name
+        except Exception:
+            continue
+    logger.warning("Could not register Unicode font, using Helvetica")
+    return 'Helvetica'  # Last resort
+
+
 # Enhanced PDF conversion function with proper font embedding
 def convert_word_to_pdf(docx_filepath, pdf_filepath):
     """Enhanced PDF conversion with proper Greek font support"""
     logger.info(f"Converting {docx_filepath} to PDF with Unicode font support...")
-    
+
+    # Preferred: warm headless LibreOffice pool, keeps the full layout
+    office_converter = get_office_converter()
+    if office_converter is not None:
+        if office_converter.convert(docx_filepath, pdf_filepath):
+            return True
+        logger.warning("LibreOffice conversion failed. Trying alternative method...")
+
     try:
-        # Try using docx2pdf first
+        # Try using docx2pdf next
         from docx2pdf import convert
         convert(docx_filepath, pdf_filepath)
         logger.info(f"Successfully converted {docx_filepath} to {pdf_filepath}")
@@ -1082,24 +1200,9 @@ def convert_word_to_pdf(docx_filepath, pdf_filepath):
             from reportlab.lib.pagesizes import letter
             from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer
             from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-            from reportlab.lib.fonts import addMapping
-            from reportlab.pdfbase import pdfmetrics
-            from reportlab.pdfbase.ttfonts import TTFont
             
             # Register Unicode font
-            try:
-                # Try to register Arial Unicode MS or fallback to DejaVu
-                pdfmetrics.registerFont(TTFont('ArialUnicode', 'arial.ttf'))
-                addMapping('ArialUnicode', 0, 0, 'ArialUnicode')
-            except:
-                # Fallback to DejaVu Sans which supports Greek
-                try:
-                    pdfmetrics.registerFont(TTFont('DejaVuSans', 'DejaVuSans.ttf'))
-                    addMapping('DejaVuSans', 0, 0, 'DejaVuSans')
-                    font_name = 'DejaVuSans'
-                except:
-                    font_name = 'Helvetica'  # Last resort
-                    logger.warning("Could not register Unicode font, using Helvetica")
+            font_name = _register_unicode_pdf_font()
             
             # Extract text from DOCX
             text = docx2txt.process(docx_filepath)
@@ -1144,5 +1247,5 @@ class PDFConverter:
 # Create an instance of the PDF converter
 pdf_converter = PDFConverter()
 
-# Instantiate the generator for use by other modules
-document_generator = WordDocumentGenerator()
\ No newline at end of file
+# Generator for use by other modules, built on first use
+document_generator = LazySingleton(WordDocumentGenerator)
\ No newline at end of file
@@ -0,0 +1,275 @@
+"""
+Document Profiling Engine for Ultimate PDF Translator
+
+Produces per-page PageProfile records for AdvancedDocumentAnalyzer without
+re-parsing the PDF for every page:
+- Each worker opens the document once (PyMuPDF + pdfplumber) and profiles a
+  contiguous page range
+- Page ranges are sharded across a process pool for large documents
+- Profiles are cached on disk keyed by the PDF content hash, so re-runs and
+  routing decisions reuse them instead of profiling again
+"""
+
+import os
+import json
+import time
+import hashlib
+import logging
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import asdict
+from typing import Dict, List, Optional, Tuple
+
+from advanced_document_analyzer import (
+    AdvancedDocumentAnalyzer, PageProfile, LayoutAnalysis, MathAnalysis,
+    ContentType, LayoutComplexity, PYMUPDF_AVAILABLE, PDFPLUMBER_AVAILABLE
+)
+
+logger = logging.getLogger(__name__)
+
+# Bump when the profile record layout or the profiling heuristics change
+PROFILE_FORMAT_VERSION = 1
+
+
+def page_profile_to_record(profile: PageProfile) -> Dict:
+    """Convert a PageProfile into a compact JSON-serializable record"""
+    record = asdict(profile)
+    record['content_type'] = profile.content_type.value
+    record['layout_analysis']['complexity'] = profile.layout_analysis.complexity.value
+    return record
+
+
+def page_profile_from_record(record: Dict) -> PageProfile:
+    """Rebuild a PageProfile from a record produced by page_profile_to_record"""
+    layout = dict(record['layout_analysis'])
+    layout['complexity'] = LayoutComplexity(layout['complexity'])
+    return PageProfile(
+        page_number=record['page_number'],
+        content_type=ContentType(record['content_type']),
+        layout_analysis=LayoutAnalysis(**layout),
+        math_analysis=MathAnalysis(**record['math_analysis']),
+        text_blocks=record['text_blocks'],
+        image_blocks=record['image_blocks'],
+        table_blocks=record['table_blocks'],
+        complexity_score=record['complexity_score'],
+        processing_recommendation=record['processing_recommendation']
+    )
+
+
+def _profile_page_range(task: Tuple[str, int, int]) -> List[Dict]:
+    """
+    Profile pages [start, stop) of a PDF, opening the document only once.
+    This function must be at module level to be pickable by ProcessPoolExecutor.
+    """
+    filepath, start, stop = task
+    import fitz
+
+    analyzer = AdvancedDocumentAnalyzer()
+    records = []
+
+    doc = fitz.open(filepath)
+    plumber_pdf = None
+    try:
+        if PDFPLUMBER_AVAILABLE:
+            import pdfplumber
+            try:
+                plumber_pdf = pdfplumber.open(filepath)
+            except Exception as e:
+                logger.warning(f"pdfplumber could not open {filepath}, using basic layout analysis: {e}")
+
+        for page_num in range(start, min(stop, len(doc))):
+            profile = analyzer._analyze_single_page(filepath, doc, page_num, plumber_pdf=plumber_pdf)
+            records.append(page_profile_to_record(profile))
+    finally:
+        if plumber_pdf is not None:
+            plumber_pdf.close()
+        doc.close()
+
+    return records
+
+
+class DocumentProfiler:
+    """
+    Sharded, cached page profiler used by AdvancedDocumentAnalyzer and
+    TranslationStrategyManager.
+    """
+
+    def __init__(self, cache_dir: Optional[str] = None, max_workers: Optional[int] = None,
+                 pages_per_shard: Optional[int] = None, min_pages_for_pool: Optional[int] = None,
+                 use_cache: Optional[bool] = None):
+        settings = self._load_settings()
+
+        self.cache_dir = cache_dir or settings['cache_dir']
+        self.max_workers = max_workers or settings['max_workers'] or max(1, (os.cpu_count() or 2) - 1)
+        self.pages_per_shard = max(1, pages_per_shard or settings['pages_per_shard'])
+        self.min_pages_for_pool = min_pages_for_pool if min_pages_for_pool is not None else settings['min_pages_for_pool']
+        self.use_cache = settings['use_cache'] if use_cache is None else use_cache
+
+        # In-process memo so repeated lookups within one run skip the disk entirely
+        self._memory_cache: Dict[str, List[PageProfile]] = {}
+
+        self.stats = {
+            'documents_profiled': 0,
+            'pages_profiled': 0,
+            'cache_hits': 0,
+            'cache_misses': 0,
+            'profiling_time_seconds': 0.0
+        }
+
+    @staticmethod
+    def _load_settings() -> Dict:
+        """Read [DocumentProfiling] settings, falling back to defaults without a config"""
+        defaults = {
+            'cache_dir': 'profile_cache',
+            'max_workers': 0,
+            'pages_per_shard': 25,
+            'min_pages_for_pool': 40,
+            'use_cache': True
+        }
+        try:
+            from config_manager import config_manager
+            return {
+                'cache_dir': config_manager.get_config_value('DocumentProfiling', 'cache_dir', defaults['cache_dir']),
+                'max_workers': config_manager.get_config_value('DocumentProfiling', 'max_workers', defaults['max_workers'], int),
+                'pages_per_shard': config_manager.get_config_value('DocumentProfiling', 'pages_per_shard', defaults['pages_per_shard'], int),
+                'min_pages_for_pool': config_manager.get_config_value('DocumentProfiling', 'min_pages_for_pool', defaults['min_pages_for_pool'], int),
+                'use_cache': config_manager.get_config_value('DocumentProfiling', 'use_profile_cache', defaults['use_cache'], bool)
+            }
+        except Exception as e:
+            logger.debug(f"Profiling settings unavailable, using defaults: {e}")
+            return defaults
+
+    @staticmethod
+    def compute_pdf_hash(filepath: str, chunk_size: int = 1024 * 1024) -> str:
+        """SHA-256 of the PDF contents (independent of path and mtime)"""
+        sha = hashlib.sha256()
+        with open(filepath, 'rb') as f:
+            for chunk in iter(lambda: f.read(chunk_size), b''):
+                sha.update(chunk)
+        return sha.hexdigest()
+
+    def _cache_path(self, pdf_hash: str) -> str:
+        return os.path.join(self.cache_dir, f"{pdf_hash}.profile.json")
+
+    def _load_cached_profiles(self, pdf_hash: str) -> Optional[List[PageProfile]]:
+        """Load profiles from the disk cache if a compatible entry exists"""
+        cache_path = self._cache_path(pdf_hash)
+        if not os.path.exists(cache_path):
+            return None
+
+        try:
+            with open(cache_path, 'r', encoding='utf-8') as f:
+                payload = json.load(f)
+            if payload.get('version') != PROFILE_FORMAT_VERSION:
+                return None
+            return [page_profile_from_record(r) for r in payload['profiles']]
+        except Exception as e:
+            logger.warning(f"Ignoring unreadable profile cache {cache_path}: {e}")
+            return None
+
+    def _save_cached_profiles(self, pdf_hash: str, filepath: str, records: List[Dict]):
+        """Persist profile records atomically so concurrent runs never see partial files"""
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            cache_path = self._cache_path(pdf_hash)
+            tmp_path = f"{cache_path}.{os.getpid()}.tmp"
+            payload = {
+                'version': PROFILE_FORMAT_VERSION,
+                'pdf_hash': pdf_hash,
+                'source_name': os.path.basename(filepath),
+                'page_count': len(records),
+                'created_at': time.time(),
+                'profiles': records
+            }
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(payload, f, ensure_ascii=False, separators=(',', ':'))
+            os.replace(tmp_path, cache_path)
+        except Exception as e:
+            logger.warning(f"Could not save profile cache for {filepath}: {e}")
+
+    def _build_shards(self, page_count: int) -> List[Tuple[int, int]]:
+        """Split [0, page_count) into contiguous ranges, at least one per worker"""
+        shard_size = min(self.pages_per_shard, max(1, -(-page_count // self.max_workers)))
+        return [(start, min(start + shard_size, page_count)) for start in range(0, page_count, shard_size)]
+
+    def _profile_uncached(self, filepath: str, page_count: int) -> List[Dict]:
+        """Profile every page, in-process for short documents and sharded otherwise"""
+        shards = self._build_shards(page_count)
+
+        if page_count < self.min_pages_for_pool or self.max_workers <= 1 or len(shards) <= 1:
+            return _profile_page_range((filepath, 0, page_count))
+
+        tasks = [(filepath, start, stop) for start, stop in shards]
+        records: List[Dict] = []
+        try:
+            with ProcessPoolExecutor(max_workers=min(self.max_workers, len(tasks))) as executor:
+                # executor.map preserves shard order, so pages come back in order
+                for shard_records in executor.map(_profile_page_range, tasks):
+                    records.extend(shard_records)
+        except Exception as e:
+            logger.warning(f"Parallel profiling failed ({e}), falling back to a single worker")
+            records = _profile_page_range((filepath, 0, page_count))
+
+        return records
+
+    def profile_document(self, filepath: str, page_count: Optional[int] = None) -> List[PageProfile]:
+        """
+        Return one PageProfile per page, from the cache when possible.
+        """
+        if not PYMUPDF_AVAILABLE:
+            raise RuntimeError("PyMuPDF is required for document profiling")
+
+        pdf_hash = self.compute_pdf_hash(filepath)
+
+        if pdf_hash in self._memory_cache:
+            self.stats['cache_hits'] += 1
+            return self._memory_cache[pdf_hash]
+
+        if self.use_cache:
+            cached = self._load_cached_profiles(pdf_hash)
+            if cached is not None:
+                self.stats['cache_hits'] += 1
+                self._memory_cache[pdf_hash] = cached
+                logger.info(f"📋 Reusing cached page profiles for {os.path.basename(filepath)} ({len(cached)} pages)")
+                return cached
+
+        self.stats['cache_misses'] += 1
+
+        if page_count is None:
+            import fitz
+            with fitz.open(filepath) as doc:
+                page_count = len(doc)
+
+        start_time = time.time()
+        records = self._profile_uncached(filepath, page_count)
+        elapsed = time.time() - start_time
+
+        self.stats['documents_profiled'] += 1
+        self.stats['pages_profiled'] += len(records)
+        self.stats['profiling_time_seconds'] += elapsed
+        logger.info(f"📋 Profiled {len(records)} pages of {os.path.basename(filepath)} in {elapsed:.2f}s")
+
+        if self.use_cache:
+            self._save_cached_profiles(pdf_hash, filepath, records)
+
+        profiles = [page_profile_from_record(r) for r in records]
+        self._memory_cache[pdf_hash] = profiles
+        return profiles
+
+    def get_statistics(self) -> Dict:
+        """Get profiling and cache statistics"""
+        lookups = self.stats['cache_hits'] + self.stats['cache_misses']
+        return {
+            **self.stats,
+            'cache_hit_rate': self.stats['cache_hits'] / lookups if lookups else 0.0
+        }
+
+
+_document_profiler: Optional[DocumentProfiler] = None
+
+
+def get_document_profiler() -> DocumentProfiler:
+    """Shared profiler instance so every caller in a process shares one memo"""
+    global _document_profiler
+    if _document_profiler is None:
+        _document_profiler = DocumentProfiler()
+    return _document_profiler
@@ -0,0 +1,434 @@
+"""
+Compact Binary Serialization for Structured Documents
+
+Stores a Document (either structured_document_model or document_model) as a
+versioned binary file instead of a JSON dict tree or a pickle of dataclass
+objects. Block fields live in columnar numpy arrays and all text is kept once
+in a deduplicated string table, so a checkpoint is small, loads without
+rebuilding intermediate dicts, and can be memory-mapped to materialize only
+the blocks of a page range.
+
+Layout (little-endian):
+    magic (8 bytes) | format version (uint32) | header length (uint32)
+    header (UTF-8 JSON: document fields, class table, section table)
+    sections, each aligned to 8 bytes:
+        class_index, block_type, page_num, page_index, block_num, bbox,
+        original_text, content, block_id, block_uuid, formatting, extras,
+        string_offsets, string_data
+
+Text columns hold indices into the string table; UUID block ids are kept as
+16 raw bytes in block_uuid instead. formatting (or font_info)
+and any remaining block fields are stored as compact JSON strings, which
+deduplicate well because most blocks share them.
+"""
+
+import os
+import json
+import mmap
+import uuid
+import struct
+import logging
+import importlib
+import dataclasses
+from enum import Enum
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+DOCUMENT_FORMAT_MAGIC = b"PDTDOC\x00\x01"
+DOCUMENT_FORMAT_VERSION = 1
+DOCUMENT_FILE_EXTENSION = ".pdoc"
+
+_PREAMBLE = struct.Struct("<8sII")
+_ALIGNMENT = 8
+_NULL_STRING = 0xFFFFFFFF
+_NULL_INT = -2 ** 31
+
+# Only classes from these modules are rebuilt when loading
+_MODEL_MODULES = ('structured_document_model', 'document_model')
+
+_SECTION_DTYPES = {
+    'class_index': '<u2',
+    'block_type': '<i2',
+    'page_num': '<i4',
+    'page_index': '<i4',
+    'block_num': '<i4',
+    'bbox': '<f8',
+    'original_text': '<u4',
+    'content': '<u4',
+    'block_id': '<u4',
+    'block_uuid': 'u1',
+    'formatting': '<u4',
+    'extras': '<u4',
+    'string_offsets': '<u8',
+    'string_data': 'u1',
+}
+
+_STRING_COLUMNS = ('original_text', 'content', 'block_id')
+# Dict-valued fields stored as JSON in the 'formatting' column
+_FORMATTING_FIELDS = ('formatting', 'font_info')
+_COLUMN_FIELDS = {'block_type', 'page_num', 'bbox', 'block_num'} | set(_STRING_COLUMNS) | set(_FORMATTING_FIELDS)
+
+
+class DocumentFormatError(ValueError):
+    """Raised when a buffer is not a readable serialized document."""
+
+
+def _json_dumps(value: Any) -> str:
+    return json.dumps(value, sort_keys=True, separators=(',', ':'), ensure_ascii=False, default=str)
+
+
+def _class_name(cls: type) -> str:
+    return f"{cls.__module__}:{cls.__qualname__}"
+
+
+def _resolve_class(name: str) -> type:
+    module_name, _, qualname = name.partition(':')
+    if module_name not in _MODEL_MODULES:
+        raise DocumentFormatError(f"Refusing to load block class from module '{module_name}'")
+    return getattr(importlib.import_module(module_name), qualname)
+
+
+def _model_of(document: Any) -> str:
+    if hasattr(document, 'pages') and hasattr(document, 'document_metadata'):
+        return 'document_model'
+    if hasattr(document, 'content_blocks'):
+        return 'structured'
+    raise TypeError(f"Cannot serialize {type(document).__name__}: not a Document")
+
+
+def is_serializable_document(obj: Any) -> bool:
+    """True for Document instances from either document model."""
+    return (type(obj).__name__ == 'Document' and type(obj).__module__ in _MODEL_MODULES)
+
+
+# ----------------------------------------------------------------------
+# Encoding
+# ----------------------------------------------------------------------
+
+def _pack_uuid(value: Any) -> Optional[bytes]:
+    """16 raw bytes for a canonical UUID string, else None."""
+    if not isinstance(value, str) or len(value) != 36:
+        return None
+    try:
+        parsed = uuid.UUID(value)
+    except ValueError:
+        return None
+    return parsed.bytes if parsed.int and str(parsed) == value else None
+
+
+class _StringTable:
+    """Deduplicating string table; None is stored as _NULL_STRING."""
+
+    def __init__(self):
+        self.index: Dict[str, int] = {}
+        self.strings: List[str] = []
+
+    def add(self, value: Optional[str]) -> int:
+        if value is None:
+            return _NULL_STRING
+        string_id = self.index.get(value)
+        if string_id is None:
+            string_id = self.index[value] = len(self.strings)
+            self.strings.append(value)
+        return string_id
+
+    def to_arrays(self) -> Tuple[np.ndarray, np.ndarray]:
+        encoded = [s.encode('utf-8') for s in self.strings]
+        offsets = np.zeros(len(encoded) + 1, dtype=_SECTION_DTYPES['string_offsets'])
+        if encoded:
+            np.cumsum(np.fromiter((len(b) for b in encoded), dtype=offsets.dtype, count=len(encoded)),
+                      out=offsets[1:])
+        return offsets, np.frombuffer(b''.join(encoded), dtype=np.uint8)
+
+
+def _encode_blocks(blocks: List[Any], page_indices: Optional[List[int]], header: Dict[str, Any]) -> bytes:
+    count = len(blocks)
+    strings = _StringTable()
+    classes: Dict[type, int] = {}
+    block_types: Dict[str, int] = {}
+    field_names: Dict[type, List[str]] = {}
+
+    columns = {name: np.empty(count, dtype=_SECTION_DTYPES[name])
+               for name in ('class_index', 'block_type', 'page_num', 'page_index', 'block_num',
+                            'formatting', 'extras') + _STRING_COLUMNS}
+    bbox = np.zeros((count, 4), dtype=_SECTION_DTYPES['bbox'])
+    block_uuid = np.zeros((count, 16), dtype=_SECTION_DTYPES['block_uuid'])
+
+    for row, block in enumerate(blocks):
+        cls = type(block)
+        if cls not in classes:
+            classes[cls] = len(classes)
+            field_names[cls] = [f.name for f in dataclasses.fields(cls)]
+        values = block.__dict__
+        extras = {name: values[name] for name in field_names[cls] if name not in _COLUMN_FIELDS}
+
+        block_type = values.get('block_type')
+        if isinstance(block_type, Enum):
+            type_value = block_type.value
+            if type_value not in block_types:
+                block_types[type_value] = len(block_types)
+            columns['block_type'][row] = block_types[type_value]
+        else:
+            columns['block_type'][row] = -1
+
+        box = values.get('bbox')
+        if box is not None and len(box) == 4:
+            bbox[row] = box
+        else:
+            bbox[row] = np.nan
+            extras['bbox'] = box
+
+        block_num = values.get('block_num')
+        formatting = next((values[name] for name in _FORMATTING_FIELDS if name in values), None)
+        columns['class_index'][row] = classes[cls]
+        columns['page_num'][row] = values.get('page_num') or 0
+        columns['page_index'][row] = page_indices[row] if page_indices is not None else -1
+        columns['block_num'][row] = _NULL_INT if block_num is None else block_num
+        block_id = values.get('block_id')
+        packed_uuid = _pack_uuid(block_id)
+        if packed_uuid is not None:
+            block_uuid[row] = np.frombuffer(packed_uuid, dtype=np.uint8)
+            block_id = None
+        for name in ('original_text', 'content'):
+            columns[name][row] = strings.add(values.get(name))
+        columns['block_id'][row] = strings.add(block_id)
+        columns['formatting'][row] = strings.add(None if formatting is None else _json_dumps(formatting))
+        columns['extras'][row] = strings.add(_json_dumps(extras) if extras else None)
+
+    columns['bbox'] = bbox
+    columns['block_uuid'] = block_uuid
+    columns['string_offsets'], columns['string_data'] = strings.to_arrays()
+
+    # Lay out sections after the header, each aligned
+    sections = {}
+    payloads = []
+    offset = 0
+    for name in _SECTION_DTYPES:
+        data = np.ascontiguousarray(columns[name]).tobytes()
+        sections[name] = [offset, list(columns[name].shape)]
+        payloads.append(data + b'\x00' * (-len(data) % _ALIGNMENT))
+        offset += len(payloads[-1])
+
+    header = dict(header, classes=[_class_name(cls) for cls in classes], block_types=list(block_types),
+                  block_count=count, string_count=len(strings.strings), sections=sections)
+    header_bytes = _json_dumps(header).encode('utf-8')
+    header_bytes += b' ' * (-(_PREAMBLE.size + len(header_bytes)) % _ALIGNMENT)
+    return b''.join([_PREAMBLE.pack(DOCUMENT_FORMAT_MAGIC, DOCUMENT_FORMAT_VERSION, len(header_bytes)),
+                     header_bytes] + payloads)
+
+
+def serialize_document(document: Any) -> bytes:
+    """Serialize a Document from either document model to bytes."""
+    model = _model_of(document)
+    if model == 'structured':
+        header = {'model': model, 'document': {
+            'title': document.title, 'metadata': document.metadata,
+            'source_filepath': document.source_filepath, 'total_pages': document.total_pages}}
+        return _encode_blocks(document.content_blocks, None, header)
+
+    blocks, page_indices = [], []
+    for page_index, page in enumerate(document.pages):
+        blocks.extend(page.content_blocks)
+        page_indices.extend([page_index] * len(page.content_blocks))
+    header = {'model': model, 'document': {
+        'title': document.title, 'document_metadata': document.document_metadata,
+        'toc_entries': document.toc_entries,
+        'pages': [[page.page_number, page.page_metadata] for page in document.pages]}}
+    return _encode_blocks(blocks, page_indices, header)
+
+
+def serialize_blocks(blocks: List[Any]) -> bytes:
+    """Serialize a bare list of content blocks, e.g. to return them from a worker process."""
+    return _encode_blocks(list(blocks), None, {'model': 'blocks'})
+
+
+def save_document(document: Any, path: str) -> str:
+    """Write a Document checkpoint atomically and return its path."""
+    data = serialize_document(document)
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    temp_path = f"{path}.{os.getpid()}.tmp"
+    with open(temp_path, 'wb') as f:
+        f.write(data)
+    os.replace(temp_path, path)
+    logger.debug(f"💾 Saved document checkpoint {os.path.basename(path)} ({len(data)} bytes)")
+    return path
+
+
+# ----------------------------------------------------------------------
+# Decoding
+# ----------------------------------------------------------------------
+
+def _read_header(buffer) -> Tuple[Dict[str, Any], int]:
+    if len(buffer) < _PREAMBLE.size:
+        raise DocumentFormatError("Buffer too short for a serialized document")
+    magic, version, header_length = _PREAMBLE.unpack_from(buffer, 0)
+    if magic != DOCUMENT_FORMAT_MAGIC:
+        raise DocumentFormatError("Not a serialized document (bad magic)")
+    if version > DOCUMENT_FORMAT_VERSION:
+        raise DocumentFormatError(f"Unsupported document format version {version}")
+    data_start = _PREAMBLE.size + header_length
+    header = json.loads(bytes(buffer[_PREAMBLE.size:data_start]).decode('utf-8'))
+    return header, data_start
+
+
+def _section(buffer, header: Dict[str, Any], data_start: int, name: str) -> np.ndarray:
+    offset, shape = header['sections'][name]
+    dtype = np.dtype(_SECTION_DTYPES[name])
+    count = int(np.prod(shape)) if shape else 0
+    return np.frombuffer(buffer, dtype=dtype, count=count, offset=data_start + offset).reshape(shape)
+
+
+def _select_rows(buffer, header: Dict[str, Any], data_start: int,
+                 page_range: Optional[Tuple[int, int]]) -> Tuple[np.ndarray, Optional[List[int]]]:
+    """Row indices to materialize and, for document_model, the page slots kept."""
+    count = header['block_count']
+    if header['model'] == 'document_model':
+        pages = header['document']['pages']
+        kept_pages = [i for i, (number, _) in enumerate(pages)
+                      if page_range is None or page_range[0] <= number <= page_range[1]]
+        if page_range is None:
+            return np.arange(count), kept_pages
+        page_index = _section(buffer, header, data_start, 'page_index')
+        return np.flatnonzero(np.isin(page_index, kept_pages)), kept_pages
+    if page_range is None:
+        return np.arange(count), None
+    page_num = _section(buffer, header, data_start, 'page_num')
+    return np.flatnonzero((page_num >= page_range[0]) & (page_num <= page_range[1])), None
+
+
+def _decode_strings(buffer, header: Dict[str, Any], data_start: int, ids: np.ndarray) -> Dict[int, Optional[str]]:
+    """Decode only the referenced strings of the string table."""
+    ids = np.unique(ids)
+    ids = ids[ids != _NULL_STRING]
+    string_offsets = _section(buffer, header, data_start, 'string_offsets')
+    starts = string_offsets[ids].tolist()
+    ends = string_offsets[ids + 1].tolist()
+    base = data_start + header['sections']['string_data'][0]
+    view = memoryview(buffer)
+    try:
+        strings = {string_id: str(view[base + start:base + end], 'utf-8')
+                   for string_id, start, end in zip(ids.tolist(), starts, ends)}
+    finally:
+        view.release()
+    strings[_NULL_STRING] = None
+    return strings
+
+
+def _decode(buffer, page_range: Optional[Tuple[int, int]] = None):
+    header, data_start = _read_header(buffer)
+    rows, kept_pages = _select_rows(buffer, header, data_start, page_range)
+    if rows.size == header['block_count']:
+        rows = slice(None)
+
+    selected = {name: _section(buffer, header, data_start, name)[rows]
+                for name in _SECTION_DTYPES if name not in ('string_offsets', 'string_data')}
+    strings = _decode_strings(buffer, header, data_start, np.concatenate(
+        [selected[name] for name in _STRING_COLUMNS + ('formatting', 'extras')]))
+
+    classes = [_resolve_class(name) for name in header['classes']]
+    class_fields = [{f.name for f in dataclasses.fields(cls)} for cls in classes]
+    # Per class: the enum members for the stored block_type values
+    class_block_types = [[importlib.import_module(cls.__module__).ContentType(value)
+                          for value in header['block_types']] if 'block_type' in fields else None
+                         for cls, fields in zip(classes, class_fields)]
+
+    columns = {name: array.tolist() for name, array in selected.items() if name not in ('bbox', 'block_uuid')}
+    bbox = selected['bbox'].tolist()
+    has_uuid = selected['block_uuid'].any(axis=1).tolist()
+    uuid_hex = [value.hex() for value in map(bytes, selected['block_uuid'])]
+    formatting, extras = columns['formatting'], columns['extras']
+
+    blocks = []
+    for i, cls_id in enumerate(columns['class_index']):
+        cls, fields = classes[cls_id], class_fields[cls_id]
+        values = {'page_num': columns['page_num'][i], 'bbox': tuple(bbox[i])}
+        if class_block_types[cls_id] is not None:
+            type_id = columns['block_type'][i]
+            values['block_type'] = class_block_types[cls_id][type_id] if type_id >= 0 else None
+        if 'block_num' in fields:
+            block_num = columns['block_num'][i]
+            values['block_num'] = None if block_num == _NULL_INT else block_num
+        for name in _STRING_COLUMNS:
+            if name in fields:
+                values[name] = strings[columns[name][i]]
+        if values.get('block_id') is None and has_uuid[i]:
+            h = uuid_hex[i]
+            values['block_id'] = f"{h[:8]}-{h[8:12]}-{h[12:16]}-{h[16:20]}-{h[20:]}"
+        formatting_text = strings[formatting[i]]
+        for name in _FORMATTING_FIELDS:
+            if name in fields:
+                values[name] = None if formatting_text is None else json.loads(formatting_text)
+        if extras[i] != _NULL_STRING:
+            values.update(json.loads(strings[extras[i]]))
+        # Every field was stored, so skip __init__/__post_init__ validation
+        block = cls.__new__(cls)
+        block.__dict__.update(values)
+        blocks.append(block)
+
+    page_index = columns['page_index'] if header['model'] == 'document_model' else None
+    return header, blocks, page_index, kept_pages
+
+
+def _build_document(header: Dict[str, Any], blocks: List[Any], page_index, kept_pages):
+    fields = header['document']
+    if header['model'] == 'structured':
+        from structured_document_model import Document
+        return Document(title=fields['title'], content_blocks=blocks, metadata=fields['metadata'],
+                        source_filepath=fields['source_filepath'], total_pages=fields['total_pages'])
+    if header['model'] == 'document_model':
+        from document_model import Document, Page
+        pages = {i: Page(page_number=fields['pages'][i][0], page_metadata=fields['pages'][i][1])
+                 for i in kept_pages}
+        for block, i in zip(blocks, page_index):
+            # Append directly so stored positions are kept
+            pages[i].content_blocks.append(block)
+        return Document(title=fields['title'], pages=list(pages.values()),
+                        document_metadata=fields['document_metadata'], toc_entries=fields['toc_entries'])
+    raise DocumentFormatError(f"Buffer holds '{header['model']}', not a Document")
+
+
+def deserialize_document(data, page_range: Optional[Tuple[int, int]] = None):
+    """
+    Rebuild a Document from serialize_document() output. page_range is an
+    inclusive (first_page, last_page) filter; only those blocks are decoded.
+    """
+    header, blocks, page_index, kept_pages = _decode(data, page_range)
+    return _build_document(header, blocks, page_index, kept_pages)
+
+
+def deserialize_blocks(data) -> List[Any]:
+    """Rebuild the block list written by serialize_blocks()."""
+    return _decode(data)[1]
+
+
+def load_document(path: str, page_range: Optional[Tuple[int, int]] = None):
+    """
+    Load a Document checkpoint. The file is memory-mapped, so with a
+    page_range only the header, the page column and the selected blocks'
+    strings are actually read from disk.
+    """
+    with open(path, 'rb') as f:
+        if os.fstat(f.fileno()).st_size < _PREAMBLE.size:
+            raise DocumentFormatError(f"{path} is too short for a serialized document")
+        mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    try:
+        return deserialize_document(mapped, page_range)
+    finally:
+        try:
+            mapped.close()
+        except BufferError:
+            # A traceback still holds array views; the map is closed when they are collected
+            pass
+
+
+def read_document_header(path: str) -> Dict[str, Any]:
+    """Return the header (document fields, block count, sections) without loading blocks."""
+    with open(path, 'rb') as f:
+        preamble = f.read(_PREAMBLE.size)
+        if len(preamble) < _PREAMBLE.size:
+            raise DocumentFormatError(f"{path} is too short for a serialized document")
+        header_length = _PREAMBLE.unpack(preamble)[2]
+        return _read_header(preamble + f.read(header_length))[0]
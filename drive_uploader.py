@@ -1,24 +1,456 @@
 """
 Google Drive Uploader Module for Ultimate PDF Translator
 
-Handles Google Drive integration and file uploads
+Handles Google Drive integration and file uploads.
+
+Uploads run in a background thread with its own event loop, so the
+translation pipeline can queue a document's outputs and move on to the next
+document; uploads still queued when the process exits are finished by an
+exit hook. Files are sent in chunks over Drive resumable upload sessions
+with bounded concurrency; transient failures are retried with exponential
+backoff and resume from the last byte the server committed.
+LocalDriveBackend is a local stand-in for Drive used by tests and offline
+runs.
 """
 
 import os
+import json
+import time
+import atexit
+import random
+import asyncio
 import logging
+import mimetypes
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
 from config_manager import config_manager
+from lazy_imports import LazySingleton
 
 logger = logging.getLogger(__name__)
 
+DRIVE_RESUMABLE_UPLOAD_URL = "https://www.googleapis.com/upload/drive/v3/files?uploadType=resumable&fields=id,name"
+# Drive requires chunk sizes in multiples of 256 KiB (except the last chunk)
+DRIVE_CHUNK_GRANULARITY = 256 * 1024
+# Drive keeps resumable sessions for a week; reuse them for a bit less
+SESSION_MAX_AGE_SECONDS = 6 * 24 * 3600
+
+# Executors refuse new work once threading starts shutting down, before atexit
+# hooks run. Queued uploads are drained from threading's own exit hooks, which
+# run last-registered first, so they finish while chunks can still be sent.
+_register_exit_hook = getattr(threading, '_register_atexit', atexit.register)
+
+
+class TransientUploadError(Exception):
+    """Network hiccup, rate limit or server error: retry and resume"""
+
+
+class UploadSessionExpiredError(Exception):
+    """The resumable session is gone: start a new one from byte 0"""
+
+
+@dataclass
+class ChunkResponse:
+    """Server state of a resumable session after a chunk or status query"""
+    complete: bool
+    next_offset: int = 0
+    file: Optional[Dict[str, Any]] = None
+
+
+@dataclass
+class UploadJob:
+    """A queued upload; wait() blocks until it finishes"""
+    filepath: str
+    filename: str
+    folder_id: Optional[str]
+    status: str = 'queued'  # queued, uploading, completed, failed
+    attempts: int = 0
+    bytes_sent: int = 0
+    result: Optional[Dict[str, Any]] = None
+    error: Optional[str] = None
+    future: Any = field(default=None, repr=False)
+
+    def done(self) -> bool:
+        return self.status in ('completed', 'failed')
+
+    def wait(self, timeout: Optional[float] = None) -> Optional[Dict[str, Any]]:
+        if self.future is not None:
+            try:
+                self.future.result(timeout)
+            except Exception:
+                pass
+        return self.result
+
+
+class DriveResumableBackend:
+    """Drive v3 resumable upload protocol over the PyDrive2 credentials"""
+
+    def __init__(self, gauth):
+        self.gauth = gauth
+
+    def _request(self, uri, method, body=None, headers=None):
+        import httplib2
+        # One authorized Http object per request: httplib2 is not thread-safe
+        http = self.gauth.Get_Http_Object()
+        try:
+            return http.request(uri, method, body=body, headers=headers or {})
+        except (httplib2.HttpLib2Error, OSError) as e:
+            raise TransientUploadError(str(e)) from e
+
+    @staticmethod
+    def _check_status(response, content):
+        status = int(response.status)
+        if status in (404, 410):
+            raise UploadSessionExpiredError(f"Upload session expired (HTTP {status})")
+        if status == 429 or status >= 500:
+            raise TransientUploadError(f"HTTP {status}")
+        if status >= 400:
+            raise RuntimeError(f"Drive upload failed (HTTP {status}): {content[:200]!r}")
+
+    def _parse_response(self, response, content, total_size):
+        self._check_status(response, content)
+        if int(response.status) in (200, 201):
+            return ChunkResponse(True, total_size, json.loads(content or b'{}'))
+        # 308 Resume Incomplete: Range is "bytes=0-<last committed byte>"
+        committed = response.get('range')
+        next_offset = int(committed.rsplit('-', 1)[1]) + 1 if committed else 0
+        return ChunkResponse(False, next_offset)
+
+    def start_session(self, filename, folder_id, total_size, mime_type):
+        metadata = {'name': filename}
+        if folder_id:
+            metadata['parents'] = [folder_id]
+        response, content = self._request(
+            DRIVE_RESUMABLE_UPLOAD_URL, 'POST', json.dumps(metadata),
+            {'Content-Type': 'application/json; charset=UTF-8',
+             'X-Upload-Content-Type': mime_type,
+             'X-Upload-Content-Length': str(total_size)})
+        self._check_status(response, content)
+        return response['location']
+
+    def upload_chunk(self, session_uri, data, offset, total_size):
+        headers = {'Content-Length': str(len(data))}
+        if data:
+            headers['Content-Range'] = f"bytes {offset}-{offset + len(data) - 1}/{total_size}"
+        else:
+            headers['Content-Range'] = f"bytes */{total_size}"
+        response, content = self._request(session_uri, 'PUT', data, headers)
+        return self._parse_response(response, content, total_size)
+
+    def query_session(self, session_uri, total_size):
+        return self.upload_chunk(session_uri, b'', 0, total_size)
+
+
+class LocalDriveBackend:
+    """
+    In-process fake of the Drive resumable protocol that stores finished files
+    under root_dir. fail_next(n) makes the next n chunk requests fail after
+    the server has committed part of the chunk, like a dropped connection;
+    latency simulates a slow network.
+    """
+
+    def __init__(self, root_dir, latency=0.0):
+        self.root_dir = root_dir
+        self.latency = latency
+        self._lock = threading.Lock()
+        self._sessions = {}
+        self._pending_failures = 0
+        self._next_id = 0
+        self.bytes_received = 0
+        self.active_uploads = 0
+        self.max_active_uploads = 0
+        self.files = {}
+        os.makedirs(root_dir, exist_ok=True)
+
+    def fail_next(self, count=1):
+        with self._lock:
+            self._pending_failures += count
+
+    def expire_sessions(self):
+        with self._lock:
+            self._sessions.clear()
+
+    def start_session(self, filename, folder_id, total_size, mime_type):
+        with self._lock:
+            self._next_id += 1
+            session_uri = f"local://upload/{self._next_id}"
+            self._sessions[session_uri] = {'name': filename, 'folder_id': folder_id,
+                                           'size': total_size, 'data': bytearray()}
+        return session_uri
+
+    def upload_chunk(self, session_uri, data, offset, total_size):
+        with self._lock:
+            self.active_uploads += 1
+            self.max_active_uploads = max(self.max_active_uploads, self.active_uploads)
+        try:
+            if self.latency:
+                time.sleep(self.latency)
+            with self._lock:
+                session = self._sessions.get(session_uri)
+                if session is None:
+                    raise UploadSessionExpiredError(session_uri)
+                if offset != len(session['data']) and data:
+                    raise RuntimeError(f"Offset {offset} does not match committed {len(session['data'])}")
+                if data and self._pending_failures > 0:
+                    self._pending_failures -= 1
+                    # Half of the chunk reached the server before the connection dropped
+                    partial = data[:len(data) // 2]
+                    session['data'].extend(partial)
+                    self.bytes_received += len(partial)
+                    raise TransientUploadError("simulated connection reset")
+                session['data'].extend(data)
+                self.bytes_received += len(data)
+                if len(session['data']) < session['size']:
+                    return ChunkResponse(False, len(session['data']))
+
+                file_id = f"local-{session_uri.rsplit('/', 1)[1]}"
+                del self._sessions[session_uri]
+            path = os.path.join(self.root_dir, f"{file_id}_{session['name']}")
+            with open(path, 'wb') as f:
+                f.write(session['data'])
+            file_info = {'id': file_id, 'name': session['name'], 'path': path}
+            with self._lock:
+                self.files[file_id] = file_info
+            return ChunkResponse(True, session['size'], file_info)
+        finally:
+            with self._lock:
+                self.active_uploads -= 1
+
+    def query_session(self, session_uri, total_size):
+        with self._lock:
+            session = self._sessions.get(session_uri)
+            if session is None:
+                raise UploadSessionExpiredError(session_uri)
+            return ChunkResponse(False, len(session['data']))
+
+
+class BackgroundUploadManager:
+    """
+    Runs uploads on a dedicated event-loop thread. submit() returns at once;
+    at most max_concurrent_uploads files are in flight. Session URIs are
+    persisted so uploads interrupted by a crash resume in the next run.
+    """
+
+    def __init__(self, backend, max_concurrent_uploads=3, chunk_size=8 * 1024 * 1024,
+                 max_retries=5, retry_base_delay=1.0, retry_max_delay=60.0, session_state_path=None):
+        self.backend = backend
+        self.max_concurrent_uploads = max(1, max_concurrent_uploads)
+        # Round down to Drive's chunk granularity (at least one unit)
+        self.chunk_size = max(DRIVE_CHUNK_GRANULARITY, chunk_size - chunk_size % DRIVE_CHUNK_GRANULARITY)
+        self.max_retries = max_retries
+        self.retry_base_delay = retry_base_delay
+        self.retry_max_delay = retry_max_delay
+        self.session_state_path = session_state_path
+
+        self._loop = None
+        self._thread = None
+        self._executor = None
+        self._semaphore = None
+        self._lock = threading.Lock()
+        self._state_lock = threading.Lock()
+        self.jobs: List[UploadJob] = []
+        self._session_state = self._read_state()
+
+    def _ensure_loop(self):
+        with self._lock:
+            if self._loop is not None:
+                return
+            self._loop = asyncio.new_event_loop()
+            # Blocking chunk reads and HTTP requests; one per upload in flight
+            self._executor = ThreadPoolExecutor(max_workers=self.max_concurrent_uploads,
+                                                thread_name_prefix="drive-upload")
+            self._loop.set_default_executor(self._executor)
+            self._thread = threading.Thread(target=self._loop.run_forever, name="drive-uploads", daemon=True)
+            self._thread.start()
+            # The thread is a daemon: finish queued uploads before the interpreter exits
+            _register_exit_hook(self._finish_at_exit)
+            self._semaphore = asyncio.run_coroutine_threadsafe(
+                self._create_semaphore(), self._loop).result()
+
+    async def _create_semaphore(self):
+        return asyncio.Semaphore(self.max_concurrent_uploads)
+
+    def submit(self, filepath, filename, folder_id=None) -> UploadJob:
+        """Queue an upload and return immediately"""
+        job = UploadJob(filepath=filepath, filename=filename, folder_id=folder_id)
+        self._ensure_loop()
+        with self._lock:
+            self.jobs.append(job)
+        job.future = asyncio.run_coroutine_threadsafe(self._run_job(job), self._loop)
+        return job
+
+    def pending_jobs(self) -> List[UploadJob]:
+        with self._lock:
+            return [job for job in self.jobs if not job.done()]
+
+    def wait(self, jobs=None, timeout=None) -> List[Dict[str, Any]]:
+        """Block until jobs (default: all submitted) finish; return successful results"""
+        jobs = list(self.jobs) if jobs is None else jobs
+        deadline = None if timeout is None else time.monotonic() + timeout
+        for job in jobs:
+            remaining = None if deadline is None else max(0.0, deadline - time.monotonic())
+            job.wait(remaining)
+        return [job.result for job in jobs if job.result]
+
+    def shutdown(self, wait=True):
+        if wait:
+            self.wait()
+        with self._lock:
+            loop, self._loop = self._loop, None
+            executor, self._executor = self._executor, None
+        if loop is not None:
+            loop.call_soon_threadsafe(loop.stop)
+        if executor is not None:
+            executor.shutdown(wait=False)
+
+    def _finish_at_exit(self):
+        pending = self.pending_jobs()
+        if pending:
+            logger.info(f"☁️ Finishing {len(pending)} queued Google Drive uploads before exit...")
+        self.shutdown(wait=True)
+
+    async def _run_job(self, job: UploadJob):
+        async with self._semaphore:
+            job.status = 'uploading'
+            while True:
+                job.attempts += 1
+                try:
+                    file_info = await self._upload_resumable(job)
+                    job.result = {
+                        'file_id': file_info['id'],
+                        'file_url': f"https://drive.google.com/file/d/{file_info['id']}/view",
+                        'filename': job.filename
+                    }
+                    job.status = 'completed'
+                    logger.info(f"☁️ Uploaded to Google Drive: {job.filename} "
+                                f"({job.attempts} attempt{'s' if job.attempts > 1 else ''})")
+                    return job.result
+                except TransientUploadError as e:
+                    if job.attempts > self.max_retries:
+                        job.error = str(e)
+                        break
+                    delay = min(self.retry_max_delay, self.retry_base_delay * 2 ** (job.attempts - 1))
+                    delay *= 0.5 + random.random()
+                    logger.warning(f"⚠️ Upload of {job.filename} interrupted ({e}), retrying in {delay:.1f}s")
+                    await asyncio.sleep(delay)
+                except Exception as e:
+                    job.error = str(e)
+                    break
+            job.status = 'failed'
+            logger.error(f"❌ Google Drive upload failed: {job.filename}: {job.error}")
+            return None
+
+    async def _upload_resumable(self, job: UploadJob):
+        loop = asyncio.get_running_loop()
+        if not os.path.exists(job.filepath):
+            raise FileNotFoundError(f"File not found for upload: {job.filepath}")
+        total_size = os.path.getsize(job.filepath)
+        state_key = self._session_key(job, total_size)
+
+        session_uri = self._load_session(state_key)
+        offset = 0
+        if session_uri:
+            try:
+                status = await loop.run_in_executor(None, self.backend.query_session, session_uri, total_size)
+                if status.complete:
+                    self._forget_session(state_key)
+                    return status.file
+                offset = status.next_offset
+            except UploadSessionExpiredError:
+                session_uri = None
+        if not session_uri:
+            mime_type = mimetypes.guess_type(job.filename)[0] or 'application/octet-stream'
+            session_uri = await loop.run_in_executor(
+                None, self.backend.start_session, job.filename, job.folder_id, total_size, mime_type)
+            self._remember_session(state_key, session_uri)
+
+        try:
+            while True:
+                data = await loop.run_in_executor(None, self._read_chunk, job.filepath, offset)
+                try:
+                    response = await loop.run_in_executor(
+                        None, self.backend.upload_chunk, session_uri, data, offset, total_size)
+                except TransientUploadError:
+                    # Learn how much the server kept so the retry resumes there
+                    try:
+                        status = await loop.run_in_executor(None, self.backend.query_session, session_uri, total_size)
+                        job.bytes_sent = status.next_offset
+                    except Exception:
+                        pass
+                    raise
+                if response.complete:
+                    self._forget_session(state_key)
+                    job.bytes_sent = total_size
+                    return response.file
+                offset = response.next_offset
+                job.bytes_sent = offset
+        except UploadSessionExpiredError:
+            self._forget_session(state_key)
+            raise TransientUploadError("upload session expired")
+
+    def _read_chunk(self, filepath, offset):
+        with open(filepath, 'rb') as f:
+            f.seek(offset)
+            return f.read(self.chunk_size)
+
+    # Session persistence -------------------------------------------------
+
+    @staticmethod
+    def _session_key(job, total_size):
+        mtime = int(os.path.getmtime(job.filepath))
+        return f"{os.path.abspath(job.filepath)}|{total_size}|{mtime}|{job.filename}|{job.folder_id or ''}"
+
+    def _read_state(self):
+        if not self.session_state_path or not os.path.exists(self.session_state_path):
+            return {}
+        try:
+            with open(self.session_state_path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _write_state(self, state):
+        if not self.session_state_path:
+            return
+        temp_path = f"{self.session_state_path}.tmp"
+        try:
+            with open(temp_path, 'w', encoding='utf-8') as f:
+                json.dump(state, f)
+            os.replace(temp_path, self.session_state_path)
+        except OSError as e:
+            logger.debug(f"Could not save upload sessions: {e}")
+
+    def _load_session(self, key):
+        with self._state_lock:
+            entry = self._session_state.get(key)
+        if entry and time.time() - entry['created'] < SESSION_MAX_AGE_SECONDS:
+            return entry['session_uri']
+        return None
+
+    def _remember_session(self, key, session_uri):
+        with self._state_lock:
+            self._session_state[key] = {'session_uri': session_uri, 'created': time.time()}
+            self._write_state(self._session_state)
+
+    def _forget_session(self, key):
+        with self._state_lock:
+            if self._session_state.pop(key, None) is not None:
+                self._write_state(self._session_state)
+
+
 class GoogleDriveUploader:
     """Handles Google Drive uploads with authentication and error handling"""
     
-    def __init__(self):
+    def __init__(self, upload_backend=None):
         self.drive_settings = config_manager.google_drive_settings
         self.credentials_file = self.drive_settings['credentials_file']
         self.target_folder_id = self.drive_settings['target_folder_id']
         self.drive = None
-        self._initialize_drive()
+        self.upload_backend = upload_backend
+        self._upload_manager = None
+        if upload_backend is None:
+            self._initialize_drive()
     
     def _initialize_drive(self):
         """Initialize Google Drive connection"""
@@ -64,6 +496,7 @@ class GoogleDriveUploader:
             
             # Initialize Google Drive
             self.drive = GoogleDrive(gauth)
+            self.upload_backend = DriveResumableBackend(gauth)
             logger.info("Google Drive initialized successfully")
             
         except ImportError:
@@ -75,78 +508,106 @@ class GoogleDriveUploader:
             logger.info("2. Set 'get_refresh_token = True' in your client_secrets.json")
             logger.info("3. Run the script again to re-authenticate")
     
-    def upload_to_google_drive(self, filepath_to_upload, filename_on_drive, gdrive_folder_id=None):
-        """Upload file to Google Drive"""
-        if not self.drive:
+    @property
+    def upload_manager(self):
+        """Background upload manager (started on first upload)"""
+        if self._upload_manager is None:
+            self._upload_manager = BackgroundUploadManager(
+                self.upload_backend,
+                max_concurrent_uploads=self.drive_settings['max_concurrent_uploads'],
+                chunk_size=int(self.drive_settings['upload_chunk_size_mb'] * 1024 * 1024),
+                max_retries=self.drive_settings['upload_max_retries'],
+                retry_base_delay=self.drive_settings['upload_retry_base_delay'],
+                session_state_path=self.drive_settings['upload_sessions_file']
+            )
+        return self._upload_manager
+
+    def queue_upload(self, filepath_to_upload, filename_on_drive, gdrive_folder_id=None):
+        """Queue a file for background upload; returns an UploadJob or None"""
+        if not self.upload_backend:
             logger.warning("Google Drive not initialized. Skipping upload.")
             return None
-        
+
         if gdrive_folder_id is None:
             gdrive_folder_id = self.target_folder_id
-        
+
         if not gdrive_folder_id:
             logger.warning("No Google Drive folder ID specified. Skipping upload.")
             return None
-        
-        try:
-            logger.info(f"--- Uploading to Google Drive: {filename_on_drive} ---")
-            
-            # Check if file exists
-            if not os.path.exists(filepath_to_upload):
-                logger.error(f"File not found for upload: {filepath_to_upload}")
-                return None
-            
-            # Create file metadata
-            file_metadata = {
-                'title': filename_on_drive,
-                'parents': [{'id': gdrive_folder_id}]
-            }
-            
-            # Create and upload file
-            drive_file = self.drive.CreateFile(file_metadata)
-            drive_file.SetContentFile(filepath_to_upload)
-            drive_file.Upload()
-            
-            # Get file info
-            file_id = drive_file['id']
-            file_url = f"https://drive.google.com/file/d/{file_id}/view"
-            
-            logger.info(f"Successfully uploaded to Google Drive: {filename_on_drive}")
-            logger.info(f"Google Drive URL: {file_url}")
-            
-            return {
-                'file_id': file_id,
-                'file_url': file_url,
-                'filename': filename_on_drive
-            }
-            
-        except Exception as e:
-            logger.error(f"Google Drive upload failed: {e}")
+
+        if not os.path.exists(filepath_to_upload):
+            logger.error(f"File not found for upload: {filepath_to_upload}")
             return None
-    
-    def upload_multiple_files(self, file_list, folder_id=None):
-        """Upload multiple files to Google Drive"""
-        if not self.drive:
-            logger.warning("Google Drive not initialized. Skipping uploads.")
-            return []
-        
-        results = []
-        
+
+        logger.info(f"--- Queued for Google Drive upload: {filename_on_drive} ---")
+        return self.upload_manager.submit(filepath_to_upload, filename_on_drive, gdrive_folder_id)
+
+    def queue_uploads(self, file_list, folder_id=None):
+        """Queue several files for background upload without waiting; returns the UploadJobs"""
+        jobs = []
         for file_info in file_list:
             filepath = file_info.get('filepath')
             filename = file_info.get('filename')
-            
+
             if not filepath or not filename:
                 logger.warning(f"Invalid file info: {file_info}")
                 continue
-            
-            result = self.upload_to_google_drive(filepath, filename, folder_id)
-            if result:
-                results.append(result)
-        
+
+            job = self.queue_upload(filepath, filename, folder_id)
+            if job:
+                jobs.append(job)
+        return jobs
+
+    def upload_to_google_drive(self, filepath_to_upload, filename_on_drive, gdrive_folder_id=None):
+        """Upload file to Google Drive and wait for it to finish"""
+        job = self.queue_upload(filepath_to_upload, filename_on_drive, gdrive_folder_id)
+        if not job:
+            return None
+
+        result = job.wait()
+        if result:
+            logger.info(f"Google Drive URL: {result['file_url']}")
+        return result
+
+    def upload_multiple_files(self, file_list, folder_id=None):
+        """Upload multiple files to Google Drive concurrently and wait for all of them"""
+        if not self.upload_backend:
+            logger.warning("Google Drive not initialized. Skipping uploads.")
+            return []
+
+        jobs = self.queue_uploads(file_list, folder_id)
+        results = self.upload_manager.wait(jobs)
+
         logger.info(f"Uploaded {len(results)} out of {len(file_list)} files to Google Drive")
         return results
-    
+
+    def upload_files(self, file_list, folder_id=None):
+        """
+        Upload a document's output files: queued in the background when
+        background_uploads is enabled (returns UploadJobs), otherwise uploaded
+        before returning (returns the upload results).
+        """
+        if self.drive_settings['background_uploads']:
+            return self.queue_uploads(file_list, folder_id)
+        return self.upload_multiple_files(file_list, folder_id)
+
+    @staticmethod
+    def count_completed_uploads(results) -> int:
+        """
+        Number of finished uploads in upload_files() results: upload results
+        count as uploaded, UploadJobs only once they have completed
+        """
+        return sum(1 for result in results or [] if not isinstance(result, UploadJob) or result.status == 'completed')
+
+    def has_pending_uploads(self):
+        return self._upload_manager is not None and bool(self._upload_manager.pending_jobs())
+
+    def wait_for_uploads(self, timeout=None):
+        """Wait for all queued background uploads; returns the successful results"""
+        if self._upload_manager is None:
+            return []
+        return self._upload_manager.wait(timeout=timeout)
+
     def create_folder(self, folder_name, parent_folder_id=None):
         """Create a new folder in Google Drive"""
         if not self.drive:
@@ -210,22 +671,31 @@ class GoogleDriveUploader:
     
     def is_available(self):
         """Check if Google Drive upload is available"""
-        return self.drive is not None
+        return self.upload_backend is not None
     
     def get_upload_summary(self, uploaded_files):
         """Generate upload summary report"""
         if not uploaded_files:
             return "No files were uploaded to Google Drive."
         
+        # Queued jobs are reported by their current state
+        completed = [item.result if isinstance(item, UploadJob) else item for item in uploaded_files
+                     if not isinstance(item, UploadJob) or item.result]
+        unfinished = [item for item in uploaded_files if isinstance(item, UploadJob) and not item.result]
+        
         summary = f"""
 📤 GOOGLE DRIVE UPLOAD SUMMARY
 =============================
-✅ Successfully uploaded: {len(uploaded_files)} files
-
-Files uploaded:
+✅ Successfully uploaded: {len(completed)} files
 """
+        if unfinished:
+            summary += f"⏳ Uploading in background or failed: {len(unfinished)} files\n"
+        summary += "\nFiles uploaded:\n"
+        
+        for job in unfinished:
+            summary += f"• {job.filename}\n  ⏳ {job.status}{f' ({job.error})' if job.error else ''}\n"
         
-        for file_info in uploaded_files:
+        for file_info in completed:
             filename = file_info.get('filename', 'Unknown')
             file_url = file_info.get('file_url', 'No URL')
             summary += f"• {filename}\n  📎 {file_url}\n"
@@ -238,5 +708,5 @@ Files uploaded:
         
         return summary
 
-# Global Google Drive uploader instance
-drive_uploader = GoogleDriveUploader()
+# Global Google Drive uploader instance (authenticates on first use)
+drive_uploader = LazySingleton(GoogleDriveUploader)
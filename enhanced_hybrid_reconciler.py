@@ -14,12 +14,15 @@ Key Features:
 """
 
 import os
+import re
 import logging
 import asyncio
 from typing import List, Dict, Any, Optional, Tuple
 from dataclasses import dataclass
 from pathlib import Path
 
+from spatial_index import SpatialIndex
+
 # Import YOLOv8 detector
 try:
     from yolov8_visual_detector import YOLOv8VisualDetector, YOLODetection
@@ -29,7 +32,10 @@ except ImportError:
 
 # Import original hybrid reconciler as fallback
 try:
-    from hybrid_content_reconciler import HybridContentReconciler, VisualElement, NougatBlock
+    from hybrid_content_reconciler import (
+        HybridContentReconciler, VisualElement, NougatBlock,
+        DEFAULT_PAGE_HEIGHT, page_line_ranges, estimate_vertical_position
+    )
     HYBRID_RECONCILER_AVAILABLE = True
 except ImportError:
     HYBRID_RECONCILER_AVAILABLE = False
@@ -292,11 +298,18 @@ class EnhancedHybridReconciler:
                 visual_elements_by_page[page] = []
             visual_elements_by_page[page].append(element)
         
+        line_ranges = page_line_ranges(nougat_blocks)
+        visual_indexes = {}
+        
         # Process each Nougat block
         for block in nougat_blocks:
             # Check if this block overlaps with any visual element
             page_visuals = visual_elements_by_page.get(block.page_num, [])
-            overlapping_visual = self._find_best_yolo_match(block, page_visuals)
+            if page_visuals and block.page_num not in visual_indexes:
+                visual_indexes[block.page_num] = self._build_visual_index(page_visuals)
+            overlapping_visual = self._find_best_yolo_match(
+                block, page_visuals, visual_indexes.get(block.page_num), line_ranges.get(block.page_num)
+            )
             
             if overlapping_visual:
                 # This is visual content - exclude from translation
@@ -318,21 +331,45 @@ class EnhancedHybridReconciler:
         
         return correlated_content
 
+    def _build_visual_index(self, page_visuals: List[EnhancedVisualElement]) -> SpatialIndex:
+        """Index the page's figure and table detections by bounding box"""
+        return SpatialIndex.from_items(
+            (v for v in page_visuals if v.element_type in ['figure', 'table']), lambda v: v.bbox
+        )
+
     def _find_best_yolo_match(self, nougat_block: NougatBlock,
-                            page_visuals: List[EnhancedVisualElement]) -> Optional[EnhancedVisualElement]:
-        """Find best YOLOv8 visual element match with supreme accuracy"""
+                            page_visuals: List[EnhancedVisualElement],
+                            visual_index: Optional[SpatialIndex] = None,
+                            line_range: Optional[Tuple[int, int]] = None) -> Optional[EnhancedVisualElement]:
+        """
+        Find the figure or table detection covering a Nougat block's estimated
+        position. Text blocks must fall inside the detection; image placeholders
+        may be up to correlation_tolerance away from it.
+        """
         if not page_visuals:
             return None
+        if visual_index is None:
+            visual_index = self._build_visual_index(page_visuals)
 
         # Filter to visual content types (figures, tables)
-        visual_candidates = [v for v in page_visuals if v.element_type in ['figure', 'table']]
+        visual_candidates = visual_index.items()
 
         if not visual_candidates:
             return None
 
-        # For now, return highest confidence detection
-        # TODO: Implement spatial correlation based on line numbers and bounding boxes
-        best_match = max(visual_candidates, key=lambda x: x.confidence)
+        page_height = max(DEFAULT_PAGE_HEIGHT, max(v.bbox[3] for v in visual_candidates))
+        estimated_y = estimate_vertical_position(
+            nougat_block.line_number, line_range or (nougat_block.line_number, nougat_block.line_number),
+            page_height
+        )
+        tolerance = self.config['correlation_tolerance'] if nougat_block.content_type == 'image_placeholder' else 0
+        covering = visual_index.query_vertical_band(estimated_y - tolerance, estimated_y + tolerance)
+
+        if not covering:
+            return None
+
+        # Highest confidence detection among those at the block's position
+        best_match = max(covering, key=lambda x: x.confidence)
 
         self.logger.debug(f"   🎯 Matched {nougat_block.content} -> {best_match.element_type} (conf: {best_match.confidence:.2f})")
 
@@ -0,0 +1,306 @@
+"""
+Font Statistics Engine for Ultimate PDF Translator
+
+Histogram-based replacement for per-span font bookkeeping in
+StructuredContentExtractor._perform_global_font_analysis:
+- Span sizes are streamed page by page into fixed-size NumPy histograms
+  (span counts and character counts per 0.05pt size bin)
+- Partial results from page shards merge by simple addition, so large
+  documents can be analyzed across a process pool
+- Heading sizes come from a Gaussian KDE evaluated over the populated
+  histogram bins, which is equivalent to a KDE over every span but costs
+  O(distinct sizes) instead of O(spans)
+"""
+
+import os
+import math
+import logging
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, Iterable, List, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Size histogram resolution and range (sizes above the range share the last bin)
+FONT_SIZE_RESOLUTION = 0.05
+FONT_SIZE_MAX = 512.0
+FONT_SIZE_BINS = int(round(FONT_SIZE_MAX / FONT_SIZE_RESOLUTION)) + 1
+
+# PyMuPDF span flags
+BOLD_FLAG = 2 ** 4
+ITALIC_FLAG = 2 ** 1
+
+# Grid used to evaluate the size density when looking for heading peaks
+DENSITY_GRID_POINTS = 100
+MAX_HEADING_LEVELS = 6
+
+
+class FontStatisticsAccumulator:
+    """
+    Mergeable font statistics for a set of pages.
+
+    Memory is fixed by the histogram size plus one counter entry per distinct
+    (font, size, bold, italic) style, independent of the number of spans.
+    """
+
+    def __init__(self):
+        self.span_histogram = np.zeros(FONT_SIZE_BINS, dtype=np.int64)
+        self.char_histogram = np.zeros(FONT_SIZE_BINS, dtype=np.int64)
+        self.style_counts: Counter = Counter()  # (font, size_bin, bold, italic) -> spans
+        self.family_spans: Counter = Counter()
+        self.family_chars: Counter = Counter()
+        self.weight_spans = {'bold': 0, 'italic': 0}
+        self.weight_chars = {'bold': 0, 'italic': 0}
+        self.span_count = 0
+        self.size_sum = 0.0
+        self.size_sq_sum = 0.0
+        self.min_size = math.inf
+        self.max_size = -math.inf
+        self.pages = 0
+
+    def add_page_dict(self, page_dict: Dict[str, Any]):
+        """Add the spans of one page (output of page.get_text("dict"))"""
+        sizes, char_counts, fonts, flags = [], [], [], []
+        for block in page_dict.get("blocks", ()):
+            for line in block.get("lines", ()):
+                for span in line["spans"]:
+                    sizes.append(span.get("size", 12.0))
+                    char_counts.append(len(span.get("text", "")))
+                    fonts.append(span.get("font", "Arial"))
+                    flags.append(span.get("flags", 0))
+
+        self.pages += 1
+        if sizes:
+            self.add_spans(sizes, char_counts, fonts, flags)
+
+    def add_spans(self, sizes: List[float], char_counts: List[int], fonts: List[str], flags: List[int]):
+        """Add a batch of spans given as parallel lists"""
+        size_array = np.asarray(sizes, dtype=np.float64)
+        char_array = np.asarray(char_counts, dtype=np.int64)
+        flag_array = np.asarray(flags, dtype=np.int64)
+
+        bins = np.clip(np.rint(size_array / FONT_SIZE_RESOLUTION), 0, FONT_SIZE_BINS - 1).astype(np.int64)
+        self.span_histogram += np.bincount(bins, minlength=FONT_SIZE_BINS)
+        self.char_histogram += np.bincount(bins, weights=char_array, minlength=FONT_SIZE_BINS).astype(np.int64)
+
+        self.span_count += len(size_array)
+        self.size_sum += float(size_array.sum())
+        self.size_sq_sum += float(np.square(size_array).sum())
+        self.min_size = min(self.min_size, float(size_array.min()))
+        self.max_size = max(self.max_size, float(size_array.max()))
+
+        bold = (flag_array & BOLD_FLAG) != 0
+        italic = (flag_array & ITALIC_FLAG) != 0
+        self.weight_spans['bold'] += int(bold.sum())
+        self.weight_spans['italic'] += int(italic.sum())
+        self.weight_chars['bold'] += int(char_array[bold].sum())
+        self.weight_chars['italic'] += int(char_array[italic].sum())
+
+        self.style_counts.update(zip(fonts, bins.tolist(), bold.tolist(), italic.tolist()))
+        self.family_spans.update(fonts)
+        font_names, font_index = np.unique(np.asarray(fonts, dtype=object), return_inverse=True)
+        for name, chars in zip(font_names.tolist(), np.bincount(font_index, weights=char_array).tolist()):
+            self.family_chars[name] += int(chars)
+
+    def merge(self, other: 'FontStatisticsAccumulator') -> 'FontStatisticsAccumulator':
+        """Fold another accumulator (e.g. from a page shard) into this one"""
+        self.span_histogram += other.span_histogram
+        self.char_histogram += other.char_histogram
+        self.style_counts.update(other.style_counts)
+        self.family_spans.update(other.family_spans)
+        self.family_chars.update(other.family_chars)
+        for key in self.weight_spans:
+            self.weight_spans[key] += other.weight_spans[key]
+            self.weight_chars[key] += other.weight_chars[key]
+        self.span_count += other.span_count
+        self.size_sum += other.size_sum
+        self.size_sq_sum += other.size_sq_sum
+        self.min_size = min(self.min_size, other.min_size)
+        self.max_size = max(self.max_size, other.max_size)
+        self.pages += other.pages
+        return self
+
+
+def _bin_size(bin_index: int) -> float:
+    return round(bin_index * FONT_SIZE_RESOLUTION, 2)
+
+
+def _find_density_peaks(density: np.ndarray, min_height: float) -> np.ndarray:
+    """
+    Indices of interior local maxima at or above min_height. A flat top (equal
+    neighbouring bins) is one peak, reported at its middle, as find_peaks does.
+    """
+    # Collapse runs of equal values, then look for maxima among the runs
+    starts = np.flatnonzero(np.r_[True, density[1:] != density[:-1]])
+    ends = np.r_[starts[1:], len(density)] - 1
+    values = density[starts]
+    if len(values) < 3:
+        return np.array([], dtype=np.int64)
+    interior = values[1:-1]
+    is_peak = (interior > values[:-2]) & (interior > values[2:]) & (interior >= min_height)
+    runs = np.nonzero(is_peak)[0] + 1
+    return (starts[runs] + ends[runs]) // 2
+
+
+def _weighted_median(values: np.ndarray, weights: np.ndarray) -> float:
+    cumulative = np.cumsum(weights)
+    total = cumulative[-1]
+    lower = np.searchsorted(cumulative, (total - 1) / 2.0, side='right')
+    upper = np.searchsorted(cumulative, total / 2.0, side='right')
+    return float((values[lower] + values[min(upper, len(values) - 1)]) / 2.0)
+
+
+def analyze_font_statistics(accumulator: FontStatisticsAccumulator) -> Dict[str, Any]:
+    """
+    Turn accumulated statistics into the font profile used by heading detection.
+
+    Body text size, dominant font and body weight are weighted by character
+    count, so a few long paragraphs outweigh many short labels. The size
+    distribution used to find heading peaks stays weighted by span, because
+    headings contribute few characters but distinct spans.
+    """
+    if accumulator.span_count == 0:
+        return {
+            'font_analysis': {},
+            'dominant_font_size': 12.0,
+            'heading_font_sizes': set(),
+            'font_hierarchy': {},
+            'body_text_style': None,
+            'heading_styles': {},
+            'font_statistics': {'mean': 12.0, 'median': 12.0, 'std': 0.0, 'dominant_font': None}
+        }
+
+    populated = np.nonzero(accumulator.span_histogram)[0]
+    bin_sizes = populated * FONT_SIZE_RESOLUTION
+    span_weights = accumulator.span_histogram[populated].astype(np.float64)
+    char_weights = accumulator.char_histogram[populated].astype(np.float64)
+
+    n = accumulator.span_count
+    mean_size = accumulator.size_sum / n
+    variance = max(0.0, accumulator.size_sq_sum / n - mean_size ** 2)
+    std_size = math.sqrt(variance)
+    median_size = _weighted_median(bin_sizes, span_weights)
+
+    body_weights = char_weights if char_weights.sum() > 0 else span_weights
+    body_text_size = _bin_size(int(populated[int(np.argmax(body_weights))]))
+
+    # Gaussian KDE with Scott's bandwidth, evaluated from the histogram bins
+    heading_sizes: List[float] = []
+    if n > 1 and variance > 0:
+        bandwidth = math.sqrt(variance * n / (n - 1)) * n ** (-1.0 / 5)
+        grid = np.linspace(accumulator.min_size, accumulator.max_size, DENSITY_GRID_POINTS)
+        kernel = np.exp(-0.5 * np.square((grid[:, None] - bin_sizes[None, :]) / bandwidth))
+        density = kernel @ span_weights
+        peaks = _find_density_peaks(density, 0.1 * density.max())
+        for size in sorted(grid[peaks].tolist(), reverse=True):
+            if size > body_text_size + std_size:  # Must be significantly larger than body text
+                heading_sizes.append(size)
+        heading_sizes = heading_sizes[:MAX_HEADING_LEVELS]
+
+    heading_styles: Dict[str, float] = {}
+    font_hierarchy: Dict[float, int] = {}
+    for i, size in enumerate(heading_sizes):
+        level = i + 1
+        heading_styles[f"h{level}"] = size
+        font_hierarchy[size] = level
+
+        # Share of spans within the heading-matching tolerance of this size
+        nearby = np.abs(bin_sizes - size) <= 0.5
+        size_frequency = float(span_weights[nearby].sum()) / n
+        heading_styles[f"h{level}_confidence"] = min(1.0, size_frequency * 10)
+
+    family_weights = accumulator.family_chars if sum(accumulator.family_chars.values()) else accumulator.family_spans
+    dominant_font = max(family_weights.items(), key=lambda x: x[1])[0]
+
+    body_text_style = f"{dominant_font}, {body_text_size:.1f}pt"
+    weights = accumulator.weight_chars
+    if weights['bold'] > weights['italic']:
+        body_text_style += ", bold"
+    elif weights['italic'] > weights['bold']:
+        body_text_style += ", italic"
+
+    font_styles: Dict[str, int] = {}
+    for (font_name, size_bin, is_bold, is_italic), count in accumulator.style_counts.items():
+        style_key = f"{font_name}, {_bin_size(size_bin):.1f}pt"
+        if is_bold:
+            style_key += ", bold"
+        if is_italic:
+            style_key += ", italic"
+        font_styles[style_key] = font_styles.get(style_key, 0) + count
+
+    return {
+        'font_analysis': font_styles,
+        'dominant_font_size': body_text_size,
+        'heading_font_sizes': set(heading_sizes),
+        'font_hierarchy': font_hierarchy,
+        'body_text_style': body_text_style,
+        'heading_styles': heading_styles,
+        'font_statistics': {
+            'mean': mean_size,
+            'median': median_size,
+            'std': std_size,
+            'dominant_font': dominant_font,
+            'span_count': n,
+            'font_families': dict(accumulator.family_spans)
+        }
+    }
+
+
+def accumulate_pages(page_dicts: Iterable[Dict[str, Any]]) -> FontStatisticsAccumulator:
+    """Stream page dicts into a new accumulator"""
+    accumulator = FontStatisticsAccumulator()
+    for page_dict in page_dicts:
+        accumulator.add_page_dict(page_dict)
+    return accumulator
+
+
+def _page_text_dict(page) -> Dict[str, Any]:
+    """page.get_text("dict") without embedded image data, which font analysis never reads"""
+    import fitz
+    flags = getattr(fitz, 'TEXTFLAGS_DICT', None)
+    if flags is None:
+        return page.get_text("dict")
+    return page.get_text("dict", flags=flags & ~fitz.TEXT_PRESERVE_IMAGES)
+
+
+def _collect_font_statistics(task: Tuple[str, int, int]) -> FontStatisticsAccumulator:
+    """
+    Accumulate font statistics for pages [start, stop) of a PDF.
+    This function must be at module level to be pickable by ProcessPoolExecutor.
+    """
+    filepath, start, stop = task
+    import fitz
+
+    with fitz.open(filepath) as doc:
+        stop = min(stop, len(doc))
+        return accumulate_pages(_page_text_dict(doc[page_num]) for page_num in range(start, stop))
+
+
+def collect_document_font_statistics(doc, max_workers: int = 0, min_pages_for_pool: int = 200,
+                                     pages_per_shard: int = 50) -> FontStatisticsAccumulator:
+    """
+    Accumulate font statistics for an open PyMuPDF document.
+
+    Large documents backed by a file are split into page shards that are
+    processed in a pool and merged; everything else streams in-process.
+    max_workers=0 uses one worker per spare CPU core.
+    """
+    page_count = len(doc)
+    max_workers = max_workers or max(1, (os.cpu_count() or 2) - 1)
+    filepath = getattr(doc, 'name', None)
+
+    if max_workers > 1 and page_count >= min_pages_for_pool and filepath and os.path.exists(filepath):
+        tasks = [(filepath, start, min(start + pages_per_shard, page_count))
+                 for start in range(0, page_count, pages_per_shard)]
+        try:
+            merged = FontStatisticsAccumulator()
+            with ProcessPoolExecutor(max_workers=min(max_workers, len(tasks))) as executor:
+                for partial in executor.map(_collect_font_statistics, tasks):
+                    merged.merge(partial)
+            return merged
+        except Exception as e:
+            logger.warning(f"Parallel font analysis failed ({e}), falling back to a single pass")
+
+    return accumulate_pages(_page_text_dict(doc[page_num]) for page_num in range(page_count))
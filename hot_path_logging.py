@@ -0,0 +1,169 @@
+"""
+Hot-Path Logging for Per-Item Events
+
+A logger.info() per block in the classification, routing and translation
+loops costs a formatted f-string, a LogRecord and every handler's I/O, for
+each of tens of thousands of items. HotPathLogger replaces those calls with
+events that:
+
+- are counted always (a dict increment) and reported as one aggregated
+  summary line when the stage is flushed;
+- are formatted lazily (%-style arguments, only when a record is emitted);
+- are sampled: the first few occurrences of each event are logged, then one
+  in every `sample_every`;
+- are rate limited per event name, so bursts cannot flood the handlers;
+- carry structured fields (event, stage, sample counts) on the LogRecord
+  for handlers that emit JSON.
+
+preview() wraps a long text so it is truncated only if a record is emitted.
+"""
+
+import time
+import logging
+import threading
+from contextlib import contextmanager
+from typing import Any, Dict, Optional
+
+from config_manager import config_manager
+
+logger = logging.getLogger(__name__)
+
+
+class _Preview:
+    """Lazily truncated text for log arguments"""
+
+    __slots__ = ('text', 'limit')
+
+    def __init__(self, text: Any, limit: int = 100):
+        self.text = text
+        self.limit = limit
+
+    def __str__(self) -> str:
+        text = str(self.text)
+        return text if len(text) <= self.limit else text[:self.limit] + "..."
+
+
+def preview(text: Any, limit: int = 100) -> _Preview:
+    """Log argument that truncates text only if the record is emitted"""
+    return _Preview(text, limit)
+
+
+class _EventState:
+    __slots__ = ('count', 'emitted', 'tokens', 'last_refill', 'total')
+
+    def __init__(self, burst: float):
+        self.count = 0
+        self.emitted = 0
+        self.tokens = burst
+        self.last_refill = time.monotonic()
+        self.total = 0.0
+
+
+class HotPathLogger:
+    """Sampled, rate-limited, lazily formatted events with per-stage counters"""
+
+    def __init__(self, target: logging.Logger, always_log_first: int = 5, sample_every: int = 100,
+                 max_events_per_second: float = 20.0, sampling: bool = True):
+        self.target = target
+        self.always_log_first = always_log_first
+        self.sample_every = max(1, sample_every)
+        self.max_events_per_second = max_events_per_second
+        # Sampling off: every event is eligible (the rate limit still applies)
+        self.sampling = sampling
+        self.stage: Optional[str] = None
+        self._events: Dict[str, _EventState] = {}
+        self._lock = threading.Lock()
+
+    def _should_emit(self, state: _EventState) -> bool:
+        if self.sampling and state.count > self.always_log_first and state.count % self.sample_every:
+            return False
+        if self.max_events_per_second > 0:
+            now = time.monotonic()
+            state.tokens = min(self.max_events_per_second,
+                               state.tokens + (now - state.last_refill) * self.max_events_per_second)
+            state.last_refill = now
+            if state.tokens < 1.0:
+                return False
+            state.tokens -= 1.0
+        return True
+
+    def event(self, name: str, msg: Optional[str] = None, *args, level: int = logging.INFO,
+              value: float = 0.0, **fields):
+        """
+        Count an occurrence of `name` (adding `value` to its total) and, if the
+        level is enabled and the sample and rate limit allow, log msg % args.
+        """
+        with self._lock:
+            state = self._events.get(name)
+            if state is None:
+                state = self._events[name] = _EventState(self.max_events_per_second or 1.0)
+            state.count += 1
+            state.total += value
+            if msg is None or not self.target.isEnabledFor(level) or not self._should_emit(state):
+                return
+            state.emitted += 1
+            count, emitted = state.count, state.emitted
+
+        if count > emitted:
+            msg = f"{msg} [{count - emitted} similar suppressed]"
+        self.target.log(level, msg, *args, stacklevel=2, extra={
+            'event': name, 'stage': self.stage, 'event_count': count, 'fields': fields})
+
+    def counts(self) -> Dict[str, int]:
+        with self._lock:
+            return {name: state.count for name, state in self._events.items()}
+
+    def flush(self, stage: Optional[str] = None, level: int = logging.INFO) -> Dict[str, Dict[str, float]]:
+        """Log one summary line with every event's count, then reset the counters"""
+        with self._lock:
+            events, self._events = self._events, {}
+        summary = {name: {'count': state.count, 'logged': state.emitted, 'total': state.total}
+                   for name, state in events.items()}
+        stage = stage or self.stage
+        if summary and self.target.isEnabledFor(level):
+            parts = []
+            for name, stats in sorted(summary.items()):
+                part = f"{name}={stats['count']}"
+                if stats['total']:
+                    part += f" (total {stats['total']:g})"
+                parts.append(part)
+            self.target.log(level, "📊 %s: %s", stage or "events", ", ".join(parts),
+                            extra={'event': 'stage_summary', 'stage': stage, 'fields': summary})
+        return summary
+
+    @contextmanager
+    def stage_scope(self, stage: str, level: int = logging.INFO):
+        """Tag events with a stage name and flush the stage's counters on exit"""
+        previous, self.stage = self.stage, stage
+        try:
+            yield self
+        finally:
+            self.flush(stage, level)
+            self.stage = previous
+
+
+_hot_path_loggers: Dict[str, HotPathLogger] = {}
+_hot_path_lock = threading.Lock()
+
+
+def get_hot_path_logger(name: str, **overrides) -> HotPathLogger:
+    """
+    Shared HotPathLogger for a module logger name. Overrides (e.g. a slower
+    rate for progress events) apply when the logger is first created.
+    """
+    hot_logger = _hot_path_loggers.get(name)
+    if hot_logger is None:
+        with _hot_path_lock:
+            hot_logger = _hot_path_loggers.get(name)
+            if hot_logger is None:
+                hot_logger = _hot_path_loggers[name] = HotPathLogger(
+                    logging.getLogger(name), **dict(config_manager.hot_path_logging_settings, **overrides))
+    return hot_logger
+
+
+def flush_hot_path_logs(stage: str, level: int = logging.INFO):
+    """Flush the counters of every hot-path logger at the end of a pipeline stage"""
+    with _hot_path_lock:
+        hot_loggers = list(_hot_path_loggers.values())
+    for hot_logger in hot_loggers:
+        hot_logger.flush(stage, level)
@@ -31,8 +31,14 @@ except ImportError:
     STRUCTURED_MODEL_AVAILABLE = False
     StructuredDocument = None
 
+from spatial_index import SpatialIndex
+
 logger = logging.getLogger(__name__)
 
+# Nougat output carries no coordinates; placeholder positions are estimated
+# from line numbers over a page of this height when no visual extends further
+DEFAULT_PAGE_HEIGHT = 792.0
+
 @dataclass
 class VisualElement:
     """Represents a visual element extracted by PyMuPDF"""
@@ -55,6 +61,22 @@ class NougatBlock:
     level: Optional[int] = None  # For headings
     image_reference: Optional[str] = None  # For image placeholders
 
+def page_line_ranges(nougat_blocks: List[NougatBlock]) -> Dict[int, Tuple[int, int]]:
+    """First and last Nougat line number seen on each page"""
+    ranges = {}
+    for block in nougat_blocks:
+        first, last = ranges.get(block.page_num, (block.line_number, block.line_number))
+        ranges[block.page_num] = (min(first, block.line_number), max(last, block.line_number))
+    return ranges
+
+def estimate_vertical_position(line_number: int, line_range: Optional[Tuple[int, int]],
+                               page_height: float) -> float:
+    """Map a Nougat line number to an approximate y coordinate on its page"""
+    if not line_range or line_range[1] <= line_range[0]:
+        return page_height / 2
+    first, last = line_range
+    return (line_number - first) / (last - first) * page_height
+
 class HybridContentReconciler:
     """
     Reconciles Nougat and PyMuPDF outputs into unified StructuredDocument.
@@ -210,14 +232,24 @@ class HybridContentReconciler:
                 visual_elements_by_page[page] = []
             visual_elements_by_page[page].append(element)
         
+        line_ranges = page_line_ranges(nougat_blocks)
+        visual_indexes = {}
+        used_elements = set()
+        
         # Process each Nougat block
         for block in nougat_blocks:
             if block.content_type == 'image_placeholder':
                 # Find matching visual element
                 page_visuals = visual_elements_by_page.get(block.page_num, [])
-                matched_element = self._find_best_visual_match(block, page_visuals)
+                if page_visuals and block.page_num not in visual_indexes:
+                    visual_indexes[block.page_num] = SpatialIndex.from_items(page_visuals, lambda v: v.bbox)
+                matched_element = self._find_best_visual_match(
+                    block, page_visuals, visual_indexes.get(block.page_num),
+                    line_ranges.get(block.page_num), used_elements
+                )
                 
                 if matched_element:
+                    used_elements.add(matched_element.element_id)
                     correlated_content.append({
                         'type': 'image_with_visual',
                         'nougat_block': block,
@@ -242,14 +274,35 @@ class HybridContentReconciler:
         return correlated_content
     
     def _find_best_visual_match(self, nougat_block: NougatBlock, 
-                               page_visuals: List[VisualElement]) -> Optional[VisualElement]:
-        """Find the best visual element match for a Nougat image placeholder"""
+                               page_visuals: List[VisualElement],
+                               visual_index: Optional[SpatialIndex] = None,
+                               line_range: Optional[Tuple[int, int]] = None,
+                               used_elements: Optional[set] = None) -> Optional[VisualElement]:
+        """
+        Find the best visual element match for a Nougat image placeholder:
+        the visual closest to the placeholder's estimated vertical position,
+        preferring visuals not already claimed by an earlier placeholder.
+        """
         if not page_visuals:
             return None
+        if visual_index is None:
+            visual_index = SpatialIndex.from_items(page_visuals, lambda v: v.bbox)
+        used_elements = used_elements or set()
+        
+        page_height = max(DEFAULT_PAGE_HEIGHT, max(v.bbox[3] for v in page_visuals))
+        estimated_y = estimate_vertical_position(
+            nougat_block.line_number, line_range or (nougat_block.line_number, nougat_block.line_number),
+            page_height
+        )
+        # Full-width horizontal line at the estimated position: edge distance is the vertical gap
+        probe = (min(v.bbox[0] for v in page_visuals), estimated_y,
+                 max(v.bbox[2] for v in page_visuals), estimated_y)
         
-        # For now, return the first visual element on the page
-        # TODO: Implement spatial correlation based on line numbers and bounding boxes
-        return page_visuals[0] if page_visuals else None
+        matches = visual_index.nearest(probe, k=1, metric='edge',
+                                       predicate=lambda v: v.element_id not in used_elements)
+        if not matches:
+            matches = visual_index.nearest(probe, k=1, metric='edge')
+        return matches[0][1] if matches else None
     
     def _create_unified_content_blocks(self, correlated_content: List[Dict[str, Any]], 
                                      output_dir: str) -> List[ContentBlock]:
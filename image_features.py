@@ -0,0 +1,167 @@
+"""
+Shared Image Feature Extraction
+
+The preemptive image filter and the heuristic image classifier both need a
+few cheap statistics about an image (size, colour diversity, contrast, edge
+and layout structure). Each used to decode the image itself, at full
+resolution, and loop over it in Python. extract_image_features() decodes an
+image once - at a reduced JPEG draft scale when the format allows - to a
+fixed-size thumbnail, computes every statistic with vectorized NumPy and
+returns them in one ImageFeatures record. get_image_features() memoizes the
+record per file, so the filter and the classifier share a single decode.
+"""
+
+import os
+import logging
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+try:
+    import numpy as np
+    from PIL import Image
+    PIL_AVAILABLE = True
+except ImportError:
+    PIL_AVAILABLE = False
+
+# Longest side of the analysis thumbnail
+FEATURE_THUMBNAIL_SIZE = 256
+# Side of the sample the colour statistics are counted on
+COLOR_SAMPLE_SIZE = 50
+# Colours counted before an image counts as "many colours"
+MAX_COUNTED_COLORS = 256
+
+_MAX_MEMOIZED_IMAGES = 4096
+
+
+@dataclass(frozen=True)
+class ImageFeatures:
+    """Statistics of one image; pixel statistics come from the analysis thumbnail"""
+    width: int
+    height: int
+    mode: str
+    file_size: int
+    # Distinct colours in the colour sample, None when above MAX_COUNTED_COLORS
+    color_count: Optional[int]
+    dominant_color_ratio: float
+    contrast: float
+    strong_horizontal_edges: float
+    strong_vertical_edges: float
+    edge_density: float
+    regular_pattern: bool
+
+    @property
+    def pixel_count(self) -> int:
+        return self.width * self.height
+
+    @property
+    def aspect_ratio(self) -> float:
+        return self.width / self.height if self.height else 0.0
+
+
+def _load_thumbnail(image_path: str, size: int):
+    """Open an image and decode it once, as small as the format allows, to at most size x size"""
+    with Image.open(image_path) as image:
+        width, height, mode = image.width, image.height, image.mode
+        # JPEG decodes directly at 1/2, 1/4 or 1/8 scale; other formats ignore this
+        image.draft(None, (size, size))
+        thumbnail = image.convert('RGB')
+    thumbnail.thumbnail((size, size), Image.NEAREST)
+    return thumbnail, width, height, mode
+
+
+def _color_statistics(thumbnail) -> Tuple[Optional[int], float]:
+    sample = thumbnail.resize((COLOR_SAMPLE_SIZE, COLOR_SAMPLE_SIZE))
+    colors = sample.getcolors(maxcolors=MAX_COUNTED_COLORS)
+    if not colors:
+        return None, 0.0
+    return len(colors), max(count for count, _ in colors) / (COLOR_SAMPLE_SIZE * COLOR_SAMPLE_SIZE)
+
+
+def edge_statistics(gray: 'np.ndarray') -> Tuple[float, float, float]:
+    """
+    Fractions of strong horizontal (>30) and vertical (>30) neighbour
+    differences, and the density of edges (>20) per pixel
+    """
+    if gray.shape[0] < 2 or gray.shape[1] < 2:
+        return 0.0, 0.0, 0.0
+    edges_h = np.abs(np.diff(gray, axis=0))
+    edges_v = np.abs(np.diff(gray, axis=1))
+    strong_h = np.count_nonzero(edges_h > 30) / edges_h.size
+    strong_v = np.count_nonzero(edges_v > 30) / edges_v.size
+    edge_density = (np.count_nonzero(edges_h > 20) + np.count_nonzero(edges_v > 20)) / gray.size
+    return float(strong_h), float(strong_v), float(edge_density)
+
+
+def has_regular_pattern(gray: 'np.ndarray') -> bool:
+    """
+    Regular content (text lines, grids) has similar variance in every tile.
+    Tiles are the same as the original window loop: side min(20, h/10, w/10),
+    starting at every multiple of the side below (h - side) and (w - side).
+    """
+    h, w = gray.shape
+    window = min(20, h // 10, w // 10)
+    if window < 5:
+        return False
+    rows = len(range(0, h - window, window))
+    cols = len(range(0, w - window, window))
+    if rows * cols <= 4:
+        return False
+    tiles = gray[:rows * window, :cols * window].reshape(rows, window, cols, window)
+    variances = tiles.var(axis=(1, 3))
+    return bool(variances.std() < variances.mean() * 0.5)
+
+
+def extract_image_features(image_path: str, thumbnail_size: int = FEATURE_THUMBNAIL_SIZE) -> ImageFeatures:
+    """Decode an image once and compute all features on its thumbnail"""
+    if not PIL_AVAILABLE:
+        raise RuntimeError("Pillow and NumPy are required for image feature extraction")
+
+    file_size = os.path.getsize(image_path)
+    thumbnail, width, height, mode = _load_thumbnail(image_path, thumbnail_size)
+    color_count, dominant_color_ratio = _color_statistics(thumbnail)
+
+    gray = np.asarray(thumbnail, dtype=np.float32).mean(axis=2)
+    strong_h, strong_v, edge_density = edge_statistics(gray)
+
+    return ImageFeatures(
+        width=width,
+        height=height,
+        mode=mode,
+        file_size=file_size,
+        color_count=color_count,
+        dominant_color_ratio=dominant_color_ratio,
+        contrast=float(gray.std()),
+        strong_horizontal_edges=strong_h,
+        strong_vertical_edges=strong_v,
+        edge_density=edge_density,
+        regular_pattern=has_regular_pattern(gray),
+    )
+
+
+_memoized_features: 'OrderedDict[Tuple[str, float, int], ImageFeatures]' = OrderedDict()
+_memoized_features_lock = threading.Lock()
+
+
+def get_image_features(image_path: str) -> ImageFeatures:
+    """
+    Features of an image file, extracted once per (path, mtime, size) and
+    shared by every caller in the process
+    """
+    stat = os.stat(image_path)
+    key = (os.path.abspath(image_path), stat.st_mtime, stat.st_size)
+    with _memoized_features_lock:
+        features = _memoized_features.get(key)
+        if features is not None:
+            _memoized_features.move_to_end(key)
+            return features
+
+    features = extract_image_features(image_path)
+    with _memoized_features_lock:
+        _memoized_features[key] = features
+        while len(_memoized_features) > _MAX_MEMOIZED_IMAGES:
+            _memoized_features.popitem(last=False)
+    return features
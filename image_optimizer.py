@@ -0,0 +1,266 @@
+"""
+Image Optimization Stage for Word Output
+
+Images reach the Word generator at whatever resolution they were extracted
+(300-DPI YOLO crops, full-resolution xref images, rendered page areas), while
+Word only displays them a few inches wide. This stage resamples each image to
+the target print DPI for its placed width, chooses JPEG for photographic
+content and PNG (palette PNG when possible) for line art and transparency,
+drops EXIF/text metadata, and caches results by content hash so the same
+image is never processed twice - including the decision to keep an original
+that re-encoding would barely shrink. Images are optimized in parallel.
+"""
+
+import io
+import os
+import math
+import time
+import hashlib
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+from config_manager import config_manager
+from lazy_imports import LazySingleton
+
+logger = logging.getLogger(__name__)
+
+try:
+    from PIL import Image, ImageOps
+    PIL_AVAILABLE = True
+except ImportError:
+    PIL_AVAILABLE = False
+    logger.warning("⚠️ Pillow not available - images will be embedded unoptimized")
+
+# Bump when the optimization pipeline changes output for the same settings
+IMAGE_OPTIMIZER_VERSION = 1
+
+# Thumbnail used to tell photographs from line art
+_ANALYSIS_SIZE = 128
+# Empty cache entry recording that the original image is embedded as-is
+_KEEP_ORIGINAL_EXTENSION = '.keep'
+
+
+def _file_hash(path: str, chunk_size: int = 1024 * 1024) -> str:
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _has_transparency(image) -> bool:
+    if image.mode in ('RGBA', 'LA'):
+        return image.getchannel('A').getextrema()[0] < 255
+    return image.mode == 'P' and 'transparency' in image.info
+
+
+def is_photographic(image, color_threshold: int = 256, dominant_share: float = 0.8) -> bool:
+    """
+    True for continuous-tone content that compresses well as JPEG.
+    Line art has few distinct colors, or a handful of colors (background,
+    ink) covering most of the image even when anti-aliasing adds more.
+    """
+    thumbnail = image.convert('RGB')
+    thumbnail.thumbnail((_ANALYSIS_SIZE, _ANALYSIS_SIZE), Image.NEAREST)
+    pixel_count = thumbnail.width * thumbnail.height
+    colors = thumbnail.getcolors(maxcolors=pixel_count)
+    if len(colors) <= color_threshold:
+        return False
+    dominant = sum(count for count, _ in sorted(colors, reverse=True)[:16])
+    return dominant / pixel_count < dominant_share
+
+
+class ImageOptimizer:
+    """Resamples and recompresses images for embedding, with a content-hash cache"""
+
+    def __init__(self, settings: Optional[Dict[str, Any]] = None):
+        self.settings = settings if settings is not None else config_manager.image_optimization_settings
+        self.enabled = self.settings['enabled'] and PIL_AVAILABLE
+        self.cache_dir = self.settings['cache_dir']
+        self.max_cache_bytes = int(self.settings['max_cache_size_mb'] * 1024 * 1024)
+        self._lock = threading.Lock()
+        self.stats = {'optimized': 0, 'cache_hits': 0, 'kept_original': 0, 'failed': 0,
+                      'bytes_in': 0, 'bytes_out': 0}
+
+    def _count(self, counter: str, amount: int = 1):
+        with self._lock:
+            self.stats[counter] += amount
+
+    def target_width_pixels(self, display_width_inches: float) -> int:
+        return max(1, math.ceil(display_width_inches * self.settings['target_dpi']))
+
+    def _cache_key(self, image_path: str, target_width: int) -> str:
+        signature = (f"{IMAGE_OPTIMIZER_VERSION}:{target_width}:{self.settings['jpeg_quality']}:"
+                     f"{self.settings['photo_color_threshold']}:{self.settings['min_size_reduction']}")
+        return hashlib.sha256(f"{_file_hash(image_path)}:{signature}".encode()).hexdigest()
+
+    def _cached_path(self, key: str) -> Optional[str]:
+        for extension in ('.jpg', '.png', _KEEP_ORIGINAL_EXTENSION):
+            path = os.path.join(self.cache_dir, key[:2], key + extension)
+            if os.path.exists(path):
+                return path
+        return None
+
+    # ------------------------------------------------------------------
+    # Optimization
+    # ------------------------------------------------------------------
+
+    def _encode(self, image_path: str, target_width: int) -> Tuple[bytes, str]:
+        """Return (encoded bytes, extension) for the optimized image"""
+        with Image.open(image_path) as source:
+            # Apply EXIF rotation before the metadata is dropped
+            image = ImageOps.exif_transpose(source)
+            image.load()
+
+        if image.width > target_width:
+            target_height = max(1, round(image.height * target_width / image.width))
+            image = image.resize((target_width, target_height), Image.LANCZOS, reducing_gap=3.0)
+
+        output = io.BytesIO()
+        if _has_transparency(image):
+            image.convert('RGBA').save(output, format='PNG', optimize=True)
+            return output.getvalue(), '.png'
+
+        if is_photographic(image, self.settings['photo_color_threshold']):
+            image.convert('RGB').save(output, format='JPEG', quality=self.settings['jpeg_quality'],
+                                      optimize=True, progressive=True)
+            return output.getvalue(), '.jpg'
+
+        if image.mode in ('1', 'L', 'LA', 'I', 'I;16'):
+            image = image.convert('L')
+        else:
+            # Line art: a 256-color palette keeps edges sharp, including the
+            # anti-aliasing that resampling adds, at a fraction of the size
+            image = image.convert('RGB').quantize(colors=256, method=Image.Quantize.MEDIANCUT,
+                                                  dither=Image.Dither.NONE)
+        image.save(output, format='PNG', optimize=True)
+        return output.getvalue(), '.png'
+
+    def optimize(self, image_path: str, display_width_inches: float) -> str:
+        """
+        Return the path of an optimized copy of image_path for display at the
+        given width, or image_path itself when optimization is disabled, fails
+        or would not make the file smaller.
+        """
+        if not self.enabled or not os.path.exists(image_path):
+            return image_path
+        try:
+            original_size = os.path.getsize(image_path)
+            target_width = self.target_width_pixels(display_width_inches)
+            key = self._cache_key(image_path, target_width)
+
+            cached_path = self._cached_path(key)
+            if cached_path:
+                os.utime(cached_path)
+                self._count('cache_hits')
+                self._count('bytes_in', original_size)
+                if cached_path.endswith(_KEEP_ORIGINAL_EXTENSION):
+                    self._count('bytes_out', original_size)
+                    return image_path
+                self._count('bytes_out', os.path.getsize(cached_path))
+                return cached_path
+
+            data, extension = self._encode(image_path, target_width)
+            # Re-encoding for a marginal gain is not worth the generation loss
+            if len(data) >= original_size * self.settings['min_size_reduction']:
+                self._write_cache_entry(key, _KEEP_ORIGINAL_EXTENSION, b'')
+                self._count('kept_original')
+                self._count('bytes_in', original_size)
+                self._count('bytes_out', original_size)
+                return image_path
+
+            optimized_path = self._write_cache_entry(key, extension, data)
+
+            self._count('optimized')
+            self._count('bytes_in', original_size)
+            self._count('bytes_out', len(data))
+            logger.debug(f"Optimized {os.path.basename(image_path)}: {original_size} → {len(data)} bytes")
+            return optimized_path
+        except Exception as e:
+            self._count('failed')
+            logger.warning(f"Could not optimize {os.path.basename(image_path)}, embedding original: {e}")
+            return image_path
+
+    def _write_cache_entry(self, key: str, extension: str, data: bytes) -> str:
+        entry_dir = os.path.join(self.cache_dir, key[:2])
+        os.makedirs(entry_dir, exist_ok=True)
+        path = os.path.join(entry_dir, key + extension)
+        temp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(temp_path, 'wb') as f:
+            f.write(data)
+        os.replace(temp_path, path)
+        return path
+
+    def optimize_many(self, images: Iterable[Tuple[str, float]]) -> Dict[str, str]:
+        """
+        Optimize (image_path, display_width_inches) pairs in parallel.
+        Returns {image_path: path to embed}.
+        """
+        unique = {}
+        for image_path, width in images:
+            unique.setdefault(image_path, width)
+        if not self.enabled or not unique:
+            return {path: path for path in unique}
+
+        start_time = time.time()
+        bytes_in, bytes_out = self.stats['bytes_in'], self.stats['bytes_out']
+        workers = max(1, min(self.settings['max_workers'], len(unique)))
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            results = dict(zip(unique, executor.map(lambda item: self.optimize(*item), unique.items())))
+
+        saved_in = self.stats['bytes_in'] - bytes_in
+        saved_out = self.stats['bytes_out'] - bytes_out
+        logger.info(f"🖼️ Optimized {len(unique)} images in {time.time() - start_time:.1f}s: "
+                    f"{saved_in / (1024 * 1024):.1f} MB → {saved_out / (1024 * 1024):.1f} MB")
+        self.evict()
+        return results
+
+    # ------------------------------------------------------------------
+    # Cache maintenance
+    # ------------------------------------------------------------------
+
+    def _iter_cache_files(self):
+        if not os.path.isdir(self.cache_dir):
+            return
+        for root, _, names in os.walk(self.cache_dir):
+            for name in names:
+                if name.endswith('.tmp'):
+                    continue
+                path = os.path.join(root, name)
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue
+                yield path, stat.st_size, stat.st_mtime
+
+    def evict(self):
+        """Remove least-recently-used images until the cache fits its budget"""
+        entries = list(self._iter_cache_files())
+        total = sum(size for _, size, _ in entries)
+        if total <= self.max_cache_bytes:
+            return
+        for path, size, _ in sorted(entries, key=lambda entry: entry[2]):
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            total -= size
+            if total <= self.max_cache_bytes:
+                break
+
+    def get_statistics(self) -> Dict[str, Any]:
+        with self._lock:
+            stats = dict(self.stats)
+        stats['enabled'] = self.enabled
+        stats['reduction_ratio'] = 1 - stats['bytes_out'] / stats['bytes_in'] if stats['bytes_in'] else 0.0
+        return stats
+
+
+_image_optimizer = LazySingleton(ImageOptimizer, name='image_optimizer')
+
+
+def get_image_optimizer() -> ImageOptimizer:
+    """Process-wide image optimizer (created on first use)"""
+    return _image_optimizer.get_instance()
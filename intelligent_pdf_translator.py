@@ -24,11 +24,12 @@ import json
 from config_manager import config_manager
 from advanced_document_analyzer import AdvancedDocumentAnalyzer, PageProfile
 from translation_strategy_manager import TranslationStrategyManager, ProcessingTool
-from onnx_image_classifier import ONNXImageClassifier, filter_images_for_processing
+from onnx_image_classifier import get_image_classifier, filter_images_for_processing
 from semantic_text_chunker import SemanticTextChunker, chunk_content_semantically
 from async_translation_service import AsyncTranslationService
 from pdf_parser import PDFParser
 from utils import ProgressTracker
+from hot_path_logging import get_hot_path_logger, flush_hot_path_logs
 
 # Optional imports with graceful fallbacks
 try:
@@ -39,6 +40,7 @@ except ImportError:
     logging.warning("Tenacity not available - using basic retry logic")
 
 logger = logging.getLogger(__name__)
+hot_log = get_hot_path_logger(__name__)
 
 # Simple wrapper class to make dictionary results compatible with main workflow
 class IntelligentTranslationResult:
@@ -91,7 +93,7 @@ class IntelligentPDFTranslator:
         self.max_workers = max_workers
         self.document_analyzer = AdvancedDocumentAnalyzer()
         self.strategy_manager = TranslationStrategyManager()
-        self.image_classifier = ONNXImageClassifier()
+        self.image_classifier = get_image_classifier()
         self.semantic_chunker = SemanticTextChunker()
         self.async_translator = AsyncTranslationService()
         self.pdf_parser = PDFParser()
@@ -199,20 +201,12 @@ class IntelligentPDFTranslator:
             
             # Apply intelligent image filtering
             if all_images:
-                image_paths = [img['filepath'] for img in all_images]
-                filtered_images, filtering_summary = filter_images_for_processing(image_paths)
+                filtered_image_refs = filter_images_for_processing(all_images, self.image_classifier)
                 
                 logger.info(f"🖼️ Image filtering results:")
                 logger.info(f"   📊 Total images: {len(all_images)}")
-                logger.info(f"   ✅ To process: {len(filtered_images)}")
-                logger.info(f"   🚫 Skipped: {len(all_images) - len(filtered_images)}")
-                logger.info(f"   💰 Cost savings: ${filtering_summary.get('cost_savings', 0):.3f}")
-                
-                # Update image list to only include filtered images
-                filtered_image_refs = [
-                    img for img in all_images 
-                    if img['filepath'] in filtered_images
-                ]
+                logger.info(f"   ✅ To process: {len(filtered_image_refs)}")
+                logger.info(f"   🚫 Skipped: {len(all_images) - len(filtered_image_refs)}")
             else:
                 filtered_image_refs = []
             
@@ -255,7 +249,8 @@ class IntelligentPDFTranslator:
         """Phase 3: Process content with intelligent routing and parallel execution"""
         try:
             # Create page profile lookup
-            page_profile_map = {profile.page_num: profile for profile in page_profiles}
+            page_profile_map = {profile.page_number: profile for profile in page_profiles}
+            self.strategy_manager.register_page_profiles(page_profiles)
             
             # Group content by processing tool using intelligent routing
             routing_groups = self._route_content_intelligently(content_items, page_profile_map)
@@ -352,7 +347,7 @@ class IntelligentPDFTranslator:
             # USER REQUIREMENT: Skip translation for images/diagrams/schemes
             item_type = item.get('type', '')
             if item_type in ['image', 'diagram', 'scheme', 'figure', 'chart', 'graph']:
-                logger.info(f"🚫 Skipping translation for visual content: {item_type}")
+                hot_log.event('skip_visual_content', "🚫 Skipping translation for visual content: %s", item_type)
                 item['routing_decision'] = ProcessingTool.SKIP.value
                 item['skip_reason'] = 'visual_content_bypass'
                 routing_groups[ProcessingTool.SKIP.value].append(item)
@@ -368,6 +363,7 @@ class IntelligentPDFTranslator:
             # Add to appropriate group
             routing_groups[routing_decision.value].append(item)
 
+        flush_hot_path_logs("Intelligent routing")
         return routing_groups
 
     def _process_content_group(self, tool: str, items: List[Dict], target_language: str) -> Dict[str, Any]:
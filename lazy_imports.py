@@ -0,0 +1,253 @@
+"""
+Lazy Loading Utilities for Ultimate PDF Translator
+
+Keeps CLI and test startup cheap by deferring heavy subsystems until they
+are actually used:
+- lazy_import(): module proxy that performs the import on first attribute access
+- is_module_available(): dependency check that does not execute the module
+- LazySingleton: module-level singleton that is built on first use
+- Import-time profiling report: python lazy_imports.py [module ...]
+"""
+
+import os
+import re
+import sys
+import types
+import logging
+import importlib
+import importlib.util
+import subprocess
+import threading
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+def is_module_available(module_name: str) -> bool:
+    """
+    Check whether a module can be imported without importing it.
+    Only the import system's finders are consulted, so this is cheap even
+    for torch, ultralytics or sentence-transformers.
+    """
+    if module_name in sys.modules:
+        return sys.modules[module_name] is not None
+    try:
+        return importlib.util.find_spec(module_name) is not None
+    except (ImportError, ValueError):
+        # Raised when a parent package is missing or half-initialized
+        return False
+
+
+class _LazyModule(types.ModuleType):
+    """Module placeholder that imports the real module on first attribute access"""
+
+    def __init__(self, module_name: str):
+        super().__init__(module_name)
+        self.__dict__['_lazy_module_name'] = module_name
+        self.__dict__['_lazy_module'] = None
+
+    def _load(self) -> types.ModuleType:
+        module = self.__dict__['_lazy_module']
+        if module is None:
+            module = importlib.import_module(self.__dict__['_lazy_module_name'])
+            self.__dict__['_lazy_module'] = module
+        return module
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._load(), name)
+
+    def __dir__(self):
+        return dir(self._load())
+
+
+def lazy_import(module_name: str) -> types.ModuleType:
+    """
+    Return a proxy for module_name that is imported on first use.
+    ImportError is raised at first use, so callers keep their existing
+    try/except fallbacks around the code that actually needs the module.
+    """
+    module = sys.modules.get(module_name)
+    if module is not None:
+        return module
+    return _LazyModule(module_name)
+
+
+class LazySingleton:
+    """
+    Proxy for a module-level singleton that is constructed on first use.
+
+    `service = LazySingleton(Service)` keeps `from module import service`
+    working for every caller while moving the constructor cost (config
+    parsing, cache loading, model checks) out of import time.
+    """
+
+    def __init__(self, factory: Callable[[], Any], name: Optional[str] = None):
+        object.__setattr__(self, '_factory', factory)
+        object.__setattr__(self, '_name', name or getattr(factory, '__name__', 'singleton'))
+        object.__setattr__(self, '_instance', None)
+        # Tracked separately: a factory may return None (feature disabled) and is still called once
+        object.__setattr__(self, '_initialized', False)
+        object.__setattr__(self, '_lock', threading.Lock())
+
+    def get_instance(self) -> Any:
+        """Build the instance on first call and return it"""
+        if not object.__getattribute__(self, '_initialized'):
+            with object.__getattribute__(self, '_lock'):
+                if not object.__getattribute__(self, '_initialized'):
+                    instance = object.__getattribute__(self, '_factory')()
+                    object.__setattr__(self, '_instance', instance)
+                    object.__setattr__(self, '_initialized', True)
+                    logger.debug(f"Initialized lazy singleton {object.__getattribute__(self, '_name')}")
+        return object.__getattribute__(self, '_instance')
+
+    def is_initialized(self) -> bool:
+        return object.__getattribute__(self, '_initialized')
+
+    def set_instance(self, instance: Any):
+        """Use instance instead of building one (e.g. a test double)"""
+        with object.__getattribute__(self, '_lock'):
+            object.__setattr__(self, '_instance', instance)
+            object.__setattr__(self, '_initialized', True)
+
+    def reset(self):
+        """Forget the instance; the next use calls the factory again"""
+        with object.__getattribute__(self, '_lock'):
+            object.__setattr__(self, '_instance', None)
+            object.__setattr__(self, '_initialized', False)
+
+    @contextmanager
+    def replaced(self, instance: Any) -> Iterator[Any]:
+        """Use instance inside the block, then restore the previous state"""
+        saved = object.__getattribute__(self, '_instance'), object.__getattribute__(self, '_initialized')
+        self.set_instance(instance)
+        try:
+            yield instance
+        finally:
+            with object.__getattribute__(self, '_lock'):
+                object.__setattr__(self, '_instance', saved[0])
+                object.__setattr__(self, '_initialized', saved[1])
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self.get_instance(), name)
+
+    def __setattr__(self, name: str, value: Any):
+        setattr(self.get_instance(), name, value)
+
+    def __delattr__(self, name: str):
+        delattr(self.get_instance(), name)
+
+    def __repr__(self) -> str:
+        name = object.__getattribute__(self, '_name')
+        if not self.is_initialized():
+            return f"<LazySingleton {name} (not initialized)>"
+        return repr(object.__getattribute__(self, '_instance'))
+
+
+def lazy_object(module_name: str, attribute: str) -> LazySingleton:
+    """
+    Proxy for module_name.attribute that imports the module on first use.
+    Lets an orchestrator reference another module's singleton without paying
+    for that module's dependencies at import time.
+    """
+    def _resolve():
+        value = getattr(importlib.import_module(module_name), attribute)
+        if isinstance(value, LazySingleton):
+            value = value.get_instance()
+        return value
+    return LazySingleton(_resolve, name=f"{module_name}.{attribute}")
+
+
+# ---------------------------------------------------------------------------
+# Import-time profiling
+# ---------------------------------------------------------------------------
+
+_IMPORTTIME_PATTERN = re.compile(r'^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S.*)$')
+
+
+def parse_importtime_output(stderr_text: str) -> List[Dict[str, Any]]:
+    """Parse `python -X importtime` output into records (times in milliseconds)"""
+    records = []
+    for line in stderr_text.splitlines():
+        match = _IMPORTTIME_PATTERN.match(line)
+        if not match:
+            continue
+        self_us, cumulative_us, indent, module_name = match.groups()
+        records.append({
+            'module': module_name.strip(),
+            'self_ms': int(self_us) / 1000.0,
+            'cumulative_ms': int(cumulative_us) / 1000.0,
+            'depth': len(indent) // 2
+        })
+    return records
+
+
+def profile_module_import(module_name: str, python_executable: Optional[str] = None,
+                          cwd: Optional[str] = None, timeout: int = 300) -> Dict[str, Any]:
+    """
+    Import module_name in a fresh interpreter with -X importtime and
+    return the total import time plus per-module records.
+    """
+    cwd = cwd or os.path.dirname(os.path.abspath(__file__))
+    result = subprocess.run(
+        [python_executable or sys.executable, '-X', 'importtime', '-c', f'import {module_name}'],
+        cwd=cwd, capture_output=True, text=True, timeout=timeout
+    )
+    records = parse_importtime_output(result.stderr)
+    top_level = [r for r in records if r['module'] == module_name]
+    return {
+        'module': module_name,
+        'success': result.returncode == 0,
+        'error': result.stderr.strip().splitlines()[-1] if result.returncode != 0 and result.stderr.strip() else None,
+        'total_ms': top_level[-1]['cumulative_ms'] if top_level else 0.0,
+        'records': records
+    }
+
+
+def format_import_report(profile: Dict[str, Any], top_n: int = 15) -> str:
+    """Render the slowest imports of a profile as a plain-text report"""
+    lines = [f"📊 Import-time report for {profile['module']}: {profile['total_ms']:.1f} ms total"]
+    if not profile['success']:
+        lines.append(f"   ❌ Import failed: {profile['error']}")
+
+    slowest_self = sorted(profile['records'], key=lambda r: r['self_ms'], reverse=True)[:top_n]
+    lines.append("   Slowest modules (self time):")
+    for record in slowest_self:
+        lines.append(f"   {record['self_ms']:9.1f} ms  {record['module']}")
+
+    # Direct dependencies of the profiled module, by cumulative time. -X importtime
+    # prints children before their parent, so walk back from the module's own line.
+    direct = []
+    records = profile['records']
+    target_index = max((i for i, r in enumerate(records)
+                        if r['module'] == profile['module'] and r['depth'] == 0), default=None)
+    if target_index is not None:
+        for record in reversed(records[:target_index]):
+            if record['depth'] == 0:
+                break
+            if record['depth'] == 1:
+                direct.append(record)
+    slowest_direct = sorted(direct, key=lambda r: r['cumulative_ms'], reverse=True)[:top_n]
+    if slowest_direct:
+        lines.append("   Heaviest subsystems (cumulative):")
+        for record in slowest_direct:
+            lines.append(f"   {record['cumulative_ms']:9.1f} ms  {record['module']}")
+
+    return "\n".join(lines)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Print import-time reports for the given modules (default: the CLI entry points)"""
+    module_names = (argv if argv is not None else sys.argv[1:]) or ['main_workflow', 'translation_service']
+    exit_code = 0
+    for module_name in module_names:
+        profile = profile_module_import(module_name)
+        print(format_import_report(profile))
+        print()
+        if not profile['success']:
+            exit_code = 1
+    return exit_code
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -19,39 +19,43 @@ from collections import defaultdict
 
 logger = logging.getLogger(__name__)
 
-# Structured logging setup
-try:
-    import structlog
-    STRUCTURED_LOGGING_AVAILABLE = True
-
-    # Configure structured logging
-    structlog.configure(
-        processors=[
-            structlog.stdlib.filter_by_level,
-            structlog.stdlib.add_logger_name,
-            structlog.stdlib.add_log_level,
-            structlog.stdlib.PositionalArgumentsFormatter(),
-            structlog.processors.TimeStamper(fmt="iso"),
-            structlog.processors.StackInfoRenderer(),
-            structlog.processors.format_exc_info,
-            structlog.processors.UnicodeDecoder(),
-            structlog.processors.JSONRenderer()
-        ],
-        context_class=dict,
-        logger_factory=structlog.stdlib.LoggerFactory(),
-        wrapper_class=structlog.stdlib.BoundLogger,
-        cache_logger_on_first_use=True,
-    )
-
-    # Create structured logger
-    structured_logger = structlog.get_logger()
-    logger.info("✅ Structured logging enabled (JSON output)")
+from lazy_imports import is_module_available, lazy_object
 
-except ImportError:
-    STRUCTURED_LOGGING_AVAILABLE = False
-    structured_logger = None
+# Structured logging is configured on first use (see _get_structured_logger)
+STRUCTURED_LOGGING_AVAILABLE = is_module_available('structlog')
+structured_logger = None
+if not STRUCTURED_LOGGING_AVAILABLE:
     logger.warning("⚠️ Structured logging not available - install with: pip install structlog")
 
+
+def _get_structured_logger():
+    """Configure structlog on first use and return the shared structured logger"""
+    global structured_logger
+    if structured_logger is None and STRUCTURED_LOGGING_AVAILABLE:
+        import structlog
+
+        structlog.configure(
+            processors=[
+                structlog.stdlib.filter_by_level,
+                structlog.stdlib.add_logger_name,
+                structlog.stdlib.add_log_level,
+                structlog.stdlib.PositionalArgumentsFormatter(),
+                structlog.processors.TimeStamper(fmt="iso"),
+                structlog.processors.StackInfoRenderer(),
+                structlog.processors.format_exc_info,
+                structlog.processors.UnicodeDecoder(),
+                structlog.processors.JSONRenderer()
+            ],
+            context_class=dict,
+            logger_factory=structlog.stdlib.LoggerFactory(),
+            wrapper_class=structlog.stdlib.BoundLogger,
+            cache_logger_on_first_use=True,
+        )
+
+        structured_logger = structlog.get_logger()
+        logger.info("✅ Structured logging enabled (JSON output)")
+    return structured_logger
+
 class MetricsCollector:
     """Collects and logs structured metrics for monitoring"""
 
@@ -127,7 +131,7 @@ class MetricsCollector:
         })
 
         # Log structured metrics
-        if STRUCTURED_LOGGING_AVAILABLE and structured_logger:
+        if STRUCTURED_LOGGING_AVAILABLE and _get_structured_logger():
             structured_logger.info("document_processing_completed", **self.metrics)
         else:
             # Fallback to JSON logging
@@ -140,14 +144,18 @@ from config_manager import config_manager
 UNIFIED_CONFIG_AVAILABLE = False
 from pdf_parser import PDFParser, StructuredContentExtractor
 from ocr_processor import SmartImageAnalyzer
-from translation_service import translation_service
 from optimization_manager import optimization_manager
-from document_generator import document_generator, pdf_converter
-from drive_uploader import drive_uploader
+from hot_path_logging import flush_hot_path_logs
 from nougat_integration import NougatIntegration  # Enhanced Nougat integration
-from nougat_only_integration import NougatOnlyIntegration  # NOUGAT-ONLY mode
 from enhanced_document_intelligence import DocumentTextRestructurer  # Footnote handling
 
+# Service singletons are resolved on first use, so importing this module does not
+# load the Gemini SDK, python-docx or the Drive client
+translation_service = lazy_object('translation_service', 'translation_service')
+document_generator = lazy_object('document_generator', 'document_generator')
+pdf_converter = lazy_object('document_generator', 'pdf_converter')
+drive_uploader = lazy_object('drive_uploader', 'drive_uploader')
+
 # Import structured document model for new workflow
 try:
     from structured_document_model import Document as StructuredDocument
@@ -161,40 +169,12 @@ from utils import (
     ProgressTracker
 )
 
-# Import advanced features (with fallback if not available)
-try:
-    from advanced_translation_pipeline import AdvancedTranslationPipeline
-    from self_correcting_translator import SelfCorrectingTranslator
-    from hybrid_ocr_processor import HybridOCRProcessor
-    from semantic_cache import SemanticCache
-    ADVANCED_FEATURES_AVAILABLE = True
-    logger.info("✅ Advanced features available: Self-correction, Hybrid OCR, Semantic caching")
-except ImportError as e:
-    ADVANCED_FEATURES_AVAILABLE = False
-    logger.warning(f"⚠️ Advanced features not available: {e}")
-    logger.info("💡 Install advanced features with: pip install -r advanced_features_requirements.txt")
-
-# Import intelligent pipeline (with fallback if not available)
-try:
-    from intelligent_pdf_translator import IntelligentPDFTranslator
-    from advanced_document_analyzer import AdvancedDocumentAnalyzer
-    from translation_strategy_manager import TranslationStrategyManager
-    INTELLIGENT_PIPELINE_AVAILABLE = True
-    logger.info("🧠 Intelligent pipeline available: Content-aware routing, Strategic processing")
-except ImportError as e:
-    INTELLIGENT_PIPELINE_AVAILABLE = False
-    logger.warning(f"⚠️ Intelligent pipeline not available: {e}")
-    logger.info("💡 Intelligent pipeline requires additional dependencies")
-
-# Import YOLO integration pipeline (with fallback if not available)
-try:
-    from yolov8_integration_pipeline import YOLOv8IntegrationPipeline
-    YOLO_PIPELINE_AVAILABLE = True
-    logger.info("🎯 YOLOv8 pipeline available: Supreme visual detection accuracy")
-except ImportError as e:
-    YOLO_PIPELINE_AVAILABLE = False
-    logger.warning(f"⚠️ YOLOv8 pipeline not available: {e}")
-    logger.info("💡 YOLOv8 pipeline requires ultralytics and additional dependencies")
+# Optional pipelines are only imported when UltimatePDFTranslator enables them.
+# These flags only check that the entry modules exist; missing third-party
+# dependencies are reported when the pipeline is initialized.
+ADVANCED_FEATURES_AVAILABLE = is_module_available('advanced_translation_pipeline')
+INTELLIGENT_PIPELINE_AVAILABLE = is_module_available('intelligent_pdf_translator')
+YOLO_PIPELINE_AVAILABLE = is_module_available('yolov8_integration_pipeline')
 
 # Import distributed tracing for comprehensive pipeline monitoring
 try:
@@ -258,10 +238,11 @@ def _process_single_page(task):
 
         doc.close()
 
-        # Return page data
+        # Return page data; blocks travel as one compact buffer instead of pickled dataclasses
+        from document_serialization import serialize_blocks
         return {
             'page_num': page_num,
-            'content_blocks': page_content_blocks,
+            'content_blocks': serialize_blocks(page_content_blocks),
             'title': extractor._extract_document_title(doc) if page_num == 0 else None
         }
 
@@ -381,6 +362,7 @@ class UltimatePDFTranslator:
             if nougat_only_mode:
                 # Initialize NOUGAT-ONLY integration (no fallback)
                 logger.info("🚀 NOUGAT-ONLY MODE: Initializing comprehensive visual extraction...")
+                from nougat_only_integration import NougatOnlyIntegration
                 self.nougat_integration = NougatOnlyIntegration(config_manager)
 
                 if self.nougat_integration.nougat_available:
@@ -424,6 +406,7 @@ class UltimatePDFTranslator:
         if ADVANCED_FEATURES_AVAILABLE and self.use_advanced_features:
             try:
                 logger.info("🚀 Initializing advanced translation features...")
+                from advanced_translation_pipeline import AdvancedTranslationPipeline
                 self.advanced_pipeline = AdvancedTranslationPipeline(
                     base_translator=translation_service,
                     nougat_integration=self.nougat_integration,
@@ -434,6 +417,10 @@ class UltimatePDFTranslator:
                 logger.info("   🔧 Self-correcting translation enabled")
                 logger.info("   📖 Hybrid OCR strategy enabled")
                 logger.info("   🧠 Semantic caching enabled")
+            except ImportError as e:
+                logger.warning(f"⚠️ Advanced features not available: {e}")
+                logger.info("💡 Install advanced features with: pip install -r advanced_features_requirements.txt")
+                self.advanced_pipeline = None
             except Exception as e:
                 logger.error(f"❌ Failed to initialize advanced features: {e}")
                 logger.warning("⚠️ Falling back to standard translation workflow")
@@ -465,12 +452,17 @@ class UltimatePDFTranslator:
                         max_workers = config_manager.get_config_value('IntelligentPipeline', 'max_concurrent_tasks', 4, int)
                 except Exception:
                     max_workers = 4
+                from intelligent_pdf_translator import IntelligentPDFTranslator
                 self.intelligent_pipeline = IntelligentPDFTranslator(max_workers=max_workers)
                 logger.info("✅ Intelligent pipeline initialized successfully!")
                 logger.info("   🎯 Content-aware routing enabled")
                 logger.info("   📊 Strategic tool selection enabled")
                 logger.info("   ⚡ Parallel processing enabled")
                 logger.info("   🧠 Semantic caching enabled")
+            except ImportError as e:
+                logger.warning(f"⚠️ Intelligent pipeline not available: {e}")
+                logger.info("💡 Intelligent pipeline requires additional dependencies")
+                self.intelligent_pipeline = None
             except Exception as e:
                 logger.error(f"❌ Failed to initialize intelligent pipeline: {e}")
                 logger.warning("⚠️ Falling back to advanced or standard workflow")
@@ -497,6 +489,7 @@ class UltimatePDFTranslator:
 
                 if yolo_enabled:
                     logger.info("🎯 Initializing YOLOv8 integration pipeline...")
+                    from yolov8_integration_pipeline import YOLOv8IntegrationPipeline
                     self.yolo_pipeline = YOLOv8IntegrationPipeline(yolo_service_url=yolo_service_url)
                     self.use_yolo_pipeline = True
                     logger.info("✅ YOLOv8 pipeline initialized successfully!")
@@ -567,6 +560,95 @@ class UltimatePDFTranslator:
                 filepath, output_dir_for_this_file, target_language_override, precomputed_style_guide
             )
 
+    async def translate_document_multi_language(self, filepath, output_dir_for_this_file, target_languages,
+                                                max_concurrent_requests=None):
+        """
+        Translate one PDF into several languages from a single extraction.
+
+        The Document is extracted once, its translatable blocks are fanned out
+        to every language concurrently under one shared request limit, and one
+        DOCX (plus PDF, if enabled) is generated per language as soon as that
+        language finishes. Returns {language: {'docx': path, 'pdf': path or None}}.
+        """
+        if not target_languages:
+            raise ValueError("No target languages given")
+
+        logger.info(f"🌍 Starting multi-language translation of: {os.path.basename(filepath)} "
+                    f"→ {', '.join(target_languages)}")
+        start_time = time.time()
+
+        if not os.path.exists(filepath):
+            raise FileNotFoundError(f"Input file not found: {filepath}")
+        os.makedirs(output_dir_for_this_file, exist_ok=True)
+
+        # STEP 1: Extract once for all languages
+        image_folder = os.path.join(output_dir_for_this_file, "images")
+        os.makedirs(image_folder, exist_ok=True)
+        extracted_images = PDFParser().extract_images_from_pdf(filepath, image_folder)
+        structured_document = StructuredContentExtractor().extract_structured_content_from_pdf(filepath, extracted_images)
+        logger.info(f"📊 Extracted {len(structured_document.content_blocks)} blocks and "
+                    f"{len(extracted_images)} images once for {len(target_languages)} languages")
+        extraction_time = time.time() - start_time
+
+        if config_manager.pdf_processing_settings.get('extract_cover_page', False):
+            cover_page_data = pdf_converter.extract_cover_page_from_pdf(filepath, output_dir_for_this_file)
+        else:
+            cover_page_data = None
+
+        base_filename = os.path.splitext(os.path.basename(filepath))[0]
+        generate_pdf = config_manager.word_output_settings.get('generate_pdf', False)
+        outputs = {}
+        # Document generation is CPU-bound: run it off the event loop, one at a time
+        generation_lock = asyncio.Lock()
+
+        async def generate_outputs(language, translated_document):
+            language_slug = re.sub(r'[^\w-]+', '_', language).strip('_') or 'translation'
+            word_output_path = os.path.join(output_dir_for_this_file, f"{base_filename}_translated_{language_slug}.docx")
+            pdf_output_path = os.path.join(output_dir_for_this_file, f"{base_filename}_translated_{language_slug}.pdf")
+            loop = asyncio.get_event_loop()
+            async with generation_lock:
+                saved_word_filepath = await loop.run_in_executor(
+                    None, document_generator.create_word_document_from_structured_document,
+                    translated_document, word_output_path, image_folder, cover_page_data
+                )
+                if not saved_word_filepath:
+                    raise Exception(f"Failed to create Word document for {language}")
+            # PDF conversions of different languages run concurrently in the office pool
+            pdf_success = False
+            if generate_pdf:
+                pdf_success = await loop.run_in_executor(
+                    None, pdf_converter.convert_word_to_pdf, saved_word_filepath, pdf_output_path
+                )
+            outputs[language] = {'docx': saved_word_filepath, 'pdf': pdf_output_path if pdf_success else None}
+            logger.info(f"📄 {language}: {os.path.basename(saved_word_filepath)}")
+
+            if drive_uploader.is_available():
+                files_to_upload = [{'filepath': saved_word_filepath, 'filename': os.path.basename(saved_word_filepath)}]
+                if pdf_success:
+                    files_to_upload.append({'filepath': pdf_output_path, 'filename': os.path.basename(pdf_output_path)})
+                drive_uploader.upload_files(files_to_upload)
+
+        # STEP 2: Fan out to all languages under a shared request limit
+        translated_documents = await translation_service.translate_document_multi(
+            structured_document, target_languages, "",
+            max_concurrent_requests=max_concurrent_requests, on_translated=generate_outputs
+        )
+
+        translation_service.save_caches()
+
+        total_time = time.time() - start_time
+        logger.info(f"🌍 Multi-language translation finished in {total_time / 60:.1f} minutes "
+                    f"(extraction {extraction_time:.1f}s, shared by all languages)")
+        for language in target_languages:
+            status = '✅' if language in outputs else '❌'
+            logger.info(f"   {status} {language}: {outputs.get(language, {}).get('docx', 'failed')}")
+        if len(translated_documents) < len(target_languages):
+            failed = [language for language in target_languages if language not in outputs]
+            logger.warning(f"⚠️ Languages without output: {', '.join(failed)}")
+        if not outputs:
+            raise Exception(f"No output produced for any of {target_languages}")
+        return outputs
+
     async def _extract_pages_in_parallel(self, filepath, extracted_images):
         """Extract pages in parallel using ProcessPoolExecutor"""
         if not self.enable_parallel_processing:
@@ -631,9 +713,10 @@ class UltimatePDFTranslator:
             all_content_blocks = []
             document_title = None
 
+            from document_serialization import deserialize_blocks
             for page_num, page_content in sorted(successful_pages):
                 if page_content and 'content_blocks' in page_content:
-                    all_content_blocks.extend(page_content['content_blocks'])
+                    all_content_blocks.extend(deserialize_blocks(page_content['content_blocks']))
                     if not document_title and page_content.get('title'):
                         document_title = page_content['title']
 
@@ -783,8 +866,10 @@ class UltimatePDFTranslator:
                             'filename': f"{base_filename}_translated.pdf"
                         })
 
-                    drive_results = drive_uploader.upload_multiple_files(files_to_upload)
-                    add_metadata(files_uploaded=len(drive_results))
+                    drive_results = drive_uploader.upload_files(files_to_upload)
+                    # Background uploads are only queued here; count what has actually finished
+                    files_uploaded = drive_uploader.count_completed_uploads(drive_results)
+                    add_metadata(files_uploaded=files_uploaded, files_queued=len(drive_results) - files_uploaded)
 
             # Generate enhanced final report
             end_time = time.time()
@@ -1004,8 +1089,10 @@ class UltimatePDFTranslator:
                             'filename': f"{base_filename}_translated.pdf"
                         })
 
-                    drive_results = drive_uploader.upload_multiple_files(files_to_upload)
-                    add_metadata(files_uploaded=len(drive_results))
+                    drive_results = drive_uploader.upload_files(files_to_upload)
+                    # Background uploads are only queued here; count what has actually finished
+                    files_uploaded = drive_uploader.count_completed_uploads(drive_results)
+                    add_metadata(files_uploaded=files_uploaded, files_queued=len(drive_results) - files_uploaded)
 
             # Generate enhanced final report
             end_time = time.time()
@@ -1080,7 +1167,7 @@ class UltimatePDFTranslator:
                         'filename': f"{base_filename}_translated.pdf"
                     })
 
-                drive_results = drive_uploader.upload_multiple_files(files_to_upload)
+                drive_results = drive_uploader.upload_files(files_to_upload)
 
             # Step 9: Generate final report
             end_time = time.time()
@@ -1133,29 +1220,53 @@ class UltimatePDFTranslator:
             extracted_images = self.pdf_parser.extract_images_from_pdf(filepath, image_folder)
             cover_page_data = self.pdf_parser.extract_cover_page_from_pdf(filepath, output_dir_for_this_file)
             
-            # Step 2: Extract structured content
-            logger.info("📝 Step 2: Extracting structured content...")
-            document = self.content_extractor.extract_structured_content_from_pdf(
-                filepath, extracted_images
-            )
-            
-            if not document or not document.content_blocks:
-                raise Exception("No content could be extracted from the PDF")
-            
-            # Step 3: Analyze images
-            logger.info("🔍 Step 3: Analyzing images...")
-            if extracted_images:
-                image_paths = [img['filepath'] for img in extracted_images]
-                image_analysis = self.image_analyzer.batch_analyze_images(image_paths)
-                self._integrate_image_analysis_into_document(document, image_analysis)
-            
-            # Step 4: Translate the structured document
-            logger.info("🌐 Step 4: Translating structured document...")
             target_language = target_language_override or config_manager.translation_enhancement_settings['target_language']
-            
-            translated_document = await translation_service.translate_document(
-                document, target_language, precomputed_style_guide or ""
-            )
+            translate_while_extracting = config_manager.get_config_value(
+                'TranslationEnhancements', 'translate_while_extracting', True, bool)
+
+            if translate_while_extracting:
+                # Steps 2, 3 and 4 overlap: pages are translated as soon as they are extracted,
+                # and the images are analyzed alongside
+                logger.info("📝🔍🌐 Steps 2-4: Extracting, analyzing images and translating pages as they arrive...")
+                image_analysis_task = None
+                if extracted_images:
+                    image_paths = [img['filepath'] for img in extracted_images]
+                    image_analysis_task = asyncio.get_running_loop().run_in_executor(
+                        None, self.image_analyzer.batch_analyze_images, image_paths)
+
+                document, translated_document = await translation_service.translate_document_streaming(
+                    lambda on_page: self.content_extractor.extract_structured_content_from_pdf(
+                        filepath, extracted_images, on_page=on_page),
+                    target_language, precomputed_style_guide or ""
+                )
+                if not document or not document.content_blocks:
+                    raise Exception("No content could be extracted from the PDF")
+
+                # Image analysis only updates image placeholders, which the translated document shares
+                if image_analysis_task is not None:
+                    self._integrate_image_analysis_into_document(document, await image_analysis_task)
+            else:
+                # Step 2: Extract structured content
+                logger.info("📝 Step 2: Extracting structured content...")
+                document = self.content_extractor.extract_structured_content_from_pdf(
+                    filepath, extracted_images
+                )
+
+                if not document or not document.content_blocks:
+                    raise Exception("No content could be extracted from the PDF")
+
+                # Step 3: Analyze images
+                logger.info("🔍 Step 3: Analyzing images...")
+                if extracted_images:
+                    image_paths = [img['filepath'] for img in extracted_images]
+                    image_analysis = self.image_analyzer.batch_analyze_images(image_paths)
+                    self._integrate_image_analysis_into_document(document, image_analysis)
+
+                # Step 4: Translate the structured document
+                logger.info("🌐 Step 4: Translating structured document...")
+                translated_document = await translation_service.translate_document(
+                    document, target_language, precomputed_style_guide or ""
+                )
             
             # Step 5: Generate Word document
             logger.info("📄 Step 5: Generating Word document...")
@@ -1188,7 +1299,7 @@ class UltimatePDFTranslator:
                         'filename': f"{base_filename}_translated.pdf"
                     })
                 
-                drive_results = drive_uploader.upload_multiple_files(files_to_upload)
+                drive_results = drive_uploader.upload_files(files_to_upload)
             
             # Step 8: Generate final report
             end_time = time.time()
@@ -1419,63 +1530,80 @@ class UltimatePDFTranslator:
         return restructured_content
 
     async def _translate_batches(self, optimized_batches, target_language, style_guide):
-        """Translate optimized batches of content"""
-        translated_items = []
+        """
+        Translate optimized batches of content.
+
+        Groups are independent requests, so up to max_concurrent_api_calls of
+        them are in flight at once. Results are reassembled in the original
+        batch/group order, and each request's size, latency and outcome is
+        reported to the adaptive batch optimizer.
+        """
         total_batches = len(optimized_batches)
-        
+        max_in_flight = max(1, config_manager.gemini_settings['max_concurrent_calls'])
+        grouping_processor = optimization_manager.grouping_processor
+
+        # One result slot per group, filled in completion order, read in input order
+        group_results = [[None] * len(batch) for batch in optimized_batches]
+        groups_remaining = [len(batch) for batch in optimized_batches]
+        batch_failed = [False] * total_batches
+
         progress_tracker = ProgressTracker(total_batches)
-        
-        for batch_idx, batch in enumerate(optimized_batches):
-            logger.info(f"Translating batch {batch_idx + 1}/{total_batches}")
-            
-            batch_start_time = time.time()
-            
-            try:
-                # Translate each group in the batch
-                for group_idx, group in enumerate(batch):
-                    logger.debug(f"Processing group {group_idx + 1}/{len(batch)} with {len(group)} items")
+        semaphore = asyncio.Semaphore(max_in_flight)
+
+        total_groups = sum(groups_remaining)
+        logger.info(f"Translating {total_groups} groups in {total_batches} batches "
+                    f"({max_in_flight} requests in flight)")
 
-                    # Combine group items for translation
-                    combined_text = optimization_manager.grouping_processor.combine_group_for_translation(group)
-                    logger.debug(f"Combined text length: {len(combined_text)} characters")
+        async def translate_group(batch_idx, group_idx, group):
+            async with semaphore:
+                # Combine group items for translation; keep this group's placeholder map
+                combined_text, preserved_chars = grouping_processor.prepare_group_for_translation(group)
 
-                    # Translate the combined text
-                    logger.debug("Sending text to translation service...")
+                request_start_time = time.time()
+                try:
                     translated_text = await translation_service.translate_text(
                         combined_text, target_language, style_guide
                     )
-                    logger.debug(f"Received translated text length: {len(translated_text)} characters")
+                    success = True
+                except Exception as e:
+                    logger.error(f"Failed to translate group {group_idx + 1} of batch {batch_idx + 1}: {e}")
+                    success = False
+                latency = time.time() - request_start_time
 
-                    # Log the raw translation for debugging
-                    logger.debug(f"Raw translated text preview: {translated_text[:200]}...")
+                optimization_manager.record_batch_performance(
+                    len(combined_text), latency, 1.0 if success else 0.0
+                )
 
+                if success:
                     # Split the translated text back into individual items
-                    logger.debug("Splitting translated text back into individual items...")
-                    translated_group = optimization_manager.grouping_processor.split_translated_group(
-                        translated_text, group
+                    group_results[batch_idx][group_idx] = grouping_processor.split_translated_group(
+                        translated_text, group, preserved_chars
                     )
-                    logger.debug(f"Split resulted in {len(translated_group)} items")
+                else:
+                    # Keep original items as fallback
+                    group_results[batch_idx][group_idx] = list(group)
+                    batch_failed[batch_idx] = True
+
+                groups_remaining[batch_idx] -= 1
+                if groups_remaining[batch_idx] == 0:
+                    if batch_failed[batch_idx]:
+                        progress_tracker.update(failed=1)
+                    else:
+                        progress_tracker.update(completed=1)
+
+        await asyncio.gather(*[
+            translate_group(batch_idx, group_idx, group)
+            for batch_idx, batch in enumerate(optimized_batches)
+            for group_idx, group in enumerate(batch)
+        ])
 
-                    translated_items.extend(translated_group)
-                
-                # Record performance
-                batch_time = time.time() - batch_start_time
-                optimization_manager.record_batch_performance(
-                    len(str(batch)), batch_time, 1.0  # Success rate = 1.0 for successful batches
-                )
-                
-                progress_tracker.update(completed=1)
-                
-            except Exception as e:
-                logger.error(f"Failed to translate batch {batch_idx + 1}: {e}")
-                
-                # Add original items as fallback
-                for group in batch:
-                    translated_items.extend(group)
-                
-                progress_tracker.update(failed=1)
-        
         progress_tracker.finish()
+        flush_hot_path_logs("Group translation")
+
+        translated_items = []
+        for batch in group_results:
+            for translated_group in batch:
+                translated_items.extend(translated_group)
         return translated_items
     
     def _reconstruct_full_content(self, original_content, translated_text_items):
@@ -2085,6 +2213,11 @@ async def main():
     if len(files_to_process) == 1:
         estimate_translation_cost(files_to_process[0], config_manager)
     
+    # Several target languages share one extraction per file
+    target_languages = config_manager.translation_enhancement_settings['target_languages']
+    if len(target_languages) > 1:
+        logger.info(f"🌍 Multi-language mode: {', '.join(target_languages)}")
+
     # Initialize translator and failure tracker
     translator = UltimatePDFTranslator()
     failure_tracker = FailureTracker(
@@ -2111,7 +2244,10 @@ async def main():
             continue
 
         try:
-            await translator.translate_document_async(filepath, specific_output_dir)
+            if len(target_languages) > 1:
+                await translator.translate_document_multi_language(filepath, specific_output_dir, target_languages)
+            else:
+                await translator.translate_document_async(filepath, specific_output_dir)
             processed_count += 1
             logger.info(f"✅ Successfully processed: {os.path.basename(filepath)}")
 
@@ -2132,6 +2268,11 @@ async def main():
             logger.info("Pausing before next file...")
             time.sleep(3)
     
+    # Uploads ran in the background while later files were processed
+    if drive_uploader.is_initialized() and drive_uploader.has_pending_uploads():
+        logger.info("☁️ Waiting for background Google Drive uploads to finish...")
+        drive_uploader.wait_for_uploads()
+
     # Final processing summary
     logger.info("--- ALL PROCESSING COMPLETED ---")
     logger.info(f"📊 Processing Summary:")
@@ -8,8 +8,11 @@ the document with preserved formatting.
 
 import re
 import logging
-from typing import Dict, List, Any, Optional, Tuple
+from typing import Dict, List, Optional, Tuple
 from dataclasses import dataclass
+from config_manager import config_manager
+from lazy_imports import LazySingleton
+from token_accounting import count_tokens
 
 try:
     from markdown_it import MarkdownIt
@@ -41,7 +44,17 @@ class MarkdownAwareTranslator:
             'math': r'[+\-*/=<>≤≥±∞∑∏∫√]',
             'special': r'[@#$%^&*_~`|\\]'
         }
-        self.preserved_chars = set()
+        self.preserved_chars: Dict[str, str] = {}
+
+        # Node batching: pack many small text nodes into one delimited request
+        self.node_separator = "%%%%ITEM_BREAK%%%%"
+        self.batching_settings = config_manager.markdown_batching_settings
+        self.batching_stats = {
+            'nodes_seen': 0,
+            'unique_nodes': 0,
+            'requests_sent': 0,
+            'batch_splits': 0
+        }
         
         if MARKDOWN_IT_AVAILABLE:
             self.md_parser = MarkdownIt("commonmark", {"breaks": True, "html": True})
@@ -164,6 +177,11 @@ class MarkdownAwareTranslator:
         """
         Translate text nodes in parallel batches with proper ordering and error handling.
         """
+        if self.batching_settings['enabled'] and len(text_nodes) > 1:
+            return await self._translate_nodes_batched(
+                text_nodes, translation_func, target_language, context_before, context_after
+            )
+
         import asyncio
         try:
             from tqdm.asyncio import tqdm
@@ -193,7 +211,7 @@ class MarkdownAwareTranslator:
         logger.info(f"🚀 Starting parallel translation of {len(tasks)} nodes...")
 
         # Use semaphore to limit concurrent requests (avoid rate limiting)
-        semaphore = asyncio.Semaphore(5)  # Max 5 concurrent translations
+        semaphore = asyncio.Semaphore(max(1, self.batching_settings['max_concurrent_requests']))
 
         async def translate_with_semaphore(task):
             async with semaphore:
@@ -245,6 +263,131 @@ class MarkdownAwareTranslator:
         logger.info(f"✅ Parallel translation completed: {successful_translations} successful, {failed_translations} failed")
         return translated_nodes
 
+    async def _translate_nodes_batched(self, text_nodes: List[TextNode], translation_func,
+                                       target_language: str, context_before: str,
+                                       context_after: str) -> Dict[str, str]:
+        """
+        Translate text nodes as delimited multi-node requests.
+
+        Identical node texts are sent once, unique texts are packed into requests
+        within the token budget, and results are mapped back onto every node_path
+        that shares the text.
+        """
+        import asyncio
+
+        # Deduplicate while keeping first-occurrence order
+        paths_by_text: Dict[str, List[str]] = {}
+        for node in text_nodes:
+            paths_by_text.setdefault(node.content, []).append(node.node_path)
+        unique_texts = list(paths_by_text.keys())
+
+        batches = self._pack_node_batches(unique_texts)
+
+        self.batching_stats['nodes_seen'] += len(text_nodes)
+        self.batching_stats['unique_nodes'] += len(unique_texts)
+        logger.info(f"📦 Batched markdown translation: {len(text_nodes)} nodes → "
+                    f"{len(unique_texts)} unique → {len(batches)} requests")
+
+        semaphore = asyncio.Semaphore(max(1, self.batching_settings['max_concurrent_requests']))
+
+        async def run_batch(batch_indices: List[int]) -> Dict[int, str]:
+            first, last = batch_indices[0], batch_indices[-1]
+            batch_context_before = unique_texts[first - 1][-100:] if first > 0 else context_before
+            batch_context_after = unique_texts[last + 1][:100] if last + 1 < len(unique_texts) else context_after
+            return await self._translate_node_batch(
+                batch_indices, unique_texts, translation_func, target_language,
+                batch_context_before, batch_context_after, semaphore
+            )
+
+        results = await asyncio.gather(*[run_batch(batch) for batch in batches], return_exceptions=True)
+
+        translated_by_index: Dict[int, str] = {}
+        failed_batches = 0
+        for batch, result in zip(batches, results):
+            if isinstance(result, Exception):
+                logger.warning(f"Node batch of {len(batch)} failed: {type(result).__name__}: {result}")
+                failed_batches += 1
+                continue
+            translated_by_index.update(result)
+
+        translated_nodes = {}
+        for index, text in enumerate(unique_texts):
+            translated = translated_by_index.get(index, text)
+            for node_path in paths_by_text[text]:
+                translated_nodes[node_path] = translated
+
+        logger.info(f"✅ Batched translation completed: {len(translated_by_index)}/{len(unique_texts)} "
+                    f"unique nodes translated, {failed_batches} failed batches")
+        return translated_nodes
+
+    def _estimate_node_tokens(self, text: str) -> int:
+        """Token estimate for packing node batches"""
+        return max(1, count_tokens(text))
+
+    def _pack_node_batches(self, unique_texts: List[str]) -> List[List[int]]:
+        """Greedily pack node indices into requests within the token and node budgets"""
+        max_tokens = max(1, self.batching_settings['max_tokens_per_request'])
+        max_nodes = max(1, self.batching_settings['max_nodes_per_request'])
+        separator_tokens = self._estimate_node_tokens(self.node_separator)
+
+        batches: List[List[int]] = []
+        current: List[int] = []
+        current_tokens = 0
+
+        for index, text in enumerate(unique_texts):
+            text_tokens = self._estimate_node_tokens(text) + separator_tokens
+            if current and (current_tokens + text_tokens > max_tokens or len(current) >= max_nodes):
+                batches.append(current)
+                current, current_tokens = [], 0
+            current.append(index)
+            current_tokens += text_tokens
+
+        if current:
+            batches.append(current)
+        return batches
+
+    async def _translate_node_batch(self, batch_indices: List[int], unique_texts: List[str],
+                                    translation_func, target_language: str, context_before: str,
+                                    context_after: str, semaphore) -> Dict[int, str]:
+        """
+        Translate one delimited batch. If the separators do not survive translation,
+        the batch is halved and retried so a bad response never misaligns nodes.
+        """
+        if len(batch_indices) == 1:
+            index = batch_indices[0]
+            async with semaphore:
+                self.batching_stats['requests_sent'] += 1
+                translated = await self._translate_single_node(
+                    TextNode(content=unique_texts[index], node_path=str(index)),
+                    translation_func, target_language, context_before, context_after, index
+                )
+            return {index: translated.strip()}
+
+        combined_text = self.node_separator.join(unique_texts[i] for i in batch_indices)
+        async with semaphore:
+            self.batching_stats['requests_sent'] += 1
+            translated = await translation_func(
+                combined_text, target_language, "",
+                context_before, context_after, "text_only"
+            )
+
+        parts = translated.split(self.node_separator) if translated else []
+        if len(parts) == len(batch_indices):
+            return {index: part.strip() for index, part in zip(batch_indices, parts)}
+
+        logger.warning(f"Node batch returned {len(parts)} parts for {len(batch_indices)} nodes, splitting batch")
+        self.batching_stats['batch_splits'] += 1
+        middle = len(batch_indices) // 2
+        left = await self._translate_node_batch(
+            batch_indices[:middle], unique_texts, translation_func, target_language,
+            context_before, unique_texts[batch_indices[middle]][:100], semaphore
+        )
+        right = await self._translate_node_batch(
+            batch_indices[middle:], unique_texts, translation_func, target_language,
+            unique_texts[batch_indices[middle - 1]][-100:], context_after, semaphore
+        )
+        return {**left, **right}
+
     async def _translate_single_node(self, node, translation_func, target_language: str,
                                    context_before: str, context_after: str, node_index: int) -> str:
         """
@@ -855,5 +998,5 @@ REMINDER: Return ONLY the translated Markdown with identical structure. Do not a
             restored_text = restored_text.replace(placeholder, char)
         return restored_text
 
-# Global instance
-markdown_translator = MarkdownAwareTranslator()
+# Global instance (built on first use)
+markdown_translator = LazySingleton(MarkdownAwareTranslator)
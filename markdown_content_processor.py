@@ -8,6 +8,7 @@ that the document generator can process properly.
 import re
 import logging
 from typing import List, Dict, Any
+from lazy_imports import LazySingleton
 
 logger = logging.getLogger(__name__)
 
@@ -243,5 +244,5 @@ class MarkdownContentProcessor:
         
         return stats
 
-# Global instance
-markdown_processor = MarkdownContentProcessor()
+# Global instance (built on first use)
+markdown_processor = LazySingleton(MarkdownContentProcessor)
@@ -16,6 +16,9 @@ from typing import List, Dict, Optional, Tuple, Any
 from dataclasses import dataclass
 from enum import Enum
 import hashlib
+from lazy_imports import LazySingleton
+from spatial_index import SpatialIndex
+from classification_rules import get_classification_engine
 
 # Import structured document model
 from document_model import (
@@ -75,6 +78,54 @@ class VisualElement:
         if self.reconstruction_data is None:
             self.reconstruction_data = {}
 
+def cluster_drawing_rects(rects: List[Tuple[float, float, float, float]],
+                          merge_distance: float = 8.0) -> List[Tuple[Tuple[float, float, float, float], List[int]]]:
+    """
+    Group vector-drawing rectangles into figure regions.
+
+    Paths within merge_distance of each other are joined with a union-find
+    over a spatial index, then regions whose boxes still overlap are merged
+    until stable. Returns (region_bbox, member_indices) pairs ordered by
+    their first member.
+    """
+    regions = [(tuple(rect), [i]) for i, rect in enumerate(rects)]
+    distance = merge_distance
+
+    while True:
+        bboxes = [bbox for bbox, _ in regions]
+        index = SpatialIndex.from_items(range(len(bboxes)), lambda i: bboxes[i])
+        parent = list(range(len(bboxes)))
+
+        def find(i):
+            while parent[i] != i:
+                parent[i] = parent[parent[i]]
+                i = parent[i]
+            return i
+
+        for i, bbox in enumerate(bboxes):
+            for j in index.query_overlap(bbox, tolerance=distance):
+                root_i, root_j = find(i), find(j)
+                if root_i != root_j:
+                    parent[max(root_i, root_j)] = min(root_i, root_j)
+
+        groups: Dict[int, List[int]] = {}
+        for i in range(len(bboxes)):
+            groups.setdefault(find(i), []).append(i)
+        if len(groups) == len(regions):
+            return regions
+
+        merged = []
+        for members in groups.values():
+            member_bboxes = [bboxes[i] for i in members]
+            merged.append((
+                (min(b[0] for b in member_bboxes), min(b[1] for b in member_bboxes),
+                 max(b[2] for b in member_bboxes), max(b[3] for b in member_bboxes)),
+                sorted(member for i in members for member in regions[i][1])
+            ))
+        regions = merged
+        # Later passes only merge region boxes that actually overlap
+        distance = 0.0
+
 class NougatFirstProcessor:
     """
     Strategic processor implementing the nougat-first methodology for
@@ -82,10 +133,20 @@ class NougatFirstProcessor:
     """
     
     def __init__(self):
+        self._nougat_integration = None
         self.nougat_available = self._check_nougat_availability()
         self.processed_elements = {}
         self.placeholder_map = {}
         
+        # Vector drawings are clustered into figure regions before analysis
+        self.drawing_clustering_config = {
+            'merge_distance': 8.0,  # points between paths of the same figure
+            'min_region_size': 12.0,  # smaller regions are rules/underlines
+            'max_page_coverage': 0.9,  # larger paths are page backgrounds
+            'render_dpi': 150,
+            'nougat_batch_size': 16
+        }
+        
         # Cost tracking
         self.cost_stats = {
             'nougat_calls': 0,
@@ -104,8 +165,8 @@ class NougatFirstProcessor:
         try:
             # Try to import nougat components
             from nougat_integration import NougatIntegration
-            nougat_integration = NougatIntegration()
-            return nougat_integration.nougat_available
+            self._nougat_integration = NougatIntegration()
+            return self._nougat_integration.nougat_available
         except ImportError:
             logger.warning("⚠️ Nougat not available - falling back to alternative methods")
             return False
@@ -217,6 +278,9 @@ class NougatFirstProcessor:
             if page_num not in pages_dict:
                 pages_dict[page_num] = Page(page_number=page_num)
 
+        # Evaluate the classification rules for all blocks in one batch pass
+        get_classification_engine().classify_batch(block.text for block in text_blocks)
+
         # Process blocks and convert to structured content
         current_paragraph_blocks = []
 
@@ -391,40 +455,12 @@ class NougatFirstProcessor:
         return ""
 
     def _is_table_content(self, text: str) -> bool:
-        """Check if text appears to be table content"""
-        # Look for table indicators
-        table_indicators = [
-            '|',  # Markdown table separator
-            '\t',  # Tab-separated values
-            '  +',  # Multiple spaces (column alignment)
-        ]
-
-        # Check for multiple table indicators
-        indicator_count = sum(1 for indicator in table_indicators if indicator in text)
-
-        # Also check for structured data patterns
-        lines = text.split('\n')
-        if len(lines) > 1:
-            # Check if multiple lines have similar structure
-            structured_lines = [line for line in lines if any(ind in line for ind in table_indicators)]
-            return len(structured_lines) >= 2
-
-        return indicator_count >= 2
+        """Check if text appears to be table content (markdown pipes, tabs, aligned columns)"""
+        return get_classification_engine().features(text).table_like
 
     def _is_list_item(self, text: str) -> bool:
-        """Check if text is a list item"""
-        list_patterns = [
-            r'^\s*[•\-\*]\s+',  # Bullet points
-            r'^\s*\d+[\.\)]\s+',  # Numbered lists
-            r'^\s*[a-zA-Z][\.\)]\s+',  # Lettered lists
-            r'^\s*[ivxlcdm]+[\.\)]\s+',  # Roman numerals
-        ]
-
-        for pattern in list_patterns:
-            if re.match(pattern, text, re.IGNORECASE):
-                return True
-
-        return False
+        """Check if text is a list item (bullets, numbers, letters, roman numerals)"""
+        return get_classification_engine().features(text).list_item
 
     def _parse_list_item(self, text: str) -> Tuple[int, bool, Optional[int]]:
         """Parse list item to extract level, type, and number"""
@@ -602,27 +638,61 @@ class NougatFirstProcessor:
             except Exception as e:
                 logger.warning(f"Failed to extract image {img_index} from page {page_num}: {e}")
         
-        # Extract vector drawings (simplified)
-        drawings = page.get_drawings()
-        for draw_index, drawing in enumerate(drawings):
+        # Extract vector drawings, clustered into figure regions
+        visual_elements.extend(self._extract_drawing_regions_page(page, page_num, images_dir))
+        
+        return visual_elements
+    
+    def _extract_drawing_regions_page(self, page: fitz.Page, page_num: int, images_dir: str) -> List[VisualElement]:
+        """
+        Cluster the page's vector paths into figure regions and render each
+        region once, instead of creating one element per path.
+        """
+        config = self.drawing_clustering_config
+        page_rect = page.rect
+        page_area = max(page_rect.width * page_rect.height, 1.0)
+        
+        rects = []
+        for drawing in page.get_drawings():
+            rect = drawing.get("rect")
+            if rect is None:
+                continue
+            rect = fitz.Rect(rect)
+            if rect.width * rect.height > config['max_page_coverage'] * page_area:
+                continue  # page background or frame
+            rects.append((rect.x0, rect.y0, rect.x1, rect.y1))
+        
+        if not rects:
+            return []
+        
+        visual_elements = []
+        regions = cluster_drawing_rects(rects, config['merge_distance'])
+        for bbox, members in regions:
+            if (bbox[2] - bbox[0]) < config['min_region_size'] or (bbox[3] - bbox[1]) < config['min_region_size']:
+                continue
+            
+            element_id = f"page_{page_num}_figure_{len(visual_elements) + 1}"
+            img_path = os.path.join(images_dir, f"{element_id}.png")
             try:
-                element_id = f"page_{page_num}_drawing_{draw_index + 1}"
-                
-                # Get bounding box
-                bbox = drawing.get("rect", (0, 0, 100, 100))
-                
-                visual_element = VisualElement(
-                    element_id=element_id,
-                    element_type=VisualElementType.UNKNOWN,
-                    source_path="",  # Vector drawing, no file
-                    page_num=page_num,
-                    bbox=bbox
-                )
-                
-                visual_elements.append(visual_element)
-                
+                clip = (fitz.Rect(bbox) + (-2, -2, 2, 2)) & page_rect
+                pix = page.get_pixmap(clip=clip, dpi=config['render_dpi'])
+                pix.save(img_path)
+                pix = None
             except Exception as e:
-                logger.warning(f"Failed to extract drawing {draw_index} from page {page_num}: {e}")
+                logger.warning(f"Failed to render drawing region {element_id}: {e}")
+                img_path = ""
+            
+            visual_elements.append(VisualElement(
+                element_id=element_id,
+                element_type=VisualElementType.UNKNOWN,
+                source_path=img_path,
+                page_num=page_num,
+                bbox=bbox,
+                reconstruction_data={'drawing_count': len(members)}
+            ))
+        
+        if len(rects) > len(visual_elements):
+            logger.debug(f"Page {page_num}: clustered {len(rects)} drawings into {len(visual_elements)} regions")
         
         return visual_elements
     
@@ -696,12 +766,8 @@ class NougatFirstProcessor:
             return {'method_used': 'none', 'entries': [], 'confidence': 0.0}
         
         try:
-            # Use nougat integration to analyze ToC pages
-            from nougat_integration import NougatIntegration
-            nougat_integration = NougatIntegration()
-            
             # Analyze first few pages for ToC
-            nougat_result = nougat_integration.analyze_toc_pages(pdf_path, max_pages=5)
+            nougat_result = self._nougat_integration.analyze_toc_pages(pdf_path, max_pages=5)
             
             if nougat_result and nougat_result.get('toc_entries'):
                 return {
@@ -819,11 +885,11 @@ class NougatFirstProcessor:
 
         processed_elements = []
 
+        # 2.1 Initial Analysis with nougat, batched across all elements
+        visual_elements = self._analyze_elements_with_nougat(visual_elements)
+
         for element in visual_elements:
             try:
-                # 2.1 Initial Analysis with nougat
-                element = self._analyze_element_with_nougat(element)
-
                 # 2.2 Targeted Processing and Reconstruction
                 element = self._process_element_based_on_nougat_analysis(element, output_dir)
 
@@ -852,17 +918,29 @@ class NougatFirstProcessor:
         2.1 Initial Analysis with nougat
         Analyze visual element with nougat to get structured output for classification
         """
-        if not self.nougat_available or not element.source_path or not os.path.exists(element.source_path):
-            return element
+        return self._analyze_elements_with_nougat([element])[0]
 
-        try:
-            from nougat_integration import NougatIntegration
-            nougat_integration = NougatIntegration()
+    def _analyze_elements_with_nougat(self, elements: List[VisualElement]) -> List[VisualElement]:
+        """
+        Analyze rendered visual elements with nougat in batches through the
+        shared integration instance, then classify each from its output
+        """
+        pending = [e for e in elements if e.source_path and os.path.exists(e.source_path)]
+        if not self.nougat_available or not pending:
+            return elements
 
-            # Analyze with nougat
-            nougat_result = nougat_integration.analyze_visual_element(element.source_path)
-            self.cost_stats['nougat_calls'] += 1
+        batch_size = self.drawing_clustering_config['nougat_batch_size']
+        try:
+            nougat_results = self._nougat_integration.analyze_visual_elements(
+                [e.source_path for e in pending], batch_size=batch_size
+            )
+            self.cost_stats['nougat_calls'] += (len(pending) + batch_size - 1) // batch_size
+        except Exception as e:
+            logger.warning(f"Nougat analysis failed for {len(pending)} visual elements: {e}")
+            return elements
 
+        for element in pending:
+            nougat_result = nougat_results.get(element.source_path)
             if nougat_result:
                 element.nougat_output = nougat_result.get('text', '')
                 element.nougat_confidence = nougat_result.get('confidence', 0.0)
@@ -872,10 +950,7 @@ class NougatFirstProcessor:
 
                 logger.debug(f"Nougat analysis for {element.element_id}: {element.element_type.value}")
 
-        except Exception as e:
-            logger.warning(f"Nougat analysis failed for {element.element_id}: {e}")
-
-        return element
+        return elements
 
     def _classify_from_nougat_output(self, nougat_output: str) -> VisualElementType:
         """
@@ -1180,5 +1255,5 @@ class NougatFirstProcessor:
                 'note': 'AI reconstruction would generate diagram code here'
             }
 
-# Global nougat-first processor instance
-nougat_first_processor = NougatFirstProcessor()
+# Global nougat-first processor instance (built on first use)
+nougat_first_processor = LazySingleton(NougatFirstProcessor)
@@ -12,9 +12,13 @@ import subprocess
 import json
 import re
 import time
+import shutil
+import tempfile
 from typing import Dict, List, Optional, Tuple
 from pathlib import Path
 
+from stage_cache import get_stage_cache
+
 logger = logging.getLogger(__name__)
 
 def _process_nougat_batch_worker(task):
@@ -384,13 +388,15 @@ class NougatIntegration:
             logger.warning(f"❌ Nougat not available: {e}")
             return False
 
-    def _get_nougat_command(self, pdf_path: str, output_dir: str, extra_args: List[str] = None) -> str:
+    def _get_nougat_command(self, pdf_path, output_dir: str, extra_args: List[str] = None) -> str:
         """
         Get the nougat command string that activates conda environment first.
         Returns a shell command string instead of a list.
+        pdf_path may be a list of PDFs, which Nougat processes with one model load.
         """
         # Build the nougat command arguments
-        nougat_args = [pdf_path, '-o', output_dir]
+        pdf_paths = [pdf_path] if isinstance(pdf_path, str) else list(pdf_path)
+        nougat_args = pdf_paths + ['-o', output_dir]
         if extra_args:
             nougat_args.extend(extra_args)
 
@@ -461,13 +467,28 @@ class NougatIntegration:
                 max_pages = int(total_pages * 0.8)
                 logger.info(f"📚 Excluding bibliography: processing {max_pages}/{total_pages} pages (80%)")
 
+            # Nougat output depends only on the PDF and the pages parsed
+            stage_cache = get_stage_cache()
+            cache_config = {'max_pages': max_pages, 'batch_size': batch_size}
+            mmd_path = os.path.join(output_dir, f"{Path(pdf_path).stem}.mmd")
+            cached_result = stage_cache.get(pdf_path, 'nougat', cache_config)
+            if cached_result is not None:
+                if not os.path.exists(mmd_path) and cached_result.get('raw_content'):
+                    with open(mmd_path, 'w', encoding='utf-8') as f:
+                        f.write(cached_result['raw_content'])
+                return cached_result
+
             # Determine if batch processing is needed
             if max_pages > batch_size:
                 logger.info(f"📄 Large document detected: {max_pages} pages, using batch processing (batch_size={batch_size})")
-                return self._parse_pdf_in_batches(pdf_path, output_dir, batch_size, max_pages)
+                result = self._parse_pdf_in_batches(pdf_path, output_dir, batch_size, max_pages)
             else:
                 logger.info(f"📄 Small document: {max_pages} pages, using single-pass processing")
-                return self._parse_pdf_single_pass(pdf_path, output_dir, max_pages)
+                result = self._parse_pdf_single_pass(pdf_path, output_dir, max_pages)
+
+            if result:
+                stage_cache.put(pdf_path, 'nougat', result, cache_config)
+            return result
 
         except Exception as e:
             logger.error(f"Error analyzing document: {e}")
@@ -824,6 +845,90 @@ class NougatIntegration:
             logger.error(f"Error during Nougat parsing: {e}")
             return None
 
+    def analyze_visual_elements(self, image_paths: List[str], output_dir: str = None,
+                                batch_size: int = 16) -> Dict[str, Dict]:
+        """
+        Run Nougat over rendered visual regions, one model load per batch.
+
+        Each image is wrapped in a single-page PDF and a batch of PDFs is passed
+        to a single Nougat invocation, which writes one .mmd file per PDF.
+
+        Returns:
+            {image_path: {'text': str, 'confidence': float}} for every region
+            Nougat produced output for
+        """
+        if not self.nougat_available or not image_paths:
+            return {}
+
+        # A fresh directory per call: region files are named by position, so leftovers
+        # from an earlier call (or a concurrent one) must never be read back
+        base_dir = output_dir or self.temp_dir
+        os.makedirs(base_dir, exist_ok=True)
+        work_dir = tempfile.mkdtemp(prefix="visual_elements_", dir=base_dir)
+        try:
+            return self._analyze_visual_elements_in(work_dir, image_paths, batch_size)
+        finally:
+            shutil.rmtree(work_dir, ignore_errors=True)
+
+    def _analyze_visual_elements_in(self, work_dir: str, image_paths: List[str],
+                                    batch_size: int) -> Dict[str, Dict]:
+        results = {}
+        for batch_start in range(0, len(image_paths), batch_size):
+            batch = image_paths[batch_start:batch_start + batch_size]
+            pdf_by_image = {}
+            for offset, image_path in enumerate(batch):
+                pdf_path = os.path.join(work_dir, f"region_{batch_start + offset}.pdf")
+                if self._image_to_pdf(image_path, pdf_path):
+                    pdf_by_image[image_path] = pdf_path
+            if not pdf_by_image:
+                continue
+
+            timeout_seconds = max(120, len(pdf_by_image) * 8)
+            cmd = self._get_nougat_command(
+                list(pdf_by_image.values()), work_dir,
+                ['--markdown', '--no-skipping', '--batchsize', str(len(pdf_by_image))]
+            )
+            logger.info(f"🔍 Analyzing {len(pdf_by_image)} visual regions with one Nougat run...")
+            try:
+                result = subprocess.run(cmd, shell=True, capture_output=True, text=True, timeout=timeout_seconds)
+            except subprocess.TimeoutExpired:
+                logger.warning(f"⏰ Nougat visual analysis timed out after {timeout_seconds}s")
+                continue
+            if result.returncode != 0:
+                logger.warning(f"Nougat visual analysis failed: {result.stderr}")
+                continue
+
+            for image_path, pdf_path in pdf_by_image.items():
+                output_file = os.path.join(work_dir, f"{Path(pdf_path).stem}.mmd")
+                if not os.path.exists(output_file):
+                    continue
+                with open(output_file, 'r', encoding='utf-8') as f:
+                    text = f.read().strip()
+                missing = not text or text.startswith('[MISSING_PAGE')
+                results[image_path] = {'text': '' if missing else text, 'confidence': 0.0 if missing else 1.0}
+
+        return results
+
+    def analyze_visual_element(self, image_path: str, output_dir: str = None) -> Optional[Dict]:
+        """Analyze a single rendered visual region (see analyze_visual_elements)"""
+        return self.analyze_visual_elements([image_path], output_dir).get(image_path)
+
+    def _image_to_pdf(self, image_path: str, pdf_path: str) -> bool:
+        """Wrap an image in a single-page PDF sized to the image"""
+        try:
+            import fitz
+            with fitz.open(image_path) as image_doc:
+                rect = image_doc[0].rect
+            doc = fitz.open()
+            page = doc.new_page(width=rect.width, height=rect.height)
+            page.insert_image(page.rect, filename=image_path)
+            doc.save(pdf_path)
+            doc.close()
+            return True
+        except Exception as e:
+            logger.warning(f"Could not wrap {image_path} as PDF: {e}")
+            return False
+
     def _combine_batch_results(self, batch_results: List[Dict], pdf_path: str) -> Dict:
         """Combine results from multiple batches into a single structured document with proper ordering"""
         logger.info(f"🔗 Combining {len(batch_results)} batch results...")
@@ -5,11 +5,16 @@ Handles OCR functionality, image processing, and smart OCR filtering
 """
 
 import os
+import hashlib
 import logging
 from config_manager import config_manager
+from shared_cache import get_shared_namespace
+from lazy_imports import lazy_import, is_module_available
 
 logger = logging.getLogger(__name__)
 
+_OCR_CACHE_MISS = object()
+
 # Try to import OCR dependencies
 try:
     import pytesseract
@@ -28,14 +33,13 @@ except ImportError:
     OCR_AVAILABLE = False
     ADVANCED_OCR_AVAILABLE = False
 
-# Try to import OpenCV for advanced preprocessing
-try:
-    import cv2
-    OPENCV_AVAILABLE = True
-except ImportError:
+# OpenCV is only needed for advanced preprocessing, so import it on first use
+OPENCV_AVAILABLE = is_module_available('cv2')
+if OPENCV_AVAILABLE:
+    cv2 = lazy_import('cv2')
+else:
     logger.info("OpenCV not available. Using basic PIL preprocessing only.")
     cv2 = None
-    OPENCV_AVAILABLE = False
 
 class ImagePreprocessor:
     """Advanced image preprocessing for improved OCR accuracy"""
@@ -301,6 +305,7 @@ class OCRProcessor:
         self.settings = config_manager.pdf_processing_settings
         self.ocr_enabled = self.settings['perform_ocr'] and OCR_AVAILABLE
         self.preprocessor = ImagePreprocessor()
+        self.shared_cache = get_shared_namespace('ocr_results') if self.ocr_enabled else None
         
     def ocr_image_text(self, image_path, lang=None):
         """Extract text from image using OCR with advanced preprocessing"""
@@ -310,6 +315,32 @@ class OCRProcessor:
         if lang is None:
             lang = self.settings['ocr_language']
 
+        # Reuse OCR output for identical image bytes from any process in the run
+        cache_key = self._get_ocr_cache_key(image_path, lang)
+        if self.shared_cache is not None and cache_key:
+            cached = self.shared_cache.get(cache_key, _OCR_CACHE_MISS)
+            if cached is not _OCR_CACHE_MISS:
+                return cached
+
+        extracted_text = self._ocr_image_text_uncached(image_path, lang)
+        if self.shared_cache is not None and cache_key:
+            self.shared_cache.set(cache_key, extracted_text)
+        return extracted_text
+
+    def _get_ocr_cache_key(self, image_path, lang):
+        """Cache key from image content, OCR language and engine configuration"""
+        try:
+            hasher = hashlib.sha256()
+            with open(image_path, 'rb') as f:
+                for chunk in iter(lambda: f.read(1024 * 1024), b''):
+                    hasher.update(chunk)
+            hasher.update(f"|{lang}|{self._get_ocr_config()}".encode('utf-8'))
+            return hasher.hexdigest()
+        except OSError:
+            return None
+
+    def _ocr_image_text_uncached(self, image_path, lang):
+        """Run preprocessing and Tesseract on one image"""
         # Apply preprocessing for better OCR accuracy
         preprocessed_path = self.preprocessor.preprocess_image(image_path)
 
@@ -0,0 +1,437 @@
+"""
+Headless Office Conversion Service for DOCX → PDF
+
+docx2pdf drives Microsoft Word and is unavailable on Linux servers, and
+starting LibreOffice for every file costs seconds of startup per document.
+OfficeConversionPool keeps a few warm headless soffice processes, each with
+its own user profile so they can run side by side, and feeds them queued
+conversions from worker threads. Each conversion has a timeout; a process
+that hangs is killed, one that crashes is restarted and the conversion
+retried, and processes are recycled after a number of conversions to bound
+their memory growth.
+
+With the Python UNO bridge available, each worker keeps one resident soffice
+and converts over UNO. Without it, each conversion runs soffice --convert-to
+against the worker's already-initialized profile, which skips the expensive
+first-start profile setup but still starts the process.
+"""
+
+import os
+import time
+import atexit
+import queue
+import shutil
+import logging
+import tempfile
+import threading
+import subprocess
+from pathlib import Path
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+from config_manager import config_manager
+from lazy_imports import LazySingleton
+
+logger = logging.getLogger(__name__)
+
+try:
+    import uno
+    from com.sun.star.beans import PropertyValue
+    from com.sun.star.connection import NoConnectException
+    UNO_AVAILABLE = True
+except ImportError:
+    UNO_AVAILABLE = False
+
+SOFFICE_BINARY_NAMES = ("soffice", "libreoffice")
+PDF_EXPORT_FILTER = "writer_pdf_Export"
+
+
+class OfficeConversionError(Exception):
+    """The document could not be converted"""
+
+
+class OfficeProcessCrashed(OfficeConversionError):
+    """The office process died during a conversion: restart it and retry"""
+
+
+class ConversionTimeout(OfficeConversionError):
+    """The conversion did not finish in time; the process was killed"""
+
+
+@dataclass
+class ConversionJob:
+    """A queued conversion; wait() blocks until it finishes"""
+    docx_path: str
+    pdf_path: str
+    status: str = 'queued'  # queued, converting, completed, failed
+    attempts: int = 0
+    seconds: float = 0.0
+    error: Optional[str] = None
+    _finished: threading.Event = field(default_factory=threading.Event, repr=False)
+
+    def done(self) -> bool:
+        return self.status in ('completed', 'failed')
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """True when the PDF was written"""
+        self._finished.wait(timeout)
+        return self.status == 'completed'
+
+
+def find_soffice_binary(configured_path: str = "") -> Optional[str]:
+    """Path of the soffice executable, or None when LibreOffice is not installed"""
+    if configured_path:
+        return configured_path if os.path.exists(configured_path) else shutil.which(configured_path)
+    for name in SOFFICE_BINARY_NAMES:
+        path = shutil.which(name)
+        if path:
+            return path
+    return None
+
+
+def _soffice_base_command(soffice_path: str, profile_dir: str) -> List[str]:
+    return [soffice_path, f"-env:UserInstallation={Path(profile_dir).resolve().as_uri()}",
+            "--headless", "--invisible", "--nologo", "--norestore", "--nodefault",
+            "--nolockcheck", "--nofirststartwizard"]
+
+
+def _kill_process(process: Optional[subprocess.Popen]):
+    if process is not None and process.poll() is None:
+        process.kill()
+        try:
+            process.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            pass
+
+
+class UnoOfficeProcess:
+    """One resident headless soffice, converting documents over the UNO bridge"""
+
+    def __init__(self, soffice_path: str, profile_dir: str, startup_timeout: float = 60.0):
+        self.soffice_path = soffice_path
+        self.profile_dir = profile_dir
+        self.startup_timeout = startup_timeout
+        self.process: Optional[subprocess.Popen] = None
+        self.desktop = None
+
+    @staticmethod
+    def _properties(**values):
+        properties = []
+        for name, value in values.items():
+            prop = PropertyValue()
+            prop.Name, prop.Value = name, value
+            properties.append(prop)
+        return tuple(properties)
+
+    def start(self):
+        pipe_name = f"pdt_office_{os.getpid()}_{id(self):x}"
+        command = _soffice_base_command(self.soffice_path, self.profile_dir)
+        command.append(f"--accept=pipe,name={pipe_name};urp;StarOffice.ComponentContext")
+        self.process = subprocess.Popen(command, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+        local_context = uno.getComponentContext()
+        resolver = local_context.ServiceManager.createInstanceWithContext(
+            "com.sun.star.bridge.UnoUrlResolver", local_context)
+        deadline = time.monotonic() + self.startup_timeout
+        while True:
+            if self.process.poll() is not None:
+                raise OfficeProcessCrashed(f"soffice exited during startup (code {self.process.returncode})")
+            try:
+                context = resolver.resolve(f"uno:pipe,name={pipe_name};urp;StarOffice.ComponentContext")
+                break
+            except NoConnectException:
+                if time.monotonic() > deadline:
+                    self.kill()
+                    raise ConversionTimeout(f"soffice did not start within {self.startup_timeout:.0f}s")
+                time.sleep(0.25)
+        self.desktop = context.ServiceManager.createInstanceWithContext("com.sun.star.frame.Desktop", context)
+
+    def alive(self) -> bool:
+        return self.process is not None and self.process.poll() is None
+
+    def convert(self, docx_path: str, pdf_path: str):
+        document = self.desktop.loadComponentFromURL(
+            uno.systemPathToFileUrl(os.path.abspath(docx_path)), "_blank", 0,
+            self._properties(Hidden=True, ReadOnly=True))
+        if document is None:
+            raise OfficeConversionError(f"soffice could not open {os.path.basename(docx_path)}")
+        try:
+            document.storeToURL(uno.systemPathToFileUrl(os.path.abspath(pdf_path)),
+                                self._properties(FilterName=PDF_EXPORT_FILTER))
+        finally:
+            document.close(True)
+
+    def kill(self):
+        _kill_process(self.process)
+
+    def stop(self):
+        if self.desktop is not None and self.alive():
+            try:
+                self.desktop.terminate()
+                self.process.wait(timeout=10)
+            except Exception:
+                pass
+        self.desktop = None
+        self.kill()
+
+
+class CliOfficeProcess:
+    """soffice --convert-to per document, against a profile initialized once up front"""
+
+    def __init__(self, soffice_path: str, profile_dir: str, startup_timeout: float = 60.0):
+        self.soffice_path = soffice_path
+        self.profile_dir = profile_dir
+        self.startup_timeout = startup_timeout
+        self.process: Optional[subprocess.Popen] = None
+        self.crashed = False
+
+    def _run(self, arguments: List[str], timeout: Optional[float] = None) -> int:
+        self.process = subprocess.Popen(_soffice_base_command(self.soffice_path, self.profile_dir) + arguments,
+                                        stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
+        try:
+            _, stderr = self.process.communicate(timeout=timeout)
+        except subprocess.TimeoutExpired:
+            self.kill()
+            raise ConversionTimeout("soffice did not finish in time")
+        if self.process.returncode != 0 and stderr:
+            logger.debug(f"soffice: {stderr.decode(errors='replace').strip()}")
+        # A negative return code means soffice was terminated by a signal
+        self.crashed = self.process.returncode < 0
+        return self.process.returncode
+
+    def start(self):
+        # First start of a fresh profile is the slow part: do it before any work arrives
+        if self._run(["--terminate_after_init"], timeout=self.startup_timeout) != 0:
+            raise OfficeProcessCrashed("soffice failed to initialize its profile")
+
+    def alive(self) -> bool:
+        return not self.crashed
+
+    def convert(self, docx_path: str, pdf_path: str):
+        output_dir = tempfile.mkdtemp(prefix="convert_", dir=self.profile_dir)
+        try:
+            returncode = self._run(["--convert-to", "pdf", "--outdir", output_dir, os.path.abspath(docx_path)])
+            if self.crashed:
+                raise OfficeProcessCrashed(f"soffice was terminated by signal {-returncode}")
+            produced = os.path.join(output_dir, Path(docx_path).stem + ".pdf")
+            if not os.path.exists(produced):
+                raise OfficeConversionError(f"soffice exited with code {returncode} and wrote no PDF")
+            shutil.move(produced, pdf_path)
+        finally:
+            shutil.rmtree(output_dir, ignore_errors=True)
+
+    def kill(self):
+        _kill_process(self.process)
+
+    def stop(self):
+        self.kill()
+
+
+def default_process_factory(soffice_path: str) -> Callable[[int, str], Any]:
+    process_class = UnoOfficeProcess if UNO_AVAILABLE else CliOfficeProcess
+    return lambda worker_index, profile_dir: process_class(soffice_path, profile_dir)
+
+
+class OfficeConversionPool:
+    """
+    Worker threads each owning one office process. submit() returns at once;
+    at most `workers` documents are converted at the same time.
+    """
+
+    def __init__(self, process_factory: Callable[[int, str], Any], workers: int = 2,
+                 conversion_timeout: float = 180.0, max_retries: int = 1,
+                 max_conversions_per_process: int = 200):
+        self.process_factory = process_factory
+        self.workers = max(1, workers)
+        self.conversion_timeout = conversion_timeout
+        self.max_retries = max_retries
+        self.max_conversions_per_process = max_conversions_per_process
+
+        self._queue: "queue.Queue[Optional[ConversionJob]]" = queue.Queue()
+        self._lock = threading.Lock()
+        self._profile_root = tempfile.mkdtemp(prefix="office_profiles_")
+        self._processes: Dict[int, Any] = {}
+        self.stats = {'completed': 0, 'failed': 0, 'timeouts': 0, 'restarts': 0, 'conversion_seconds': 0.0}
+
+        self._threads = [threading.Thread(target=self._worker, args=(index,), name=f"office-convert-{index}",
+                                          daemon=True)
+                         for index in range(self.workers)]
+        for thread in self._threads:
+            thread.start()
+
+    def _count(self, counter: str, amount=1):
+        with self._lock:
+            self.stats[counter] += amount
+
+    def submit(self, docx_path: str, pdf_path: str) -> ConversionJob:
+        """Queue a conversion and return immediately"""
+        job = ConversionJob(docx_path=docx_path, pdf_path=pdf_path)
+        self._queue.put(job)
+        return job
+
+    def convert(self, docx_path: str, pdf_path: str) -> bool:
+        return self.submit(docx_path, pdf_path).wait()
+
+    def convert_many(self, pairs: Iterable[Tuple[str, str]]) -> Dict[str, bool]:
+        """Convert (docx_path, pdf_path) pairs concurrently; returns {pdf_path: success}"""
+        jobs = [self.submit(docx_path, pdf_path) for docx_path, pdf_path in pairs]
+        return {job.pdf_path: job.wait() for job in jobs}
+
+    def shutdown(self):
+        for _ in self._threads:
+            self._queue.put(None)
+        for thread in self._threads:
+            thread.join()
+        shutil.rmtree(self._profile_root, ignore_errors=True)
+
+    def get_statistics(self) -> Dict[str, Any]:
+        with self._lock:
+            return dict(self.stats, workers=self.workers)
+
+    # ------------------------------------------------------------------
+    # Workers
+    # ------------------------------------------------------------------
+
+    def _start_process(self, index: int):
+        profile_dir = os.path.join(self._profile_root, f"worker_{index}")
+        os.makedirs(profile_dir, exist_ok=True)
+        process = self.process_factory(index, profile_dir)
+        process.start()
+        return process
+
+    def _stop_process(self, process):
+        if process is None:
+            return
+        try:
+            process.stop()
+        except Exception as e:
+            logger.debug(f"Error stopping office process: {e}")
+
+    def _worker(self, index: int):
+        process = None
+        conversions = 0
+        try:
+            # Start warm, before the first job arrives
+            process = self._start_process(index)
+        except Exception as e:
+            logger.warning(f"⚠️ Office worker {index} could not start soffice: {e}")
+
+        while True:
+            job = self._queue.get()
+            if job is None:
+                break
+            if process is not None and conversions >= self.max_conversions_per_process:
+                self._stop_process(process)
+                process, conversions = None, 0
+
+            job.status = 'converting'
+            start_time = time.time()
+            while True:
+                job.attempts += 1
+                try:
+                    if process is None or not process.alive():
+                        self._stop_process(process)
+                        process = self._start_process(index)
+                        self._count('restarts')
+                        conversions = 0
+                    self._convert_with_timeout(process, job)
+                    conversions += 1
+                    job.status = 'completed'
+                    break
+                except OfficeProcessCrashed as e:
+                    self._stop_process(process)
+                    process = None
+                    if job.attempts > self.max_retries:
+                        job.error = str(e)
+                        break
+                    logger.warning(f"⚠️ soffice crashed converting {os.path.basename(job.docx_path)}, "
+                                   f"restarting (attempt {job.attempts}/{self.max_retries + 1})")
+                except Exception as e:
+                    # Timeouts and bad documents are not retried: they would fail the same way
+                    if isinstance(e, ConversionTimeout):
+                        self._count('timeouts')
+                        self._stop_process(process)
+                        process = None
+                    job.error = str(e)
+                    break
+
+            job.seconds = time.time() - start_time
+            if job.status != 'completed':
+                job.status = 'failed'
+                self._count('failed')
+                logger.error(f"PDF conversion failed for {os.path.basename(job.docx_path)}: {job.error}")
+            else:
+                self._count('completed')
+                self._count('conversion_seconds', job.seconds)
+                logger.info(f"📄 Converted {os.path.basename(job.docx_path)} to PDF in {job.seconds:.1f}s")
+            job._finished.set()
+
+        self._stop_process(process)
+
+    def _convert_with_timeout(self, process, job: ConversionJob):
+        """Run one conversion, killing the process if it takes longer than the timeout"""
+        if not os.path.exists(job.docx_path):
+            raise OfficeConversionError(f"File not found: {job.docx_path}")
+        output_dir = os.path.dirname(os.path.abspath(job.pdf_path))
+        os.makedirs(output_dir, exist_ok=True)
+        temp_path = f"{job.pdf_path}.{os.getpid()}.{threading.get_ident()}.tmp.pdf"
+
+        timed_out = threading.Event()
+
+        def on_timeout():
+            timed_out.set()
+            process.kill()
+
+        timer = threading.Timer(self.conversion_timeout, on_timeout)
+        timer.daemon = True
+        timer.start()
+        try:
+            process.convert(job.docx_path, temp_path)
+            if timed_out.is_set():
+                raise ConversionTimeout(f"conversion exceeded {self.conversion_timeout:.0f}s")
+            if not os.path.exists(temp_path) or not os.path.getsize(temp_path):
+                raise OfficeConversionError("soffice wrote no PDF")
+            os.replace(temp_path, job.pdf_path)
+        except Exception as e:
+            # A killed process fails in its own way (no PDF, signal exit): report the timeout
+            if timed_out.is_set():
+                raise ConversionTimeout(f"conversion exceeded {self.conversion_timeout:.0f}s")
+            if isinstance(e, OfficeConversionError):
+                raise
+            if process.alive():
+                raise OfficeConversionError(str(e))
+            raise OfficeProcessCrashed(str(e))
+        finally:
+            timer.cancel()
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+
+
+def _create_office_converter() -> Optional[OfficeConversionPool]:
+    settings = config_manager.office_conversion_settings
+    if not settings['enabled']:
+        return None
+    soffice_path = find_soffice_binary(settings['soffice_path'])
+    if not soffice_path:
+        logger.info("LibreOffice (soffice) not found - using fallback PDF conversion")
+        return None
+
+    pool = OfficeConversionPool(
+        default_process_factory(soffice_path), workers=settings['workers'],
+        conversion_timeout=settings['conversion_timeout'], max_retries=settings['max_retries'],
+        max_conversions_per_process=settings['max_conversions_per_process'])
+    atexit.register(pool.shutdown)
+    logger.info(f"🖨️ Office PDF conversion: {settings['workers']} warm soffice workers "
+                f"({'UNO' if UNO_AVAILABLE else 'command line'})")
+    return pool
+
+
+_office_pool = LazySingleton(_create_office_converter, name='office_converter')
+
+
+def get_office_converter() -> Optional[OfficeConversionPool]:
+    """
+    Process-wide conversion pool, or None when disabled or LibreOffice is not
+    installed. The soffice processes start on first use.
+    """
+    return _office_pool.get_instance()
@@ -2,15 +2,29 @@
 """
 ONNX Image Classifier
 Provides intelligent image classification for translation relevance using ONNX Runtime
+
+Classifications are cached by image content hash (in memory and in the shared
+on-disk cache), so the same image bytes are classified once across output
+folders and runs. classify_images() classifies a whole batch: cache lookups
+in one query, ONNX inference on stacked tensors, and the heuristic path on a
+thread pool when no model is loaded.
 """
 
 import os
 import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from typing import Dict, List, Optional, Tuple, Any
 from dataclasses import dataclass
 from enum import Enum
 import hashlib
 
+from config_manager import config_manager
+from lazy_imports import LazySingleton
+from shared_cache import get_shared_namespace
+from hot_path_logging import get_hot_path_logger
+from image_features import ImageFeatures, get_image_features
+
 # Optional imports for enhanced functionality
 try:
     import onnxruntime as ort
@@ -26,6 +40,10 @@ except ImportError:
     PIL_AVAILABLE = False
 
 logger = logging.getLogger(__name__)
+hot_log = get_hot_path_logger(__name__)
+
+# Part of every cache key; bump when the heuristic's decisions change
+HEURISTIC_CLASSIFIER_VERSION = "heuristic-v2"
 
 class RelevanceLevel(Enum):
     """Image relevance levels for translation"""
@@ -49,12 +67,25 @@ class ONNXImageClassifier:
     ONNX-based image classifier for determining translation relevance
     """
     
-    def __init__(self, model_path: Optional[str] = None):
+    def __init__(self, model_path: Optional[str] = None, batch_size: Optional[int] = None,
+                 max_workers: Optional[int] = None):
+        settings = config_manager.image_classification_settings
         self.model_path = model_path
+        self.batch_size = max(1, batch_size or settings['batch_size'])
+        self.max_workers = max(1, max_workers or settings['max_workers'])
+        self.class_labels = settings['class_labels']
         self.session = None
         self.input_name = None
         self.output_names = None
+        self.input_size = (224, 224)
+        self.channels_first = False
+        self.classifier_version = HEURISTIC_CLASSIFIER_VERSION
+        # Content key -> classification
         self.classification_cache = {}
+        # Path -> (mtime, size, content key), so unchanged files are hashed once
+        self._content_keys: Dict[str, Tuple[float, int, str]] = {}
+        self._lock = threading.Lock()
+        self.shared_cache = get_shared_namespace('image_classification')
         
         # Feature detection patterns
         self.feature_patterns = {
@@ -98,7 +129,10 @@ class ONNXImageClassifier:
                 self.session = ort.InferenceSession(self.model_path)
                 self.input_name = self.session.get_inputs()[0].name
                 self.output_names = [output.name for output in self.session.get_outputs()]
-                logger.info(f"✅ ONNX model loaded: {self.model_path}")
+                self._configure_model_input(self.session.get_inputs()[0].shape)
+                self.classifier_version = f"onnx-{self._file_digest(self.model_path)[:16]}"
+                logger.info(f"✅ ONNX model loaded: {self.model_path} "
+                            f"(input {self.input_size[0]}x{self.input_size[1]}, batch size {self.batch_size})")
             else:
                 # Use built-in heuristic classification
                 logger.info("🔧 Using heuristic image classification (no ONNX model)")
@@ -107,6 +141,17 @@ class ONNXImageClassifier:
             logger.warning(f"Failed to initialize ONNX session: {e}")
             self.session = None
     
+    def _configure_model_input(self, shape):
+        """Read input size, channel layout and a fixed batch dimension from the model's input shape"""
+        if len(shape) != 4:
+            return
+        self.channels_first = shape[1] == 3
+        height, width = (shape[2], shape[3]) if self.channels_first else (shape[1], shape[2])
+        if isinstance(height, int) and isinstance(width, int):
+            self.input_size = (width, height)
+        if isinstance(shape[0], int):
+            self.batch_size = min(self.batch_size, shape[0])
+
     def classify_image(self, image_path: str) -> ImageClassification:
         """
         Classify image for translation relevance
@@ -117,51 +162,154 @@ class ONNXImageClassifier:
         Returns:
             ImageClassification with relevance assessment
         """
-        # Check cache first
-        cache_key = self._get_cache_key(image_path)
-        if cache_key in self.classification_cache:
-            return self.classification_cache[cache_key]
-        
+        return self.classify_images([image_path])[image_path]
+
+    def classify_images(self, image_paths: List[str]) -> Dict[str, ImageClassification]:
+        """
+        Classify a batch of images. Each distinct image content is classified
+        at most once: cached results (memory, then one shared-cache query) are
+        reused and only the misses go to the model or the heuristic.
+
+        Returns:
+            {image_path: ImageClassification}
+        """
+        image_paths = list(dict.fromkeys(image_paths))
+        if not image_paths:
+            return {}
+
+        if len(image_paths) > 1 and self.max_workers > 1:
+            with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+                keys = dict(zip(image_paths, executor.map(self._get_cache_key, image_paths)))
+        else:
+            keys = {image_path: self._get_cache_key(image_path) for image_path in image_paths}
+
+        classifications: Dict[str, ImageClassification] = {}
+        with self._lock:
+            for key in set(keys.values()):
+                if key in self.classification_cache:
+                    classifications[key] = self.classification_cache[key]
+
+        missing = [key for key in dict.fromkeys(keys.values()) if key not in classifications]
+        if missing and self.shared_cache is not None:
+            shared = self.shared_cache.get_many(missing)
+            classifications.update(shared)
+            with self._lock:
+                self.classification_cache.update(shared)
+            missing = [key for key in missing if key not in shared]
+
+        if missing:
+            # One representative path per distinct content
+            paths_by_key = {}
+            for image_path, key in keys.items():
+                paths_by_key.setdefault(key, image_path)
+            to_classify = [paths_by_key[key] for key in missing]
+
+            results = self._classify_uncached(to_classify)
+            computed = {}
+            for key, image_path, classification in zip(missing, to_classify, results):
+                classifications[key] = classification
+                if classification.detected_features != ['classification_failed']:
+                    computed[key] = classification
+                hot_log.event('image_classified', "Image classified: %s -> %s", os.path.basename(image_path),
+                              classification.relevance.value, level=logging.DEBUG)
+
+            with self._lock:
+                self.classification_cache.update(computed)
+            if self.shared_cache is not None:
+                self.shared_cache.set_many(computed)
+
+        return {image_path: classifications[key] for image_path, key in keys.items()}
+
+    def _classify_uncached(self, image_paths: List[str]) -> List[ImageClassification]:
+        """Classify images that no cache knows, with the model when one is loaded"""
         try:
-            if self.session and ONNX_AVAILABLE and PIL_AVAILABLE:
-                classification = self._classify_with_onnx(image_path)
-            else:
-                classification = self._classify_heuristic(image_path)
-            
-            # Cache the result
-            self.classification_cache[cache_key] = classification
-            
-            logger.debug(f"Image classified: {os.path.basename(image_path)} -> {classification.relevance.value}")
-            return classification
-            
+            if self.session is not None and PIL_AVAILABLE:
+                return self._classify_batch_with_onnx(image_paths)
+        except Exception as e:
+            logger.warning(f"Batched ONNX classification failed: {e}, falling back to heuristic")
+        return self._classify_heuristic_parallel(image_paths)
+
+    def _classify_heuristic_parallel(self, image_paths: List[str]) -> List[ImageClassification]:
+        """Run the heuristic on a thread pool (image decoding and numpy release the GIL)"""
+        if len(image_paths) == 1 or self.max_workers == 1:
+            return [self._classify_safely(image_path) for image_path in image_paths]
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            return list(executor.map(self._classify_safely, image_paths))
+
+    def _classify_safely(self, image_path: str) -> ImageClassification:
+        try:
+            return self._classify_heuristic(image_path)
         except Exception as e:
             logger.error(f"Image classification failed for {image_path}: {e}")
-            return ImageClassification(
-                relevance=RelevanceLevel.MEDIUM,
-                confidence=0.5,
-                reasoning=f"Classification failed: {e}",
-                detected_features=[],
-                text_likelihood=0.5,
-                processing_recommendation="standard"
-            )
-    
+            return self._failed_classification(e)
+
+    def _failed_classification(self, error: Exception) -> ImageClassification:
+        return ImageClassification(
+            relevance=RelevanceLevel.MEDIUM,
+            confidence=0.5,
+            reasoning=f"Classification failed: {error}",
+            detected_features=['classification_failed'],
+            text_likelihood=0.5,
+            processing_recommendation="standard"
+        )
+
     def _classify_with_onnx(self, image_path: str) -> ImageClassification:
         """Classify image using ONNX model"""
+        return self._classify_batch_with_onnx([image_path])[0]
+
+    def _load_model_input(self, image_path: str) -> Optional[np.ndarray]:
         try:
-            # Load and preprocess image
-            image = Image.open(image_path).convert('RGB')
-            input_tensor = self._preprocess_image(image)
-            
-            # Run inference
-            outputs = self.session.run(self.output_names, {self.input_name: input_tensor})
-            
-            # Process outputs (this would depend on your specific model)
-            # For now, using heuristic as fallback
-            return self._classify_heuristic(image_path)
-            
+            with Image.open(image_path) as image:
+                return self._preprocess_image(image.convert('RGB'))
         except Exception as e:
-            logger.warning(f"ONNX classification failed: {e}, falling back to heuristic")
-            return self._classify_heuristic(image_path)
+            logger.warning(f"Could not preprocess {image_path} for ONNX: {e}")
+            return None
+
+    def _classify_batch_with_onnx(self, image_paths: List[str]) -> List[ImageClassification]:
+        """Preprocess images in parallel and run the model on stacked batches"""
+        if len(image_paths) > 1 and self.max_workers > 1:
+            with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+                tensors = list(executor.map(self._load_model_input, image_paths))
+        else:
+            tensors = [self._load_model_input(image_path) for image_path in image_paths]
+
+        results: List[Optional[ImageClassification]] = [None] * len(image_paths)
+        loaded = [index for index, tensor in enumerate(tensors) if tensor is not None]
+        for start in range(0, len(loaded), self.batch_size):
+            indices = loaded[start:start + self.batch_size]
+            batch = np.stack([tensors[index] for index in indices])
+            outputs = self.session.run(self.output_names, {self.input_name: batch})
+            for index, scores in zip(indices, np.asarray(outputs[0]).reshape(len(indices), -1)):
+                results[index] = self._interpret_model_output(scores)
+
+        # Images the model could not take are classified heuristically
+        fallback = [index for index, result in enumerate(results) if result is None]
+        for index, classification in zip(fallback, self._classify_heuristic_parallel(
+                [image_paths[index] for index in fallback])):
+            results[index] = classification
+        return results
+
+    def _interpret_model_output(self, scores: np.ndarray) -> ImageClassification:
+        """Map one row of model scores (logits or probabilities, one per class label) to a classification"""
+        scores = scores.astype(np.float64)
+        if len(scores) != len(self.class_labels):
+            raise ValueError(f"model returned {len(scores)} scores for {len(self.class_labels)} class labels")
+        if scores.min() < 0 or not np.isclose(scores.sum(), 1.0, atol=1e-3):
+            exp_scores = np.exp(scores - scores.max())
+            scores = exp_scores / exp_scores.sum()
+
+        probabilities = dict(zip(self.class_labels, scores))
+        label = self.class_labels[int(np.argmax(scores))]
+        relevance = RelevanceLevel(label)
+        features = ['onnx_model']
+        return ImageClassification(
+            relevance=relevance,
+            confidence=float(probabilities[label]),
+            reasoning=f"ONNX model: {label} ({probabilities[label]:.2f})",
+            detected_features=features,
+            text_likelihood=float(probabilities.get('high', 0.0) + 0.5 * probabilities.get('medium', 0.0)),
+            processing_recommendation=self._recommend_processing(relevance, features)
+        )
     
     def _classify_heuristic(self, image_path: str) -> ImageClassification:
         """Classify image using heuristic analysis"""
@@ -169,15 +317,13 @@ class ONNXImageClassifier:
             if not PIL_AVAILABLE:
                 return self._classify_by_filename(image_path)
             
-            # Load image for analysis
-            image = Image.open(image_path)
-            width, height = image.size
-            
-            # Basic image analysis
-            features = self._analyze_image_features(image)
+            # One decode to a thumbnail, shared with the preemptive image filter
+            image_features = get_image_features(image_path)
+            features = self._analyze_image_features(image_features)
             
             # Determine relevance based on features
-            relevance, confidence, reasoning = self._determine_relevance(features, width, height)
+            relevance, confidence, reasoning = self._determine_relevance(
+                features, image_features.width, image_features.height)
             
             # Calculate text likelihood
             text_likelihood = self._estimate_text_likelihood(features)
@@ -198,107 +344,31 @@ class ONNXImageClassifier:
             logger.warning(f"Heuristic classification failed: {e}")
             return self._classify_by_filename(image_path)
     
-    def _analyze_image_features(self, image: Image.Image) -> List[str]:
-        """Analyze image features for classification"""
+    def _analyze_image_features(self, image_features: ImageFeatures) -> List[str]:
+        """Turn extracted image statistics into feature labels"""
         features = []
         
-        try:
-            # Convert to numpy array for analysis
-            img_array = np.array(image)
-            
-            # Basic feature detection
-            if len(img_array.shape) == 3:
-                # Color image analysis
-                gray = np.mean(img_array, axis=2)
-            else:
-                gray = img_array
-            
-            # Detect high contrast regions (potential text)
-            contrast = np.std(gray)
-            if contrast > 50:
-                features.append('high_contrast_regions')
-            
-            # Detect horizontal/vertical structures
-            if self._has_linear_structures(gray):
-                features.append('structured_layout')
-            
-            # Detect regular patterns (potential text or diagrams)
-            if self._has_regular_patterns(gray):
-                features.append('regular_spacing')
-            
-            # Analyze aspect ratio
-            height, width = gray.shape
-            aspect_ratio = width / height
-            
-            if 0.5 < aspect_ratio < 2.0:
-                features.append('document_like_aspect')
-            
-            # Detect edges (potential diagrams/charts)
-            edge_density = self._calculate_edge_density(gray)
-            if edge_density > 0.1:
-                features.append('geometric_shapes')
-            
-        except Exception as e:
-            logger.warning(f"Feature analysis failed: {e}")
-            features.append('analysis_failed')
+        # High contrast regions (potential text)
+        if image_features.contrast > 50:
+            features.append('high_contrast_regions')
+        
+        # Strong horizontal/vertical lines
+        if image_features.strong_horizontal_edges > 0.01 or image_features.strong_vertical_edges > 0.01:
+            features.append('structured_layout')
+        
+        # Regular patterns (potential text or diagrams)
+        if image_features.regular_pattern:
+            features.append('regular_spacing')
+        
+        if 0.5 < image_features.aspect_ratio < 2.0:
+            features.append('document_like_aspect')
+        
+        # Edges (potential diagrams/charts)
+        if image_features.edge_density > 0.1:
+            features.append('geometric_shapes')
         
         return features
     
-    def _has_linear_structures(self, gray_image: np.ndarray) -> bool:
-        """Detect linear structures in image"""
-        try:
-            # Simple edge detection
-            edges_h = np.abs(np.diff(gray_image, axis=0))
-            edges_v = np.abs(np.diff(gray_image, axis=1))
-            
-            # Check for strong horizontal/vertical lines
-            strong_h_lines = np.sum(edges_h > 30) / edges_h.size
-            strong_v_lines = np.sum(edges_v > 30) / edges_v.size
-            
-            return strong_h_lines > 0.01 or strong_v_lines > 0.01
-        except:
-            return False
-    
-    def _has_regular_patterns(self, gray_image: np.ndarray) -> bool:
-        """Detect regular patterns that might indicate text or structured content"""
-        try:
-            # Simple pattern detection using variance in small windows
-            h, w = gray_image.shape
-            window_size = min(20, h // 10, w // 10)
-            
-            if window_size < 5:
-                return False
-            
-            variances = []
-            for i in range(0, h - window_size, window_size):
-                for j in range(0, w - window_size, window_size):
-                    window = gray_image[i:i+window_size, j:j+window_size]
-                    variances.append(np.var(window))
-            
-            # Regular patterns have consistent variance
-            if len(variances) > 4:
-                variance_std = np.std(variances)
-                return variance_std < np.mean(variances) * 0.5
-            
-            return False
-        except:
-            return False
-    
-    def _calculate_edge_density(self, gray_image: np.ndarray) -> float:
-        """Calculate edge density in image"""
-        try:
-            # Simple edge detection
-            edges_h = np.abs(np.diff(gray_image, axis=0))
-            edges_v = np.abs(np.diff(gray_image, axis=1))
-            
-            # Count strong edges
-            strong_edges = np.sum(edges_h > 20) + np.sum(edges_v > 20)
-            total_pixels = gray_image.size
-            
-            return strong_edges / total_pixels
-        except:
-            return 0.0
-    
     def _determine_relevance(self, features: List[str], width: int, height: int) -> Tuple[RelevanceLevel, float, str]:
         """Determine relevance level based on features"""
         
@@ -414,30 +484,42 @@ class ONNXImageClassifier:
         )
     
     def _preprocess_image(self, image: Image.Image) -> np.ndarray:
-        """Preprocess image for ONNX model input"""
-        # This would depend on your specific model requirements
-        # Common preprocessing: resize, normalize, etc.
-        
-        # Resize to model input size (example: 224x224)
-        image = image.resize((224, 224))
+        """Preprocess image for ONNX model input (one sample, without the batch dimension)"""
+        # Resize to the model's input size
+        image = image.resize(self.input_size)
         
         # Convert to numpy array and normalize
-        img_array = np.array(image).astype(np.float32) / 255.0
+        img_array = np.asarray(image, dtype=np.float32) / 255.0
         
-        # Add batch dimension and rearrange channels if needed
-        img_array = np.expand_dims(img_array, axis=0)
+        # HWC -> CHW for channels-first models
+        if self.channels_first:
+            img_array = np.ascontiguousarray(img_array.transpose(2, 0, 1))
         
         return img_array
     
+    @staticmethod
+    def _file_digest(path: str) -> str:
+        digest = hashlib.blake2b(digest_size=20)
+        with open(path, 'rb') as f:
+            for chunk in iter(lambda: f.read(1024 * 1024), b''):
+                digest.update(chunk)
+        return digest.hexdigest()
+
     def _get_cache_key(self, image_path: str) -> str:
-        """Generate cache key for image"""
+        """
+        Cache key from the image bytes and the classifier version, so copies
+        of an image in other folders or runs hit the same entry
+        """
         try:
-            # Use file path and modification time for cache key
             stat = os.stat(image_path)
-            content = f"{image_path}_{stat.st_mtime}_{stat.st_size}"
-            return hashlib.md5(content.encode()).hexdigest()
-        except:
-            return hashlib.md5(image_path.encode()).hexdigest()
+            known = self._content_keys.get(image_path)
+            if known and known[0] == stat.st_mtime and known[1] == stat.st_size:
+                return known[2]
+            key = f"{self.classifier_version}:{self._file_digest(image_path)}"
+            self._content_keys[image_path] = (stat.st_mtime, stat.st_size, key)
+            return key
+        except OSError:
+            return f"{self.classifier_version}:path:{hashlib.md5(image_path.encode()).hexdigest()}"
     
     def get_classification_stats(self) -> Dict[str, Any]:
         """Get classification statistics"""
@@ -462,23 +544,23 @@ def filter_images_for_processing(image_list: List[Dict], classifier: Optional[ON
     
     Args:
         image_list: List of image dictionaries with 'filepath' key
-        classifier: Optional classifier instance
+        classifier: Optional classifier instance (defaults to the shared classifier)
         
     Returns:
         Filtered list of images for processing
     """
     if not classifier:
-        classifier = ONNXImageClassifier()
+        classifier = get_image_classifier()
+    
+    existing_images = [image_item for image_item in image_list
+                       if image_item.get('filepath') and os.path.exists(image_item['filepath'])]
+    classifications = classifier.classify_images([image_item['filepath'] for image_item in existing_images])
     
     filtered_images = []
     
-    for image_item in image_list:
-        image_path = image_item.get('filepath', '')
-        
-        if not image_path or not os.path.exists(image_path):
-            continue
-        
-        classification = classifier.classify_image(image_path)
+    for image_item in existing_images:
+        image_path = image_item['filepath']
+        classification = classifications[image_path]
         
         # Add classification info to image item
         image_item['classification'] = classification
@@ -489,11 +571,27 @@ def filter_images_for_processing(image_list: List[Dict], classifier: Optional[ON
         if classification.relevance != RelevanceLevel.SKIP:
             filtered_images.append(image_item)
         else:
-            logger.info(f"Skipping image {os.path.basename(image_path)}: {classification.reasoning}")
+            hot_log.event('image_skipped', "Skipping image %s: %s", os.path.basename(image_path),
+                          classification.reasoning)
     
     logger.info(f"Image filtering: {len(image_list)} -> {len(filtered_images)} images")
+    hot_log.flush("Image filtering")
     return filtered_images
 
+def _create_image_classifier() -> ONNXImageClassifier:
+    settings = config_manager.image_classification_settings
+    return ONNXImageClassifier(settings['model_path'] if settings['enabled'] else None)
+
+_image_classifier = LazySingleton(_create_image_classifier, name='image_classifier')
+
+def get_image_classifier() -> ONNXImageClassifier:
+    """
+    Shared classifier for the process, so its model session and in-memory
+    cache are reused by every caller. Loads the configured ONNX model when
+    enable_onnx_image_classification is set.
+    """
+    return _image_classifier.get_instance()
+
 def create_image_classifier(model_path: Optional[str] = None) -> ONNXImageClassifier:
     """Create and return an image classifier instance"""
     return ONNXImageClassifier(model_path)
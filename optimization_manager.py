@@ -10,25 +10,22 @@ import re
 from collections import defaultdict
 from config_manager import config_manager
 from utils import prepare_text_for_translation
+from lazy_imports import LazySingleton
+from token_accounting import get_token_accountant
+from hot_path_logging import get_hot_path_logger, preview
 
 logger = logging.getLogger(__name__)
+hot_log = get_hot_path_logger(__name__)
 
 def estimate_token_count(text):
-    """Estimate token count for text (rough approximation: 1 token ≈ 4 characters)"""
-    return len(text) // 4
+    """Estimate token count for text with the calibrated token accountant"""
+    return get_token_accountant().count_tokens(text)
 
 def validate_batch_size_for_model(text, model_name):
     """Validate if text size is appropriate for the given model"""
     token_estimate = estimate_token_count(text)
 
-    # Token limits for different models (conservative estimates)
-    model_limits = {
-        'gemini-1.5-flash-latest': 1000000,  # 1M tokens
-        'gemini-1.5-pro-latest': 2000000,    # 2M tokens
-        'models/gemini-2.5-pro-preview-03-25': 2000000,  # 2M tokens
-    }
-
-    limit = model_limits.get(model_name, 100000)  # Default conservative limit
+    limit = get_token_accountant().get_context_limit(model_name)
 
     if token_estimate > limit * 0.8:  # Use 80% of limit for safety
         logger.warning(f"Text may be too large for model {model_name}: ~{token_estimate} tokens (limit: ~{limit})")
@@ -36,6 +33,46 @@ def validate_batch_size_for_model(text, model_name):
 
     return True
 
+# Spans a translation model is likely to rewrite: code, LaTeX math and commands,
+# runs of math symbols and URLs. Ordinary punctuation is left to the model.
+# Math alternatives are length-bounded so an unclosed delimiter cannot make
+# the scan quadratic.
+_PROTECTED_SPAN_PATTERN = re.compile(r"""
+    (?P<code>```.*?```|`[^`\n]+`)
+  | (?P<math>\$\$.{1,2000}?\$\$
+           |\$(?=\S)[^$\n]{1,300}?(?<=\S)\$(?!\d)
+           |\\\(.{1,2000}?\\\)
+           |\\\[.{1,2000}?\\\]
+           |\\[A-Za-z]+(?:\{[^{}\n]*\})*
+           |[∑∏∫√∞∂∇≈≠≤≥±×÷∈∉⊂⊆∀∃]+)
+  | (?P<url>https?://[^\s<>"')\]]+)
+""", re.VERBOSE | re.DOTALL)
+_PLACEHOLDER_TAGS = {'code': 'C', 'math': 'M', 'url': 'U'}
+_PLACEHOLDER_PATTERN = re.compile(r'__[CMU]\d+__')
+
+def protect_at_risk_spans(text, restore_map=None):
+    """
+    Replace code, math and URL spans with short placeholders in a single pass.
+
+    Placeholders are numbered from the size of restore_map, so one map can be
+    shared by every item of a group. Returns (protected_text, restore_map).
+    """
+    if restore_map is None:
+        restore_map = {}
+
+    def replace(match):
+        placeholder = f"__{_PLACEHOLDER_TAGS[match.lastgroup]}{len(restore_map)}__"
+        restore_map[placeholder] = match.group()
+        return placeholder
+
+    return _PROTECTED_SPAN_PATTERN.sub(replace, text), restore_map
+
+def restore_protected_spans(text, restore_map):
+    """Put protected spans back in a single pass; unknown placeholders are left as-is"""
+    if not restore_map:
+        return text
+    return _PLACEHOLDER_PATTERN.sub(lambda match: restore_map.get(match.group(), match.group()), text)
+
 class SmartGroupingProcessor:
     """Enhanced intelligent grouping of text segments to reduce API calls while preserving formatting"""
 
@@ -44,35 +81,14 @@ class SmartGroupingProcessor:
         self.max_group_size = self.settings['max_group_size_chars']
         self.max_items_per_group = self.settings['max_items_per_group']
         self.group_separator = "%%%%ITEM_BREAK%%%%"
-        self.special_chars = {
-            'punctuation': r'[.,;:!?()[\]{}""\'\'\-–—]',
-            'math': r'[+\-*/=<>≤≥±∞∑∏∫√]',
-            'special': r'[@#$%^&*_~`|\\]'
-        }
+        # Restore map of the most recently combined group
         self.preserved_chars = {}
         
-    def _preserve_special_chars(self, text: str) -> str:
-        """Preserve special characters by replacing them with unique placeholders"""
-        preserved_text = text
-        self.preserved_chars.clear()
-        
-        # Create unique placeholders for each special character
-        for char_type, pattern in self.special_chars.items():
-            matches = re.finditer(pattern, preserved_text)
-            for i, match in enumerate(matches):
-                char = match.group()
-                placeholder = f"__{char_type}_{i}__"
-                preserved_text = preserved_text.replace(char, placeholder)
-                self.preserved_chars[placeholder] = char
-                
-        return preserved_text
-        
-    def _restore_special_chars(self, text: str) -> str:
-        """Restore special characters from placeholders"""
-        restored_text = text
-        for placeholder, char in self.preserved_chars.items():
-            restored_text = restored_text.replace(placeholder, char)
-        return restored_text
+    def _restore_special_chars(self, text: str, preserved_chars=None) -> str:
+        """Restore protected spans from placeholders"""
+        if preserved_chars is None:
+            preserved_chars = self.preserved_chars
+        return restore_protected_spans(text, preserved_chars)
 
     def create_smart_groups(self, content_items):
         """Create intelligent groups from content items"""
@@ -84,10 +100,18 @@ class SmartGroupingProcessor:
         groups = []
         current_group = []
         current_size = 0
+        current_tokens = 0
+        
+        # Requests are also capped in model tokens, so that non-Latin text and
+        # its (longer) translation still fit the model's output limit
+        token_accountant = get_token_accountant()
+        max_group_tokens = token_accountant.get_request_token_budget()
+        separator_tokens = token_accountant.count_tokens(self.group_separator)
         
         for item in content_items:
             text = item.get('text', '')
             item_size = len(text)
+            item_tokens = token_accountant.count_tokens(text) + separator_tokens
             current_page = item.get('page_num', 1)
 
             # Special handling for TOC and early pages - be more aggressive about grouping
@@ -107,6 +131,7 @@ class SmartGroupingProcessor:
             should_start_new_group = (
                 len(current_group) >= effective_max_items or
                 current_size + item_size > effective_max_size or
+                current_tokens + item_tokens > max_group_tokens or
                 self._should_break_group(current_group, item)
             )
 
@@ -114,9 +139,11 @@ class SmartGroupingProcessor:
                 groups.append(current_group)
                 current_group = []
                 current_size = 0
+                current_tokens = 0
 
             current_group.append(item)
             current_size += item_size + len(self.group_separator)
+            current_tokens += item_tokens
         
         # Add the last group
         if current_group:
@@ -185,46 +212,55 @@ class SmartGroupingProcessor:
 
         return False
 
-    def combine_group_for_translation(self, group):
-        """Combine a group of items for translation with special character preservation"""
+    def prepare_group_for_translation(self, group):
+        """
+        Combine a group of items for translation, protecting code and math spans.
+        Returns (combined_text, restore_map); the map belongs to this call only,
+        so groups can be prepared and split independently.
+        """
         if not group:
-            return ""
+            return "", {}
             
-        # Preserve special characters in each item
-        preserved_items = []
+        restore_map = {}
+        protected_items = []
         for item in group:
             if isinstance(item, dict) and 'text' in item:
-                preserved_text = self._preserve_special_chars(item['text'])
-                preserved_items.append(preserved_text)
+                protected_text, _ = protect_at_risk_spans(item['text'], restore_map)
+                protected_items.append(protected_text)
             else:
-                preserved_items.append(str(item))
+                protected_items.append(str(item))
                 
         # Combine with separator
-        combined_text = self.group_separator.join(preserved_items)
+        combined_text = self.group_separator.join(protected_items)
         
-        logger.debug(f"Combined {len(group)} items for translation")
-        logger.debug(f"  - Separator: '{self.group_separator}'")
-        logger.debug(f"  - Separator count: {combined_text.count(self.group_separator)}")
-        logger.debug(f"  - Preview: {combined_text[:200]}...")
+        logger.debug(f"Combined {len(group)} items for translation ({len(restore_map)} protected spans)")
         
+        return combined_text, restore_map
+    
+    def combine_group_for_translation(self, group):
+        """Combine a group of items for translation with special character preservation"""
+        combined_text, self.preserved_chars = self.prepare_group_for_translation(group)
         return combined_text
     
-    def split_translated_group(self, translated_text, original_group):
-        """Split translated group text back into individual items with enhanced debugging and robust fallback"""
-        logger.debug(f"Splitting translated text for {len(original_group)} items")
-        logger.debug(f"Translated text length: {len(translated_text)} chars")
-        logger.debug(f"Translated text preview: {translated_text[:300]}...")
+    def split_translated_group(self, translated_text, original_group, preserved_chars=None):
+        """
+        Split translated group text back into individual items with enhanced debugging and robust fallback.
+        preserved_chars is the placeholder map captured when the group was combined;
+        pass it when several groups are in flight at once.
+        """
+        logger.debug("Splitting translated text for %d items (%d chars): %s",
+                     len(original_group), len(translated_text), preview(translated_text, 300))
 
         # Primary splitting attempt
         translated_parts = translated_text.split(self.group_separator)
         splitting_method = "primary_separator"
 
-        logger.debug(f"Primary split resulted in {len(translated_parts)} parts (expected: {len(original_group)})")
+        logger.debug("Primary split resulted in %d parts (expected: %d)", len(translated_parts), len(original_group))
 
         # Handle case where separator might be modified during translation
         if len(translated_parts) != len(original_group):
-            logger.warning(f"Primary separator split failed: got {len(translated_parts)} parts, expected {len(original_group)}")
-            logger.debug(f"Looking for separator '{self.group_separator}' in translated text...")
+            hot_log.event('primary_split_failed', "Primary separator split failed: got %d parts, expected %d",
+                          len(translated_parts), len(original_group), level=logging.WARNING)
 
             # Try alternative splitting strategies
             translated_parts = self._alternative_split(translated_text, original_group)
@@ -236,17 +272,17 @@ class SmartGroupingProcessor:
                 translated_parts = self._intelligent_paragraph_split(translated_text, original_group)
                 splitting_method = "intelligent_paragraph"
 
-        logger.info(f"Used splitting method: {splitting_method}")
+        hot_log.event(f"split.{splitting_method}", "Used splitting method: %s", splitting_method)
 
         results = []
         for i, item in enumerate(original_group):
             if i < len(translated_parts):
                 translated_item = item.copy()
                 # Restore special characters in the translated text
-                restored_text = self._restore_special_chars(translated_parts[i].strip())
+                restored_text = self._restore_special_chars(translated_parts[i].strip(), preserved_chars)
                 translated_item['text'] = restored_text
                 results.append(translated_item)
-                logger.debug(f"Item {i}: '{restored_text[:100]}...'")
+                logger.debug("Item %d: '%s'", i, preview(restored_text))
             else:
                 # Fallback: keep original text
                 logger.warning(f"Could not split translated text for item {i}, keeping original")
@@ -611,8 +647,10 @@ class SmartGroupingProcessor:
 class IntelligentBatcher:
     """Enhanced batching that dramatically reduces API calls"""
     
-    def __init__(self, max_batch_size=15000, target_batches=50):
+    def __init__(self, max_batch_size=15000, target_batches=50, max_batch_tokens=None):
         self.max_batch_size = max_batch_size
+        # Token cap per batch; by default the nominal 4 characters per token of max_batch_size
+        self.max_batch_tokens = max_batch_tokens or max_batch_size // 4
         self.target_batches = target_batches
         self.grouping_processor = SmartGroupingProcessor()
         
@@ -634,11 +672,12 @@ class IntelligentBatcher:
         batches = []
         current_batch = []
         current_size = 0
+        token_accountant = get_token_accountant()
         
         for group in groups:
-            group_size = sum(len(item.get('text', '')) for item in group)
+            group_size = sum(token_accountant.count_tokens(item.get('text', '')) for item in group)
             
-            if (current_size + group_size > self.max_batch_size and current_batch):
+            if (current_size + group_size > self.max_batch_tokens and current_batch):
                 batches.append(current_batch)
                 current_batch = []
                 current_size = 0
@@ -661,8 +700,12 @@ class AdaptiveBatchOptimizer:
         self.max_batch_size = 20000
     
     def record_performance(self, batch_size, processing_time, success_rate):
-        """Record performance metrics for adaptive optimization"""
-        efficiency_score = success_rate / max(processing_time, 0.1)  # Avoid division by zero
+        """
+        Record performance metrics for adaptive optimization.
+        batch_size is the request size in characters and processing_time the
+        request latency, so efficiency is the successfully translated throughput.
+        """
+        efficiency_score = batch_size * success_rate / max(processing_time, 0.1)  # Avoid division by zero
         
         self.performance_history.append({
             'batch_size': batch_size,
@@ -689,6 +732,11 @@ class AdaptiveBatchOptimizer:
         
         # Gradually adjust towards optimal size
         target_size = best_performance['batch_size']
+        
+        # Back off when requests start failing (timeouts, truncated responses)
+        if self.get_error_rate() > 0.2:
+            target_size = min(target_size, self.optimal_batch_size * 0.8)
+        
         adjustment = (target_size - self.optimal_batch_size) * 0.3  # 30% adjustment
         
         self.optimal_batch_size = max(
@@ -701,6 +749,12 @@ class AdaptiveBatchOptimizer:
     def get_optimal_batch_size(self):
         """Get current optimal batch size"""
         return int(self.optimal_batch_size)
+    
+    def get_error_rate(self):
+        """Share of failed requests in the recent history"""
+        if not self.performance_history:
+            return 0.0
+        return 1.0 - sum(p['success_rate'] for p in self.performance_history) / len(self.performance_history)
 
 class ContentTypeOptimizer:
     """Optimizes translation approach based on content type analysis"""
@@ -859,7 +913,11 @@ class UltimateOptimizationManager:
         optimal_batch_size = int(self.adaptive_batcher.get_optimal_batch_size() * batch_multiplier)
         logger.info(f"🎯 Optimal batch size: {optimal_batch_size} chars")
 
-        # Step 4: Create intelligent batches with strategy-aware grouping
+        # Step 4: Create intelligent batches with strategy-aware grouping,
+        # using the group size tuned from measured request throughput
+        self.intelligent_batcher.grouping_processor.max_group_size = min(
+            optimal_batch_size, self.adaptive_batcher.max_batch_size
+        )
         batches = self._create_strategy_aware_batches(optimized_items)
 
         # Generate comprehensive optimization report
@@ -949,5 +1007,5 @@ class UltimateOptimizationManager:
         """Get comprehensive performance analysis"""
         return self.profiler.get_performance_report()
 
-# Global optimization manager instance
-optimization_manager = UltimateOptimizationManager()
+# Global optimization manager instance (built on first use)
+optimization_manager = LazySingleton(UltimateOptimizationManager)
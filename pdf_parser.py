@@ -19,6 +19,9 @@ from structured_document_model import (
 )
 from typing import List, Dict, Any, Optional
 from difflib import SequenceMatcher
+from spatial_index import SpatialIndex, bbox_intersection_area, bbox_area, non_maximum_suppression
+from stage_cache import get_stage_cache
+from classification_rules import get_classification_engine
 
 logger = logging.getLogger(__name__)
 
@@ -46,11 +49,27 @@ class PDFParser:
         self.figure_pattern = re.compile(r'^(?:Figure|Fig\.?|Diagram|Schema)\s+\d+(?:\.\d+)?', re.IGNORECASE)
 
     def extract_images_from_pdf(self, pdf_filepath, output_image_folder):
-        """Extract images from PDF and save to folder"""
+        """Extract images from PDF and save to folder (reused from the stage cache when possible)"""
         if not self.settings['extract_images']:
             logger.info("Image extraction is disabled in config.ini.")
             return []
-        
+
+        stage_cache = get_stage_cache()
+        cached_refs = stage_cache.get(pdf_filepath, 'image_extraction', self.settings,
+                                      files_dir=output_image_folder)
+        if cached_refs is not None:
+            return cached_refs
+
+        image_refs = self._extract_images_from_pdf(pdf_filepath, output_image_folder)
+        # An empty result may be an extraction error, so only real results are kept
+        if image_refs:
+            stage_cache.put(pdf_filepath, 'image_extraction', image_refs, self.settings,
+                            files_dir=output_image_folder,
+                            attach_files=[ref['filepath'] for ref in image_refs if ref.get('filepath')])
+        return image_refs
+
+    def _extract_images_from_pdf(self, pdf_filepath, output_image_folder):
+        """Extract images from PDF and save to folder"""
         logger.info(f"--- Extracting Images from PDF: {os.path.basename(pdf_filepath)} ---")
         
         try:
@@ -925,11 +944,9 @@ class PDFParser:
         # For each type, keep only the best one(s)
         for extraction_type, type_images in by_type.items():
             if extraction_type == 'visual':
-                # For visual content, we might have overlapping extractions
-                # Keep the one with the best quality indicators
-                best_visual = self._select_best_visual_extraction(type_images)
-                if best_visual:
-                    best_images.append(best_visual)
+                # For visual content, we might have overlapping extractions:
+                # keep the best one of each overlapping group
+                best_images.extend(self._select_best_visual_extractions(type_images))
             else:
                 # For tables, equations, etc., keep all if they're different enough
                 # or the best one if they're too similar
@@ -951,6 +968,37 @@ class PDFParser:
         else:
             return 'unknown'
 
+    def _image_bbox(self, img):
+        """Bounding box of an extracted image reference, if it has one"""
+        if img.get('bbox'):
+            return img['bbox']
+        if all(key in img for key in ('x0', 'y0', 'x1', 'y1')):
+            return (img['x0'], img['y0'], img['x1'], img['y1'])
+        return None
+
+    def _images_overlap_significantly(self, bbox1, bbox2):
+        """Competing extractions overlap by more than 20% of the smaller area"""
+        min_area = min(bbox_area(bbox1), bbox_area(bbox2))
+        return min_area > 0 and bbox_intersection_area(bbox1, bbox2) > 0.2 * min_area
+
+    def _select_best_visual_extractions(self, visual_images):
+        """
+        Keep the highest-quality extraction of each group of overlapping visual
+        areas. Extractions without coordinates compete for a single slot.
+        """
+        with_bbox = [img for img in visual_images if self._image_bbox(img)]
+        without_bbox = [img for img in visual_images if not self._image_bbox(img)]
+
+        selected = non_maximum_suppression(
+            with_bbox, self._image_bbox, self._calculate_image_quality_score,
+            self._images_overlap_significantly
+        )
+        if without_bbox and not selected:
+            best_visual = self._select_best_visual_extraction(without_bbox)
+            if best_visual:
+                selected.append(best_visual)
+        return selected
+
     def _select_best_visual_extraction(self, visual_images):
         """Select the best visual extraction from competing candidates"""
         if len(visual_images) <= 1:
@@ -2224,10 +2272,29 @@ class StructuredContentExtractor:
         self.settings = config_manager.pdf_processing_settings
         self.parser = PDFParser()
         
-    def extract_structured_content_from_pdf(self, filepath, all_extracted_image_refs):
-        """Main function to extract structured content from PDF - returns Document object"""
+    def extract_structured_content_from_pdf(self, filepath, all_extracted_image_refs, on_page=None):
+        """
+        Main function to extract structured content from PDF - returns Document object.
+        on_page(page_num, page_blocks), when given, is called as each page's
+        blocks are final, so consumers can start before the whole document is done.
+        """
         logger.info(f"--- Structuring Content from PDF: {os.path.basename(filepath)} ---")
 
+        # Keyed by image names rather than paths, so another output directory can reuse it
+        image_refs = all_extracted_image_refs or []
+        images_dir = os.path.dirname(image_refs[0]['filepath']) if image_refs and image_refs[0].get('filepath') else None
+        cache_config = {
+            'settings': self.settings,
+            'images': [(os.path.basename(ref.get('filepath', '')), ref.get('page_num')) for ref in image_refs]
+        }
+        stage_cache = get_stage_cache()
+        cached_document = stage_cache.get(filepath, 'structured_document', cache_config, files_dir=images_dir)
+        if cached_document is not None:
+            cached_document.source_filepath = filepath
+            if on_page is not None:
+                self._publish_pages(cached_document.content_blocks, on_page)
+            return cached_document
+
         images_by_page = self.parser.groupby_images_by_page(all_extracted_image_refs)
 
         try:
@@ -2237,11 +2304,12 @@ class StructuredContentExtractor:
             structure_analysis = self.parser.detect_document_structure(doc)
 
             # Extract content with structure as Document object
-            document = self._extract_content_as_document(doc, images_by_page, structure_analysis, filepath)
+            document = self._extract_content_as_document(doc, images_by_page, structure_analysis, filepath, on_page)
 
             doc.close()
 
             logger.info(f"Extracted Document with {len(document.content_blocks)} content blocks across {document.total_pages} pages")
+            stage_cache.put(filepath, 'structured_document', document, cache_config, files_dir=images_dir)
             return document
 
         except Exception as e:
@@ -2305,127 +2373,30 @@ class StructuredContentExtractor:
         1. Body text characteristics (mode, mean, standard deviation)
         2. Heading hierarchy based on statistical clustering
         3. Font style patterns and their distribution
+
+        Spans are streamed page by page into fixed-size histograms (see
+        font_statistics), sharded across processes for long documents.
         """
         logger.info("🔍 Performing enhanced statistical font analysis...")
 
-        font_styles = {}  # font_key -> count
-        font_sizes = []
-        font_weights = defaultdict(int)  # Track font weights
-        font_families = defaultdict(int)  # Track font families
-
-        # First pass: collect all font information
-        for page_num in range(len(doc)):
-            page = doc[page_num]
-            blocks = page.get_text("dict")["blocks"]
-
-            for block in blocks:
-                if "lines" in block:
-                    for line in block["lines"]:
-                        for span in line["spans"]:
-                            font_size = span.get("size", 12.0)
-                            font_name = span.get("font", "Arial")
-                            font_flags = span.get("flags", 0)
-
-                            # Determine font style
-                            is_bold = bool(font_flags & 2**4)  # Bold flag
-                            is_italic = bool(font_flags & 2**1)  # Italic flag
-
-                            # Create font style key
-                            style_key = f"{font_name}, {font_size:.1f}pt"
-                            if is_bold:
-                                style_key += ", bold"
-                                font_weights['bold'] += 1
-                            if is_italic:
-                                style_key += ", italic"
-                                font_weights['italic'] += 1
-
-                            # Count occurrences
-                            font_styles[style_key] = font_styles.get(style_key, 0) + 1
-                            font_sizes.append(font_size)
-                            font_families[font_name] += 1
-
-        # Statistical analysis of font sizes
-        from collections import Counter
-        import numpy as np
-        from scipy import stats
-
-        # Convert to numpy array for statistical analysis
-        font_sizes_array = np.array(font_sizes)
-        
-        # Calculate basic statistics
-        mean_size = np.mean(font_sizes_array)
-        median_size = np.median(font_sizes_array)
-        std_size = np.std(font_sizes_array)
-        
-        # Use mode for body text size (more robust than mean for discrete values)
-        size_counter = Counter(font_sizes)
-        body_text_size = size_counter.most_common(1)[0][0]
-        
-        # Calculate size clusters using KDE (Kernel Density Estimation)
-        kde = stats.gaussian_kde(font_sizes_array)
-        x_range = np.linspace(min(font_sizes_array), max(font_sizes_array), 100)
-        density = kde(x_range)
-        
-        # Find peaks in the density plot (potential heading sizes)
-        from scipy.signal import find_peaks
-        peaks, _ = find_peaks(density, height=0.1*np.max(density))
-        potential_heading_sizes = sorted(x_range[peaks], reverse=True)
-        
-        # Filter heading sizes based on statistical significance
-        heading_sizes = []
-        for size in potential_heading_sizes:
-            if size > body_text_size + std_size:  # Must be significantly larger than body text
-                heading_sizes.append(size)
-        
-        # Limit to top 6 heading sizes
-        heading_sizes = heading_sizes[:6]
-        
-        # Build heading hierarchy
-        heading_styles = {}
-        font_hierarchy = {}
-        
-        # Map heading levels to font sizes
-        for i, size in enumerate(heading_sizes):
-            level = i + 1
-            heading_styles[f"h{level}"] = size
-            font_hierarchy[size] = level
-            
-            # Calculate confidence score for this heading level
-            size_frequency = size_counter[size] / len(font_sizes)
-            confidence = min(1.0, size_frequency * 10)  # Scale frequency to 0-1 range
-            
-            heading_styles[f"h{level}_confidence"] = confidence
+        from font_statistics import collect_document_font_statistics, analyze_font_statistics
 
-        # Identify dominant font family
-        dominant_font = max(font_families.items(), key=lambda x: x[1])[0]
-        
-        # Create body text style string
-        body_text_style = f"{dominant_font}, {body_text_size:.1f}pt"
-        if font_weights['bold'] > font_weights['italic']:
-            body_text_style += ", bold"
-        elif font_weights['italic'] > font_weights['bold']:
-            body_text_style += ", italic"
+        accumulator = collect_document_font_statistics(
+            doc,
+            max_workers=config_manager.get_config_value('PDFProcessing', 'font_analysis_max_workers', 0, int),
+            min_pages_for_pool=config_manager.get_config_value('PDFProcessing', 'font_analysis_min_pages_for_pool', 200, int),
+            pages_per_shard=config_manager.get_config_value('PDFProcessing', 'font_analysis_pages_per_shard', 50, int)
+        )
+        font_profile = analyze_font_statistics(accumulator)
+        font_stats = font_profile['font_statistics']
 
         logger.info(f"📊 Enhanced font analysis complete:")
-        logger.info(f"   • Body text: {body_text_style} (size: {body_text_size:.1f}pt)")
-        logger.info(f"   • Font statistics: mean={mean_size:.1f}, median={median_size:.1f}, std={std_size:.1f}")
-        logger.info(f"   • Heading hierarchy: {heading_styles}")
-        logger.info(f"   • Font families: {dict(font_families)}")
+        logger.info(f"   • Body text: {font_profile['body_text_style']} (size: {font_profile['dominant_font_size']:.1f}pt)")
+        logger.info(f"   • Font statistics: mean={font_stats['mean']:.1f}, median={font_stats['median']:.1f}, std={font_stats['std']:.1f}")
+        logger.info(f"   • Heading hierarchy: {font_profile['heading_styles']}")
+        logger.info(f"   • Font families: {font_stats.get('font_families', {})}")
 
-        return {
-            'font_analysis': font_styles,
-            'dominant_font_size': body_text_size,
-            'heading_font_sizes': set(heading_sizes),
-            'font_hierarchy': font_hierarchy,
-            'body_text_style': body_text_style,
-            'heading_styles': heading_styles,
-            'font_statistics': {
-                'mean': mean_size,
-                'median': median_size,
-                'std': std_size,
-                'dominant_font': dominant_font
-            }
-        }
+        return font_profile
 
     def _extract_spatial_elements(self, page, page_num, structure_analysis):
         """
@@ -2714,9 +2685,6 @@ class StructuredContentExtractor:
         3. Contextual clues (position, surrounding content)
         4. Confidence scoring for each classification
         """
-        import re
-        import numpy as np
-
         # Get document structure information
         font_hierarchy = structure_analysis.get('font_hierarchy', {})
         font_stats = structure_analysis.get('font_statistics', {})
@@ -2734,10 +2702,11 @@ class StructuredContentExtractor:
         is_italic = formatting.get('is_italic', False) or self._detect_italic_from_flags(formatting)
         font_color = formatting.get('color', 0)
 
-        # Text analysis
+        # Text analysis (text-only features are computed once per distinct block)
         text_clean = text.strip()
-        text_length = len(text_clean)
-        word_count = len(text_clean.split())
+        features = get_classification_engine().features(text)
+        text_length = features.length
+        word_count = features.word_count
 
         # Early filtering: very long text is unlikely to be a heading
         if word_count > 20 or text_length > 150:
@@ -2781,12 +2750,12 @@ class StructuredContentExtractor:
             heading_score += 0.05; score_details.append(f"Len<=100 ({text_length})")
 
         # Pattern-based scoring
-        has_patterns = self._has_heading_patterns(text_clean)
+        has_patterns = features.heading_pattern
         if has_patterns:
             heading_score += 0.1; score_details.append("HasPatterns")
 
         # 5. Position-based analysis
-        appears_section_start = self._appears_to_be_section_start(text_clean)
+        appears_section_start = features.section_start
         if appears_section_start:
             heading_score += 0.1; score_details.append("SectionStart")
 
@@ -2817,15 +2786,8 @@ class StructuredContentExtractor:
             return f'h{heading_level}'
 
         # Check for list items
-        list_patterns = [
-            r'^\s*[•\-\*]\s+',  # Bullet points
-            r'^\s*\d+[\.\)]\s+',  # Numbered lists
-            r'^\s*[a-zA-Z][\.\)]\s+',  # Lettered lists
-        ]
-
-        for pattern in list_patterns:
-            if re.match(pattern, text_clean):
-                return 'list_item'
+        if features.list_marker:
+            return 'list_item'
 
         # Default to paragraph
         return 'paragraph'
@@ -2843,41 +2805,13 @@ class StructuredContentExtractor:
         return bool(flags & 2)
 
     def _has_heading_patterns(self, text):
-        """Check for common heading patterns"""
-        import re
-
-        heading_patterns = [
-            r'^\d+\.?\s+[A-Z]',  # "1. Introduction" or "1 Introduction"
-            # ALL CAPS headings (max 5 words) - Constrained to avoid long capitalized sentences.
-            r'^([A-Z]+\s){0,4}[A-Z]+$',
-            # Title Case (max 7 words) - Constrained to avoid long title-cased sentences.
-            r'^([A-Z][a-z]+\s){0,6}[A-Z][a-z]+$',
-            r'^(Chapter|Section|Part|Appendix)\s+\d+',  # Chapter/Section numbers
-            r'^\d+\.\d+',  # Numbered sections like "2.1"
-            r'^[IVX]+\.\s+[A-Z]',  # Roman numerals
-            r'^[A-Z]\.\s+[A-Z]',  # Single letter sections "A."
-        ]
-        # Check if the text matches any of the defined heading patterns.
+        """Check for common heading patterns (see classification_rules.HEADING_RULES)"""
         # These patterns contribute to the heading_score in _classify_content_type_adaptive.
-        for pattern in heading_patterns:
-            if re.search(pattern, text):
-                logger.debug(f"Found heading pattern ({pattern}) in text: '{text[:100]}...'")
-                return True
-        return False
+        return get_classification_engine().features(text).heading_pattern
 
     def _appears_to_be_section_start(self, text):
         """Check if text appears to start a new section"""
-        import re
-
-        section_indicators = [
-            r'^(introduction|conclusion|abstract|summary|overview)',
-            r'^(background|methodology|results|discussion)',
-            r'^(references|bibliography|appendix|glossary)',
-            r'^\d+\.\s*(introduction|background|method)',
-        ]
-
-        text_lower = text.lower()
-        return any(re.search(pattern, text_lower) for pattern in section_indicators)
+        return get_classification_engine().features(text).section_start
 
     def _is_list_item_pattern(self, text):
         """Check if text follows list item patterns"""
@@ -2905,6 +2839,9 @@ class StructuredContentExtractor:
 
         logger.debug(f"Associating {len(extracted_images)} images with {len(content_blocks)} text blocks on page {page_num}")
 
+        # Index the page's text blocks once for every image on the page
+        text_index = SpatialIndex.from_items(content_blocks, lambda block: getattr(block, 'bbox', None))
+
         # Create image placeholders with spatial analysis
         image_placeholders = []
 
@@ -2922,13 +2859,13 @@ class StructuredContentExtractor:
             )
 
             # Determine spatial relationship with text blocks
-            spatial_info = self._analyze_image_text_spatial_relationship(placeholder, content_blocks)
+            spatial_info = self._analyze_image_text_spatial_relationship(placeholder, content_blocks, text_index)
 
             placeholder.spatial_relationship = spatial_info['relationship']
             placeholder.reading_order_position = spatial_info['reading_order_position']
 
             # Detect and link captions
-            caption_info = self._detect_and_link_caption(placeholder, content_blocks)
+            caption_info = self._detect_and_link_caption(placeholder, content_blocks, text_index)
             if caption_info:
                 placeholder.caption_block_id = caption_info['caption_block_id']
                 placeholder.caption = caption_info['caption_text']
@@ -2940,37 +2877,25 @@ class StructuredContentExtractor:
 
         return enhanced_content_blocks
 
-    def _analyze_image_text_spatial_relationship(self, image_placeholder, text_blocks):
+    def _analyze_image_text_spatial_relationship(self, image_placeholder, text_blocks, text_index=None):
         """
         Analyze spatial relationship between an image and surrounding text blocks.
 
         Returns relationship type and suggested reading order position.
         """
         image_bbox = image_placeholder.bbox
-        image_center_y = (image_bbox[1] + image_bbox[3]) / 2
-        image_center_x = (image_bbox[0] + image_bbox[2]) / 2
-
-        # Find closest text blocks
-        distances = []
-        for block in text_blocks:
-            if not hasattr(block, 'bbox') or not block.bbox:
-                continue
-
-            text_bbox = block.bbox
-            text_center_y = (text_bbox[1] + text_bbox[3]) / 2
-            text_center_x = (text_bbox[0] + text_bbox[2]) / 2
 
-            # Calculate distance
-            distance = ((image_center_x - text_center_x) ** 2 + (image_center_y - text_center_y) ** 2) ** 0.5
-
-            distances.append({
+        # Find the closest text block (centre to centre)
+        if text_index is None:
+            text_index = SpatialIndex.from_items(text_blocks, lambda block: getattr(block, 'bbox', None))
+        distances = [
+            {
                 'block': block,
                 'distance': distance,
-                'relative_position': self._get_relative_position(image_bbox, text_bbox)
-            })
-
-        # Sort by distance
-        distances.sort(key=lambda x: x['distance'])
+                'relative_position': self._get_relative_position(image_bbox, block.bbox)
+            }
+            for distance, block in text_index.nearest(image_bbox, k=1, metric='center')
+        ]
 
         # Determine relationship based on closest blocks
         if not distances:
@@ -3021,7 +2946,7 @@ class StructuredContentExtractor:
         else:
             return 'wrapped'
 
-    def _detect_and_link_caption(self, image_placeholder, text_blocks):
+    def _detect_and_link_caption(self, image_placeholder, text_blocks, text_index=None):
         """
         Enhanced caption detection with flexible proximity rules and multi-directional search.
 
@@ -3041,10 +2966,14 @@ class StructuredContentExtractor:
 
         caption_candidates = []
 
-        for block in text_blocks:
-            if not hasattr(block, 'bbox') or not block.bbox:
-                continue
+        # Captions must overlap the image horizontally and lie within the
+        # proximity limit vertically, so only blocks in that region qualify
+        if text_index is None:
+            text_index = SpatialIndex.from_items(text_blocks, lambda block: getattr(block, 'bbox', None))
+        search_region = (image_bbox[0], image_bbox[1] - max_vertical_distance,
+                         image_bbox[2], image_bbox[3] + max_vertical_distance)
 
+        for block in text_index.query_overlap(search_region):
             text_bbox = block.bbox
             text_content = getattr(block, 'content', '') or getattr(block, 'original_text', '')
 
@@ -3224,81 +3153,13 @@ class StructuredContentExtractor:
         """
         Enhanced caption detection with improved pattern recognition and context analysis.
 
-        Addresses detection issues by expanding pattern recognition and adding
-        contextual analysis for better accuracy.
+        Explicit caption patterns (figure/table labels, attributions, multi-language
+        labels) plus heuristics for short descriptive text; see
+        classification_rules.CAPTION_RULES.
         """
-        import re
-
-        if not text or len(text.strip()) < 5:
-            logger.debug(f"Caption check failed: text too short ({len(text.strip()) if text else 0} chars)")
+        if not text:
             return False
-
-        text_lower = text.lower().strip()
-        text_clean = text.strip()
-        logger.debug(f"Checking caption patterns for: '{text_clean[:50]}...'")  # Debug log
-
-        # Enhanced caption patterns - more comprehensive
-        caption_patterns = [
-            # Standard figure/table references
-            r'^(figure|fig|image|diagram|chart|graph|table|schema|plate|exhibit)\s*\d*[:\.\-\s]',
-            r'^(fig\.|figure\.|table\.|chart\.|diagram\.)?\s*\d+[:\.\-\s]',
-
-            # Source and attribution patterns
-            r'^(source|credit|copyright|adapted from|modified from)[:.\-\s]',
-            r'^(photo|image)\s+(by|from|courtesy)',
-
-            # Parenthetical captions
-            r'^\([^)]+\)$',
-
-            # Academic/technical patterns
-            r'^(step|phase|stage|example|case)\s*\d*[:\.]',
-            r'^(above|below|left|right)[:.\-\s]',
-
-            # Multi-language support
-            r'^(figura|tabela|esquema|gráfico)\s*\d*[:\.]',  # Spanish/Portuguese
-            r'^(abbildung|tabelle|diagramm)\s*\d*[:\.]',     # German
-            r'^(図|表|グラフ)\s*\d*[:\.]',                    # Japanese
-        ]
-
-        # Check explicit caption patterns
-        for pattern in caption_patterns:
-            if re.search(pattern, text_lower):
-                return True
-
-        # Enhanced heuristic analysis
-        word_count = len(text_clean.split())
-
-        # Short descriptive text without sentence endings
-        if (word_count <= 15 and
-            not text_clean.endswith('.') and
-            not text_clean.endswith('!') and
-            not text_clean.endswith('?')):
-
-            # Check for descriptive keywords
-            descriptive_keywords = [
-                'showing', 'depicting', 'illustrating', 'displaying',
-                'overview', 'comparison', 'analysis', 'structure',
-                'process', 'workflow', 'system', 'model', 'framework'
-            ]
-
-            if any(keyword in text_lower for keyword in descriptive_keywords):
-                return True
-
-        # Check for numbered/lettered items (a), (b), (1), (2)
-        if re.match(r'^\([a-z0-9]+\)', text_lower):
-            return True
-
-        # Check for colon-separated descriptive text
-        if ':' in text_clean and word_count <= 20:
-            return True
-
-        # Italic or emphasized text patterns (common in captions)
-        if (word_count <= 25 and
-            ('*' in text_clean or '_' in text_clean or
-             text_clean.isupper() or text_clean.islower())):
-            return True
-
-        return False
+        return get_classification_engine().features(text).caption
 
     def _insert_images_by_spatial_order(self, content_blocks, image_placeholders):
         """Insert image placeholders into content blocks based on spatial reading order"""
@@ -3318,9 +3179,22 @@ class StructuredContentExtractor:
         logger.debug(f"Inserted {len(image_placeholders)} images into reading order")
         return sorted_blocks
 
-    def _extract_content_as_document(self, doc, images_by_page, structure_analysis, filepath):
+    @staticmethod
+    def _publish_pages(content_blocks, on_page):
+        """Call on_page once per page of an already extracted block list"""
+        page_blocks = []
+        for block in content_blocks:
+            if page_blocks and block.page_num != page_blocks[0].page_num:
+                on_page(page_blocks[0].page_num, page_blocks)
+                page_blocks = []
+            page_blocks.append(block)
+        if page_blocks:
+            on_page(page_blocks[0].page_num, page_blocks)
+
+    def _extract_content_as_document(self, doc, images_by_page, structure_analysis, filepath, on_page=None):
         """Extract content as a structured Document object"""
         content_blocks = []
+        images_associated = 0
 
         # Extract document title from first page or filename
         document_title = self._extract_document_title(doc) or os.path.splitext(os.path.basename(filepath))[0]
@@ -3330,7 +3204,6 @@ class StructuredContentExtractor:
 
             # Extract text blocks with formatting
             page_content_blocks = self._extract_page_content_as_blocks(page, page_num + 1, structure_analysis)
-            content_blocks.extend(page_content_blocks)
 
             # Add images for this page as ImagePlaceholder blocks
             if page_num + 1 in images_by_page:
@@ -3349,13 +3222,19 @@ class StructuredContentExtractor:
                         ocr_text=img_ref.get('ocr_text'),
                         translation_needed=img_ref.get('translation_needed', False)
                     )
-                    content_blocks.append(image_block)
+                    page_content_blocks.append(image_block)
                     logger.debug(f"Added image block: {img_ref['filename']} at position ({img_ref['x0']}, {img_ref['y0']})")
             else:
                 logger.debug(f"No images found for page {page_num + 1}")
 
-        # Improve image placement by associating images with nearby text
-        self._associate_images_with_text_blocks(content_blocks)
+            # Improve image placement by associating images with nearby text (pages are independent)
+            images_associated += self._associate_images_with_text_blocks(page_content_blocks)
+
+            content_blocks.extend(page_content_blocks)
+            if on_page is not None:
+                on_page(page_num + 1, page_content_blocks)
+
+        logger.info(f"🔗 Associated {images_associated} images with text content blocks")
 
         # Create and return Document object
         document = Document(
@@ -3417,6 +3296,10 @@ class StructuredContentExtractor:
             # Proposition 1: Sort elements by spatial reading order
             ordered_elements = self._apply_spatial_reading_order(all_elements)
 
+            # Evaluate the classification rules for the whole page in one batch pass
+            get_classification_engine().classify_batch(
+                element['content'] for element in ordered_elements if element['type'] == 'text')
+
             # Convert ordered elements to ContentBlocks
             for element in ordered_elements:
                 content_block = self._create_content_block_from_element(element, structure_analysis)
@@ -3610,41 +3493,14 @@ class StructuredContentExtractor:
 
     def _is_code_block(self, text):
         """Detect code blocks"""
-        code_indicators = [
-            r'```',
-            r'^\s*def\s+\w+\(',
-            r'^\s*class\s+\w+',
-            r'^\s*import\s+\w+',
-            r'^\s*from\s+\w+\s+import',
-            r'^\s*function\s+\w+\(',
-            r'^\s*var\s+\w+\s*=',
-            r'^\s*\w+\s*=\s*function\(',
-        ]
-
-        for pattern in code_indicators:
-            if re.search(pattern, text, re.MULTILINE):
-                return True
-        return False
+        return get_classification_engine().features(text).code_block
 
     def _is_equation(self, text):
         """Detect mathematical equations"""
-        equation_indicators = [
-            r'\$.*?\$',  # LaTeX inline math
-            r'\\\[.*?\\\]',  # LaTeX display math
-            r'\\begin\{equation\}',
-            r'\\begin\{align\}',
-            r'[∑∏∫∂∇±×÷≤≥≠≈∞]',  # Mathematical symbols
-            r'[αβγδεζηθικλμνξοπρστυφχψω]',  # Greek letters
-        ]
-
-        for pattern in equation_indicators:
-            if re.search(pattern, text):
-                return True
-        return False
+        return get_classification_engine().features(text).equation
 
     def _associate_images_with_text_blocks(self, content_blocks):
-        """Associate images with nearby text content blocks for better placement"""
-        logger.info("🔗 Associating images with nearby text content blocks...")
+        """Associate images with nearby text content blocks for better placement; returns the number associated"""
 
         # Separate images and text content by page
         pages_content = {}
@@ -3674,9 +3530,10 @@ class StructuredContentExtractor:
 
             # Sort text content by Y position (top to bottom)
             page_text.sort(key=lambda x: x.bbox[1], reverse=True)
+            text_index = SpatialIndex.from_items(page_text, lambda block: block.bbox)
 
             for image in page_images:
-                best_text_block = self._find_best_text_block_for_image(image, page_text)
+                best_text_block = self._find_best_text_block_for_image(image, page_text, text_index)
 
                 if best_text_block:
                     # Add image reference to the text block
@@ -3698,9 +3555,9 @@ class StructuredContentExtractor:
 
                     logger.debug(f"Associated image {image.image_path} with text on page {page_num}")
 
-        logger.info(f"🔗 Associated {images_associated} images with text content blocks")
+        return images_associated
 
-    def _find_best_text_block_for_image(self, image_block, page_text_blocks):
+    def _find_best_text_block_for_image(self, image_block, page_text_blocks, text_index=None):
         """Find the best text block to associate with an image"""
         if not page_text_blocks:
             return None
@@ -3710,7 +3567,12 @@ class StructuredContentExtractor:
         best_block = None
         min_distance = float('inf')
 
-        for text_block in page_text_blocks:
+        # A block whose centre is within 200pt of the image centre must touch this band
+        if text_index is None:
+            text_index = SpatialIndex.from_items(page_text_blocks, lambda block: block.bbox)
+        nearby_blocks = text_index.query_vertical_band(image_center_y - 200, image_center_y + 200)
+
+        for text_block in nearby_blocks:
             # Skip very short text (likely headers/footers)
             if len(text_block.original_text.strip()) < 20:
                 continue
@@ -4352,19 +4214,13 @@ class StructuredContentExtractor:
             text_blocks = [b for b in text_blocks if "lines" in b]
             
             # Filter out text blocks that overlap with visual areas
+            visual_index = SpatialIndex.from_items(visual_areas, lambda area: area['bbox'])
             filtered_blocks = []
             for block in text_blocks:
-                block_bbox = block["bbox"]
-                should_exclude = False
-                
-                for visual_area in visual_areas:
-                    if self._bboxes_overlap(block_bbox, visual_area['bbox']):
-                        should_exclude = True
-                        logger.debug(f"Excluding text block from page {page_num + 1} due to overlap with visual content")
-                        break
-                
-                if not should_exclude:
-                    filtered_blocks.append(block)
+                if visual_index.query_overlap(block["bbox"]):
+                    logger.debug(f"Excluding text block from page {page_num + 1} due to overlap with visual content")
+                    continue
+                filtered_blocks.append(block)
             
             # Extract text from filtered blocks
             text = ""
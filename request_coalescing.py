@@ -0,0 +1,161 @@
+"""
+Request Coalescing for Translation Calls
+
+Documents repeat themselves: running headers that survive filtering,
+repeated figure captions, boilerplate, identical table labels. Translated
+concurrently, every copy used to race past the caches and become its own
+API request. This module gives each request an identity - the normalized
+text plus target language, model and style guide - and:
+
+- request_key() computes that identity, so callers can dedupe a batch up
+  front and translate one representative per key;
+- SingleFlight coalesces concurrent calls with the same key into one
+  execution whose result (or error) every caller receives, and remembers
+  successful results for the rest of the run, so a string that comes back
+  after its first translation finished is not sent again either.
+"""
+
+import re
+import asyncio
+import hashlib
+import logging
+import threading
+import unicodedata
+import weakref
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+from config_manager import config_manager
+from lazy_imports import LazySingleton
+
+logger = logging.getLogger(__name__)
+
+_HORIZONTAL_WHITESPACE = re.compile(r'[^\S\n]+')
+
+
+def normalize_request_text(text: str) -> str:
+    """Text as far as translation is concerned: NFC, trimmed, runs of spaces collapsed (line breaks kept)"""
+    text = unicodedata.normalize('NFC', text or "")
+    return "\n".join(_HORIZONTAL_WHITESPACE.sub(" ", line).strip() for line in text.strip().splitlines())
+
+
+def request_key(text: str, target_language: str, model_name: str, style_guide: str = "") -> str:
+    """Identity of a translation request"""
+    digest = hashlib.blake2b(digest_size=16)
+    for part in (normalize_request_text(text), target_language or "", model_name or "", style_guide or ""):
+        digest.update(part.encode('utf-8'))
+        digest.update(b"\x00")
+    return digest.hexdigest()
+
+
+class SingleFlight:
+    """
+    Runs at most one call per key at a time; concurrent callers with the same
+    key await the running call. Successful results are remembered (LRU,
+    bounded) and returned directly to later callers. Safe to share between
+    event loops: in-flight calls are tracked per loop, remembered results
+    globally.
+    """
+
+    def __init__(self, max_remembered: int = 20000):
+        self.max_remembered = max_remembered
+        self._results: 'OrderedDict[str, Any]' = OrderedDict()
+        self._in_flight: 'weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[str, asyncio.Future]]' = \
+            weakref.WeakKeyDictionary()
+        self._lock = threading.Lock()
+        self.stats = {'calls': 0, 'executions': 0, 'coalesced': 0, 'remembered_hits': 0}
+
+    def _remembered(self, key: str, default: Any) -> Any:
+        with self._lock:
+            if key in self._results:
+                self._results.move_to_end(key)
+                self.stats['remembered_hits'] += 1
+                return self._results[key]
+        return default
+
+    def _remember(self, key: str, result: Any):
+        if self.max_remembered <= 0:
+            return
+        with self._lock:
+            self._results[key] = result
+            self._results.move_to_end(key)
+            while len(self._results) > self.max_remembered:
+                self._results.popitem(last=False)
+
+    async def do(self, key: str, call: Callable[[], Awaitable[Any]]) -> Any:
+        """Return call()'s result, running call() only if no caller with this key did or does"""
+        with self._lock:
+            self.stats['calls'] += 1
+
+        loop = asyncio.get_running_loop()
+        while True:
+            result = self._remembered(key, _MISSING)
+            if result is not _MISSING:
+                return result
+
+            with self._lock:
+                in_flight = self._in_flight.setdefault(loop, {})
+                future = in_flight.get(key)
+                if future is None:
+                    future = in_flight[key] = loop.create_future()
+                    self.stats['executions'] += 1
+                    leader = True
+                else:
+                    self.stats['coalesced'] += 1
+                    leader = False
+
+            if leader:
+                break
+            try:
+                return await asyncio.shield(future)
+            except asyncio.CancelledError:
+                # The leading call was cancelled, not us: take over
+                if future.cancelled():
+                    continue
+                raise
+
+        try:
+            result = await call()
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except BaseException as e:
+            future.set_exception(e)
+            # Followers get the error; nobody awaiting it is not a problem
+            future.exception()
+            raise
+        else:
+            self._remember(key, result)
+            future.set_result(result)
+            return result
+        finally:
+            with self._lock:
+                in_flight.pop(key, None)
+
+    def forget(self):
+        """Drop remembered results (e.g. between runs)"""
+        with self._lock:
+            self._results.clear()
+
+    def get_statistics(self) -> Dict[str, Any]:
+        with self._lock:
+            stats = dict(self.stats)
+            stats['remembered'] = len(self._results)
+        stats['saved_requests'] = stats['coalesced'] + stats['remembered_hits']
+        return stats
+
+
+_MISSING = object()
+
+
+def _create_single_flight() -> Optional[SingleFlight]:
+    settings = config_manager.request_coalescing_settings
+    return SingleFlight(settings['max_remembered']) if settings['enabled'] else None
+
+
+_single_flight = LazySingleton(_create_single_flight, name='translation_single_flight')
+
+
+def get_translation_single_flight() -> Optional[SingleFlight]:
+    """Process-wide SingleFlight for translation requests, or None when coalescing is disabled"""
+    return _single_flight.get_instance()
@@ -15,6 +15,8 @@ from typing import Dict, List, Optional, Tuple, Any
 from dataclasses import dataclass, asdict
 import numpy as np
 
+from shared_cache import get_shared_namespace
+
 logger = logging.getLogger(__name__)
 
 @dataclass
@@ -70,6 +72,10 @@ class SemanticCache:
             'avg_similarity_score': 0.0
         }
         
+        # Cross-process stores: exact translations and text embeddings
+        self.shared_translations = get_shared_namespace('semantic_translations')
+        self.shared_embeddings = get_shared_namespace('embeddings')
+        
         # Initialize embedding model
         self._init_embedding_model()
         
@@ -127,6 +133,13 @@ class SemanticCache:
             self.stats['exact_hits'] += 1
             logger.debug(f"🎯 Exact cache hit for: {text[:50]}...")
             return entry.translated_text
+
+        # Exact match cached by another process in this run
+        if self.shared_translations is not None:
+            shared_translation = self.shared_translations.get(cache_key)
+            if shared_translation is not None:
+                self.stats['exact_hits'] += 1
+                return shared_translation
         
         # Check for semantic similarity
         similar_entry = self._find_similar_entry(text, target_language, model_name, context)
@@ -157,7 +170,7 @@ class SemanticCache:
         
         # Generate embedding for the text
         try:
-            embedding = self.embedding_model.encode([text])[0]
+            embedding = self._get_embedding(text)
         except Exception as e:
             logger.error(f"Failed to generate embedding: {e}")
             return
@@ -182,6 +195,8 @@ class SemanticCache:
         # Add to cache
         self.cache[cache_key] = entry
         self.cache_keys.append(cache_key)
+        if self.shared_translations is not None:
+            self.shared_translations.set(cache_key, translation)
         
         # Update embeddings index
         self._update_embeddings_index()
@@ -204,7 +219,7 @@ class SemanticCache:
         
         try:
             # Generate embedding for query text
-            query_embedding = self.embedding_model.encode([text])[0]
+            query_embedding = self._get_embedding(text)
             
             # Calculate similarities with all cached embeddings
             similarities = np.dot(self.embeddings_index, query_embedding)
@@ -268,6 +283,19 @@ class SemanticCache:
             logger.error(f"Error updating embeddings index: {e}")
             self.embeddings_index = None
     
+    def _get_embedding(self, text: str) -> np.ndarray:
+        """Encode text, reusing embeddings computed by any process sharing the cache"""
+        embedding_key = hashlib.md5(f"{self.embedding_model_name}|{text}".encode('utf-8')).hexdigest()
+        if self.shared_embeddings is not None:
+            embedding = self.shared_embeddings.get(embedding_key)
+            if embedding is not None:
+                return embedding
+
+        embedding = self.embedding_model.encode([text])[0]
+        if self.shared_embeddings is not None:
+            self.shared_embeddings.set(embedding_key, embedding)
+        return embedding
+    
     def _generate_cache_key(self, text: str, target_language: str, 
                           model_name: str, context: str) -> str:
         """Generate cache key for exact matching"""
@@ -18,6 +18,8 @@ from typing import List, Dict, Optional, Tuple
 from dataclasses import dataclass
 from enum import Enum
 
+from token_accounting import get_token_accountant
+
 # Optional imports for enhanced functionality
 try:
     import spacy
@@ -61,9 +63,13 @@ class TextChunk:
 class SemanticTextChunker:
     """Intelligent text chunker using spaCy for semantic coherence"""
     
-    def __init__(self, max_chunk_size: int = 8000, overlap_size: int = 200):
+    def __init__(self, max_chunk_size: int = 8000, overlap_size: int = 200,
+                 max_chunk_tokens: Optional[int] = None):
         self.max_chunk_size = max_chunk_size
         self.overlap_size = overlap_size
+        # Token cap per chunk; characters alone under-count Greek and CJK text
+        self.token_accountant = get_token_accountant()
+        self.max_chunk_tokens = max_chunk_tokens or self.token_accountant.get_chunk_token_budget()
         self.nlp = None
         
         # Initialize spaCy if available
@@ -138,13 +144,16 @@ class SemanticTextChunker:
         # Group sentences into chunks respecting size limits
         current_chunk = ""
         current_sentences = []
+        current_tokens = 0
         start_pos = 0
         
         for i, sentence in enumerate(sentences):
             sentence_text = sentence['text']
+            sentence_tokens = self.token_accountant.count_tokens(sentence_text)
             
-            # Check if adding this sentence would exceed chunk size
-            if current_chunk and len(current_chunk) + len(sentence_text) > self.max_chunk_size:
+            # Check if adding this sentence would exceed chunk size or token budget
+            if current_chunk and (len(current_chunk) + len(sentence_text) > self.max_chunk_size or
+                                  current_tokens + sentence_tokens > self.max_chunk_tokens):
                 # Create chunk from current sentences
                 chunk = self._create_chunk(
                     current_chunk.strip(),
@@ -165,15 +174,18 @@ class SemanticTextChunker:
                     overlap_sentences = current_sentences[-1:]  # Take last sentence as overlap
                     current_chunk = overlap_sentences[0]['text'] + " "
                     current_sentences = overlap_sentences
+                    current_tokens = self.token_accountant.count_tokens(current_chunk)
                     start_pos = overlap_sentences[0]['start']
                 else:
                     current_chunk = ""
                     current_sentences = []
+                    current_tokens = 0
                     start_pos = sentence['start']
             
             # Add sentence to current chunk
             current_chunk += sentence_text + " "
             current_sentences.append(sentence)
+            current_tokens += sentence_tokens
         
         # Add final chunk if there's remaining content
         if current_chunk.strip():
@@ -263,13 +275,16 @@ class SemanticTextChunker:
         # Group list items into chunks
         current_chunk = ""
         current_items = []
+        current_tokens = 0
         start_pos = 0
         
         for item in list_items:
             item_text = item['text']
+            item_tokens = self.token_accountant.count_tokens(item_text)
             
-            # Check if adding this item would exceed chunk size
-            if current_chunk and len(current_chunk) + len(item_text) > self.max_chunk_size:
+            # Check if adding this item would exceed chunk size or token budget
+            if current_chunk and (len(current_chunk) + len(item_text) > self.max_chunk_size or
+                                  current_tokens + item_tokens > self.max_chunk_tokens):
                 # Create chunk from current items
                 chunk = self._create_chunk(
                     current_chunk.strip(),
@@ -283,11 +298,13 @@ class SemanticTextChunker:
                 # Start new chunk
                 current_chunk = ""
                 current_items = []
+                current_tokens = 0
                 start_pos = item['start']
             
             # Add item to current chunk
             current_chunk += item_text + "\n"
             current_items.append(item)
+            current_tokens += item_tokens
         
         # Add final chunk
         if current_chunk.strip():
@@ -0,0 +1,411 @@
+"""
+Cross-Process Shared Cache for Ultimate PDF Translator
+
+A SQLite-backed key/value store (WAL mode) that every process in a run can
+query: the main workflow, ProcessPoolExecutor page workers and parallel
+document runs all see each other's translations, embeddings and image
+classifications instead of duplicating memory and misses.
+
+- Namespaces keep cache types apart (translations, embeddings, OCR, ...)
+- Each namespace has its own LRU budget (entries and bytes)
+- Hit/miss/set/eviction counters are kept per namespace and aggregated
+  across processes in the database
+"""
+
+import os
+import time
+import pickle
+import sqlite3
+import logging
+import threading
+import atexit
+from typing import Any, Dict, Optional
+
+from config_manager import config_manager
+from lazy_imports import LazySingleton
+
+logger = logging.getLogger(__name__)
+
+# Default LRU budgets per namespace: (max_entries, max_bytes)
+DEFAULT_NAMESPACE_BUDGETS = {
+    'translations': (200000, 512 * 1024 * 1024),
+    'session_translations': (100000, 256 * 1024 * 1024),
+    'contextual_translations': (100000, 256 * 1024 * 1024),
+    'semantic_translations': (100000, 256 * 1024 * 1024),
+    'embeddings': (100000, 512 * 1024 * 1024),
+    'image_classification': (50000, 64 * 1024 * 1024),
+    'ocr_results': (50000, 256 * 1024 * 1024),
+}
+FALLBACK_BUDGET = (50000, 128 * 1024 * 1024)
+# Keys per IN (...) query; stays below SQLite's default host-parameter limit
+_MAX_SQL_VARIABLES = 500
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS cache_entries (
+    namespace   TEXT NOT NULL,
+    key         TEXT NOT NULL,
+    value       BLOB NOT NULL,
+    size        INTEGER NOT NULL,
+    last_access REAL NOT NULL,
+    PRIMARY KEY (namespace, key)
+);
+CREATE INDEX IF NOT EXISTS idx_cache_lru ON cache_entries (namespace, last_access);
+CREATE TABLE IF NOT EXISTS cache_counters (
+    namespace TEXT PRIMARY KEY,
+    hits      INTEGER NOT NULL DEFAULT 0,
+    misses    INTEGER NOT NULL DEFAULT 0,
+    sets      INTEGER NOT NULL DEFAULT 0,
+    evictions INTEGER NOT NULL DEFAULT 0
+);
+"""
+
+
+class SharedCacheNamespace:
+    """Handle on one namespace of the shared store, with a dict-like API"""
+
+    def __init__(self, store: 'SharedCacheStore', name: str):
+        self.store = store
+        self.name = name
+
+    def get(self, key: str, default: Any = None) -> Any:
+        return self.store.get(self.name, key, default)
+
+    def set(self, key: str, value: Any):
+        self.store.set(self.name, key, value)
+
+    def get_many(self, keys) -> Dict[str, Any]:
+        return self.store.get_many(self.name, keys)
+
+    def set_many(self, items: Dict[str, Any]):
+        self.store.set_many(self.name, items)
+
+    def delete(self, key: str):
+        self.store.delete(self.name, key)
+
+    def __contains__(self, key: str) -> bool:
+        return self.store.get(self.name, key, _MISSING, count=False) is not _MISSING
+
+    def stats(self) -> Dict[str, Any]:
+        return self.store.get_statistics().get(self.name, {})
+
+
+_MISSING = object()
+
+
+class SharedCacheStore:
+    """
+    SQLite-backed cache shared by all processes that open the same file.
+    Safe to use from several threads; reconnects automatically after fork.
+    """
+
+    def __init__(self, db_path: str, budgets: Optional[Dict[str, tuple]] = None,
+                 eviction_check_interval: int = 256, counter_flush_interval: int = 200):
+        self.db_path = db_path
+        self.budgets = dict(DEFAULT_NAMESPACE_BUDGETS)
+        if budgets:
+            self.budgets.update(budgets)
+        self.eviction_check_interval = max(1, eviction_check_interval)
+        self.counter_flush_interval = max(1, counter_flush_interval)
+
+        self._lock = threading.RLock()
+        self._conn: Optional[sqlite3.Connection] = None
+        self._conn_pid: Optional[int] = None
+
+        # Per-process counter deltas, flushed to cache_counters periodically
+        self._pending_counters: Dict[str, Dict[str, int]] = {}
+        self._pending_ops = 0
+        self._sets_since_eviction: Dict[str, int] = {}
+
+        directory = os.path.dirname(os.path.abspath(db_path))
+        os.makedirs(directory, exist_ok=True)
+        self._connection()
+
+    # -- connection management -------------------------------------------------
+
+    def _connection(self) -> sqlite3.Connection:
+        pid = os.getpid()
+        if self._conn is None or self._conn_pid != pid:
+            # Never reuse a connection inherited through fork
+            self._conn = sqlite3.connect(self.db_path, timeout=30.0, check_same_thread=False,
+                                         isolation_level=None)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.executescript(_SCHEMA)
+            self._conn_pid = pid
+            self._pending_counters = {}
+            self._pending_ops = 0
+        return self._conn
+
+    def namespace(self, name: str) -> SharedCacheNamespace:
+        """Get a handle on a namespace"""
+        return SharedCacheNamespace(self, name)
+
+    # -- core operations -------------------------------------------------------
+
+    def get(self, namespace: str, key: str, default: Any = None, count: bool = True) -> Any:
+        with self._lock:
+            try:
+                conn = self._connection()
+                row = conn.execute(
+                    "SELECT value FROM cache_entries WHERE namespace=? AND key=?",
+                    (namespace, key)
+                ).fetchone()
+                if row is None:
+                    if count:
+                        self._count(namespace, 'misses')
+                    return default
+                conn.execute(
+                    "UPDATE cache_entries SET last_access=? WHERE namespace=? AND key=?",
+                    (time.time(), namespace, key)
+                )
+                if count:
+                    self._count(namespace, 'hits')
+                return pickle.loads(row[0])
+            except Exception as e:
+                logger.debug(f"Shared cache get failed ({namespace}): {e}")
+                return default
+
+    def set(self, namespace: str, key: str, value: Any):
+        with self._lock:
+            try:
+                payload = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+                conn = self._connection()
+                conn.execute(
+                    "INSERT OR REPLACE INTO cache_entries (namespace, key, value, size, last_access) "
+                    "VALUES (?, ?, ?, ?, ?)",
+                    (namespace, key, sqlite3.Binary(payload), len(payload), time.time())
+                )
+                self._count(namespace, 'sets')
+
+                self._sets_since_eviction[namespace] = self._sets_since_eviction.get(namespace, 0) + 1
+                if self._sets_since_eviction[namespace] >= self.eviction_check_interval:
+                    self._sets_since_eviction[namespace] = 0
+                    self._enforce_budget(namespace)
+            except Exception as e:
+                logger.debug(f"Shared cache set failed ({namespace}): {e}")
+
+    def get_many(self, namespace: str, keys) -> Dict[str, Any]:
+        """Look up several keys in one query per chunk; returns only the keys that were found"""
+        keys = list(dict.fromkeys(keys))
+        found: Dict[str, Any] = {}
+        with self._lock:
+            try:
+                conn = self._connection()
+                for start in range(0, len(keys), _MAX_SQL_VARIABLES):
+                    chunk = keys[start:start + _MAX_SQL_VARIABLES]
+                    placeholders = ",".join("?" * len(chunk))
+                    rows = conn.execute(
+                        f"SELECT key, value FROM cache_entries WHERE namespace=? AND key IN ({placeholders})",
+                        (namespace, *chunk)
+                    ).fetchall()
+                    for key, value in rows:
+                        found[key] = pickle.loads(value)
+                if found:
+                    now = time.time()
+                    conn.executemany(
+                        "UPDATE cache_entries SET last_access=? WHERE namespace=? AND key=?",
+                        [(now, namespace, key) for key in found]
+                    )
+                self._count(namespace, 'hits', len(found))
+                self._count(namespace, 'misses', len(keys) - len(found))
+            except Exception as e:
+                logger.debug(f"Shared cache get_many failed ({namespace}): {e}")
+        return found
+
+    def set_many(self, namespace: str, items: Dict[str, Any]):
+        """Store several entries in a single transaction"""
+        if not items:
+            return
+        with self._lock:
+            try:
+                now = time.time()
+                rows = []
+                for key, value in items.items():
+                    payload = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+                    rows.append((namespace, key, sqlite3.Binary(payload), len(payload), now))
+                conn = self._connection()
+                conn.execute("BEGIN")
+                try:
+                    conn.executemany(
+                        "INSERT OR REPLACE INTO cache_entries (namespace, key, value, size, last_access) "
+                        "VALUES (?, ?, ?, ?, ?)", rows
+                    )
+                    conn.execute("COMMIT")
+                except Exception:
+                    conn.execute("ROLLBACK")
+                    raise
+                self._count(namespace, 'sets', len(rows))
+
+                self._sets_since_eviction[namespace] = self._sets_since_eviction.get(namespace, 0) + len(rows)
+                if self._sets_since_eviction[namespace] >= self.eviction_check_interval:
+                    self._sets_since_eviction[namespace] = 0
+                    self._enforce_budget(namespace)
+            except Exception as e:
+                logger.debug(f"Shared cache set_many failed ({namespace}): {e}")
+
+    def delete(self, namespace: str, key: str):
+        with self._lock:
+            try:
+                self._connection().execute(
+                    "DELETE FROM cache_entries WHERE namespace=? AND key=?", (namespace, key)
+                )
+            except Exception as e:
+                logger.debug(f"Shared cache delete failed ({namespace}): {e}")
+
+    def clear(self, namespace: Optional[str] = None):
+        """Remove all entries of a namespace, or of every namespace"""
+        with self._lock:
+            conn = self._connection()
+            if namespace:
+                conn.execute("DELETE FROM cache_entries WHERE namespace=?", (namespace,))
+            else:
+                conn.execute("DELETE FROM cache_entries")
+
+    # -- LRU budgets -----------------------------------------------------------
+
+    def _enforce_budget(self, namespace: str):
+        """Evict least recently used entries until the namespace fits its budget"""
+        max_entries, max_bytes = self.budgets.get(namespace, FALLBACK_BUDGET)
+        conn = self._connection()
+        count, total_bytes = conn.execute(
+            "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM cache_entries WHERE namespace=?",
+            (namespace,)
+        ).fetchone()
+
+        if count <= max_entries and total_bytes <= max_bytes:
+            return
+
+        # Drop down to 90% of the budget so eviction does not run on every set
+        target_entries = int(max_entries * 0.9)
+        target_bytes = int(max_bytes * 0.9)
+        evicted = 0
+        rows = conn.execute(
+            "SELECT key, size FROM cache_entries WHERE namespace=? ORDER BY last_access ASC",
+            (namespace,)
+        ).fetchall()
+        keys_to_delete = []
+        for key, size in rows:
+            if count <= target_entries and total_bytes <= target_bytes:
+                break
+            keys_to_delete.append((namespace, key))
+            count -= 1
+            total_bytes -= size
+            evicted += 1
+
+        conn.executemany("DELETE FROM cache_entries WHERE namespace=? AND key=?", keys_to_delete)
+        self._count(namespace, 'evictions', evicted)
+        logger.debug(f"🧹 Shared cache '{namespace}': evicted {evicted} LRU entries")
+
+    # -- counters --------------------------------------------------------------
+
+    def _count(self, namespace: str, counter: str, amount: int = 1):
+        counters = self._pending_counters.setdefault(
+            namespace, {'hits': 0, 'misses': 0, 'sets': 0, 'evictions': 0}
+        )
+        counters[counter] += amount
+        self._pending_ops += 1
+        if self._pending_ops >= self.counter_flush_interval:
+            self.flush_counters()
+
+    def flush_counters(self):
+        """Write this process's counter deltas into the shared counters table"""
+        with self._lock:
+            if not self._pending_counters:
+                return
+            try:
+                conn = self._connection()
+                for namespace, counters in self._pending_counters.items():
+                    conn.execute(
+                        "INSERT INTO cache_counters (namespace, hits, misses, sets, evictions) "
+                        "VALUES (?, ?, ?, ?, ?) "
+                        "ON CONFLICT(namespace) DO UPDATE SET "
+                        "hits = hits + excluded.hits, misses = misses + excluded.misses, "
+                        "sets = sets + excluded.sets, evictions = evictions + excluded.evictions",
+                        (namespace, counters['hits'], counters['misses'],
+                         counters['sets'], counters['evictions'])
+                    )
+                self._pending_counters = {}
+                self._pending_ops = 0
+            except Exception as e:
+                logger.debug(f"Could not flush shared cache counters: {e}")
+
+    def get_statistics(self) -> Dict[str, Dict[str, Any]]:
+        """Per-namespace sizes and hit rates aggregated across all processes"""
+        self.flush_counters()
+        with self._lock:
+            conn = self._connection()
+            stats: Dict[str, Dict[str, Any]] = {}
+            for namespace, count, total_bytes in conn.execute(
+                "SELECT namespace, COUNT(*), COALESCE(SUM(size), 0) FROM cache_entries GROUP BY namespace"
+            ):
+                stats[namespace] = {'entries': count, 'bytes': total_bytes}
+            for namespace, hits, misses, sets, evictions in conn.execute(
+                "SELECT namespace, hits, misses, sets, evictions FROM cache_counters"
+            ):
+                entry = stats.setdefault(namespace, {'entries': 0, 'bytes': 0})
+                lookups = hits + misses
+                entry.update({
+                    'hits': hits,
+                    'misses': misses,
+                    'sets': sets,
+                    'evictions': evictions,
+                    'hit_rate': hits / lookups if lookups else 0.0
+                })
+            for namespace, entry in stats.items():
+                max_entries, max_bytes = self.budgets.get(namespace, FALLBACK_BUDGET)
+                entry['max_entries'] = max_entries
+                entry['max_bytes'] = max_bytes
+            return stats
+
+    def close(self):
+        self.flush_counters()
+        with self._lock:
+            if self._conn is not None and self._conn_pid == os.getpid():
+                self._conn.close()
+            self._conn = None
+            self._conn_pid = None
+
+
+def _shared_cache_budgets(overrides: Dict[str, Dict[str, int]]) -> Dict[str, tuple]:
+    """(max_entries, max_bytes) for every namespace with limits set in the configuration"""
+    budgets = {}
+    for namespace, limits in overrides.items():
+        max_entries, max_bytes = DEFAULT_NAMESPACE_BUDGETS.get(namespace, FALLBACK_BUDGET)
+        budgets[namespace] = (limits.get('max_entries', max_entries),
+                              limits.get('max_mb', max_bytes // (1024 * 1024)) * 1024 * 1024)
+    return budgets
+
+
+def _create_shared_cache() -> Optional[SharedCacheStore]:
+    settings = config_manager.shared_cache_settings
+    if not settings['enabled']:
+        return None
+
+    # Workers inherit the parent's store even if their working directory differs
+    db_path = os.path.abspath(os.environ.get('PDF_TRANSLATOR_SHARED_CACHE', settings['db_path']))
+    os.environ['PDF_TRANSLATOR_SHARED_CACHE'] = db_path
+    try:
+        store = SharedCacheStore(db_path, budgets=_shared_cache_budgets(settings['budget_overrides']))
+    except Exception as e:
+        logger.warning(f"Shared cache unavailable, using per-process caches only: {e}")
+        return None
+    atexit.register(store.close)
+    logger.info(f"🔗 Shared cache enabled: {db_path}")
+    return store
+
+
+_shared_cache = LazySingleton(_create_shared_cache, name='shared_cache')
+
+
+def get_shared_cache() -> Optional[SharedCacheStore]:
+    """
+    Get the process-wide shared cache, or None when it is disabled or unavailable.
+    Every process that calls this opens the same database file.
+    """
+    return _shared_cache.get_instance()
+
+
+def get_shared_namespace(name: str) -> Optional[SharedCacheNamespace]:
+    """Convenience accessor returning a namespace handle or None"""
+    store = get_shared_cache()
+    return store.namespace(name) if store else None
@@ -0,0 +1,356 @@
+"""
+Spatial Index for Ultimate PDF Translator
+
+Per-page uniform-grid index over axis-aligned bounding boxes (x0, y0, x1, y1)
+in PDF coordinates. Replaces nested "every image against every text block"
+loops in pdf_parser, the YOLOv8 detector and the hybrid reconcilers with:
+- overlap queries (optionally with a tolerance)
+- nearest-neighbour queries by centre or edge distance
+- "below / above within distance" queries for captions and placement
+
+Results are always returned in insertion order (or by distance, ties broken
+by insertion order), so callers keep the deterministic "first match wins"
+behaviour of the loops they replace.
+"""
+
+import math
+import heapq
+from typing import Callable, Dict, Generic, Iterable, List, Optional, Sequence, Tuple, TypeVar
+
+T = TypeVar('T')
+
+BBox = Tuple[float, float, float, float]
+
+# Below this many entries a linear scan beats walking grid cells
+BRUTE_FORCE_LIMIT = 16
+DEFAULT_CELL_SIZE = 72.0  # one inch in PDF points
+
+
+def bbox_intersection_area(bbox1: Sequence[float], bbox2: Sequence[float]) -> float:
+    """Area of the intersection of two boxes (0 if they are disjoint)"""
+    x_overlap = max(0.0, min(bbox1[2], bbox2[2]) - max(bbox1[0], bbox2[0]))
+    y_overlap = max(0.0, min(bbox1[3], bbox2[3]) - max(bbox1[1], bbox2[1]))
+    return x_overlap * y_overlap
+
+
+def bbox_area(bbox: Sequence[float]) -> float:
+    return max(0.0, bbox[2] - bbox[0]) * max(0.0, bbox[3] - bbox[1])
+
+
+def bbox_center(bbox: Sequence[float]) -> Tuple[float, float]:
+    return ((bbox[0] + bbox[2]) / 2, (bbox[1] + bbox[3]) / 2)
+
+
+def bbox_center_distance(bbox1: Sequence[float], bbox2: Sequence[float]) -> float:
+    """Euclidean distance between box centres"""
+    c1x, c1y = bbox_center(bbox1)
+    c2x, c2y = bbox_center(bbox2)
+    return math.hypot(c1x - c2x, c1y - c2y)
+
+
+def bbox_edge_distance(bbox1: Sequence[float], bbox2: Sequence[float]) -> float:
+    """Shortest distance between the two boxes (0 if they touch or overlap)"""
+    dx = max(0.0, bbox2[0] - bbox1[2], bbox1[0] - bbox2[2])
+    dy = max(0.0, bbox2[1] - bbox1[3], bbox1[1] - bbox2[3])
+    return math.hypot(dx, dy)
+
+
+def bboxes_overlap(bbox1: Sequence[float], bbox2: Sequence[float], tolerance: float = 0.0) -> bool:
+    """True if the boxes intersect or are within `tolerance` of each other (edges inclusive)"""
+    return not (bbox1[2] + tolerance < bbox2[0] or
+                bbox2[2] + tolerance < bbox1[0] or
+                bbox1[3] + tolerance < bbox2[1] or
+                bbox2[3] + tolerance < bbox1[1])
+
+
+_DISTANCE_METRICS: Dict[str, Callable[[Sequence[float], Sequence[float]], float]] = {
+    'center': bbox_center_distance,
+    'edge': bbox_edge_distance
+}
+
+
+class SpatialIndex(Generic[T]):
+    """
+    Uniform-grid index of (bbox, item) pairs for one page.
+
+    Each entry is registered in every grid cell its box touches; queries only
+    visit the cells their search region covers, so a lookup costs roughly the
+    number of nearby boxes instead of the number of boxes on the page.
+    """
+
+    def __init__(self, cell_size: float = DEFAULT_CELL_SIZE):
+        self.cell_size = float(cell_size) if cell_size and cell_size > 0 else DEFAULT_CELL_SIZE
+        self._bboxes: List[BBox] = []
+        self._items: List[T] = []
+        self._cells: Dict[Tuple[int, int], List[int]] = {}
+        self._extent: Optional[List[int]] = None  # [min_cx, min_cy, max_cx, max_cy]
+
+    @classmethod
+    def from_items(cls, items: Iterable[T], bbox_func: Callable[[T], Optional[Sequence[float]]],
+                   cell_size: Optional[float] = None) -> 'SpatialIndex[T]':
+        """
+        Build an index from items; entries whose bbox_func returns a falsy
+        value are skipped. Without an explicit cell size, the median box
+        dimension is used so each box touches only a few cells.
+        """
+        entries = []
+        for item in items:
+            bbox = bbox_func(item)
+            if bbox:
+                entries.append((normalize_bbox(bbox), item))
+
+        if cell_size is None:
+            dimensions = sorted(max(b[2] - b[0], b[3] - b[1]) for b, _ in entries)
+            cell_size = max(dimensions[len(dimensions) // 2], 8.0) if dimensions else DEFAULT_CELL_SIZE
+
+        index = cls(cell_size)
+        for bbox, item in entries:
+            index.insert(bbox, item)
+        return index
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def insert(self, bbox: Sequence[float], item: T) -> int:
+        """Add an entry and return its insertion id"""
+        bbox = normalize_bbox(bbox)
+        entry_id = len(self._items)
+        self._bboxes.append(bbox)
+        self._items.append(item)
+
+        cx0, cy0, cx1, cy1 = self._cell_range(bbox)
+        for cx in range(cx0, cx1 + 1):
+            for cy in range(cy0, cy1 + 1):
+                self._cells.setdefault((cx, cy), []).append(entry_id)
+
+        if self._extent is None:
+            self._extent = [cx0, cy0, cx1, cy1]
+        else:
+            extent = self._extent
+            extent[0], extent[1] = min(extent[0], cx0), min(extent[1], cy0)
+            extent[2], extent[3] = max(extent[2], cx1), max(extent[3], cy1)
+        return entry_id
+
+    def items(self) -> List[T]:
+        return list(self._items)
+
+    def bbox_of(self, entry_id: int) -> BBox:
+        return self._bboxes[entry_id]
+
+    # ------------------------------------------------------------------
+    # Queries
+    # ------------------------------------------------------------------
+
+    def query_overlap(self, bbox: Sequence[float], tolerance: float = 0.0,
+                      predicate: Optional[Callable[[T], bool]] = None) -> List[T]:
+        """Items whose box intersects bbox (expanded by tolerance), in insertion order"""
+        return [self._items[i] for i in self._overlap_ids(normalize_bbox(bbox), tolerance, predicate)]
+
+    def query_overlap_with_ids(self, bbox: Sequence[float], tolerance: float = 0.0) -> List[Tuple[int, T]]:
+        return [(i, self._items[i]) for i in self._overlap_ids(normalize_bbox(bbox), tolerance, None)]
+
+    def nearest(self, bbox: Sequence[float], k: int = 1, metric: str = 'center',
+                max_distance: float = math.inf,
+                predicate: Optional[Callable[[T], bool]] = None) -> List[Tuple[float, T]]:
+        """
+        Up to k (distance, item) pairs closest to bbox, nearest first.
+        metric is 'center' (centre to centre) or 'edge' (gap between boxes).
+        """
+        distance_func = _DISTANCE_METRICS[metric]
+        target = normalize_bbox(bbox)
+        if not self._items or k <= 0:
+            return []
+
+        # Max-heap of the k best as (-distance, -id) so ties keep the earliest entry
+        best: List[Tuple[float, int]] = []
+
+        def consider(entry_id: int):
+            item = self._items[entry_id]
+            if predicate is not None and not predicate(item):
+                return
+            distance = distance_func(target, self._bboxes[entry_id])
+            if distance > max_distance:
+                return
+            key = (-distance, -entry_id)
+            if len(best) < k:
+                heapq.heappush(best, key)
+            elif key > best[0]:
+                heapq.heapreplace(best, key)
+
+        if len(self._items) <= BRUTE_FORCE_LIMIT:
+            for entry_id in range(len(self._items)):
+                consider(entry_id)
+        else:
+            self._ring_search(target, best, k, max_distance, consider)
+
+        return [(-negative_distance, self._items[-negative_id])
+                for negative_distance, negative_id in sorted(best, reverse=True)]
+
+    def within_distance(self, bbox: Sequence[float], distance: float, metric: str = 'edge',
+                        predicate: Optional[Callable[[T], bool]] = None) -> List[Tuple[float, T]]:
+        """All (distance, item) pairs within distance of bbox, nearest first"""
+        distance_func = _DISTANCE_METRICS[metric]
+        target = normalize_bbox(bbox)
+        results = []
+        for entry_id in self._overlap_ids(target, distance, predicate):
+            d = distance_func(target, self._bboxes[entry_id])
+            if d <= distance:
+                results.append((d, entry_id))
+        results.sort()
+        return [(d, self._items[i]) for d, i in results]
+
+    def below(self, bbox: Sequence[float], max_distance: float, min_horizontal_overlap: float = 0.0,
+              predicate: Optional[Callable[[T], bool]] = None) -> List[Tuple[float, T]]:
+        """
+        Items starting below bbox within max_distance (vertical gap), nearest first.
+        min_horizontal_overlap is the required overlap relative to the narrower box.
+        """
+        target = normalize_bbox(bbox)
+        region = (target[0], target[3], target[2], target[3] + max_distance)
+        return self._directional(target, region, lambda b: b[1] - target[3],
+                                 max_distance, min_horizontal_overlap, predicate)
+
+    def above(self, bbox: Sequence[float], max_distance: float, min_horizontal_overlap: float = 0.0,
+              predicate: Optional[Callable[[T], bool]] = None) -> List[Tuple[float, T]]:
+        """Items ending above bbox within max_distance (vertical gap), nearest first"""
+        target = normalize_bbox(bbox)
+        region = (target[0], target[1] - max_distance, target[2], target[1])
+        return self._directional(target, region, lambda b: target[1] - b[3],
+                                 max_distance, min_horizontal_overlap, predicate)
+
+    def query_vertical_band(self, y0: float, y1: float,
+                            predicate: Optional[Callable[[T], bool]] = None) -> List[T]:
+        """Items whose vertical extent intersects [y0, y1], at any x, in insertion order"""
+        if self._extent is None:
+            return []
+        cs = self.cell_size
+        band = ((self._extent[0]) * cs, y0, (self._extent[2] + 1) * cs, y1)
+        return self.query_overlap(band, predicate=predicate)
+
+    # ------------------------------------------------------------------
+    # Internals
+    # ------------------------------------------------------------------
+
+    def _cell_range(self, bbox: Sequence[float]) -> Tuple[int, int, int, int]:
+        cs = self.cell_size
+        return (int(math.floor(bbox[0] / cs)), int(math.floor(bbox[1] / cs)),
+                int(math.floor(bbox[2] / cs)), int(math.floor(bbox[3] / cs)))
+
+    def _overlap_ids(self, bbox: BBox, tolerance: float,
+                     predicate: Optional[Callable[[T], bool]]) -> List[int]:
+        if self._extent is None:
+            return []
+        search = (bbox[0] - tolerance, bbox[1] - tolerance, bbox[2] + tolerance, bbox[3] + tolerance)
+
+        if len(self._items) <= BRUTE_FORCE_LIMIT:
+            candidates: Iterable[int] = range(len(self._items))
+        else:
+            cx0, cy0, cx1, cy1 = self._cell_range(search)
+            extent = self._extent
+            cx0, cy0 = max(cx0, extent[0]), max(cy0, extent[1])
+            cx1, cy1 = min(cx1, extent[2]), min(cy1, extent[3])
+            found = set()
+            for cx in range(cx0, cx1 + 1):
+                for cy in range(cy0, cy1 + 1):
+                    found.update(self._cells.get((cx, cy), ()))
+            candidates = sorted(found)
+
+        return [i for i in candidates
+                if bboxes_overlap(bbox, self._bboxes[i], tolerance)
+                and (predicate is None or predicate(self._items[i]))]
+
+    def _ring_search(self, target: BBox, best: List[Tuple[float, int]], k: int,
+                     max_distance: float, consider: Callable[[int], None]):
+        """Visit grid cells in rings of increasing distance around target"""
+        cs = self.cell_size
+        qx0, qy0, qx1, qy1 = self._cell_range(target)
+        extent = self._extent
+        max_ring = max(qx0 - extent[0], extent[2] - qx1, qy0 - extent[1], extent[3] - qy1, 0)
+        seen = set()
+
+        for ring in range(max_ring + 1):
+            # Every point in ring r is at least (r - 1) cells away from target
+            lower_bound = max(0, ring - 1) * cs
+            if lower_bound > max_distance:
+                break
+            if len(best) == k and lower_bound > -best[0][0]:
+                break
+
+            for cell in _ring_cells(qx0 - ring, qy0 - ring, qx1 + ring, qy1 + ring, ring, extent):
+                for entry_id in self._cells.get(cell, ()):
+                    if entry_id not in seen:
+                        seen.add(entry_id)
+                        consider(entry_id)
+
+    def _directional(self, target: BBox, region: BBox, gap_func: Callable[[BBox], float],
+                     max_distance: float, min_horizontal_overlap: float,
+                     predicate: Optional[Callable[[T], bool]]) -> List[Tuple[float, T]]:
+        results = []
+        for entry_id in self._overlap_ids(normalize_bbox(region), 0.0, predicate):
+            candidate = self._bboxes[entry_id]
+            gap = gap_func(candidate)
+            if gap < 0 or gap > max_distance:
+                continue
+            if horizontal_overlap_ratio(target, candidate) < min_horizontal_overlap:
+                continue
+            results.append((gap, entry_id))
+        results.sort()
+        return [(gap, self._items[i]) for gap, i in results]
+
+
+def _ring_cells(x0: int, y0: int, x1: int, y1: int, ring: int, extent: List[int]):
+    """Cells on the border of [x0..x1] x [y0..y1], clipped to the occupied extent"""
+    ex0, ey0, ex1, ey1 = extent
+    if ring == 0:
+        for cx in range(max(x0, ex0), min(x1, ex1) + 1):
+            for cy in range(max(y0, ey0), min(y1, ey1) + 1):
+                yield (cx, cy)
+        return
+
+    for cx in range(max(x0, ex0), min(x1, ex1) + 1):
+        if ey0 <= y0 <= ey1:
+            yield (cx, y0)
+        if y1 != y0 and ey0 <= y1 <= ey1:
+            yield (cx, y1)
+    for cy in range(max(y0 + 1, ey0), min(y1 - 1, ey1) + 1):
+        if ex0 <= x0 <= ex1:
+            yield (x0, cy)
+        if x1 != x0 and ex0 <= x1 <= ex1:
+            yield (x1, cy)
+
+
+def normalize_bbox(bbox: Sequence[float]) -> BBox:
+    """Coerce a bbox-like sequence into an ordered float tuple"""
+    x0, y0, x1, y1 = (float(v) for v in bbox[:4])
+    return (min(x0, x1), min(y0, y1), max(x0, x1), max(y0, y1))
+
+
+def horizontal_overlap_ratio(bbox1: Sequence[float], bbox2: Sequence[float]) -> float:
+    """Horizontal overlap relative to the narrower box (0-1)"""
+    overlap = max(0.0, min(bbox1[2], bbox2[2]) - max(bbox1[0], bbox2[0]))
+    narrower = min(bbox1[2] - bbox1[0], bbox2[2] - bbox2[0])
+    return overlap / narrower if narrower > 0 else 0.0
+
+
+def non_maximum_suppression(items: Sequence[T], bbox_func: Callable[[T], Sequence[float]],
+                            score_func: Callable[[T], float],
+                            overlap_func: Callable[[Sequence[float], Sequence[float]], bool]) -> List[T]:
+    """
+    Keep the highest-scoring items, dropping any item that overlaps an
+    already kept one according to overlap_func. Kept items are indexed as
+    they are accepted, so each candidate is only compared with its neighbours.
+    """
+    ordered = sorted(range(len(items)), key=lambda i: score_func(items[i]), reverse=True)
+    kept_index: SpatialIndex[int] = SpatialIndex(
+        max(8.0, max((max(b[2] - b[0], b[3] - b[1]) for b in (normalize_bbox(bbox_func(x)) for x in items)),
+                     default=DEFAULT_CELL_SIZE))
+    )
+    kept: List[int] = []
+    for i in ordered:
+        bbox = normalize_bbox(bbox_func(items[i]))
+        neighbours = kept_index.query_overlap(bbox)
+        if any(overlap_func(bbox, kept_index.bbox_of(j)) for j in neighbours):
+            continue
+        kept_index.insert(bbox, len(kept))
+        kept.append(i)
+    return [items[i] for i in kept]
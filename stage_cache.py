@@ -0,0 +1,341 @@
+"""
+Stage Artifact Cache for Ultimate PDF Translator
+
+Stores the results of whole pipeline stages (Nougat output, image extraction,
+structured Document objects, document analysis, YOLO detections) on disk,
+keyed by the PDF content hash, the stage name and a hash of the stage
+configuration. A failed translation that is retried, or the same PDF
+translated into another language, goes straight to translation instead of
+repeating extraction.
+
+Each entry is a directory holding the payload (Documents in the binary format
+of document_serialization, anything else pickled) and, optionally, the files
+the stage wrote (extracted images, .mmd output). Paths inside a cached
+payload are relocated to the directory the caller asks for, so an entry made
+for one output directory can be reused for another. Entries are evicted
+least-recently-used first once the cache exceeds its size budget.
+"""
+
+import os
+import json
+import time
+import pickle
+import shutil
+import hashlib
+import logging
+import threading
+import dataclasses
+from enum import Enum
+from typing import Any, Callable, Dict, Iterable, List, Optional, Union
+
+from config_manager import config_manager
+from document_serialization import DOCUMENT_FILE_EXTENSION, is_serializable_document, load_document, save_document
+from lazy_imports import LazySingleton
+
+logger = logging.getLogger(__name__)
+
+# Bump when cached payload layouts change in an incompatible way
+STAGE_CACHE_VERSION = 1
+
+_META_FILENAME = "meta.json"
+_PAYLOAD_FILENAME = "payload.pkl"
+_DOCUMENT_PAYLOAD_FILENAME = "payload" + DOCUMENT_FILE_EXTENSION
+_FILES_DIRNAME = "files"
+
+_MISSING = object()
+
+
+def compute_file_hash(filepath: str, chunk_size: int = 1024 * 1024) -> str:
+    """SHA-256 of a file's contents (independent of path and mtime)"""
+    sha = hashlib.sha256()
+    with open(filepath, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            sha.update(chunk)
+    return sha.hexdigest()
+
+
+def compute_config_hash(config: Any) -> str:
+    """Stable hash of a stage configuration (any JSON-like structure)"""
+    encoded = json.dumps(config, sort_keys=True, default=str, ensure_ascii=False)
+    return hashlib.sha256(encoded.encode('utf-8')).hexdigest()[:16]
+
+
+def _path_under(path: str, root: str) -> bool:
+    return path == root or path.startswith(root.rstrip(os.sep) + os.sep)
+
+
+def relocate_paths(obj: Any, old_root: str, new_root: str, _seen: Optional[set] = None) -> Any:
+    """
+    Rewrite every string path under old_root to the same path under new_root,
+    in nested dicts, lists, tuples and plain objects (updated in place).
+    """
+    if _seen is None:
+        _seen = set()
+    if isinstance(obj, str):
+        if _path_under(obj, old_root):
+            return os.path.join(new_root, os.path.relpath(obj, old_root))
+        return obj
+    if obj is None or isinstance(obj, (int, float, bool, bytes, Enum)):
+        return obj
+    if id(obj) in _seen:
+        return obj
+    _seen.add(id(obj))
+    if isinstance(obj, dict):
+        for key, value in obj.items():
+            obj[key] = relocate_paths(value, old_root, new_root, _seen)
+        return obj
+    if isinstance(obj, list):
+        obj[:] = [relocate_paths(value, old_root, new_root, _seen) for value in obj]
+        return obj
+    if isinstance(obj, tuple):
+        relocated = [relocate_paths(value, old_root, new_root, _seen) for value in obj]
+        return type(obj)(*relocated) if hasattr(obj, '_fields') else tuple(relocated)
+    if dataclasses.is_dataclass(obj) or hasattr(obj, '__dict__'):
+        for name, value in list(vars(obj).items()):
+            setattr(obj, name, relocate_paths(value, old_root, new_root, _seen))
+    return obj
+
+
+def _link_or_copy(src: str, dst: str):
+    os.makedirs(os.path.dirname(dst), exist_ok=True)
+    if os.path.exists(dst):
+        return
+    try:
+        os.link(src, dst)
+    except OSError:
+        shutil.copy2(src, dst)
+
+
+class StageCache:
+    """On-disk artifact cache for pipeline stages with LRU size-based eviction"""
+
+    def __init__(self, cache_dir: Optional[str] = None, max_size_mb: Optional[float] = None,
+                 enabled: Optional[bool] = None):
+        settings = config_manager.stage_cache_settings
+        self.cache_dir = cache_dir or settings['cache_dir']
+        self.max_size_bytes = int((max_size_mb if max_size_mb is not None else settings['max_size_mb']) * 1024 * 1024)
+        self.enabled = settings['enabled'] if enabled is None else enabled
+
+        self._lock = threading.Lock()
+        # (absolute path, size, mtime_ns) -> content hash, so a PDF is hashed once per run
+        self._hash_memo: Dict[tuple, str] = {}
+        self.stats: Dict[str, Dict[str, int]] = {}
+
+    # ------------------------------------------------------------------
+    # Keys
+    # ------------------------------------------------------------------
+
+    def pdf_hash(self, pdf_path: str) -> str:
+        stat = os.stat(pdf_path)
+        memo_key = (os.path.abspath(pdf_path), stat.st_size, stat.st_mtime_ns)
+        with self._lock:
+            cached = self._hash_memo.get(memo_key)
+        if cached is None:
+            cached = compute_file_hash(pdf_path)
+            with self._lock:
+                self._hash_memo[memo_key] = cached
+        return cached
+
+    def entry_key(self, pdf_path: str, stage: str, config: Any = None) -> str:
+        raw = f"{STAGE_CACHE_VERSION}|{self.pdf_hash(pdf_path)}|{stage}|{compute_config_hash(config)}"
+        return hashlib.sha256(raw.encode('utf-8')).hexdigest()[:40]
+
+    def _entry_dir(self, stage: str, key: str) -> str:
+        return os.path.join(self.cache_dir, stage, key)
+
+    def _count(self, stage: str, counter: str):
+        with self._lock:
+            stage_stats = self.stats.setdefault(stage, {'hits': 0, 'misses': 0, 'stores': 0, 'evictions': 0})
+            stage_stats[counter] += 1
+
+    # ------------------------------------------------------------------
+    # Lookup and store
+    # ------------------------------------------------------------------
+
+    def get(self, pdf_path: str, stage: str, config: Any = None, files_dir: Optional[str] = None,
+            default: Any = None) -> Any:
+        """
+        Return the cached payload for (pdf, stage, config) or default.
+        Attached files are restored into files_dir and paths in the payload are
+        rewritten to point there.
+        """
+        if not self.enabled or not os.path.exists(pdf_path):
+            return default
+        try:
+            entry_dir = self._entry_dir(stage, self.entry_key(pdf_path, stage, config))
+            meta_path = os.path.join(entry_dir, _META_FILENAME)
+            if not os.path.exists(meta_path):
+                self._count(stage, 'misses')
+                return default
+
+            with open(meta_path, 'r', encoding='utf-8') as f:
+                meta = json.load(f)
+            document_path = os.path.join(entry_dir, _DOCUMENT_PAYLOAD_FILENAME)
+            if os.path.exists(document_path):
+                payload = load_document(document_path)
+            else:
+                with open(os.path.join(entry_dir, _PAYLOAD_FILENAME), 'rb') as f:
+                    payload = pickle.load(f)
+
+            if files_dir:
+                for relative_path in meta.get('files', []):
+                    _link_or_copy(os.path.join(entry_dir, _FILES_DIRNAME, relative_path),
+                                  os.path.join(files_dir, relative_path))
+                original_root = meta.get('files_dir')
+                if original_root and os.path.abspath(original_root) != os.path.abspath(files_dir):
+                    payload = relocate_paths(payload, original_root, files_dir)
+
+            # Touching the metadata marks the entry as recently used
+            os.utime(meta_path)
+            self._count(stage, 'hits')
+            logger.info(f"♻️ Reusing cached {stage} for {os.path.basename(pdf_path)}")
+            return payload
+        except Exception as e:
+            logger.warning(f"Ignoring unreadable {stage} cache entry for {os.path.basename(pdf_path)}: {e}")
+            self._count(stage, 'misses')
+            return default
+
+    def put(self, pdf_path: str, stage: str, payload: Any, config: Any = None,
+            files_dir: Optional[str] = None, attach_files: Union[bool, Iterable[str]] = False) -> bool:
+        """
+        Store a stage payload. files_dir is the directory paths in the payload
+        refer to; attach_files copies either every file below it (True) or
+        the given paths into the entry so they can be restored elsewhere.
+        """
+        if not self.enabled or payload is None:
+            return False
+        try:
+            key = self.entry_key(pdf_path, stage, config)
+            entry_dir = self._entry_dir(stage, key)
+            temp_dir = f"{entry_dir}.{os.getpid()}.{threading.get_ident()}.tmp"
+            shutil.rmtree(temp_dir, ignore_errors=True)
+            os.makedirs(temp_dir)
+
+            if is_serializable_document(payload):
+                save_document(payload, os.path.join(temp_dir, _DOCUMENT_PAYLOAD_FILENAME))
+            else:
+                with open(os.path.join(temp_dir, _PAYLOAD_FILENAME), 'wb') as f:
+                    pickle.dump(payload, f, protocol=pickle.HIGHEST_PROTOCOL)
+
+            files = self._attach_files(temp_dir, files_dir, attach_files)
+            meta = {
+                'version': STAGE_CACHE_VERSION,
+                'stage': stage,
+                'source_name': os.path.basename(pdf_path),
+                'pdf_hash': self.pdf_hash(pdf_path),
+                'config_hash': compute_config_hash(config),
+                'files_dir': os.path.abspath(files_dir) if files_dir else None,
+                'files': files,
+                'created_at': time.time(),
+                'size_bytes': 0
+            }
+            meta['size_bytes'] = _directory_size(temp_dir)
+            with open(os.path.join(temp_dir, _META_FILENAME), 'w', encoding='utf-8') as f:
+                json.dump(meta, f, ensure_ascii=False)
+
+            # Publish atomically; a concurrent writer of the same entry wins harmlessly
+            shutil.rmtree(entry_dir, ignore_errors=True)
+            try:
+                os.rename(temp_dir, entry_dir)
+            except OSError:
+                shutil.rmtree(temp_dir, ignore_errors=True)
+
+            self._count(stage, 'stores')
+            logger.debug(f"Stored {stage} for {os.path.basename(pdf_path)} ({meta['size_bytes']} bytes)")
+            self.evict()
+            return True
+        except Exception as e:
+            logger.warning(f"Could not cache {stage} for {os.path.basename(pdf_path)}: {e}")
+            return False
+
+    def _attach_files(self, entry_dir: str, files_dir: Optional[str],
+                      attach_files: Union[bool, Iterable[str]]) -> List[str]:
+        if not files_dir or not attach_files or not os.path.isdir(files_dir):
+            return []
+        if attach_files is True:
+            candidates = [os.path.relpath(os.path.join(root, name), files_dir)
+                          for root, _, names in os.walk(files_dir) for name in names]
+        else:
+            candidates = [os.path.relpath(path, files_dir) if os.path.isabs(path) else path
+                          for path in attach_files]
+
+        attached = []
+        for relative_path in candidates:
+            source = os.path.join(files_dir, relative_path)
+            if relative_path.startswith('..') or not os.path.isfile(source):
+                continue
+            _link_or_copy(source, os.path.join(entry_dir, _FILES_DIRNAME, relative_path))
+            attached.append(relative_path)
+        return attached
+
+    def get_or_compute(self, pdf_path: str, stage: str, compute: Callable[[], Any], config: Any = None,
+                       files_dir: Optional[str] = None, attach_files: Union[bool, Iterable[str]] = False) -> Any:
+        """Return the cached payload, or compute, store and return it"""
+        payload = self.get(pdf_path, stage, config, files_dir=files_dir, default=_MISSING)
+        if payload is not _MISSING:
+            return payload
+        payload = compute()
+        self.put(pdf_path, stage, payload, config, files_dir=files_dir, attach_files=attach_files)
+        return payload
+
+    # ------------------------------------------------------------------
+    # Maintenance
+    # ------------------------------------------------------------------
+
+    def _iter_entries(self):
+        if not os.path.isdir(self.cache_dir):
+            return
+        for stage in os.listdir(self.cache_dir):
+            stage_dir = os.path.join(self.cache_dir, stage)
+            if not os.path.isdir(stage_dir):
+                continue
+            for key in os.listdir(stage_dir):
+                meta_path = os.path.join(stage_dir, key, _META_FILENAME)
+                if key.endswith('.tmp') or not os.path.exists(meta_path):
+                    continue
+                try:
+                    with open(meta_path, 'r', encoding='utf-8') as f:
+                        size = json.load(f).get('size_bytes', 0)
+                    yield stage, os.path.join(stage_dir, key), size, os.path.getmtime(meta_path)
+                except (OSError, ValueError):
+                    continue
+
+    def evict(self):
+        """Remove least-recently-used entries until the cache fits its budget"""
+        entries = list(self._iter_entries())
+        total = sum(size for _, _, size, _ in entries)
+        if total <= self.max_size_bytes:
+            return
+        for stage, entry_dir, size, _ in sorted(entries, key=lambda entry: entry[3]):
+            shutil.rmtree(entry_dir, ignore_errors=True)
+            total -= size
+            self._count(stage, 'evictions')
+            logger.debug(f"Evicted {stage} entry {os.path.basename(entry_dir)} ({size} bytes)")
+            if total <= self.max_size_bytes:
+                break
+
+    def clear(self, stage: Optional[str] = None):
+        shutil.rmtree(os.path.join(self.cache_dir, stage) if stage else self.cache_dir, ignore_errors=True)
+
+    def get_statistics(self) -> Dict[str, Any]:
+        entries = list(self._iter_entries())
+        return {
+            'enabled': self.enabled,
+            'entries': len(entries),
+            'size_mb': sum(size for _, _, size, _ in entries) / (1024 * 1024),
+            'max_size_mb': self.max_size_bytes / (1024 * 1024),
+            'stages': {stage: dict(counters) for stage, counters in self.stats.items()}
+        }
+
+
+def _directory_size(path: str) -> int:
+    return sum(os.path.getsize(os.path.join(root, name))
+               for root, _, names in os.walk(path) for name in names)
+
+
+_stage_cache = LazySingleton(StageCache, name='stage_cache')
+
+
+def get_stage_cache() -> StageCache:
+    """Process-wide stage cache (created on first use)"""
+    return _stage_cache.get_instance()
@@ -0,0 +1,147 @@
+"""
+Streaming DOCX Writer for Very Large Documents
+
+python-docx keeps the whole document.xml tree in memory, which for outputs of
+thousands of pages costs gigabytes of RAM and makes every picture insertion
+scan the full tree for the next shape id. StreamingDocxWriter instead uses a
+small scratch python-docx Document as a staging area: blocks are added to it
+with the usual python-docx calls, then flush() serializes the new body
+elements to a temporary file and removes them from the tree.
+
+finalize() writes the package in one pass: the scratch document is saved once
+(styles, numbering, image parts and relationships), and its document.xml is
+replaced by the skeleton with the front matter (the ToC, built last but placed
+first) and the streamed body substituted at a placeholder.
+"""
+
+import os
+import shutil
+import logging
+import zipfile
+import tempfile
+from typing import Iterable, List, Optional
+
+from docx import Document
+from docx.parts.document import DocumentPart
+from docx.oxml.ns import qn
+from lxml import etree
+
+logger = logging.getLogger(__name__)
+
+_DOCUMENT_PART_NAME = "word/document.xml"
+_BODY_PLACEHOLDER = "STREAMING-DOCX-BODY"
+_COPY_CHUNK_SIZE = 1024 * 1024
+# Entries beyond this need zip64 headers
+_ZIP64_THRESHOLD = 2 ** 31 - 1
+
+
+class _StreamingDocumentPart(DocumentPart):
+    """DocumentPart whose next shape id also accounts for already-streamed elements."""
+
+    streamed_max_id = 0
+
+    @property
+    def next_id(self) -> int:
+        return max(super().next_id, self.streamed_max_id + 1)
+
+
+def body_elements(document) -> List[etree._Element]:
+    """Body children of a python-docx Document, without its section properties."""
+    return [element for element in document.element.body if element.tag != qn('w:sectPr')]
+
+
+class StreamingDocxWriter:
+    """Builds a .docx by streaming body XML to disk as blocks are added"""
+
+    def __init__(self, output_path: str, temp_dir: Optional[str] = None):
+        self.output_path = output_path
+        self.temp_dir = temp_dir or os.path.dirname(os.path.abspath(output_path))
+        os.makedirs(self.temp_dir, exist_ok=True)
+
+        # Scratch document: callers add blocks to it with the usual python-docx API
+        self.document = Document()
+        self.document.part.__class__ = _StreamingDocumentPart
+        self._body = self.document.element.body
+        self._root_declarations = [
+            (f' xmlns:{prefix}="{uri}"' if prefix else f' xmlns="{uri}"').encode('utf-8')
+            for prefix, uri in self.document.element.nsmap.items()
+        ]
+
+        fd, self._body_path = tempfile.mkstemp(prefix=".docx_body_", suffix=".xml", dir=self.temp_dir)
+        self._body_file = os.fdopen(fd, 'wb')
+        self.elements_written = 0
+        self.bytes_written = 0
+
+    def serialize(self, element) -> bytes:
+        """Serialize a body element without repeating namespaces the root already declares"""
+        xml = etree.tostring(element, encoding='utf-8')
+        start_tag_end = xml.index(b'>')
+        start_tag = xml[:start_tag_end]
+        for declaration in self._root_declarations:
+            start_tag = start_tag.replace(declaration, b'', 1)
+        return start_tag + xml[start_tag_end:]
+
+    def flush(self):
+        """Move everything added to the scratch document so far into the body stream"""
+        part = self.document.part
+        for element in body_elements(self.document):
+            used_ids = [int(value) for value in element.xpath('.//@id') if value.isdigit()]
+            if used_ids:
+                part.streamed_max_id = max(part.streamed_max_id, max(used_ids))
+            data = self.serialize(element)
+            self._body_file.write(data)
+            self._body.remove(element)
+            self.elements_written += 1
+            self.bytes_written += len(data)
+
+    def finalize(self, front_matter: Iterable = ()) -> str:
+        """
+        Write the .docx to output_path and return it. front_matter elements
+        (e.g. the ToC) are placed before the streamed body.
+        """
+        self.flush()
+        self._body_file.close()
+
+        # document.xml skeleton with a placeholder where the body goes
+        placeholder = etree.Comment(_BODY_PLACEHOLDER)
+        self._body.insert(0, placeholder)
+        skeleton = etree.tostring(self.document.element, encoding='UTF-8', xml_declaration=True, standalone=True)
+        self._body.remove(placeholder)
+        head, tail = skeleton.split(f"<!--{_BODY_PLACEHOLDER}-->".encode('utf-8'), 1)
+        front_matter_xml = b''.join(self.serialize(element) for element in front_matter)
+
+        package_path = f"{self._body_path}.package.docx"
+        temp_output = f"{self.output_path}.{os.getpid()}.tmp"
+        try:
+            # Everything but the body: styles, settings, image parts, relationships
+            self.document.save(package_path)
+            force_zip64 = self.bytes_written + len(front_matter_xml) > _ZIP64_THRESHOLD
+            with zipfile.ZipFile(package_path) as source, \
+                    zipfile.ZipFile(temp_output, 'w', zipfile.ZIP_DEFLATED) as target:
+                for info in source.infolist():
+                    if info.filename == _DOCUMENT_PART_NAME:
+                        with target.open(_DOCUMENT_PART_NAME, 'w', force_zip64=force_zip64) as out:
+                            out.write(head)
+                            out.write(front_matter_xml)
+                            with open(self._body_path, 'rb') as body:
+                                shutil.copyfileobj(body, out, _COPY_CHUNK_SIZE)
+                            out.write(tail)
+                    else:
+                        with source.open(info) as part_data, target.open(info.filename, 'w') as out:
+                            shutil.copyfileobj(part_data, out, _COPY_CHUNK_SIZE)
+            os.replace(temp_output, self.output_path)
+        finally:
+            for path in (package_path, temp_output, self._body_path):
+                if os.path.exists(path):
+                    os.remove(path)
+
+        logger.info(f"📝 Streamed {self.elements_written} body elements "
+                    f"({self.bytes_written / (1024 * 1024):.1f} MB) into {os.path.basename(self.output_path)}")
+        return self.output_path
+
+    def abort(self):
+        """Discard the partial body stream"""
+        if not self._body_file.closed:
+            self._body_file.close()
+        if os.path.exists(self._body_path):
+            os.remove(self._body_path)
@@ -11,6 +11,8 @@ from typing import Dict, List, Optional, Tuple, Any
 from dataclasses import dataclass
 from enum import Enum
 
+from classification_rules import get_classification_engine
+
 logger = logging.getLogger(__name__)
 
 class ContentType(Enum):
@@ -88,18 +90,8 @@ class StructuredContentValidator:
     
     def _detect_content_type(self, text: str) -> ContentType:
         """Detect the type of structured content"""
-        if self.table_patterns['markdown_table'].search(text):
-            return ContentType.TABLE
-        elif self.code_patterns['code_block'].search(text):
-            return ContentType.CODE_BLOCK
-        elif (self.latex_patterns['display_math'].search(text) or 
-              self.latex_patterns['latex_env'].search(text)):
-            return ContentType.LATEX_FORMULA
-        elif (self.list_patterns['bullet_list'].search(text) or 
-              self.list_patterns['numbered_list'].search(text)):
-            return ContentType.LIST
-        else:
-            return ContentType.UNKNOWN
+        structured_type = get_classification_engine().features(text).structured_type
+        return ContentType(structured_type) if structured_type else ContentType.UNKNOWN
     
     def _validate_table(self, original: str, translated: str) -> ValidationResult:
         """Validate Markdown table structure"""
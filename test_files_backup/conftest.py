@@ -0,0 +1,46 @@
+"""
+Shared pytest setup for the test scripts
+
+Many tests construct services that open the process-wide shared cache. Point
+it (and any worker processes, through the environment) at a throwaway
+database for the session instead of shared_cache/ in the working directory,
+and restore the original singleton afterwards.
+"""
+
+import os
+import sys
+import shutil
+import tempfile
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import shared_cache
+
+_SHARED_CACHE_ENV = 'PDF_TRANSLATOR_SHARED_CACHE'
+_saved = {}
+
+
+def pytest_configure(config):
+    root = tempfile.mkdtemp(prefix="shared_cache_tests_")
+    store = shared_cache._shared_cache
+    _saved.update(root=root, env=os.environ.get(_SHARED_CACHE_ENV), initialized=store.is_initialized(),
+                  store=store.get_instance() if store.is_initialized() else None)
+    os.environ[_SHARED_CACHE_ENV] = os.path.join(root, 'shared_cache.sqlite3')
+    store.reset()
+
+
+def pytest_unconfigure(config):
+    if not _saved:
+        return
+    store = shared_cache._shared_cache
+    if store.is_initialized() and store.get_instance() not in (None, _saved['store']):
+        store.get_instance().close()
+    if _saved['initialized']:
+        store.set_instance(_saved['store'])
+    else:
+        store.reset()
+    if _saved['env'] is None:
+        os.environ.pop(_SHARED_CACHE_ENV, None)
+    else:
+        os.environ[_SHARED_CACHE_ENV] = _saved['env']
+    shutil.rmtree(_saved['root'], ignore_errors=True)
@@ -0,0 +1,210 @@
+#!/usr/bin/env python3
+"""
+Test Script for the Compiled Classification Rule Engine
+
+Checks that the combined rule sets give the same answers as the original
+one-pattern-at-a-time helpers on a varied corpus, that batches evaluate each
+distinct block once and later lookups hit the cache, and that the helpers in
+the parser, strategy manager, Nougat-first processor and validator route
+through the engine.
+"""
+
+import os
+import re
+import sys
+import time
+import random
+import logging
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from classification_rules import ClassificationEngine, RuleSet, Rule, compute_features
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+SAMPLES = [
+    "1. Introduction", "INTRODUCTION TO METHODS", "Related Work", "Chapter 3 Results", "2.1 Setup",
+    "IV. Discussion", "A. Appendix material", "introduction", "4. methodology overview",
+    "• first bullet", "- dash item", "3) third", "b. lettered", "iv) roman item", "  * indented star",
+    "Figure 3: Accuracy by epoch", "fig. 2 - overview", "Table 1. Results", "Source: World Bank",
+    "Photo by the author", "(a) left panel", "(some parenthetical caption)", "Step 2: train",
+    "Abbildung 4: Aufbau", "図 1: 構成", "Overview of the system architecture", "Key: value pair",
+    "def train(model):\n    return model", "import numpy as np", "var x = 1;", "```python\nprint(1)\n```",
+    "The energy $E = mc^2$ is conserved", "\\begin{equation} a \\end{equation}", "x ≤ y and y ≥ z",
+    "Η ενέργεια α διατηρείται", "All rights reserved", "Page 12", "σελίδα 4", "42", "xiv", "ab",
+    "%%% 123 %%%", "# comment line", "<div>", "| a | b |\n|---|---|\n| 1 | 2 |", "col1\tcol2\tcol3",
+    "$$\\int_0^1 f(x) dx$$", "\\begin{align} x \\end{align}", "- item one\n- item two",
+    "This is an ordinary sentence in a paragraph that goes on for a while.", "", "   ",
+]
+
+# --- Original helper logic, one pattern at a time ---
+
+HEADING = [r'^\d+\.?\s+[A-Z]', r'^([A-Z]+\s){0,4}[A-Z]+$', r'^([A-Z][a-z]+\s){0,6}[A-Z][a-z]+$',
+           r'^(Chapter|Section|Part|Appendix)\s+\d+', r'^\d+\.\d+', r'^[IVX]+\.\s+[A-Z]', r'^[A-Z]\.\s+[A-Z]']
+SECTION = [r'^(introduction|conclusion|abstract|summary|overview)', r'^(background|methodology|results|discussion)',
+           r'^(references|bibliography|appendix|glossary)', r'^\d+\.\s*(introduction|background|method)']
+LIST_MARKER = [r'^\s*[•\-\*]\s+', r'^\s*\d+[\.\)]\s+', r'^\s*[a-zA-Z][\.\)]\s+']
+CAPTION = [r'^(figure|fig|image|diagram|chart|graph|table|schema|plate|exhibit)\s*\d*[:\.\-\s]',
+           r'^(fig\.|figure\.|table\.|chart\.|diagram\.)?\s*\d+[:\.\-\s]',
+           r'^(source|credit|copyright|adapted from|modified from)[:.\-\s]', r'^(photo|image)\s+(by|from|courtesy)',
+           r'^\([^)]+\)$', r'^(step|phase|stage|example|case)\s*\d*[:\.]', r'^(above|below|left|right)[:.\-\s]',
+           r'^(figura|tabela|esquema|gráfico)\s*\d*[:\.]', r'^(abbildung|tabelle|diagramm)\s*\d*[:\.]',
+           r'^(図|表|グラフ)\s*\d*[:\.]']
+KEYWORDS = ['showing', 'depicting', 'illustrating', 'displaying', 'overview', 'comparison', 'analysis',
+            'structure', 'process', 'workflow', 'system', 'model', 'framework']
+CODE = [r'```', r'^\s*def\s+\w+\(', r'^\s*class\s+\w+', r'^\s*import\s+\w+', r'^\s*from\s+\w+\s+import',
+        r'^\s*function\s+\w+\(', r'^\s*var\s+\w+\s*=', r'^\s*\w+\s*=\s*function\(']
+EQUATION = [r'\$.*?\$', r'\\\[.*?\\\]', r'\\begin\{equation\}', r'\\begin\{align\}', r'[∑∏∫∂∇±×÷≤≥≠≈∞]',
+            r'[αβγδεζηθικλμνξοπρστυφχψω]']
+SKIP = [r'^\s*all rights reserved\s*$', r'^\s*copyright\s+\d{4}', r'^\s*confidential\s*$', r'^\s*εμπιστευτικό\s*$',
+        r'^\s*page\s+\d+\s*$', r'^\s*σελίδα\s+\d+\s*$', r'^\s*\d+\s*$', r'^\s*[ivxlcdm]+\s*$']
+SKIP_CODE = [r'^\s*(def|class|import|from|if|for|while|try|except)\s+', r'^\s*[a-zA-Z_][a-zA-Z0-9_]*\s*=\s*',
+             r'^\s*#.*$', r'^\s*//.*$', r'^\s*/\*.*\*/\s*$', r'^\s*<[^>]+>\s*$']
+LIST_ITEM = LIST_MARKER + [r'^\s*[ivxlcdm]+[\.\)]\s+']
+
+
+def _legacy_caption(text):
+    if not text or len(text.strip()) < 5:
+        return False
+    text_lower, text_clean = text.lower().strip(), text.strip()
+    if any(re.search(pattern, text_lower) for pattern in CAPTION):
+        return True
+    word_count = len(text_clean.split())
+    if word_count <= 15 and not text_clean.endswith(('.', '!', '?')) and any(k in text_lower for k in KEYWORDS):
+        return True
+    if re.match(r'^\([a-z0-9]+\)', text_lower):
+        return True
+    if ':' in text_clean and word_count <= 20:
+        return True
+    return word_count <= 25 and ('*' in text_clean or '_' in text_clean or text_clean.isupper() or text_clean.islower())
+
+
+def _legacy_skip(text):
+    text_lower = text.lower().strip()
+    if any(re.match(pattern, text_lower, re.IGNORECASE) for pattern in SKIP):
+        return True
+    if any(re.match(pattern, text, re.MULTILINE) for pattern in SKIP_CODE):
+        return True
+    if len(text.strip()) < 3:
+        return True
+    alpha_chars = sum(1 for c in text if c.isalpha())
+    return len(text) > 0 and alpha_chars / len(text) < 0.3
+
+
+def _legacy_structured(text):
+    if re.search(r'\|.*\|', text, re.MULTILINE):
+        return 'table'
+    if re.search(r'```[\s\S]*?```', text, re.MULTILINE):
+        return 'code_block'
+    if re.search(r'\$\$[\s\S]*?\$\$', text) or re.search(r'\\begin\{(\w+)\}[\s\S]*?\\end\{\1\}', text):
+        return 'latex_formula'
+    if re.search(r'^[\s]*[-*+]\s+', text, re.MULTILINE) or re.search(r'^[\s]*\d+\.\s+', text, re.MULTILINE):
+        return 'list'
+    return None
+
+
+def _legacy_features(text):
+    clean = text.strip()
+    return {
+        'heading_pattern': any(re.search(pattern, clean) for pattern in HEADING),
+        'section_start': any(re.search(pattern, clean.lower()) for pattern in SECTION),
+        'list_marker': any(re.match(pattern, clean) for pattern in LIST_MARKER),
+        'list_item': any(re.match(pattern, text, re.IGNORECASE) for pattern in LIST_ITEM),
+        'caption': _legacy_caption(text),
+        'code_block': any(re.search(pattern, text, re.MULTILINE) for pattern in CODE),
+        'equation': any(re.search(pattern, text) for pattern in EQUATION),
+        'skip_translation': _legacy_skip(text),
+        'structured_type': _legacy_structured(text),
+    }
+
+
+def _corpus(size, seed=7):
+    rng = random.Random(seed)
+    words = "the model of data results system table figure energy page value".split()
+    corpus = []
+    for _ in range(size):
+        base = rng.choice(SAMPLES)
+        if rng.random() < 0.5:
+            base = f"{base} {' '.join(rng.choices(words, k=rng.randint(0, 12)))}"
+        corpus.append(base)
+    return corpus
+
+
+def test_engine_matches_original_helpers():
+    for text in SAMPLES + _corpus(3000):
+        features = compute_features(text)
+        for name, expected in _legacy_features(text).items():
+            assert getattr(features, name) == expected, (name, text)
+
+
+def test_rule_set_combination():
+    rules = RuleSet('demo', [Rule('anchored', r'^\d+', anchored=True), Rule('ci', r'word', re.IGNORECASE),
+                             Rule('multiline', r'^end$', re.MULTILINE), Rule('backref', r'(\w)\1')])
+    assert rules.first_match("12 abc") == 'anchored'
+    assert rules.first_match("x\n12") is None
+    assert rules.first_match("a WORD here") == 'ci'
+    assert rules.first_match("start\nend") == 'multiline'
+    assert rules.first_match("xyzzy") == 'backref'
+
+
+def test_batch_cache_and_speed():
+    corpus = _corpus(20000, seed=11)
+    engine = ClassificationEngine(max_cache_entries=100000)
+
+    start = time.perf_counter()
+    legacy = [_legacy_features(text) for text in corpus]
+    legacy_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    batched = engine.classify_batch(corpus)
+    batch_seconds = time.perf_counter() - start
+    distinct = len(set(corpus))
+    stats = engine.get_statistics()
+    assert stats['misses'] == distinct and stats['hits'] == len(corpus) - distinct
+
+    # Per-block lookups after the batch pass are cache hits
+    assert all(engine.features(text) is features for text, features in zip(corpus[:500], batched[:500]))
+    assert engine.get_statistics()['misses'] == distinct
+    assert [features.caption for features in batched] == [row['caption'] for row in legacy]
+
+    logger.info(f"Legacy {legacy_seconds * 1e6 / len(corpus):.1f} µs/block, "
+                f"batched {batch_seconds * 1e6 / len(corpus):.1f} µs/block ({distinct} distinct)")
+    assert batch_seconds < legacy_seconds
+
+    bounded = ClassificationEngine(max_cache_entries=10)
+    bounded.classify_batch(corpus[:1000])
+    assert bounded.get_statistics()['cached_blocks'] == 10
+
+
+def test_helpers_route_through_engine():
+    from translation_strategy_manager import TranslationStrategyManager
+    from structured_content_validator import StructuredContentValidator, ContentType
+    from nougat_first_processor import NougatFirstProcessor
+    from pdf_parser import StructuredContentExtractor
+
+    manager = TranslationStrategyManager()
+    assert manager._should_skip_translation("Page 12")
+    assert not manager._should_skip_translation("A real sentence to translate.")
+
+    validator = StructuredContentValidator()
+    assert validator._detect_content_type("| a | b |") == ContentType.TABLE
+    assert validator._detect_content_type("$$x$$") == ContentType.LATEX_FORMULA
+    assert validator._detect_content_type("plain") == ContentType.UNKNOWN
+
+    processor = NougatFirstProcessor.__new__(NougatFirstProcessor)
+    assert processor._is_list_item("iv) roman item") and not processor._is_list_item("plain text")
+    assert processor._is_table_content("a | b\nc | d")
+
+    extractor = StructuredContentExtractor.__new__(StructuredContentExtractor)
+    assert extractor._is_likely_caption("Figure 3: Accuracy by epoch")
+    assert extractor._has_heading_patterns("2.1 Setup")
+    assert extractor._is_code_block("import numpy as np") and extractor._is_equation("x ≤ y")
+
+
+if __name__ == "__main__":
+    test_engine_matches_original_helpers()
+    test_rule_set_combination()
+    test_batch_cache_and_speed()
+    test_helpers_route_through_engine()
+    logger.info("✅ Classification rule engine tests passed")
@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""
+Test Script for Concurrent Batch Translation
+
+Checks that UltimatePDFTranslator._translate_batches keeps several groups in
+flight, reassembles results in the original order even when responses arrive
+out of order, falls back to the original items for a failed group only, and
+reports per-request telemetry to the adaptive batch optimizer.
+"""
+
+import os
+import sys
+import asyncio
+import logging
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import main_workflow
+from optimization_manager import optimization_manager, AdaptiveBatchOptimizer
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+
+class FakeTranslationService:
+    """Translates by upper-casing, answering later groups first"""
+
+    def __init__(self, fail_on=None):
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.fail_on = fail_on
+
+    async def translate_text(self, text, target_language=None, style_guide=""):
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            # Earlier groups have longer texts, so they finish last
+            await asyncio.sleep(len(text) / 20000)
+            if self.fail_on and self.fail_on in text:
+                raise RuntimeError("simulated API error")
+            return text.upper()
+        finally:
+            self.in_flight -= 1
+
+
+def _make_batches():
+    batches = []
+    for batch_idx in range(3):
+        batch = []
+        for group_idx in range(4):
+            index = batch_idx * 4 + group_idx
+            filler = "x" * (200 * (12 - index))
+            batch.append([{'text': f"item {index} a {filler}", 'page_num': 1, 'block_num': index * 2},
+                          {'text': f"item {index} b", 'page_num': 1, 'block_num': index * 2 + 1}])
+        batches.append(batch)
+    return batches
+
+
+def _run(fake_service):
+    original_service = main_workflow.translation_service
+    main_workflow.translation_service = fake_service
+    try:
+        translator = main_workflow.UltimatePDFTranslator()
+        return asyncio.run(translator._translate_batches(_make_batches(), "Greek", ""))
+    finally:
+        main_workflow.translation_service = original_service
+
+
+def test_groups_run_concurrently_and_keep_order():
+    fake_service = FakeTranslationService()
+    translated = _run(fake_service)
+
+    assert fake_service.max_in_flight > 1
+    assert [item['block_num'] for item in translated] == list(range(24))
+    assert translated[0]['text'].startswith("ITEM 0 A")
+    assert translated[23]['text'] == "ITEM 11 B"
+
+
+def test_failed_group_keeps_original_items():
+    translated = _run(FakeTranslationService(fail_on="item 5 b"))
+
+    assert translated[10]['text'].startswith("item 5 a")
+    assert translated[11]['text'] == "item 5 b"
+    assert translated[12]['text'].startswith("ITEM 6 A")
+
+
+def test_telemetry_reaches_adaptive_optimizer():
+    records = []
+    original_record = optimization_manager.record_batch_performance
+
+    def recording(batch_size, processing_time, success_rate):
+        records.append((batch_size, processing_time, success_rate))
+        original_record(batch_size, processing_time, success_rate)
+
+    optimization_manager.record_batch_performance = recording
+    try:
+        _run(FakeTranslationService(fail_on="item 3 b"))
+    finally:
+        del optimization_manager.record_batch_performance
+
+    # One record per request, sized by the combined group text
+    assert len(records) == 12
+    assert sum(1 for _, _, success_rate in records if success_rate == 0.0) == 1
+    assert all(batch_size > 0 and processing_time > 0 for batch_size, processing_time, _ in records)
+    assert optimization_manager.adaptive_batcher.performance_history
+
+
+def test_optimizer_tunes_towards_throughput_and_backs_off_on_errors():
+    optimizer = AdaptiveBatchOptimizer()
+    optimizer.optimal_batch_size = 12000
+    # Larger requests deliver more characters per second
+    for size, latency in ((9000, 3.0), (12000, 3.5), (18000, 4.0)):
+        optimizer.record_performance(size, latency, 1.0)
+    assert optimizer.get_optimal_batch_size() > 12000
+
+    tuned = optimizer.get_optimal_batch_size()
+    for _ in range(10):
+        optimizer.record_performance(18000, 30.0, 0.0)
+    assert optimizer.get_error_rate() > 0.2
+    assert optimizer.get_optimal_batch_size() < tuned
+
+
+if __name__ == "__main__":
+    test_groups_run_concurrently_and_keep_order()
+    test_failed_group_keeps_original_items()
+    test_telemetry_reaches_adaptive_optimizer()
+    test_optimizer_tunes_towards_throughput_and_backs_off_on_errors()
+    logger.info("✅ Concurrent batch translation tests passed")
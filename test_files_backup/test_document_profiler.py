@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+Test Script for the Document Profiling Engine
+
+Checks that sharded profiling matches in-process profiling and that
+profiles are served from the on-disk cache on re-runs.
+"""
+
+import os
+import sys
+import logging
+import tempfile
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import fitz
+
+from document_profiler import DocumentProfiler, page_profile_to_record, page_profile_from_record
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+
+def _create_sample_pdf(path, pages=12):
+    doc = fitz.open()
+    for i in range(pages):
+        page = doc.new_page()
+        if i % 3 == 0:
+            page.insert_text((50, 60), f"Theorem {i}: the integral and derivative of the equation")
+        else:
+            page.insert_text((50, 60), f"Plain paragraph text on page {i + 1}.")
+    doc.save(path)
+    doc.close()
+
+
+def test_sharded_profiles_match_single_worker():
+    """Sharding across a process pool returns the same profiles, in page order"""
+    with tempfile.TemporaryDirectory() as tmp:
+        pdf_path = os.path.join(tmp, "sample.pdf")
+        _create_sample_pdf(pdf_path)
+
+        single = DocumentProfiler(cache_dir=os.path.join(tmp, "c1"), max_workers=1, use_cache=False)
+        sharded = DocumentProfiler(cache_dir=os.path.join(tmp, "c2"), max_workers=3,
+                                   pages_per_shard=4, min_pages_for_pool=1, use_cache=False)
+
+        expected = single.profile_document(pdf_path)
+        actual = sharded.profile_document(pdf_path)
+
+        assert [p.page_number for p in actual] == list(range(1, 13))
+        assert actual == expected
+
+
+def test_profiles_are_cached_by_content_hash():
+    """A second profiler (new process, same PDF bytes) reads profiles from disk"""
+    with tempfile.TemporaryDirectory() as tmp:
+        pdf_path = os.path.join(tmp, "sample.pdf")
+        _create_sample_pdf(pdf_path)
+        cache_dir = os.path.join(tmp, "cache")
+
+        first = DocumentProfiler(cache_dir=cache_dir, max_workers=1)
+        profiles = first.profile_document(pdf_path)
+
+        # Same bytes under a different name must still hit the cache
+        copy_path = os.path.join(tmp, "renamed.pdf")
+        with open(pdf_path, 'rb') as src, open(copy_path, 'wb') as dst:
+            dst.write(src.read())
+
+        second = DocumentProfiler(cache_dir=cache_dir, max_workers=1)
+        cached = second.profile_document(copy_path)
+
+        assert cached == profiles
+        assert second.get_statistics()['cache_hits'] == 1
+        assert second.get_statistics()['pages_profiled'] == 0
+
+
+def test_record_round_trip():
+    """Profile records survive a round trip through the compact record format"""
+    with tempfile.TemporaryDirectory() as tmp:
+        pdf_path = os.path.join(tmp, "sample.pdf")
+        _create_sample_pdf(pdf_path, pages=2)
+
+        profiles = DocumentProfiler(cache_dir=tmp, max_workers=1, use_cache=False).profile_document(pdf_path)
+        for profile in profiles:
+            assert page_profile_from_record(page_profile_to_record(profile)) == profile
+
+
+if __name__ == "__main__":
+    test_sharded_profiles_match_single_worker()
+    test_profiles_are_cached_by_content_hash()
+    test_record_round_trip()
+    logger.info("✅ Document profiler tests passed")
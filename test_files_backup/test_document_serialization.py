@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+"""
+Test Script for Binary Document Serialization
+
+Checks that Documents from both document models survive a round trip through
+the columnar binary format, that a page range loads only the blocks of those
+pages from a memory-mapped checkpoint, that worker block lists round-trip,
+and that the format is smaller than the JSON dict tree it replaces.
+"""
+
+import os
+import sys
+import json
+import logging
+import tempfile
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import document_model
+from structured_document_model import (
+    Document, Heading, Paragraph, ImagePlaceholder, Table, Caption, ContentType,
+    convert_document_to_legacy_format
+)
+from document_serialization import (
+    serialize_document, deserialize_document, serialize_blocks, deserialize_blocks,
+    save_document, load_document, read_document_header, DocumentFormatError
+)
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+
+def _make_document(pages=30):
+    blocks = []
+    for page in range(1, pages + 1):
+        blocks.append(Heading(block_type=ContentType.HEADING, original_text=f"Section {page}", page_num=page,
+                              bbox=(72.0, 60.5, 540.0, 80.25), block_num=0, level=2,
+                              formatting={'font': 'Times-Bold', 'size': 14.0}))
+        for i in range(8):
+            blocks.append(Paragraph(block_type=ContentType.PARAGRAPH, page_num=page, block_num=i + 1,
+                                    original_text=f"Η παράγραφος {i} της σελίδας {page} with English text.",
+                                    bbox=(72.0, 90.0 + 40 * i, 540.0, 125.0 + 40 * i),
+                                    formatting={'font': 'Times-Roman', 'size': 11.0}))
+        image = ImagePlaceholder(block_type=ContentType.IMAGE_PLACEHOLDER, original_text="", page_num=page,
+                                 bbox=(100, 400, 300, 550), image_path=f"images/page_{page}_img_1.png",
+                                 width=200, height=150, spatial_relationship="before")
+        blocks.append(image)
+        blocks.append(Caption(block_type=ContentType.CAPTION, original_text=f"Figure {page}.", page_num=page,
+                              bbox=(100, 555, 300, 570), target_type="figure", target_block_id=image.block_id))
+        blocks.append(Table(block_type=ContentType.TABLE, original_text="| a | b |\n| 1 | 2 |", page_num=page,
+                            bbox=(72, 600, 540, 700), rows=[["a", "b"], ["1", "2"]], headers=["a", "b"]))
+    return Document(title="Sample Paper", content_blocks=blocks, metadata={'extraction_method': 'test'},
+                    source_filepath="/tmp/sample.pdf", total_pages=pages)
+
+
+def test_structured_document_round_trip():
+    document = _make_document()
+    restored = deserialize_document(serialize_document(document))
+
+    assert restored.title == document.title
+    assert restored.metadata == document.metadata
+    assert restored.total_pages == document.total_pages
+    assert restored.content_blocks == document.content_blocks
+    assert [type(block) for block in restored.content_blocks] == [type(block) for block in document.content_blocks]
+    assert restored.content_blocks[1].formatting is not restored.content_blocks[2].formatting
+
+    empty = deserialize_document(serialize_document(Document(title="Empty")))
+    assert empty.content_blocks == [] and empty.title == "Empty"
+
+
+def test_document_model_round_trip():
+    document = document_model.Document(title="Legacy", toc_entries=[{'text': 'Intro', 'level': 1}])
+    for number in (1, 2, 3):
+        page = document_model.Page(page_number=number, page_metadata={'width': 612})
+        page.add_block(document_model.Heading(content=f"Heading {number}", level=1))
+        page.add_block(document_model.Footnote(content="A note", reference_id="1", font_info={'size': 8}))
+        page.add_block(document_model.Table(content="t", rows=2, columns=2, headers=['x', 'y']))
+        document.add_page(page)
+
+    restored = deserialize_document(serialize_document(document))
+    assert restored.to_dict() == document.to_dict()
+
+    second_page = deserialize_document(serialize_document(document), page_range=(2, 2))
+    assert [page.page_number for page in second_page.pages] == [2]
+    assert second_page.pages[0].content_blocks == document.pages[1].content_blocks
+
+
+def test_checkpoint_page_range_load():
+    document = _make_document()
+    with tempfile.TemporaryDirectory() as root:
+        path = save_document(document, os.path.join(root, "checkpoint.pdoc"))
+        header = read_document_header(path)
+        assert header['block_count'] == len(document.content_blocks)
+        assert header['document']['title'] == "Sample Paper"
+
+        partial = load_document(path, page_range=(10, 12))
+        assert {block.page_num for block in partial.content_blocks} == {10, 11, 12}
+        assert partial.content_blocks == [block for block in document.content_blocks if 10 <= block.page_num <= 12]
+        assert load_document(path).content_blocks == document.content_blocks
+
+        with open(os.path.join(root, "broken.pdoc"), 'wb') as f:
+            f.write(b"not a document at all")
+        try:
+            load_document(os.path.join(root, "broken.pdoc"))
+            assert False, "expected DocumentFormatError"
+        except DocumentFormatError:
+            pass
+
+
+def test_worker_blocks_and_size():
+    document = _make_document()
+    page_blocks = document.get_blocks_by_page(5)
+    assert deserialize_blocks(serialize_blocks(page_blocks)) == page_blocks
+
+    binary_size = len(serialize_document(document))
+    json_size = len(json.dumps(convert_document_to_legacy_format(document), ensure_ascii=False).encode('utf-8'))
+    assert binary_size < json_size
+
+
+if __name__ == "__main__":
+    test_structured_document_round_trip()
+    test_document_model_round_trip()
+    test_checkpoint_page_range_load()
+    test_worker_blocks_and_size()
+    logger.info("✅ Document serialization tests passed")
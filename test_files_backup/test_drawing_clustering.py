@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+"""
+Test Script for Vector Drawing Clustering in NougatFirstProcessor
+
+Checks that nearby paths are merged into one figure region, that separate
+figures stay separate, and that a diagram page made of hundreds of paths
+yields a handful of rendered regions instead of one element per path.
+Also checks that NougatIntegration.analyze_visual_elements never reads
+region output left behind by an earlier call.
+"""
+
+import os
+import sys
+import logging
+import tempfile
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import fitz
+import nougat_integration
+from nougat_integration import NougatIntegration
+from nougat_first_processor import NougatFirstProcessor, cluster_drawing_rects
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+
+def test_cluster_merges_nearby_paths_only():
+    rects = [
+        (10, 10, 50, 12), (10, 15, 50, 17), (52, 10, 60, 40),  # one figure
+        (300, 300, 340, 340), (345, 300, 380, 340),             # another
+        (500, 700, 560, 701)                                     # isolated rule
+    ]
+    regions = cluster_drawing_rects(rects, merge_distance=8.0)
+
+    assert [members for _, members in regions] == [[0, 1, 2], [3, 4], [5]]
+    assert regions[0][0] == (10, 10, 60, 40)
+
+
+def test_enclosing_regions_are_merged():
+    # Two groups far apart in path terms, but one region box contains the other
+    rects = [(0, 0, 200, 1), (0, 199, 200, 200), (0, 0, 1, 200), (199, 0, 200, 200),
+             (90, 90, 110, 110)]
+    regions = cluster_drawing_rects(rects, merge_distance=2.0)
+
+    assert len(regions) == 1
+    assert regions[0][1] == [0, 1, 2, 3, 4]
+
+
+def test_diagram_page_produces_few_regions():
+    processor = NougatFirstProcessor()
+    doc = fitz.open()
+    page = doc.new_page(width=612, height=792)
+
+    # A wiring diagram: a 20x20 grid of short segments, plus a separate chart
+    for row in range(20):
+        for col in range(20):
+            x, y = 50 + col * 10, 50 + row * 10
+            page.draw_line((x, y), (x + 8, y))
+            page.draw_line((x, y), (x, y + 8))
+    for bar in range(10):
+        page.draw_rect(fitz.Rect(100 + bar * 20, 500, 115 + bar * 20, 700 - bar * 10), fill=(0, 0, 1))
+    # A horizontal rule that should not become a figure
+    page.draw_line((50, 760), (560, 760))
+
+    drawing_count = len(page.get_drawings())
+    with tempfile.TemporaryDirectory() as images_dir:
+        elements = processor._extract_drawing_regions_page(page, 1, images_dir)
+
+        assert drawing_count > 100
+        assert len(elements) == 2
+        assert all(os.path.exists(element.source_path) for element in elements)
+        assert sum(element.reconstruction_data['drawing_count'] for element in elements) == drawing_count - 1
+    doc.close()
+
+
+def test_visual_analysis_ignores_earlier_region_output():
+    with tempfile.TemporaryDirectory() as root:
+        integration = NougatIntegration.__new__(NougatIntegration)
+        integration.nougat_available = True
+        integration.temp_dir = os.path.join(root, "nougat_temp")
+
+        images = []
+        for i in range(2):
+            image_path = os.path.join(root, f"figure_{i}.png")
+            pixmap = fitz.Pixmap(fitz.csRGB, fitz.IRect(0, 0, 40, 30), False)
+            pixmap.set_rect(pixmap.irect, (40 * i, 80, 120))
+            pixmap.save(image_path)
+            images.append(image_path)
+
+        skipped = set()
+
+        class FakeRun:
+            returncode = 0
+            stderr = ""
+
+        def fake_run(cmd, **kwargs):
+            tokens = cmd.split()
+            out_dir = tokens[tokens.index('-o') + 1]
+            for pdf_path in (token for token in tokens if token.endswith('.pdf')):
+                if pdf_path in skipped:
+                    continue
+                stem = os.path.splitext(os.path.basename(pdf_path))[0]
+                with open(os.path.join(out_dir, f"{stem}.mmd"), 'w', encoding='utf-8') as f:
+                    f.write(f"output of run for {stem}")
+            return FakeRun()
+
+        original_run = nougat_integration.subprocess.run
+        nougat_integration.subprocess.run = fake_run
+        try:
+            first = integration.analyze_visual_elements(images)
+            assert set(first) == set(images)
+
+            # Second run: Nougat exits 0 but writes nothing for the second region
+            image_to_pdf = integration._image_to_pdf
+
+            def image_to_pdf_skipping_second(image_path, pdf_path):
+                if image_path == images[1]:
+                    skipped.add(pdf_path)
+                return image_to_pdf(image_path, pdf_path)
+
+            integration._image_to_pdf = image_to_pdf_skipping_second
+            second = integration.analyze_visual_elements(images)
+            single = integration.analyze_visual_element(images[1])
+        finally:
+            nougat_integration.subprocess.run = original_run
+
+        assert set(second) == {images[0]}
+        assert single is None
+        assert os.listdir(integration.temp_dir) == []
+
+
+if __name__ == "__main__":
+    test_cluster_merges_nearby_paths_only()
+    test_enclosing_regions_are_merged()
+    test_diagram_page_produces_few_regions()
+    test_visual_analysis_ignores_earlier_region_output()
+    logger.info("✅ Drawing clustering tests passed")
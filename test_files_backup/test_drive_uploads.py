@@ -0,0 +1,171 @@
+#!/usr/bin/env python3
+"""
+Test Script for Background Google Drive Uploads
+
+Runs the upload subsystem against LocalDriveBackend (a local fake of the
+Drive resumable protocol) and checks that queueing never blocks the caller,
+that concurrency is bounded, that dropped connections resume from the last
+committed byte instead of byte 0, that an upload interrupted by a crash
+resumes from its persisted session in the next run, and that uploads still
+queued when the process exits are finished rather than dropped.
+"""
+
+import os
+import sys
+import time
+import logging
+import tempfile
+import textwrap
+import subprocess
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from drive_uploader import (
+    BackgroundUploadManager, GoogleDriveUploader, LocalDriveBackend, DRIVE_CHUNK_GRANULARITY
+)
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+
+def _make_file(directory, name, size):
+    path = os.path.join(directory, name)
+    with open(path, 'wb') as f:
+        f.write(os.urandom(size))
+    return path
+
+
+def _read(path):
+    with open(path, 'rb') as f:
+        return f.read()
+
+
+def test_queueing_does_not_block_and_concurrency_is_bounded():
+    with tempfile.TemporaryDirectory() as root:
+        backend = LocalDriveBackend(os.path.join(root, 'drive'), latency=0.05)
+        manager = BackgroundUploadManager(backend, max_concurrent_uploads=2,
+                                          chunk_size=DRIVE_CHUNK_GRANULARITY)
+        paths = [_make_file(root, f"doc_{i}.pdf", 3 * DRIVE_CHUNK_GRANULARITY) for i in range(5)]
+
+        start = time.perf_counter()
+        jobs = [manager.submit(path, os.path.basename(path), 'folder') for path in paths]
+        assert time.perf_counter() - start < 0.1
+        assert any(not job.done() for job in jobs)
+
+        results = manager.wait(jobs)
+        manager.shutdown()
+
+        assert len(results) == 5
+        assert backend.max_active_uploads == 2
+        for job in jobs:
+            stored = backend.files[job.result['file_id']]
+            assert _read(stored['path']) == _read(job.filepath)
+
+
+def test_dropped_connections_resume_from_committed_offset():
+    with tempfile.TemporaryDirectory() as root:
+        backend = LocalDriveBackend(os.path.join(root, 'drive'))
+        manager = BackgroundUploadManager(backend, chunk_size=DRIVE_CHUNK_GRANULARITY, retry_base_delay=0.01)
+        size = 4 * DRIVE_CHUNK_GRANULARITY + 1234
+        path = _make_file(root, "large.pdf", size)
+
+        backend.fail_next(3)
+        job = manager.submit(path, "large.pdf", 'folder')
+        result = job.wait(timeout=30)
+        manager.shutdown()
+
+        assert result is not None and job.status == 'completed'
+        assert job.attempts == 4
+        # Nothing was sent twice: every retry continued where the server stopped
+        assert backend.bytes_received == size
+        assert _read(backend.files[result['file_id']]['path']) == _read(path)
+
+
+def test_interrupted_upload_resumes_in_next_run():
+    with tempfile.TemporaryDirectory() as root:
+        backend = LocalDriveBackend(os.path.join(root, 'drive'))
+        state_path = os.path.join(root, 'sessions.json')
+        size = 3 * DRIVE_CHUNK_GRANULARITY
+        path = _make_file(root, "report.docx", size)
+
+        # First run gives up after the connection drops
+        first = BackgroundUploadManager(backend, chunk_size=DRIVE_CHUNK_GRANULARITY, max_retries=0,
+                                        session_state_path=state_path)
+        backend.fail_next(1)
+        job = first.submit(path, "report.docx", 'folder')
+        assert job.wait(timeout=30) is None and job.status == 'failed'
+        first.shutdown()
+        assert os.path.exists(state_path)
+
+        # Second run picks up the saved session
+        second = BackgroundUploadManager(backend, chunk_size=DRIVE_CHUNK_GRANULARITY,
+                                         session_state_path=state_path)
+        job = second.submit(path, "report.docx", 'folder')
+        assert job.wait(timeout=30) is not None
+        second.shutdown()
+
+        assert backend.bytes_received == size
+        assert len(backend.files) == 1
+
+        # An expired session falls back to a fresh upload
+        third = BackgroundUploadManager(backend, chunk_size=DRIVE_CHUNK_GRANULARITY, max_retries=0,
+                                        session_state_path=state_path)
+        backend.fail_next(1)
+        assert third.submit(path, "report.docx", 'folder').wait(timeout=30) is None
+        backend.expire_sessions()
+        third.max_retries = 2
+        assert third.submit(path, "report.docx", 'folder').wait(timeout=30) is not None
+        third.shutdown()
+
+
+def test_uploader_queues_document_outputs():
+    with tempfile.TemporaryDirectory() as root:
+        backend = LocalDriveBackend(os.path.join(root, 'drive'), latency=0.02)
+        uploader = GoogleDriveUploader(upload_backend=backend)
+        uploader.target_folder_id = 'folder'
+        uploader.drive_settings['background_uploads'] = True
+        uploader.drive_settings['upload_sessions_file'] = os.path.join(root, 'sessions.json')
+        files = [{'filepath': _make_file(root, "paper_translated.docx", 1000), 'filename': "paper_translated.docx"},
+                 {'filepath': os.path.join(root, "missing.pdf"), 'filename': "missing.pdf"}]
+
+        jobs = uploader.upload_files(files)
+        assert len(jobs) == 1
+        assert uploader.has_pending_uploads()
+
+        results = uploader.wait_for_uploads()
+        assert [result['filename'] for result in results] == ["paper_translated.docx"]
+        assert not uploader.has_pending_uploads()
+        assert "Successfully uploaded: 1 files" in uploader.get_upload_summary(jobs)
+        assert GoogleDriveUploader.count_completed_uploads(jobs) == 1
+        uploader.upload_manager.shutdown()
+
+
+def test_queued_uploads_finish_before_exit():
+    with tempfile.TemporaryDirectory() as root:
+        _make_file(root, "paper_translated.pdf", 3 * DRIVE_CHUNK_GRANULARITY)
+        # A script that queues an upload and exits without waiting for it
+        script = textwrap.dedent(f"""
+            import sys
+            sys.path.insert(0, {repr(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))})
+            from drive_uploader import BackgroundUploadManager, LocalDriveBackend, DRIVE_CHUNK_GRANULARITY
+            backend = LocalDriveBackend({repr(os.path.join(root, 'drive'))}, latency=0.1)
+            manager = BackgroundUploadManager(backend, chunk_size=DRIVE_CHUNK_GRANULARITY)
+            job = manager.submit({repr(os.path.join(root, 'paper_translated.pdf'))}, "paper_translated.pdf")
+            assert job.status == 'queued'
+        """)
+        completed = subprocess.run([sys.executable, "-c", script], cwd=root, capture_output=True, text=True,
+                                   timeout=60)
+        assert completed.returncode == 0, completed.stderr
+
+        uploaded = os.listdir(os.path.join(root, 'drive'))
+        assert len(uploaded) == 1
+        assert os.path.getsize(os.path.join(root, 'drive', uploaded[0])) == 3 * DRIVE_CHUNK_GRANULARITY
+
+
+if __name__ == "__main__":
+    test_queueing_does_not_block_and_concurrency_is_bounded()
+    test_dropped_connections_resume_from_committed_offset()
+    test_interrupted_upload_resumes_in_next_run()
+    test_uploader_queues_document_outputs()
+    test_queued_uploads_finish_before_exit()
+    logger.info("✅ Drive upload tests passed")
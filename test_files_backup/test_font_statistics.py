@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""
+Test Script for the Histogram-Based Font Statistics Engine
+
+Checks that page shards merge into the same statistics as a single pass,
+that heading sizes match a KDE over every individual span, that flat-topped
+density peaks are found, and that the pooled document path agrees with the
+in-process path.
+"""
+
+import os
+import sys
+import logging
+import tempfile
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import numpy as np
+import fitz
+
+from font_statistics import (
+    FontStatisticsAccumulator, accumulate_pages, analyze_font_statistics,
+    collect_document_font_statistics, _find_density_peaks
+)
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+
+def _span(text, size, font="Times", flags=0):
+    return {"text": text, "size": size, "font": font, "flags": flags}
+
+
+def _page_dict(page_num, body_lines=6):
+    spans = [_span(f"Chapter {page_num}", 20.0, "Times-Bold", 16),
+             _span(f"Section {page_num}.1", 15.0, "Times-Bold", 16)]
+    spans += [_span("Body text of the chapter with enough characters.", 10.5)
+              for _ in range(body_lines)]
+    return {"blocks": [{"lines": [{"spans": [span]} for span in spans]}]}
+
+
+def test_shards_merge_to_single_pass():
+    pages = [_page_dict(i) for i in range(30)]
+    single = analyze_font_statistics(accumulate_pages(pages))
+
+    merged = FontStatisticsAccumulator()
+    for start in range(0, 30, 7):
+        merged.merge(accumulate_pages(pages[start:start + 7]))
+
+    assert analyze_font_statistics(merged) == single
+    assert merged.pages == 30
+
+
+def test_heading_sizes_match_span_level_kde():
+    pages = [_page_dict(i, body_lines=2) for i in range(40)]
+    profile = analyze_font_statistics(accumulate_pages(pages))
+
+    assert profile['dominant_font_size'] == 10.5
+    assert profile['body_text_style'].startswith("Times, 10.5pt")
+    # The largest size sits on the edge of the density grid, so (as before)
+    # only the interior 15pt peak becomes a heading level
+    assert len(profile['font_hierarchy']) == 1
+    assert abs(next(iter(profile['font_hierarchy'])) - 15.0) <= 0.5
+
+    try:
+        from scipy import stats
+        from scipy.signal import find_peaks
+    except ImportError:
+        return
+
+    # Reference: the previous implementation ran a KDE over every span size
+    sizes = np.array([span["size"] for page in pages for block in page["blocks"]
+                      for line in block["lines"] for span in line["spans"]])
+    grid = np.linspace(sizes.min(), sizes.max(), 100)
+    density = stats.gaussian_kde(sizes)(grid)
+    peaks, _ = find_peaks(density, height=0.1 * np.max(density))
+    expected = [s for s in sorted(grid[peaks], reverse=True) if s > 10.5 + np.std(sizes)][:6]
+
+    assert np.allclose(sorted(profile['heading_font_sizes'], reverse=True), expected)
+
+
+def test_flat_topped_peaks_are_found():
+    # Two equal adjacent bins form one peak, reported at the plateau's middle
+    density = np.array([0.0, 1.0, 3.0, 3.0, 1.0, 0.5, 2.0, 2.0, 2.0, 0.0, 4.0, 4.0])
+    assert _find_density_peaks(density, min_height=0.5).tolist() == [2, 7]
+    assert _find_density_peaks(density, min_height=2.5).tolist() == [2]
+    assert _find_density_peaks(np.array([1.0, 1.0, 1.0]), min_height=0.0).tolist() == []
+
+    try:
+        from scipy.signal import find_peaks
+    except ImportError:
+        return
+    assert _find_density_peaks(density, min_height=0.5).tolist() == find_peaks(density, height=0.5)[0].tolist()
+
+
+def test_pooled_document_statistics_match_in_process():
+    with tempfile.TemporaryDirectory() as tmp:
+        pdf_path = os.path.join(tmp, "fonts.pdf")
+        doc = fitz.open()
+        for i in range(6):
+            page = doc.new_page()
+            page.insert_text((50, 60), f"Heading {i}", fontsize=18)
+            page.insert_text((50, 100), "Body text line for the font statistics test.", fontsize=11)
+        doc.save(pdf_path)
+        doc.close()
+
+        with fitz.open(pdf_path) as doc:
+            in_process = collect_document_font_statistics(doc, max_workers=1)
+            pooled = collect_document_font_statistics(doc, max_workers=2, min_pages_for_pool=1, pages_per_shard=2)
+
+        assert analyze_font_statistics(pooled) == analyze_font_statistics(in_process)
+        assert pooled.span_count == 12
+
+
+def test_empty_document_uses_defaults():
+    profile = analyze_font_statistics(FontStatisticsAccumulator())
+    assert profile['dominant_font_size'] == 12.0
+    assert profile['font_hierarchy'] == {}
+
+
+if __name__ == "__main__":
+    test_shards_merge_to_single_pass()
+    test_heading_sizes_match_span_level_kde()
+    test_flat_topped_peaks_are_found()
+    test_pooled_document_statistics_match_in_process()
+    test_empty_document_uses_defaults()
+    logger.info("✅ Font statistics tests passed")
@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""
+Test Script for Hot-Path Logging
+
+Checks that HotPathLogger counts every event but only emits the first few and
+then one in every `sample_every`, that the per-event rate limit caps bursts,
+that flush reports one aggregated line per stage, that arguments (including
+preview()) are only formatted when a record is emitted, and that a per-item
+loop is cheaper through the hot-path logger than through logger.info f-strings.
+"""
+
+import io
+import os
+import sys
+import time
+import logging
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from hot_path_logging import HotPathLogger, preview
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+
+class _RecordingHandler(logging.Handler):
+    def __init__(self):
+        super().__init__()
+        self.records = []
+
+    def emit(self, record):
+        self.records.append(record)
+
+
+def _isolated_logger(name, level=logging.INFO, handler=None):
+    target = logging.getLogger(name)
+    target.handlers = [handler or _RecordingHandler()]
+    target.propagate = False
+    target.setLevel(level)
+    return target
+
+
+def test_sampling_and_counters():
+    target = _isolated_logger("hot_path_test.sampling")
+    hot_log = HotPathLogger(target, always_log_first=3, sample_every=10, max_events_per_second=0)
+    for i in range(50):
+        hot_log.event('block', "Block %d", i)
+    hot_log.event('other', "Other")
+
+    messages = [record.getMessage() for record in target.handlers[0].records]
+    # First three, then counts 10, 20, 30, 40, 50
+    assert messages[:3] == ["Block 0", "Block 1", "Block 2"]
+    assert messages[3] == "Block 9 [6 similar suppressed]"
+    assert len([m for m in messages if m.startswith("Block")]) == 8
+    assert hot_log.counts() == {'block': 50, 'other': 1}
+    assert target.handlers[0].records[0].event == 'block'
+
+    summary = hot_log.flush("Routing")
+    assert summary['block']['count'] == 50 and summary['block']['logged'] == 8
+    assert target.handlers[0].records[-1].getMessage() == "📊 Routing: block=50, other=1"
+    assert hot_log.counts() == {}
+
+
+def test_rate_limit():
+    target = _isolated_logger("hot_path_test.rate")
+    hot_log = HotPathLogger(target, sampling=False, max_events_per_second=5.0)
+    for i in range(1000):
+        hot_log.event('progress', "Progress %d", i)
+    emitted = len(target.handlers[0].records)
+    assert 5 <= emitted <= 7
+    assert hot_log.counts()['progress'] == 1000
+
+
+def test_lazy_formatting():
+    class Exploding:
+        def __str__(self):
+            raise AssertionError("formatted although the record was not emitted")
+
+    target = _isolated_logger("hot_path_test.lazy", level=logging.WARNING)
+    hot_log = HotPathLogger(target)
+    hot_log.event('item', "Item %s", Exploding())
+    hot_log.event('item', "Item %s", preview(Exploding()), level=logging.DEBUG)
+    assert hot_log.counts()['item'] == 2 and not target.handlers[0].records
+
+    assert str(preview("x" * 150, 100)) == "x" * 100 + "..."
+    assert str(preview("short")) == "short"
+
+    with hot_log.stage_scope("Scoped"):
+        hot_log.event('item', value=3)
+        assert hot_log.stage == "Scoped"
+    assert hot_log.stage is None and hot_log.counts() == {}
+
+
+def _per_item_cost(level):
+    handler = logging.StreamHandler(io.StringIO())
+    handler.setFormatter(logging.Formatter('%(asctime)s - %(levelname)s - %(message)s'))
+    target = _isolated_logger(f"hot_path_test.bench.{level}", level=level, handler=handler)
+    hot_log = HotPathLogger(target)
+    items = [{'type': 'paragraph', 'text': f"Paragraph {i} " * 20} for i in range(20000)]
+
+    start = time.perf_counter()
+    for item in items:
+        target.info(f"🔍 Analyzing {item['type']}: {item['text'][:50]}...")
+    plain = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for item in items:
+        hot_log.event('analyze', "🔍 Analyzing %s: %s", item['type'], preview(item['text'], 50))
+    sampled = time.perf_counter() - start
+    hot_log.flush("Benchmark")
+    return plain * 1e6 / len(items), sampled * 1e6 / len(items)
+
+
+def test_hot_path_is_cheaper():
+    enabled_plain, enabled_sampled = _per_item_cost(logging.INFO)
+    disabled_plain, disabled_sampled = _per_item_cost(logging.WARNING)
+    logger.info(f"Logging enabled: logger.info {enabled_plain:.2f} µs/item, hot path {enabled_sampled:.2f} µs/item")
+    logger.info(f"Logging disabled: logger.info {disabled_plain:.2f} µs/item, hot path {disabled_sampled:.2f} µs/item")
+    assert enabled_sampled < enabled_plain / 2
+
+
+if __name__ == "__main__":
+    test_sampling_and_counters()
+    test_rate_limit()
+    test_lazy_formatting()
+    test_hot_path_is_cheaper()
+    logger.info("✅ Hot-path logging tests passed")
@@ -0,0 +1,172 @@
+#!/usr/bin/env python3
+"""
+Test Script for Batched, Content-Addressed Image Classification
+
+Checks that classify_images gives the same answers as classifying each image
+on its own, that copies of an image in another folder and a fresh classifier
+in a later run are served from the content-hash cache without re-running the
+heuristic, that ONNX inference runs on stacked batches in the model's layout,
+and that filter_images_for_processing classifies its whole list in one batch.
+"""
+
+import os
+import sys
+import time
+import shutil
+import logging
+import tempfile
+
+import numpy as np
+from PIL import Image
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from shared_cache import SharedCacheStore
+from onnx_image_classifier import ONNXImageClassifier, RelevanceLevel, filter_images_for_processing
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+
+def _make_images(directory, count, seed=3):
+    rng = np.random.default_rng(seed)
+    os.makedirs(directory, exist_ok=True)
+    paths = []
+    for i in range(count):
+        size = (64, 64) if i % 5 == 0 else (320, 240)
+        if i % 2:
+            pixels = rng.integers(0, 256, size=(size[1], size[0], 3), dtype=np.uint8)
+        else:
+            pixels = np.full((size[1], size[0], 3), 255, dtype=np.uint8)
+            pixels[::8, :, :] = 0  # ruled lines
+            pixels[1, 1, 0] = i    # distinct bytes per image
+        path = os.path.join(directory, f"image_{i:03d}.png")
+        Image.fromarray(pixels).save(path)
+        paths.append(path)
+    return paths
+
+
+def _classifier(store, **kwargs):
+    classifier = ONNXImageClassifier(**kwargs)
+    classifier.shared_cache = store.namespace('image_classification')
+    classifier.heuristic_calls = 0
+    original = classifier._classify_heuristic
+
+    def counting_heuristic(image_path):
+        classifier.heuristic_calls += 1
+        return original(image_path)
+
+    classifier._classify_heuristic = counting_heuristic
+    return classifier
+
+
+def test_batch_matches_single_and_reuses_content_hash():
+    with tempfile.TemporaryDirectory() as root:
+        store = SharedCacheStore(os.path.join(root, "cache.sqlite3"))
+        first_run = _make_images(os.path.join(root, "run_a"), 60)
+        second_run = [shutil.copy(path, os.path.join(root, f"copy_{os.path.basename(path)}")) for path in first_run]
+
+        classifier = _classifier(store, max_workers=4)
+        start = time.perf_counter()
+        batched = classifier.classify_images(first_run)
+        cold_seconds = time.perf_counter() - start
+        assert classifier.heuristic_calls == 60
+
+        reference = ONNXImageClassifier()
+        for path in first_run[:20]:
+            expected = reference._classify_heuristic(path)
+            assert batched[path].relevance == expected.relevance
+            assert batched[path].detected_features == expected.detected_features
+
+        # Same bytes in another folder: no new classification
+        copies = classifier.classify_images(second_run)
+        assert classifier.heuristic_calls == 60
+        assert [copies[path].relevance for path in second_run] == [batched[path].relevance for path in first_run]
+
+        # A later run with an empty memory cache reads the on-disk cache in one batch
+        later = _classifier(store, max_workers=4)
+        start = time.perf_counter()
+        warm = later.classify_images(second_run)
+        warm_seconds = time.perf_counter() - start
+        assert later.heuristic_calls == 0
+        assert later.classify_image(first_run[3]).relevance == batched[first_run[3]].relevance
+        assert store.get_statistics()['image_classification']['entries'] == 60
+
+        logger.info(f"60 images: cold {cold_seconds * 1000:.1f} ms, warm (on-disk cache) {warm_seconds * 1000:.1f} ms")
+        assert warm_seconds < cold_seconds
+        assert len(warm) == 60
+        store.close()
+
+
+class FakeSession:
+    """Returns scores that favour 'skip' for dark images and 'high' otherwise"""
+
+    def __init__(self):
+        self.batch_shapes = []
+
+    def run(self, output_names, feeds):
+        batch = feeds['input']
+        self.batch_shapes.append(batch.shape)
+        brightness = batch.reshape(len(batch), -1).mean(axis=1)
+        scores = np.zeros((len(batch), 4), dtype=np.float32)
+        scores[:, 0] = brightness * 10
+        scores[:, 3] = (1 - brightness) * 10
+        return [scores]
+
+
+def test_onnx_inference_is_batched():
+    with tempfile.TemporaryDirectory() as root:
+        store = SharedCacheStore(os.path.join(root, "cache.sqlite3"))
+        paths = _make_images(os.path.join(root, "images"), 10)
+        dark = os.path.join(root, "dark.png")
+        Image.fromarray(np.zeros((50, 50, 3), dtype=np.uint8)).save(dark)
+        broken = os.path.join(root, "broken_chart.png")
+        with open(broken, 'wb') as f:
+            f.write(b"not an image")
+
+        classifier = _classifier(store, batch_size=4, max_workers=2)
+        classifier.session = FakeSession()
+        classifier.input_name, classifier.output_names = 'input', ['scores']
+        classifier._configure_model_input([None, 3, 32, 32])
+        classifier.classifier_version = "onnx-test"
+
+        results = classifier.classify_images(paths + [dark, broken])
+        assert classifier.session.batch_shapes == [(4, 3, 32, 32), (4, 3, 32, 32), (3, 3, 32, 32)]
+        assert results[dark].relevance == RelevanceLevel.SKIP and results[dark].confidence > 0.9
+        assert results[paths[0]].relevance == RelevanceLevel.HIGH
+        assert results[paths[0]].detected_features == ['onnx_model']
+        # The unreadable file falls back to the heuristic (and from there to its filename)
+        assert classifier.heuristic_calls == 1 and results[broken].relevance == RelevanceLevel.HIGH
+
+        # Heuristic and model results never share cache keys
+        assert classifier._get_cache_key(dark).startswith("onnx-test:")
+        store.close()
+
+
+def test_filter_images_classifies_in_one_batch():
+    with tempfile.TemporaryDirectory() as root:
+        store = SharedCacheStore(os.path.join(root, "cache.sqlite3"))
+        paths = _make_images(os.path.join(root, "images"), 6)
+        logo = os.path.join(root, "logo.png")
+        with open(logo, 'wb') as f:
+            f.write(b"corrupt")
+
+        classifier = _classifier(store)
+        batches = []
+        original = classifier.classify_images
+        classifier.classify_images = lambda image_paths: batches.append(list(image_paths)) or original(image_paths)
+
+        image_list = [{'filepath': path} for path in paths] + [{'filepath': logo}, {'filepath': "missing.png"}]
+        filtered = filter_images_for_processing(image_list, classifier)
+
+        assert len(batches) == 1 and len(batches[0]) == 7
+        assert [item['filepath'] for item in filtered] == paths
+        assert all('relevance' in item for item in filtered)
+        store.close()
+
+
+if __name__ == "__main__":
+    test_batch_matches_single_and_reuses_content_hash()
+    test_onnx_inference_is_batched()
+    test_filter_images_classifies_in_one_batch()
+    logger.info("✅ Image classification cache tests passed")
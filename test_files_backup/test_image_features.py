@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+"""
+Test Script for Shared Image Feature Extraction
+
+Checks that the vectorized tile-variance and edge statistics equal the
+original per-window loops, that an image is decoded once (at JPEG draft
+scale) for both the preemptive filter and the heuristic classifier, and
+benchmarks full-resolution analysis against the thumbnail extractor.
+Set IMAGE_FEATURE_BENCHMARK_IMAGES to benchmark a larger set.
+"""
+
+import os
+import sys
+import time
+import logging
+import tempfile
+
+import numpy as np
+from PIL import Image
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import image_features
+from image_features import extract_image_features, get_image_features, has_regular_pattern, edge_statistics
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+
+# --- Original full-resolution analysis ---
+
+def _legacy_regular_patterns(gray):
+    h, w = gray.shape
+    window_size = min(20, h // 10, w // 10)
+    if window_size < 5:
+        return False
+    variances = []
+    for i in range(0, h - window_size, window_size):
+        for j in range(0, w - window_size, window_size):
+            variances.append(np.var(gray[i:i + window_size, j:j + window_size]))
+    if len(variances) > 4:
+        return np.std(variances) < np.mean(variances) * 0.5
+    return False
+
+
+def _legacy_edges(gray):
+    edges_h = np.abs(np.diff(gray, axis=0))
+    edges_v = np.abs(np.diff(gray, axis=1))
+    strong_h = np.sum(edges_h > 30) / edges_h.size
+    strong_v = np.sum(edges_v > 30) / edges_v.size
+    density = (np.sum(edges_h > 20) + np.sum(edges_v > 20)) / gray.size
+    return strong_h, strong_v, density
+
+
+def _legacy_analysis(image_path):
+    # Preemptive filter: its own decode for the colour sample
+    with Image.open(image_path) as img:
+        img.resize((50, 50)).getcolors(maxcolors=256)
+    # Classifier: a second, full-resolution decode
+    gray = np.mean(np.array(Image.open(image_path)), axis=2)
+    np.std(gray)
+    _legacy_edges(gray)
+    _legacy_regular_patterns(gray)
+    _legacy_edges(gray)
+
+
+def _make_images(directory, count, size=(1200, 900), seed=5):
+    rng = np.random.default_rng(seed)
+    paths = []
+    for i in range(count):
+        pixels = np.full((size[1], size[0], 3), 250, dtype=np.uint8)
+        pixels[::12, :, :] = 20  # text-like rules
+        noise = rng.integers(0, 40, size=(size[1] // 4, size[0] // 4, 3), dtype=np.uint8)
+        pixels[:size[1] // 4, :size[0] // 4] = noise + i % 200
+        path = os.path.join(directory, f"page_{i:04d}.{'jpg' if i % 2 else 'png'}")
+        Image.fromarray(pixels).save(path)
+        paths.append(path)
+    return paths
+
+
+def test_vectorized_statistics_match_loops():
+    rng = np.random.default_rng(1)
+    for shape in [(30, 30), (49, 200), (120, 80), (257, 256), (901, 640)]:
+        gray = rng.integers(0, 256, size=shape).astype(np.float64)
+        gray[::7] = 0
+        assert has_regular_pattern(gray) == _legacy_regular_patterns(gray), shape
+        assert np.allclose(edge_statistics(gray), _legacy_edges(gray)), shape
+    smooth = np.tile(np.linspace(0, 255, 300), (200, 1))
+    assert has_regular_pattern(smooth) == _legacy_regular_patterns(smooth)
+
+
+def test_single_decode_shared_by_filter_and_classifier():
+    from async_translation_service import PreemptiveImageFilter
+    from onnx_image_classifier import ONNXImageClassifier
+
+    with tempfile.TemporaryDirectory() as root:
+        jpeg, png = _make_images(root, 2, size=(1600, 1200))[::-1]
+        features = extract_image_features(jpeg)
+        assert (features.width, features.height, features.mode) == (1600, 1200, 'RGB')
+        assert features.file_size == os.path.getsize(jpeg)
+
+        with Image.open(jpeg) as image:
+            image.draft(None, (image_features.FEATURE_THUMBNAIL_SIZE,) * 2)
+            assert image.size[0] < 1600  # decoded at a reduced scale
+
+        extractions = []
+        original = image_features.extract_image_features
+        image_features.extract_image_features = lambda path, *args: extractions.append(path) or original(path, *args)
+        try:
+            image_filter = PreemptiveImageFilter()
+            image_filter.min_size_bytes = 0
+            assert image_filter.should_analyze_image(png)[0]
+            classification = ONNXImageClassifier()._classify_heuristic(png)
+            assert get_image_features(png) is get_image_features(png)
+        finally:
+            image_features.extract_image_features = original
+
+        assert extractions == [png]
+        assert 'structured_layout' in classification.detected_features
+
+        flat = os.path.join(root, "flat.png")
+        Image.fromarray(np.full((200, 200, 3), 255, dtype=np.uint8)).save(flat)
+        assert image_filter.should_analyze_image(flat) == (False, "Too few colors (1)")
+
+
+def test_thumbnail_extraction_is_faster():
+    count = int(os.environ.get('IMAGE_FEATURE_BENCHMARK_IMAGES', 60))
+    with tempfile.TemporaryDirectory() as root:
+        paths = _make_images(root, count)
+
+        start = time.perf_counter()
+        for path in paths:
+            _legacy_analysis(path)
+        legacy_seconds = time.perf_counter() - start
+
+        start = time.perf_counter()
+        for path in paths:
+            extract_image_features(path)
+        thumbnail_seconds = time.perf_counter() - start
+
+        logger.info(f"{count} images 1200x900: full resolution {legacy_seconds * 1000 / count:.1f} ms/image, "
+                    f"thumbnail {thumbnail_seconds * 1000 / count:.1f} ms/image "
+                    f"({legacy_seconds / thumbnail_seconds:.1f}x)")
+        assert thumbnail_seconds * 3 < legacy_seconds
+
+
+if __name__ == "__main__":
+    test_vectorized_statistics_match_loops()
+    test_single_decode_shared_by_filter_and_classifier()
+    test_thumbnail_extraction_is_faster()
+    logger.info("✅ Image feature extraction tests passed")
@@ -0,0 +1,158 @@
+#!/usr/bin/env python3
+"""
+Test Script for Image Optimization Before DOCX Embedding
+
+Checks that oversized images are resampled to the target DPI for their
+placed width, that photographs become JPEG while line art and transparent
+images stay PNG, that metadata is dropped, that results are cached by content
+hash, and that the Word generator embeds the optimized copies.
+"""
+
+import os
+import sys
+import logging
+import tempfile
+
+import numpy as np
+from PIL import Image, ImageDraw
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import image_optimizer
+from image_optimizer import ImageOptimizer, is_photographic
+from config_manager import config_manager
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+
+def _make_optimizer(root, **overrides):
+    settings = config_manager.image_optimization_settings
+    settings.update({'enabled': True, 'target_dpi': 150, 'jpeg_quality': 85,
+                     'cache_dir': os.path.join(root, 'image_cache')})
+    settings.update(overrides)
+    return ImageOptimizer(settings)
+
+
+def _photo(path, size=(2400, 1600)):
+    rng = np.random.default_rng(1)
+    y, x = np.mgrid[0:size[1], 0:size[0]]
+    pixels = np.stack([(x * 255 // size[0]), (y * 255 // size[1]), (x + y) % 256], axis=-1).astype(np.int16)
+    pixels += rng.integers(-20, 20, pixels.shape, dtype=np.int16)
+    image = Image.fromarray(np.clip(pixels, 0, 255).astype(np.uint8))
+    exif = Image.Exif()
+    exif[0x010E] = "camera description"
+    image.save(path, format='PNG', exif=exif)
+    return path
+
+
+def _diagram(path, size=(2400, 2400)):
+    image = Image.new('RGB', size, 'white')
+    draw = ImageDraw.Draw(image)
+    for i in range(0, size[0], 150):
+        draw.line([(i, 0), (size[0] - i, size[1])], fill='black', width=6)
+        draw.rectangle([i, i, i + 100, i + 60], outline='blue', width=4)
+    image.save(path)
+    return path
+
+
+def test_photo_and_line_art_pick_formats():
+    with tempfile.TemporaryDirectory() as root:
+        optimizer = _make_optimizer(root)
+        photo = _photo(os.path.join(root, 'photo.png'))
+        diagram = _diagram(os.path.join(root, 'diagram.png'))
+
+        optimized_photo = optimizer.optimize(photo, 6.0)
+        assert optimized_photo.endswith('.jpg')
+        with Image.open(optimized_photo) as image:
+            assert image.width == 900
+            assert not image.getexif()
+        assert os.path.getsize(optimized_photo) < os.path.getsize(photo) / 10
+
+        optimized_diagram = optimizer.optimize(diagram, 6.0)
+        assert optimized_diagram.endswith('.png')
+        with Image.open(optimized_diagram) as image:
+            assert image.width == 900 and image.mode == 'P'
+        assert os.path.getsize(optimized_diagram) < os.path.getsize(diagram)
+
+        with Image.open(photo) as image:
+            assert is_photographic(image)
+        with Image.open(diagram) as image:
+            assert not is_photographic(image)
+
+
+def test_transparency_small_images_and_cache():
+    with tempfile.TemporaryDirectory() as root:
+        optimizer = _make_optimizer(root)
+        transparent = os.path.join(root, 'logo.png')
+        image = Image.new('RGBA', (2000, 1000), (255, 0, 0, 0))
+        ImageDraw.Draw(image).ellipse([200, 200, 1800, 800], fill=(0, 128, 255, 255))
+        image.save(transparent)
+
+        optimized = optimizer.optimize(transparent, 4.0)
+        with Image.open(optimized) as result:
+            assert result.format == 'PNG' and result.mode == 'RGBA' and result.width == 600
+            assert result.getchannel('A').getextrema() == (0, 255)
+
+        # Already small and compact: the original is kept
+        icon = os.path.join(root, 'icon.jpg')
+        Image.open(_photo(os.path.join(root, 'small.png'), size=(200, 120))).convert('RGB').save(icon, quality=60)
+        assert optimizer.optimize(icon, 6.0) == icon
+        assert optimizer.stats['kept_original'] == 1
+        # The decision is cached: a later run does not re-encode it
+        later = _make_optimizer(root)
+        encoded = []
+        later._encode = lambda *args: encoded.append(args)
+        assert later.optimize(icon, 6.0) == icon
+        assert encoded == [] and later.stats['cache_hits'] == 1
+        # The threshold is part of the key: a looser one re-evaluates the image
+        assert _make_optimizer(root, min_size_reduction=1.5).optimize(icon, 6.0) != icon
+
+        # Same content under another name is a cache hit
+        photo = _photo(os.path.join(root, 'photo.png'), size=(1600, 1200))
+        first = optimizer.optimize(photo, 6.0)
+        copy_path = os.path.join(root, 'copy.png')
+        with open(photo, 'rb') as src, open(copy_path, 'wb') as dst:
+            dst.write(src.read())
+        assert optimizer.optimize(copy_path, 6.0) == first
+        assert optimizer.stats['cache_hits'] == 1
+        # A different placed width is a different entry
+        assert optimizer.optimize(photo, 3.0) != first
+
+        results = optimizer.optimize_many([(photo, 6.0), (icon, 6.0), (transparent, 4.0), (photo, 6.0)])
+        assert results == {photo: first, icon: icon, transparent: optimized}
+
+
+def test_word_document_embeds_optimized_images():
+    from docx import Document as WordDocument
+    from document_generator import WordDocumentGenerator
+    from structured_document_model import Document, Heading, ImagePlaceholder, ContentType
+
+    with tempfile.TemporaryDirectory() as root:
+        images_dir = os.path.join(root, 'images')
+        os.makedirs(images_dir)
+        _photo(os.path.join(images_dir, 'page_1_img_1.png'))
+        _diagram(os.path.join(images_dir, 'page_2_img_1.png'))
+        blocks = [Heading(block_type=ContentType.HEADING, original_text="Results", page_num=1, bbox=(0, 0, 1, 1))]
+        for page, name in ((1, 'page_1_img_1.png'), (2, 'page_2_img_1.png')):
+            blocks.append(ImagePlaceholder(block_type=ContentType.IMAGE_PLACEHOLDER, original_text="",
+                                           page_num=page, bbox=(0, 0, 1, 1), image_path=name))
+        document = Document(title="Images", content_blocks=blocks)
+
+        sizes = {}
+        for enabled in (False, True):
+            with image_optimizer._image_optimizer.replaced(_make_optimizer(root, enabled=enabled)):
+                output_path = os.path.join(root, f"out_{enabled}.docx")
+                saved = WordDocumentGenerator().create_word_document_from_structured_document(
+                    document, output_path, images_dir)
+            sizes[enabled] = os.path.getsize(saved)
+            assert len(WordDocument(saved).inline_shapes) == 2
+
+        assert sizes[True] < sizes[False] / 5
+
+
+if __name__ == "__main__":
+    test_photo_and_line_art_pick_formats()
+    test_transparency_small_images_and_cache()
+    test_word_document_embeds_optimized_images()
+    logger.info("✅ Image optimizer tests passed")
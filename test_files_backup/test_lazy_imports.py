@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""
+Test Script for Lazy Imports and Deferred Singletons
+
+Checks that importing the main workflow does not load optional pipelines or
+heavy SDKs, that lazy singletons are built once on first use, and that the
+import-time report parser understands -X importtime output.
+"""
+
+import os
+import sys
+import json
+import logging
+import subprocess
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from lazy_imports import LazySingleton, lazy_import, is_module_available, parse_importtime_output
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+
+DEFERRED_MODULES = [
+    'google.generativeai', 'docx', 'structlog', 'tkinter', 'cv2',
+    'advanced_translation_pipeline', 'intelligent_pdf_translator',
+    'yolov8_integration_pipeline', 'nougat_only_integration',
+    'translation_service', 'document_generator'
+]
+
+
+def test_main_workflow_import_defers_heavy_subsystems():
+    """Import main_workflow in a fresh interpreter and list what got loaded"""
+    script = (
+        "import sys, json, main_workflow; "
+        f"print(json.dumps([m for m in {DEFERRED_MODULES!r} if m in sys.modules]))"
+    )
+    result = subprocess.run([sys.executable, '-c', script], cwd=PROJECT_ROOT,
+                            capture_output=True, text=True, timeout=120)
+    assert result.returncode == 0, result.stderr
+    loaded = json.loads(result.stdout.strip().splitlines()[-1])
+    assert loaded == []
+
+
+def test_lazy_singleton_builds_once():
+    created = []
+
+    class Service:
+        def __init__(self):
+            created.append(self)
+            self.value = 1
+
+    service = LazySingleton(Service)
+    assert not service.is_initialized()
+    assert created == []
+
+    service.value = 5
+    assert service.value == 5
+    assert len(created) == 1
+    assert service.get_instance() is created[0]
+
+
+def test_lazy_singleton_caches_none_and_can_be_replaced():
+    calls = []
+
+    def build_disabled():
+        calls.append(1)
+        return None
+
+    feature = LazySingleton(build_disabled)
+    assert feature.get_instance() is None and feature.get_instance() is None
+    assert feature.is_initialized() and len(calls) == 1
+
+    with feature.replaced("double") as double:
+        assert feature.get_instance() == double == "double"
+    assert feature.get_instance() is None and len(calls) == 1
+
+    feature.reset()
+    assert not feature.is_initialized()
+    feature.get_instance()
+    assert len(calls) == 2
+
+
+def test_lazy_import_and_availability_check():
+    assert is_module_available('json')
+    assert not is_module_available('definitely_not_a_real_module_xyz')
+    assert not is_module_available('definitely_not_a_real_package_xyz.sub')
+
+    lazy_json = lazy_import('json')
+    assert lazy_json.dumps([1]) == '[1]'
+
+
+def test_importtime_output_is_parsed():
+    sample = (
+        "import time: self [us] | cumulative | imported package\n"
+        "import time:       120 |        120 |   _json\n"
+        "import time:      2500 |       2620 | json\n"
+    )
+    records = parse_importtime_output(sample)
+    assert [r['module'] for r in records] == ['_json', 'json']
+    assert records[0]['depth'] == 1 and records[1]['depth'] == 0
+    assert records[1]['cumulative_ms'] == 2.62
+
+
+if __name__ == "__main__":
+    test_main_workflow_import_defers_heavy_subsystems()
+    test_lazy_singleton_builds_once()
+    test_lazy_singleton_caches_none_and_can_be_replaced()
+    test_lazy_import_and_availability_check()
+    test_importtime_output_is_parsed()
+    logger.info("✅ Lazy import tests passed")
@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+Test Script for Batched Markdown Node Translation
+
+Checks that text nodes are deduplicated, packed into few delimited requests,
+mapped back onto every node_path, and that a response with broken separators
+is split and retried instead of misaligning nodes.
+"""
+
+import os
+import sys
+import asyncio
+import logging
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from markdown_aware_translator import MarkdownAwareTranslator, TextNode
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+
+def _make_nodes(count, distinct):
+    return [TextNode(content=f"Sentence number {i % distinct}.", node_path=f"token_{i}_text")
+            for i in range(count)]
+
+
+def test_nodes_are_deduplicated_and_batched():
+    translator = MarkdownAwareTranslator()
+    requests = []
+
+    async def fake_translate(text, lang, style, prev_ctx, next_ctx, content_type):
+        requests.append(text)
+        return text.upper()
+
+    nodes = _make_nodes(40, distinct=5)
+    translated = asyncio.run(translator._translate_nodes_parallel(nodes, fake_translate, "el", "", ""))
+
+    assert len(requests) == 1
+    assert requests[0].count(translator.node_separator) == 4
+    assert translated["token_7_text"] == "SENTENCE NUMBER 2."
+    assert len(translated) == 40
+
+
+def test_token_budget_splits_requests():
+    translator = MarkdownAwareTranslator()
+    translator.batching_settings['max_tokens_per_request'] = 40
+    requests = []
+
+    async def fake_translate(text, lang, style, prev_ctx, next_ctx, content_type):
+        requests.append(text)
+        return text
+
+    nodes = _make_nodes(10, distinct=10)
+    asyncio.run(translator._translate_nodes_parallel(nodes, fake_translate, "el", "", ""))
+
+    assert 1 < len(requests) < 10
+
+
+def test_broken_separators_fall_back_to_smaller_batches():
+    translator = MarkdownAwareTranslator()
+
+    async def lossy_translate(text, lang, style, prev_ctx, next_ctx, content_type):
+        # Drop the separators whenever more than two nodes are combined
+        if text.count(translator.node_separator) > 1:
+            return text.replace(translator.node_separator, " ").upper()
+        return text.upper()
+
+    nodes = _make_nodes(8, distinct=8)
+    translated = asyncio.run(translator._translate_nodes_parallel(nodes, lossy_translate, "el", "", ""))
+
+    for node in nodes:
+        assert translated[node.node_path] == node.content.upper()
+    assert translator.batching_stats['batch_splits'] > 0
+
+
+if __name__ == "__main__":
+    test_nodes_are_deduplicated_and_batched()
+    test_token_budget_splits_requests()
+    test_broken_separators_fall_back_to_smaller_batches()
+    logger.info("✅ Markdown node batching tests passed")
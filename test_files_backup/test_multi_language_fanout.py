@@ -0,0 +1,172 @@
+#!/usr/bin/env python3
+"""
+Test Script for Multi-Language Fan-Out
+
+Checks that one Document is translated into several languages concurrently
+without exceeding the shared request limit, that a failing language does not
+take the others down, that the workflow extracts the PDF once and writes
+one output document per language, and that it fails when no language
+produced output.
+"""
+
+import os
+import sys
+import asyncio
+import logging
+import tempfile
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import main_workflow
+from translation_service import TranslationService
+from structured_document_model import Document, Heading, Paragraph, ImagePlaceholder, ContentType
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+
+def _make_document(paragraph_count=12):
+    blocks = [Heading(block_type=ContentType.HEADING, original_text="Introduction", page_num=1,
+                      bbox=(0, 0, 100, 20), level=1)]
+    for i in range(paragraph_count):
+        blocks.append(Paragraph(block_type=ContentType.PARAGRAPH, original_text=f"Paragraph {i}.",
+                                page_num=1, bbox=(0, 20 * (i + 1), 100, 20 * (i + 2))))
+    blocks.append(ImagePlaceholder(block_type=ContentType.IMAGE_PLACEHOLDER, original_text="",
+                                   page_num=1, bbox=(0, 0, 50, 50), image_path="figure.png"))
+    return Document(title="Sample", content_blocks=blocks, total_pages=1)
+
+
+class _FakeTranslationService(TranslationService):
+    """TranslationService whose model call is a short sleep that records concurrency."""
+
+    def __init__(self):
+        super().__init__()
+        self.active_requests = 0
+        self.max_active_requests = 0
+        self.requests = 0
+
+    async def _translate_content_block(self, content, target_language, style_guide, block_type,
+                                       prev_context="", next_context=""):
+        self.active_requests += 1
+        self.requests += 1
+        self.max_active_requests = max(self.max_active_requests, self.active_requests)
+        try:
+            await asyncio.sleep(0.005)
+            return f"[{target_language}] {content}"
+        finally:
+            self.active_requests -= 1
+
+
+def test_fan_out_shares_request_limit():
+    service = _FakeTranslationService()
+    document = _make_document()
+    finished = []
+
+    async def on_translated(language, translated_document):
+        finished.append(language)
+
+    results = asyncio.run(service.translate_document_multi(
+        document, ["French", "German", "Ελληνικά"], max_concurrent_requests=3, on_translated=on_translated
+    ))
+
+    assert set(results) == {"French", "German", "Ελληνικά"} == set(finished)
+    assert service.requests == 3 * 13
+    assert service.max_active_requests == 3
+    for language, translated in results.items():
+        assert translated.content_blocks[1].content == f"[{language}] Paragraph 0."
+        assert translated.metadata['translated_to'] == language
+        # Non-translatable blocks are shared, not re-translated
+        assert translated.content_blocks[-1] is document.content_blocks[-1]
+    # The source Document is left untouched
+    assert document.content_blocks[1].content == "Paragraph 0."
+
+
+def test_failing_language_does_not_block_others():
+    service = _FakeTranslationService()
+
+    async def on_translated(language, translated_document):
+        if language == "German":
+            raise RuntimeError("German output failed")
+
+    results = asyncio.run(service.translate_document_multi(
+        _make_document(paragraph_count=3), ["French", "German", "Italian"],
+        max_concurrent_requests=2, on_translated=on_translated
+    ))
+    assert list(results) == ["French", "Italian"]
+
+
+class _Recorder:
+    def __init__(self, **methods):
+        self.calls = []
+        for name, result in methods.items():
+            setattr(self, name, self._record(name, result))
+
+    def _record(self, name, result):
+        def method(*args, **kwargs):
+            self.calls.append((name, args))
+            return result(*args) if callable(result) else result
+        return method
+
+
+def _run_workflow(generator, target_languages):
+    """Run translate_document_multi_language with recorders in place of the workflow's services"""
+    document = _make_document(paragraph_count=3)
+    parser = _Recorder(extract_images_from_pdf=[])
+    extractor = _Recorder(extract_structured_content_from_pdf=document)
+    uploader = _Recorder(is_available=True, upload_files=[])
+    service = _FakeTranslationService()
+    service.save_caches = lambda: None
+
+    patched = {'PDFParser': lambda: parser, 'StructuredContentExtractor': lambda: extractor,
+               'translation_service': service, 'document_generator': generator,
+               'drive_uploader': uploader}
+    originals = {name: getattr(main_workflow, name) for name in patched}
+    generate_pdf = main_workflow.config_manager.word_output_settings.get('generate_pdf', False)
+    main_workflow.config_manager.word_output_settings['generate_pdf'] = False
+    try:
+        for name, value in patched.items():
+            setattr(main_workflow, name, value)
+        with tempfile.TemporaryDirectory() as root:
+            pdf_path = os.path.join(root, "paper.pdf")
+            open(pdf_path, 'wb').close()
+            outputs = asyncio.run(main_workflow.UltimatePDFTranslator().translate_document_multi_language(
+                pdf_path, os.path.join(root, "out"), target_languages
+            ))
+    finally:
+        for name, value in originals.items():
+            setattr(main_workflow, name, value)
+        main_workflow.config_manager.word_output_settings['generate_pdf'] = generate_pdf
+    return outputs, parser, extractor, uploader
+
+
+def test_workflow_extracts_once_and_writes_each_language():
+    generator = _Recorder(create_word_document_from_structured_document=lambda doc, path, *rest:
+                          None if doc.metadata['translated_to'] == "German" else path)
+    outputs, parser, extractor, uploader = _run_workflow(generator, ["French", "German", "Ελληνικά"])
+
+    assert len(parser.calls) == 1 and len(extractor.calls) == 1
+    assert set(outputs) == {"French", "Ελληνικά"}
+    assert os.path.basename(outputs["French"]['docx']) == "paper_translated_French.docx"
+    assert os.path.basename(outputs["Ελληνικά"]['docx']) == "paper_translated_Ελληνικά.docx"
+    written = [args[0] for name, args in generator.calls]
+    assert sorted(doc.metadata['translated_to'] for doc in written) == sorted(["French", "German", "Ελληνικά"])
+    assert len([name for name, _ in uploader.calls if name == 'upload_files']) == 2
+
+
+def test_workflow_fails_when_no_language_has_output():
+    # main() must see an error, so the file is recorded as failed instead of processed
+    generator = _Recorder(create_word_document_from_structured_document=None)
+    try:
+        _run_workflow(generator, ["French", "German"])
+    except Exception as e:
+        assert "No output produced" in str(e)
+    else:
+        raise AssertionError("translate_document_multi_language returned without any output")
+
+
+if __name__ == "__main__":
+    test_fan_out_shares_request_limit()
+    test_failing_language_does_not_block_others()
+    test_workflow_extracts_once_and_writes_each_language()
+    test_workflow_fails_when_no_language_has_output()
+    logger.info("✅ Multi-language fan-out tests passed")
@@ -0,0 +1,203 @@
+#!/usr/bin/env python3
+"""
+Test Script for the Office Conversion Pool
+
+Drives OfficeConversionPool with a fake office process and checks that
+processes start once and stay warm, that conversions run concurrently up to
+the worker count, that crashed processes are restarted and the conversion
+retried, that hung conversions time out without blocking the queue, that
+the command-line soffice mode reports timeouts and signal deaths as such,
+and that convert_word_to_pdf goes through the pool.
+"""
+
+import os
+import sys
+import time
+import logging
+import tempfile
+import textwrap
+import threading
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import office_converter
+from office_converter import OfficeConversionPool, CliOfficeProcess
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+
+class FakeOfficeProcess:
+    """Stands in for soffice: 'crash' documents kill it once, 'hang' documents never finish"""
+
+    def __init__(self, registry, startup_delay=0.2, convert_delay=0.1):
+        self.registry = registry
+        self.startup_delay = startup_delay
+        self.convert_delay = convert_delay
+        self.dead = False
+        self.killed = threading.Event()
+
+    def start(self):
+        time.sleep(self.startup_delay)
+        with self.registry['lock']:
+            self.registry['starts'] += 1
+
+    def alive(self):
+        return not self.dead
+
+    def convert(self, docx_path, pdf_path):
+        name = os.path.basename(docx_path)
+        with self.registry['lock']:
+            self.registry['active'] += 1
+            self.registry['max_active'] = max(self.registry['max_active'], self.registry['active'])
+        try:
+            if name.startswith('hang'):
+                self.killed.wait()
+                raise RuntimeError("bridge disposed")
+            if name.startswith('crash') and name not in self.registry['crashed']:
+                self.registry['crashed'].add(name)
+                self.dead = True
+                raise RuntimeError("bridge disposed")
+            time.sleep(self.convert_delay)
+            with open(docx_path, 'rb') as source, open(pdf_path, 'wb') as target:
+                target.write(b"%PDF-1.7\n" + source.read())
+        finally:
+            with self.registry['lock']:
+                self.registry['active'] -= 1
+
+    def kill(self):
+        self.dead = True
+        self.killed.set()
+
+    def stop(self):
+        self.kill()
+
+
+def _make_pool(**kwargs):
+    registry = {'lock': threading.Lock(), 'starts': 0, 'active': 0, 'max_active': 0, 'crashed': set()}
+    pool = OfficeConversionPool(lambda index, profile_dir: FakeOfficeProcess(registry), **kwargs)
+    return pool, registry
+
+
+def _make_docx(directory, name):
+    path = os.path.join(directory, name)
+    with open(path, 'wb') as f:
+        f.write(name.encode())
+    return path
+
+
+def test_warm_processes_convert_concurrently():
+    with tempfile.TemporaryDirectory() as root:
+        pool, registry = _make_pool(workers=2)
+        time.sleep(0.3)  # processes warm up before any work arrives
+
+        pairs = [(_make_docx(root, f"doc_{i}.docx"), os.path.join(root, 'pdf', f"doc_{i}.pdf")) for i in range(6)]
+        start = time.perf_counter()
+        results = pool.convert_many(pairs)
+        elapsed = time.perf_counter() - start
+        pool.shutdown()
+
+        assert all(results.values()) and len(results) == 6
+        # Three rounds of two, and no startup paid per document
+        assert elapsed < 0.5
+        assert registry['starts'] == 2
+        assert registry['max_active'] == 2
+        with open(pairs[0][1], 'rb') as f:
+            assert f.read() == b"%PDF-1.7\ndoc_0.docx"
+        assert sorted(os.listdir(os.path.join(root, 'pdf'))) == sorted(os.path.basename(pdf) for _, pdf in pairs)
+
+
+def test_crash_recovery_and_timeouts():
+    with tempfile.TemporaryDirectory() as root:
+        pool, registry = _make_pool(workers=1, conversion_timeout=0.5, max_retries=1)
+
+        crash = pool.submit(_make_docx(root, "crash.docx"), os.path.join(root, "crash.pdf"))
+        hang = pool.submit(_make_docx(root, "hang.docx"), os.path.join(root, "hang.pdf"))
+        after = pool.submit(_make_docx(root, "after.docx"), os.path.join(root, "after.pdf"))
+        missing = pool.submit(os.path.join(root, "missing.docx"), os.path.join(root, "missing.pdf"))
+
+        assert crash.wait(10) and crash.attempts == 2
+        assert not hang.wait(10) and hang.status == 'failed' and "exceeded" in hang.error
+        assert after.wait(10)
+        assert not missing.wait(10) and missing.attempts == 1
+        stats = pool.get_statistics()
+        pool.shutdown()
+
+        assert stats['completed'] == 2 and stats['failed'] == 2 and stats['timeouts'] == 1
+        # Initial start, restart after the crash, restart after the timeout
+        assert registry['starts'] == 3
+        assert not os.path.exists(os.path.join(root, "hang.pdf"))
+        assert not [name for name in os.listdir(root) if name.endswith('.tmp.pdf')]
+
+
+def test_processes_are_recycled():
+    with tempfile.TemporaryDirectory() as root:
+        pool, registry = _make_pool(workers=1, max_conversions_per_process=2)
+        pairs = [(_make_docx(root, f"doc_{i}.docx"), os.path.join(root, f"doc_{i}.pdf")) for i in range(5)]
+        assert all(pool.convert_many(pairs).values())
+        pool.shutdown()
+        assert registry['starts'] == 3
+
+
+_FAKE_SOFFICE = textwrap.dedent("""\
+    #!{python}
+    import os, sys, time, signal
+    args = sys.argv[1:]
+    if "--convert-to" not in args:
+        sys.exit(0)
+    out_dir = args[args.index("--outdir") + 1]
+    docx = args[-1]
+    name = os.path.basename(docx)
+    if name.startswith("hang"):
+        time.sleep(30)
+    marker = docx + ".crashed"
+    if name.startswith("crash") and not os.path.exists(marker):
+        open(marker, "w").close()
+        os.kill(os.getpid(), signal.SIGKILL)
+    with open(os.path.join(out_dir, os.path.splitext(name)[0] + ".pdf"), "wb") as f:
+        f.write(b"%PDF-1.7\\n")
+""")
+
+
+def test_cli_mode_reports_timeouts_and_crashes():
+    with tempfile.TemporaryDirectory() as root:
+        soffice = os.path.join(root, "soffice")
+        with open(soffice, 'w') as f:
+            f.write(_FAKE_SOFFICE.format(python=sys.executable))
+        os.chmod(soffice, 0o755)
+
+        pool = OfficeConversionPool(lambda index, profile_dir: CliOfficeProcess(soffice, profile_dir),
+                                    workers=1, conversion_timeout=2.0, max_retries=1)
+        hang = pool.submit(_make_docx(root, "hang.docx"), os.path.join(root, "hang.pdf"))
+        crash = pool.submit(_make_docx(root, "crash.docx"), os.path.join(root, "crash.pdf"))
+        assert not hang.wait(20) and "exceeded" in hang.error
+        assert crash.wait(20) and crash.attempts == 2
+        stats = pool.get_statistics()
+        pool.shutdown()
+
+        assert stats['timeouts'] == 1
+        # Restarted after the timeout and after the crash
+        assert stats['restarts'] == 2
+
+
+def test_convert_word_to_pdf_uses_pool():
+    from document_generator import convert_word_to_pdf
+
+    with tempfile.TemporaryDirectory() as root:
+        pool, _ = _make_pool(workers=1)
+        try:
+            with office_converter._office_pool.replaced(pool):
+                pdf_path = os.path.join(root, "paper.pdf")
+                assert convert_word_to_pdf(_make_docx(root, "paper.docx"), pdf_path)
+                assert os.path.exists(pdf_path)
+        finally:
+            pool.shutdown()
+
+
+if __name__ == "__main__":
+    test_warm_processes_convert_concurrently()
+    test_crash_recovery_and_timeouts()
+    test_processes_are_recycled()
+    test_cli_mode_reports_timeouts_and_crashes()
+    test_convert_word_to_pdf_uses_pool()
+    logger.info("✅ Office conversion pool tests passed")
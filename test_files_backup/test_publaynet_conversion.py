@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+"""
+Test Script for Streaming PubLayNet-to-YOLO Conversion
+
+Checks that the incremental COCO reader yields the same entries as json.load
+even with tiny read chunks, that sharded parallel conversion writes the same
+labels as a straightforward per-image conversion, that images are linked
+rather than copied, and that re-runs skip finished splits and shards.
+"""
+
+import os
+import sys
+import json
+import random
+import logging
+import tempfile
+from pathlib import Path
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import convert_publaynet_to_yolo
+from convert_publaynet_to_yolo import (
+    convert_publaynet_split, convert_coco_to_yolo_bbox, iter_coco_section, MANIFEST_FILENAME
+)
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+
+def _make_publaynet(root, image_count=40, missing=(7,)):
+    rng = random.Random(5)
+    os.makedirs(os.path.join(root, 'train'))
+    coco = {'info': {'description': 'synthetic "PubLayNet", with [brackets]'},
+            'annotations': [], 'images': [],
+            'categories': [{'id': i + 1, 'name': name}
+                           for i, name in enumerate(['text', 'title', 'list', 'table', 'figure'])]}
+    ann_id = 0
+    for img_id in range(image_count):
+        file_name = f"PMC{1000 + img_id}_00001.jpg"
+        coco['images'].append({'id': img_id, 'file_name': file_name, 'width': 612, 'height': 792})
+        if img_id not in missing:
+            with open(os.path.join(root, 'train', file_name), 'wb') as f:
+                f.write(os.urandom(256))
+        for _ in range(rng.randint(0, 6)):
+            coco['annotations'].append({
+                'id': ann_id, 'image_id': img_id, 'category_id': rng.randint(1, 5),
+                'bbox': [rng.uniform(0, 300), rng.uniform(0, 400), rng.uniform(5, 300), 12.25],
+                'area': 1.0, 'iscrowd': 0, 'segmentation': [[1.5, 2.5, 3.5, 4.5]]
+            })
+            ann_id += 1
+    # Shuffle so annotations are not grouped by image
+    rng.shuffle(coco['annotations'])
+    with open(os.path.join(root, 'train.json'), 'w') as f:
+        json.dump(coco, f, indent=1)
+    return coco
+
+
+def _expected_labels(coco):
+    labels = {img['id']: [] for img in coco['images']}
+    sizes = {img['id']: (img['width'], img['height']) for img in coco['images']}
+    for ann in coco['annotations']:
+        bbox = convert_coco_to_yolo_bbox(ann['bbox'], *sizes[ann['image_id']])
+        labels[ann['image_id']].append(f"{ann['category_id'] - 1} {' '.join(map(str, bbox))}")
+    return labels
+
+
+def test_streaming_reader_matches_json_load():
+    original_chunk_size = convert_publaynet_to_yolo.JSON_READ_CHUNK_SIZE
+    original_ijson = convert_publaynet_to_yolo.IJSON_AVAILABLE
+    convert_publaynet_to_yolo.JSON_READ_CHUNK_SIZE = 7
+    convert_publaynet_to_yolo.IJSON_AVAILABLE = False
+    try:
+        with tempfile.TemporaryDirectory() as root:
+            coco = _make_publaynet(root, image_count=15)
+            annotations_file = os.path.join(root, 'train.json')
+            for section in ('images', 'annotations', 'categories', 'missing_section'):
+                assert list(iter_coco_section(annotations_file, section)) == coco.get(section, [])
+    finally:
+        convert_publaynet_to_yolo.JSON_READ_CHUNK_SIZE = original_chunk_size
+        convert_publaynet_to_yolo.IJSON_AVAILABLE = original_ijson
+
+
+def test_parallel_conversion_links_images_and_writes_labels():
+    with tempfile.TemporaryDirectory() as root:
+        coco = _make_publaynet(os.path.join(root, 'publaynet'))
+        output_dir = os.path.join(root, 'yolo')
+
+        converted = convert_publaynet_split(os.path.join(root, 'publaynet'), 'train', output_dir,
+                                            workers=2, num_shards=4)
+        assert converted == 39
+
+        expected = _expected_labels(coco)
+        for img in coco['images']:
+            label_path = os.path.join(output_dir, 'labels', 'train', Path(img['file_name']).stem + '.txt')
+            if img['id'] == 7:
+                assert not os.path.exists(label_path)
+                continue
+            with open(label_path) as f:
+                assert sorted(f.read().split('\n')) == sorted(expected[img['id']] or [''])
+            src = os.path.join(root, 'publaynet', 'train', img['file_name'])
+            dst = os.path.join(output_dir, 'images', 'train', img['file_name'])
+            assert os.path.samefile(src, dst)
+
+        manifest = json.load(open(os.path.join(output_dir, MANIFEST_FILENAME)))
+        assert manifest['train']['complete']
+        assert not os.path.exists(os.path.join(output_dir, '.conversion', 'train'))
+
+
+def test_rerun_skips_finished_work():
+    with tempfile.TemporaryDirectory() as root:
+        _make_publaynet(os.path.join(root, 'publaynet'))
+        publaynet_dir = os.path.join(root, 'publaynet')
+        output_dir = os.path.join(root, 'yolo')
+        labels_dir = os.path.join(output_dir, 'labels', 'train')
+
+        convert_publaynet_split(publaynet_dir, 'train', output_dir, workers=1, num_shards=4)
+
+        # A complete split is not touched again
+        os.remove(os.path.join(labels_dir, 'PMC1000_00001.txt'))
+        assert convert_publaynet_split(publaynet_dir, 'train', output_dir, workers=1, num_shards=4) == 39
+        assert not os.path.exists(os.path.join(labels_dir, 'PMC1000_00001.txt'))
+
+        # Simulate an interruption after shards 1-3: only shard 0 is redone
+        manifest_path = os.path.join(output_dir, MANIFEST_FILENAME)
+        manifest = json.load(open(manifest_path))
+        manifest['train']['complete'] = False
+        del manifest['train']['completed_shards']['0']
+        json.dump(manifest, open(manifest_path, 'w'))
+        os.remove(os.path.join(labels_dir, 'PMC1001_00001.txt'))  # image 1, shard 1
+
+        assert convert_publaynet_split(publaynet_dir, 'train', output_dir, workers=1, num_shards=4) == 39
+        assert os.path.exists(os.path.join(labels_dir, 'PMC1000_00001.txt'))  # image 0, shard 0
+        assert not os.path.exists(os.path.join(labels_dir, 'PMC1001_00001.txt'))
+
+
+if __name__ == "__main__":
+    test_streaming_reader_matches_json_load()
+    test_parallel_conversion_links_images_and_writes_labels()
+    test_rerun_skips_finished_work()
+    logger.info("✅ PubLayNet conversion tests passed")
@@ -0,0 +1,169 @@
+#!/usr/bin/env python3
+"""
+Test Script for Translation Request Coalescing
+
+Checks that concurrent requests for the same text (after whitespace
+normalization) reach the API once, that a failing request fails its
+waiters without being remembered, that a cancelled leader hands over to a
+waiter, that _translate_blocks_parallel translates each distinct block once
+and copies the result to its repeats, and that AsyncTranslationService
+sends duplicate tasks once.
+"""
+
+import os
+import sys
+import asyncio
+import logging
+from contextlib import contextmanager
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import request_coalescing
+from request_coalescing import SingleFlight, normalize_request_text, request_key
+from translation_service import TranslationService
+from structured_document_model import Paragraph, Heading, ContentType
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+
+@contextmanager
+def _fresh_single_flight():
+    """Swap in an empty process-wide SingleFlight, restoring the original afterwards"""
+    with request_coalescing._single_flight.replaced(SingleFlight()) as single_flight:
+        yield single_flight
+
+
+class _CountingTranslationService(TranslationService):
+    """TranslationService whose API request sleeps, counts and can fail"""
+
+    def __init__(self, fail_on=()):
+        super().__init__()
+        self.requests = []
+        self.fail_on = set(fail_on)
+
+    async def _translate_raw_text_once(self, text, target_language, style_guide="",
+                                       prev_context="", next_context="", item_type="text block"):
+        self.requests.append(text)
+        await asyncio.sleep(0.02)
+        if text in self.fail_on:
+            raise RuntimeError(f"blocked: {text}")
+        return f"[{target_language}] {normalize_request_text(text)}"
+
+
+def test_request_keys_normalize_whitespace():
+    assert normalize_request_text("  Figure   1:\tOverview \n second  line ") == "Figure 1: Overview\nsecond line"
+    assert request_key("Figure 1:  Overview", "French", "m") == request_key(" Figure 1: Overview\t", "French", "m")
+    assert request_key("Figure 1", "French", "m") != request_key("Figure 1", "German", "m")
+    assert request_key("Figure 1", "French", "m") != request_key("Figure 1", "French", "other-model")
+    assert request_key("Line\nbreak", "French", "m") != request_key("Line break", "French", "m")
+
+
+def test_concurrent_duplicates_reach_api_once():
+    service = _CountingTranslationService(fail_on={"Broken"})
+
+    async def run():
+        texts = ["Figure 1: Overview", "Figure 1:  Overview ", "Abstract", "Figure 1: Overview", "Broken", "Broken"]
+        results = await asyncio.gather(*[service._translate_raw_text(text, "French", prev_context=str(i))
+                                         for i, text in enumerate(texts)], return_exceptions=True)
+        later = await service._translate_raw_text("Abstract", "French")
+        return results, later
+
+    with _fresh_single_flight() as single_flight:
+        results, later = asyncio.run(run())
+        assert results[:4] == ["[French] Figure 1: Overview"] * 2 + ["[French] Abstract", "[French] Figure 1: Overview"]
+        assert all(isinstance(result, RuntimeError) for result in results[4:])
+        assert later == "[French] Abstract"
+        assert sorted(service.requests) == ["Abstract", "Broken", "Figure 1: Overview"]
+
+        # Failures are not remembered: the next run retries
+        service.fail_on.clear()
+        assert asyncio.run(service._translate_raw_text("Broken", "French")) == "[French] Broken"
+        stats = single_flight.get_statistics()
+    logger.info(f"Single-flight statistics: {stats}")
+    assert stats['executions'] == 4 and stats['saved_requests'] == 4
+
+
+def test_cancelled_leader_hands_over():
+    single_flight = SingleFlight()
+    executions = []
+
+    async def translate():
+        executions.append(1)
+        await asyncio.sleep(0.05)
+        return "done"
+
+    async def run():
+        leader = asyncio.create_task(single_flight.do("k", translate))
+        await asyncio.sleep(0.01)
+        follower = asyncio.create_task(single_flight.do("k", translate))
+        await asyncio.sleep(0.01)
+        leader.cancel()
+        return await follower
+
+    assert asyncio.run(run()) == "done"
+    assert len(executions) == 2
+
+
+def test_blocks_are_deduplicated_up_front():
+    service = _CountingTranslationService(fail_on={"Confidential"})
+
+    def paragraph(text, page):
+        return Paragraph(block_type=ContentType.PARAGRAPH, original_text=text, page_num=page,
+                         bbox=(0, 0, 100, 20), content=text)
+
+    blocks = []
+    for page in range(1, 6):
+        blocks.append(Heading(block_type=ContentType.HEADING, original_text="Annual  Report", page_num=page,
+                              bbox=(0, 0, 100, 20), content="Annual  Report", level=1))
+        blocks.append(paragraph(f"Body of page {page}", page))
+        blocks.append(paragraph("Confidential", page))
+    blocks.append(paragraph("Annual Report", 6))
+
+    with _fresh_single_flight():
+        translated = asyncio.run(service._translate_blocks_parallel(blocks, "French", "", asyncio.Semaphore(3)))
+
+    # One request per distinct text; only the failing representative is retried (1 + 2 retries)
+    assert len(set(service.requests)) == len(service.requests) - 2 == 7
+    assert service.requests.count("Confidential") == 3
+    assert len(translated) == len(blocks)
+    for original, result in zip(blocks, translated):
+        if original.content == "Confidential":
+            assert result is original
+        else:
+            assert type(result) is type(original)
+            assert result.page_num == original.page_num
+            assert result.content == f"[French] {normalize_request_text(original.content)}"
+
+
+def test_async_service_sends_duplicate_tasks_once():
+    from async_translation_service import AsyncTranslationService, TranslationTask
+
+    service = AsyncTranslationService()
+    service.request_delay = 0
+    service._cache_result = lambda task, result: None
+    sent = []
+
+    async def translate_single_task(task):
+        sent.append(task.text)
+        await asyncio.sleep(0.01)
+        return f"[{task.target_language}] {task.text}"
+
+    service._translate_single_task = translate_single_task
+    tasks = [TranslationTask(text=text, target_language="French", task_id=str(i), priority=priority)
+             for i, (text, priority) in enumerate([("Header", 2), ("Intro", 1), ("Header ", 1), ("Header", 3)])]
+
+    results = asyncio.run(service._translate_tasks_concurrent(tasks))
+
+    assert sorted(sent) == ["Header ", "Intro"]
+    assert results == {"0": "[French] Header ", "1": "[French] Intro", "2": "[French] Header ", "3": "[French] Header "}
+    assert service.stats['duplicate_requests'] == 2
+
+
+if __name__ == "__main__":
+    test_request_keys_normalize_whitespace()
+    test_concurrent_duplicates_reach_api_once()
+    test_cancelled_leader_hands_over()
+    test_blocks_are_deduplicated_up_front()
+    test_async_service_sends_duplicate_tasks_once()
+    logger.info("✅ Request coalescing tests passed")
@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""
+Test Script for the Cross-Process Shared Cache
+
+Checks that entries written by one worker process are served to the others,
+that per-namespace LRU budgets are enforced, and that hit/miss counters are
+aggregated across processes.
+"""
+
+import os
+import sys
+import logging
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from shared_cache import SharedCacheStore
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+
+def _worker_fill(task):
+    """Look up every key and only compute (set) the ones nobody cached yet"""
+    db_path, worker_id = task
+    store = SharedCacheStore(db_path, budgets={'translations': (1000, 10 * 1024 * 1024)})
+    cache = store.namespace('translations')
+    computed = 0
+    for i in range(20):
+        if cache.get(f"key_{i}") is None:
+            cache.set(f"key_{i}", f"value_{i}")
+            computed += 1
+    store.close()
+    return computed
+
+
+def test_entries_are_shared_across_processes():
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, "shared.sqlite3")
+        store = SharedCacheStore(db_path, budgets={'translations': (1000, 10 * 1024 * 1024)})
+        store.set('translations', 'key_0', 'value_0')
+
+        # Run the workers one after another so the outcome is deterministic
+        with ProcessPoolExecutor(max_workers=1) as executor:
+            computed = list(executor.map(_worker_fill, [(db_path, i) for i in range(3)]))
+
+        assert computed == [19, 0, 0]
+        assert store.get('translations', 'key_7') == 'value_7'
+
+        stats = store.get_statistics()['translations']
+        assert stats['entries'] == 20
+        assert stats['hits'] >= 41
+        assert stats['hit_rate'] > 0.6
+        store.close()
+
+
+def test_lru_budget_evicts_least_recently_used():
+    with tempfile.TemporaryDirectory() as tmp:
+        store = SharedCacheStore(os.path.join(tmp, "lru.sqlite3"),
+                                 budgets={'embeddings': (10, 10 * 1024 * 1024)},
+                                 eviction_check_interval=1)
+        embeddings = store.namespace('embeddings')
+        embeddings.set('hot', [0.1, 0.2])
+        for i in range(30):
+            embeddings.set(f"cold_{i}", [float(i)])
+            embeddings.get('hot')
+
+        stats = embeddings.stats()
+        assert stats['entries'] <= 10
+        assert stats['evictions'] > 0
+        assert embeddings.get('hot') == [0.1, 0.2]
+        assert 'cold_0' not in embeddings
+        store.close()
+
+
+def test_namespaces_are_isolated():
+    with tempfile.TemporaryDirectory() as tmp:
+        store = SharedCacheStore(os.path.join(tmp, "ns.sqlite3"))
+        store.set('ocr_results', 'same_key', 'ocr text')
+        store.set('image_classification', 'same_key', {'label': 'figure'})
+
+        assert store.get('ocr_results', 'same_key') == 'ocr text'
+        assert store.get('image_classification', 'same_key') == {'label': 'figure'}
+
+        store.clear('ocr_results')
+        assert store.get('ocr_results', 'same_key') is None
+        assert store.get('image_classification', 'same_key') == {'label': 'figure'}
+        store.close()
+
+
+def test_batched_get_and_set():
+    with tempfile.TemporaryDirectory() as tmp:
+        store = SharedCacheStore(os.path.join(tmp, "batch.sqlite3"))
+        classifications = store.namespace('image_classification')
+        classifications.set_many({f"hash_{i}": i for i in range(1200)})
+
+        found = classifications.get_many([f"hash_{i}" for i in range(1100, 1300)])
+        assert found == {f"hash_{i}": i for i in range(1100, 1200)}
+
+        stats = classifications.stats()
+        assert stats['entries'] == 1200 and stats['sets'] == 1200
+        assert stats['hits'] == 100 and stats['misses'] == 100
+        store.close()
+
+
+if __name__ == "__main__":
+    test_entries_are_shared_across_processes()
+    test_lru_budget_evicts_least_recently_used()
+    test_namespaces_are_isolated()
+    test_batched_get_and_set()
+    logger.info("✅ Shared cache tests passed")
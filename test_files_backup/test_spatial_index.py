@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+Test Script for the Per-Page Spatial Index
+
+Checks overlap and nearest-neighbour queries against brute-force scans on
+random page layouts, caption-style "below within distance" lookups, and
+confidence-ordered non-maximum suppression.
+"""
+
+import os
+import sys
+import random
+import logging
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from spatial_index import (
+    SpatialIndex, bboxes_overlap, bbox_center_distance, bbox_edge_distance,
+    bbox_intersection_area, bbox_area, non_maximum_suppression
+)
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+
+def _random_boxes(rng, count, page_width=612, page_height=792):
+    boxes = []
+    for _ in range(count):
+        x0 = rng.uniform(0, page_width - 10)
+        y0 = rng.uniform(0, page_height - 10)
+        boxes.append((x0, y0, x0 + rng.uniform(2, 200), y0 + rng.uniform(2, 60)))
+    return boxes
+
+
+def test_overlap_matches_brute_force():
+    rng = random.Random(7)
+    boxes = _random_boxes(rng, 300)
+    index = SpatialIndex.from_items(range(len(boxes)), lambda i: boxes[i])
+
+    for query in _random_boxes(rng, 50):
+        for tolerance in (0, 10):
+            expected = [i for i, b in enumerate(boxes) if bboxes_overlap(query, b, tolerance)]
+            assert index.query_overlap(query, tolerance) == expected
+
+
+def test_nearest_matches_brute_force():
+    rng = random.Random(11)
+    boxes = _random_boxes(rng, 250)
+    index = SpatialIndex.from_items(range(len(boxes)), lambda i: boxes[i])
+
+    for query in _random_boxes(rng, 40):
+        for metric, distance_func in (('center', bbox_center_distance), ('edge', bbox_edge_distance)):
+            expected = sorted(range(len(boxes)), key=lambda i: (distance_func(query, boxes[i]), i))[:3]
+            assert [item for _, item in index.nearest(query, k=3, metric=metric)] == expected
+
+
+def test_below_finds_caption_candidates():
+    figure = (100, 100, 300, 300)
+    blocks = {
+        'caption': (110, 310, 290, 325),
+        'far_below': (110, 500, 290, 520),
+        'beside': (350, 310, 500, 325),
+        'above': (110, 60, 290, 90)
+    }
+    index = SpatialIndex.from_items(blocks, lambda name: blocks[name])
+
+    below = index.below(figure, max_distance=50, min_horizontal_overlap=0.5)
+    assert [name for _, name in below] == ['caption']
+    assert below[0][0] == 10
+
+    above = index.above(figure, max_distance=50)
+    assert [name for _, name in above] == ['above']
+
+
+def test_non_maximum_suppression_keeps_best_per_group():
+    detections = [
+        {'bbox': (0, 0, 100, 100), 'confidence': 0.6},
+        {'bbox': (10, 10, 110, 110), 'confidence': 0.9},
+        {'bbox': (400, 400, 500, 500), 'confidence': 0.5},
+        {'bbox': (405, 405, 495, 495), 'confidence': 0.4}
+    ]
+
+    def overlaps(b1, b2):
+        return bbox_intersection_area(b1, b2) / min(bbox_area(b1), bbox_area(b2)) >= 0.5
+
+    kept = non_maximum_suppression(detections, lambda d: d['bbox'], lambda d: d['confidence'], overlaps)
+    assert [d['confidence'] for d in kept] == [0.9, 0.5]
+
+
+if __name__ == "__main__":
+    test_overlap_matches_brute_force()
+    test_nearest_matches_brute_force()
+    test_below_finds_caption_candidates()
+    test_non_maximum_suppression_keeps_best_per_group()
+    logger.info("✅ Spatial index tests passed")
@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+"""
+Test Script for the Stage Artifact Cache
+
+Checks that stage results are keyed by PDF content and stage config, that
+attached files are restored into a new output directory with payload paths
+rewritten to match, that the cache stays within its size budget by evicting
+least-recently-used entries, and that image extraction and structured
+document creation are served from the cache on a second run.
+"""
+
+import os
+import sys
+import shutil
+import logging
+import tempfile
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import fitz
+import stage_cache as stage_cache_module
+from stage_cache import StageCache
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+
+def _make_pdf(path, text="Introduction", with_image=True):
+    doc = fitz.open()
+    page = doc.new_page(width=612, height=792)
+    page.insert_text((72, 72), text, fontsize=18)
+    page.insert_text((72, 120), "Some paragraph text that belongs to the first section.", fontsize=11)
+    if with_image:
+        pixmap = fitz.Pixmap(fitz.csRGB, fitz.IRect(0, 0, 200, 150), 0)
+        pixmap.set_rect(pixmap.irect, (30, 120, 200))
+        page.insert_image(fitz.Rect(72, 200, 372, 425), pixmap=pixmap)
+    doc.save(path)
+    doc.close()
+
+
+def test_keys_follow_content_and_config():
+    with tempfile.TemporaryDirectory() as root:
+        cache = StageCache(cache_dir=os.path.join(root, 'cache'), max_size_mb=10, enabled=True)
+        pdf_a = os.path.join(root, 'a.pdf')
+        _make_pdf(pdf_a)
+        copy_of_a = os.path.join(root, 'copy.pdf')
+        shutil.copy(pdf_a, copy_of_a)
+
+        cache.put(pdf_a, 'nougat', {'raw_content': '# Title'}, {'max_pages': 8})
+
+        assert cache.get(copy_of_a, 'nougat', {'max_pages': 8}) == {'raw_content': '# Title'}
+        assert cache.get(pdf_a, 'nougat', {'max_pages': 9}) is None
+        assert cache.get(pdf_a, 'yolo_detection', {'max_pages': 8}) is None
+        assert cache.stats['nougat'] == {'hits': 1, 'misses': 1, 'stores': 1, 'evictions': 0}
+
+
+def test_files_are_restored_and_paths_relocated():
+    with tempfile.TemporaryDirectory() as root:
+        cache = StageCache(cache_dir=os.path.join(root, 'cache'), max_size_mb=10, enabled=True)
+        pdf_path = os.path.join(root, 'doc.pdf')
+        _make_pdf(pdf_path)
+
+        first_dir = os.path.join(root, 'greek', 'images')
+        os.makedirs(first_dir)
+        with open(os.path.join(first_dir, 'page_1_img_1.png'), 'wb') as f:
+            f.write(b'png-bytes')
+        refs = [{'filepath': os.path.join(first_dir, 'page_1_img_1.png'), 'page_num': 1}]
+        cache.put(pdf_path, 'image_extraction', refs, files_dir=first_dir, attach_files=True)
+        shutil.rmtree(os.path.join(root, 'greek'))
+
+        second_dir = os.path.join(root, 'french', 'images')
+        restored = cache.get(pdf_path, 'image_extraction', files_dir=second_dir)
+
+        assert restored == [{'filepath': os.path.join(second_dir, 'page_1_img_1.png'), 'page_num': 1}]
+        with open(restored[0]['filepath'], 'rb') as f:
+            assert f.read() == b'png-bytes'
+
+
+def test_size_budget_evicts_least_recently_used():
+    with tempfile.TemporaryDirectory() as root:
+        cache = StageCache(cache_dir=os.path.join(root, 'cache'), max_size_mb=0.25, enabled=True)
+        pdfs = []
+        for i in range(3):
+            pdf_path = os.path.join(root, f'doc_{i}.pdf')
+            _make_pdf(pdf_path, text=f"Document {i}", with_image=False)
+            pdfs.append(pdf_path)
+
+        payload = 'x' * 100000
+        cache.put(pdfs[0], 'nougat', payload)
+        cache.put(pdfs[1], 'nougat', payload)
+        # Read the first entry and age the second, so the second is least recently used
+        assert cache.get(pdfs[0], 'nougat') == payload
+        meta_path = os.path.join(cache._entry_dir('nougat', cache.entry_key(pdfs[1], 'nougat')), 'meta.json')
+        os.utime(meta_path, (1, 1))
+        cache.put(pdfs[2], 'nougat', payload)
+
+        assert cache.get(pdfs[1], 'nougat') is None
+        assert cache.get(pdfs[0], 'nougat') == payload
+        assert cache.get(pdfs[2], 'nougat') == payload
+        assert cache.get_statistics()['size_mb'] <= 0.25
+
+
+def test_extraction_stages_are_reused_across_output_dirs():
+    from pdf_parser import PDFParser, StructuredContentExtractor
+
+    with tempfile.TemporaryDirectory() as root:
+        cache = StageCache(cache_dir=os.path.join(root, 'cache'), max_size_mb=50, enabled=True)
+        with stage_cache_module._stage_cache.replaced(cache):
+            pdf_path = os.path.join(root, 'paper.pdf')
+            _make_pdf(pdf_path)
+            parser = PDFParser()
+            parser.settings = dict(parser.settings, extract_images=True)
+            extractor = StructuredContentExtractor()
+
+            first_images = os.path.join(root, 'run_el', 'images')
+            refs = parser.extract_images_from_pdf(pdf_path, first_images)
+            document = extractor.extract_structured_content_from_pdf(pdf_path, refs)
+            assert refs
+
+            second_images = os.path.join(root, 'run_fr', 'images')
+            cached_refs = parser.extract_images_from_pdf(pdf_path, second_images)
+            cached_document = extractor.extract_structured_content_from_pdf(pdf_path, cached_refs)
+
+            stats = cache.stats
+            assert stats['image_extraction']['hits'] == 1
+            assert stats['structured_document']['hits'] == 1
+            assert len(cached_refs) == len(refs)
+            assert all(os.path.exists(ref['filepath']) and ref['filepath'].startswith(second_images)
+                       for ref in cached_refs)
+            assert len(cached_document.content_blocks) == len(document.content_blocks)
+            image_paths = [block.image_path for block in cached_document.content_blocks
+                           if getattr(block, 'image_path', None)]
+            assert image_paths and all(path.startswith(second_images) for path in image_paths)
+
+
+if __name__ == "__main__":
+    test_keys_follow_content_and_config()
+    test_files_are_restored_and_paths_relocated()
+    test_size_budget_evicts_least_recently_used()
+    test_extraction_stages_are_reused_across_output_dirs()
+    logger.info("✅ Stage cache tests passed")
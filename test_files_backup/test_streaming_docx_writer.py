@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""
+Test Script for the Streaming DOCX Writer
+
+Builds the same structured document with the in-memory (dom) and streaming
+writers and checks that the resulting document.xml bodies and image parts are
+identical, that shape ids stay unique across flushes, and that the ToC is
+placed first and in heading order.
+"""
+
+import os
+import sys
+import logging
+import zipfile
+import tempfile
+
+from lxml import etree
+from PIL import Image
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import image_optimizer
+from image_optimizer import ImageOptimizer
+from config_manager import config_manager
+from streaming_docx_writer import StreamingDocxWriter, body_elements
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+W_NS = "http://schemas.openxmlformats.org/wordprocessingml/2006/main"
+
+
+def _build_document(images_dir, sections=5):
+    from structured_document_model import Document, Heading, Paragraph, ImagePlaceholder, ContentType
+
+    blocks = []
+    for section in range(sections):
+        page = section + 1
+        blocks.append(Heading(block_type=ContentType.HEADING, original_text=f"Section {section}",
+                              page_num=page, bbox=(0, 0, 1, 1), level=1))
+        for paragraph in range(3):
+            blocks.append(Paragraph(block_type=ContentType.PARAGRAPH,
+                                    original_text=f"Paragraph {paragraph} of section {section}.",
+                                    page_num=page, bbox=(0, 0, 1, 1)))
+        name = f"page_{page}_img_1.png"
+        Image.new('RGB', (40 + section, 30), (section * 40, 90, 160)).save(os.path.join(images_dir, name))
+        blocks.append(ImagePlaceholder(block_type=ContentType.IMAGE_PLACEHOLDER, original_text="",
+                                       page_num=page, bbox=(0, 0, 1, 1), image_path=name))
+    return Document(title="Streaming", content_blocks=blocks)
+
+
+def _parts(path):
+    with zipfile.ZipFile(path) as package:
+        return {name: package.read(name) for name in package.namelist()}
+
+
+def _canonical_body(document_xml):
+    body = etree.fromstring(document_xml).find(f"{{{W_NS}}}body")
+    return [etree.tostring(element, method='c14n', exclusive=True) for element in body]
+
+
+def _generate(root, images_dir, document, writer):
+    from document_generator import WordDocumentGenerator
+
+    generator = WordDocumentGenerator()
+    generator.word_settings = dict(generator.word_settings, docx_writer=writer)
+    return generator.create_word_document_from_structured_document(
+        document, os.path.join(root, f"out_{writer}.docx"), images_dir)
+
+
+def test_streaming_output_matches_dom_writer():
+    from docx import Document as WordDocument
+
+    with tempfile.TemporaryDirectory() as root:
+        images_dir = os.path.join(root, 'images')
+        os.makedirs(images_dir)
+        document = _build_document(images_dir)
+
+        settings = dict(config_manager.image_optimization_settings, enabled=False)
+        with image_optimizer._image_optimizer.replaced(ImageOptimizer(settings)):
+            dom_path = _generate(root, images_dir, document, 'dom')
+            streaming_path = _generate(root, images_dir, document, 'streaming')
+
+        dom_parts, streaming_parts = _parts(dom_path), _parts(streaming_path)
+        assert sorted(dom_parts) == sorted(streaming_parts)
+        for name in dom_parts:
+            if name != 'word/document.xml':
+                assert dom_parts[name] == streaming_parts[name], name
+        assert _canonical_body(dom_parts['word/document.xml']) == \
+            _canonical_body(streaming_parts['word/document.xml'])
+
+        # The file opens normally; shape ids are unique and the ToC comes first, in order
+        opened = WordDocument(streaming_path)
+        assert len(opened.inline_shapes) == 5
+        shape_ids = opened.element.body.xpath('.//wp:docPr/@id')
+        assert len(shape_ids) == len(set(shape_ids)) == 5
+        texts = [paragraph.text for paragraph in opened.paragraphs if paragraph.text]
+        assert texts[0] == "Table of Contents"
+        toc_lines = [text.rstrip(" .") for text in texts[:texts.index("Streaming")] if text.startswith("Section")]
+        assert toc_lines == [f"Section {section}" for section in range(5)]
+        assert opened.element.body[-1].tag == f"{{{W_NS}}}sectPr"
+
+
+def test_flush_releases_body_and_abort_cleans_up():
+    with tempfile.TemporaryDirectory() as root:
+        writer = StreamingDocxWriter(os.path.join(root, "big.docx"))
+        for index in range(200):
+            writer.document.add_paragraph(f"Paragraph {index}")
+            writer.flush()
+            assert not body_elements(writer.document)
+        assert writer.elements_written == 200
+        writer.finalize()
+
+        paragraphs = etree.fromstring(_parts(os.path.join(root, "big.docx"))['word/document.xml']).iter(f"{{{W_NS}}}p")
+        assert sum(1 for _ in paragraphs) == 200
+        assert os.listdir(root) == ["big.docx"]
+
+        aborted = StreamingDocxWriter(os.path.join(root, "aborted.docx"))
+        aborted.document.add_paragraph("partial")
+        aborted.flush()
+        aborted.abort()
+        assert os.listdir(root) == ["big.docx"]
+
+
+if __name__ == "__main__":
+    test_streaming_output_matches_dom_writer()
+    test_flush_releases_body_and_abort_cleans_up()
+    logger.info("✅ Streaming DOCX writer tests passed")
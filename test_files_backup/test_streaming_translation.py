@@ -0,0 +1,160 @@
+#!/usr/bin/env python3
+"""
+Test Script for Translating While Extracting
+
+Checks that pages published by the extractor are translated while later
+pages are still being extracted, so the run takes about max(extract,
+translate) instead of their sum; that context windows only use blocks
+already seen (previous blocks, following blocks of the same page); that the
+assembled document keeps block order and leaves footnotes and images alone;
+that extraction errors cancel the queued translations; and that
+StructuredContentExtractor publishes every page through on_page.
+"""
+
+import os
+import sys
+import time
+import asyncio
+import logging
+import tempfile
+
+import fitz
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from translation_service import TranslationService
+from structured_document_model import Document, Paragraph, Footnote, ImagePlaceholder, ContentType
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+PAGES = 8
+BLOCKS_PER_PAGE = 4
+EXTRACT_SECONDS_PER_PAGE = 0.05
+TRANSLATE_SECONDS_PER_BLOCK = 0.05
+
+
+class _FakeTranslationService(TranslationService):
+    """TranslationService whose model call sleeps and records when and with what context it ran"""
+
+    def __init__(self):
+        super().__init__()
+        self.calls = []
+
+    async def _translate_content_block(self, content, target_language, style_guide, block_type,
+                                       prev_context="", next_context=""):
+        self.calls.append((content, prev_context, next_context, time.perf_counter()))
+        await asyncio.sleep(TRANSLATE_SECONDS_PER_BLOCK)
+        return f"[{target_language}] {content}"
+
+
+def _page_blocks(page_num):
+    blocks = [Paragraph(block_type=ContentType.PARAGRAPH, original_text=f"p{page_num}b{i}", page_num=page_num,
+                        bbox=(0, 20 * i, 100, 20 * (i + 1))) for i in range(BLOCKS_PER_PAGE)]
+    blocks.append(Footnote(block_type=ContentType.FOOTNOTE, original_text=f"note {page_num}", page_num=page_num,
+                           bbox=(0, 700, 100, 720)))
+    blocks.append(ImagePlaceholder(block_type=ContentType.IMAGE_PLACEHOLDER, original_text="", page_num=page_num,
+                                   bbox=(0, 0, 50, 50), image_path=f"figure_{page_num}.png"))
+    return blocks
+
+
+def _slow_extract(fail_after=None):
+    extraction = {}
+
+    def extract(on_page):
+        content_blocks = []
+        for page_num in range(1, PAGES + 1):
+            time.sleep(EXTRACT_SECONDS_PER_PAGE)
+            if fail_after is not None and page_num > fail_after:
+                raise RuntimeError("damaged page")
+            blocks = _page_blocks(page_num)
+            content_blocks.extend(blocks)
+            on_page(page_num, blocks)
+        extraction['finished'] = time.perf_counter()
+        return Document(title="Streamed", content_blocks=content_blocks, total_pages=PAGES)
+
+    return extract, extraction
+
+
+def test_translation_overlaps_extraction():
+    service = _FakeTranslationService()
+    extract, extraction = _slow_extract()
+
+    async def run():
+        start = time.perf_counter()
+        result = await service.translate_document_streaming(
+            extract, "French", request_semaphore=asyncio.Semaphore(2), context_blocks=1)
+        return result, time.perf_counter() - start
+
+    (document, translated), elapsed = asyncio.run(run())
+
+    extract_seconds = PAGES * EXTRACT_SECONDS_PER_PAGE
+    translate_seconds = PAGES * BLOCKS_PER_PAGE * TRANSLATE_SECONDS_PER_BLOCK / 2
+    logger.info(f"extract {extract_seconds:.2f}s + translate {translate_seconds:.2f}s sequentially; "
+                f"streamed in {elapsed:.2f}s")
+    assert elapsed < (extract_seconds + translate_seconds) * 0.85
+    assert min(call[3] for call in service.calls) < extraction['finished']
+
+    assert len(service.calls) == PAGES * BLOCKS_PER_PAGE
+    assert len(translated.content_blocks) == len(document.content_blocks)
+    for original, result in zip(document.content_blocks, translated.content_blocks):
+        if original.block_type == ContentType.PARAGRAPH:
+            assert result.content == f"[French] {original.original_text}"
+        else:
+            assert result is original
+
+    contexts = {content: (prev, following) for content, prev, following, _ in service.calls}
+    assert contexts["p1b0"] == ("", "p1b1")
+    # Previous context crosses pages; the next page is never assumed to exist
+    assert contexts["p2b0"] == ("p1b3", "p2b1")
+    assert contexts["p1b3"] == ("p1b2", "")
+
+
+def test_extraction_error_cancels_translations():
+    service = _FakeTranslationService()
+    extract, _ = _slow_extract(fail_after=2)
+
+    async def run():
+        try:
+            await service.translate_document_streaming(extract, "French", request_semaphore=asyncio.Semaphore(1))
+        except RuntimeError as e:
+            return str(e)
+        return None
+
+    assert asyncio.run(run()) == "damaged page"
+    assert len(service.calls) < 2 * BLOCKS_PER_PAGE
+
+
+def test_extractor_publishes_every_page():
+    import stage_cache as stage_cache_module
+    from stage_cache import StageCache
+    from pdf_parser import StructuredContentExtractor
+
+    with tempfile.TemporaryDirectory() as root:
+        cache = StageCache(cache_dir=os.path.join(root, 'cache'), max_size_mb=50, enabled=True)
+        with stage_cache_module._stage_cache.replaced(cache):
+            pdf_path = os.path.join(root, "streamed.pdf")
+            pdf = fitz.open()
+            for page_index in range(3):
+                page = pdf.new_page()
+                page.insert_text((72, 72), f"Heading {page_index + 1}", fontsize=18)
+                page.insert_text((72, 120), f"Body text of page {page_index + 1} with a few more words.",
+                                 fontsize=11)
+            pdf.save(pdf_path)
+            pdf.close()
+
+            published = []
+            document = StructuredContentExtractor().extract_structured_content_from_pdf(
+                pdf_path, [], on_page=lambda page_num, blocks: published.append((page_num, blocks)))
+
+        assert [page_num for page_num, _ in published] == [1, 2, 3]
+        streamed_blocks = [block for _, blocks in published for block in blocks]
+        assert len(streamed_blocks) == len(document.content_blocks) > 0
+        assert all(a is b for a, b in zip(streamed_blocks, document.content_blocks))
+
+
+if __name__ == "__main__":
+    test_translation_overlaps_extraction()
+    test_extraction_error_cancels_translations()
+    test_extractor_publishes_every_page()
+    logger.info("✅ Streaming translation tests passed")
@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""
+Test Script for Token Accounting
+
+Checks that the per-script estimator counts Greek and CJK text as denser than
+English, that calibration from logged usage recovers the true weights, that
+request budgets shrink as translations grow longer than their source, and
+that grouping, chunking and the quota manager respect token limits.
+"""
+
+import os
+import sys
+import random
+import logging
+import tempfile
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from token_accounting import (
+    TokenAccountant, TokenRateLimiter, ScriptTokenEstimator, count_script_characters,
+    get_token_accountant
+)
+from config_manager import config_manager
+from optimization_manager import SmartGroupingProcessor
+from semantic_text_chunker import SemanticTextChunker
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+ENGLISH = "The quick brown fox jumps over the lazy dog near the river bank. "
+GREEK = "Η γρήγορη καφέ αλεπού πηδά πάνω από τον τεμπέλη σκύλο κοντά στο ποτάμι. "
+
+
+def _make_accountant(**overrides):
+    settings = dict(config_manager.token_accounting_settings)
+    settings['calibration_path'] = os.path.join(tempfile.mkdtemp(), 'calibration.json')
+    settings['tokenizer'] = 'estimator'
+    settings.update(overrides)
+    return TokenAccountant(settings)
+
+
+def test_greek_is_denser_than_len_over_four():
+    estimator = ScriptTokenEstimator()
+    greek = GREEK * 10
+
+    assert count_script_characters(greek)['greek'] > len(greek) // 2
+    assert estimator.count(greek) > len(greek) // 4
+    assert estimator.count(greek) > estimator.count(ENGLISH * 10)
+    assert estimator.count("") == 0
+
+
+def test_calibration_recovers_synthetic_weights():
+    accountant = _make_accountant(refit_interval=10 ** 6, save_interval=10 ** 6)
+    true_weights = ScriptTokenEstimator({'latin': 0.3, 'greek': 0.7, 'space': 0.1, 'punct': 0.8})
+    rng = random.Random(3)
+    for _ in range(60):
+        text = ENGLISH * rng.randint(1, 8) + GREEK * rng.randint(0, 8)
+        accountant.record_usage(text, round(true_weights.estimate_from_counts(count_script_characters(text))))
+
+    weights = accountant.fit()
+    assert abs(weights['latin'] - 0.3) < 0.05
+    assert abs(weights['greek'] - 0.7) < 0.05
+
+    accountant.save_calibration()
+    reloaded = _make_accountant(calibration_path=accountant.calibration_path)
+    assert abs(reloaded.estimator.tokens_per_char['greek'] - weights['greek']) < 1e-9
+
+
+def test_request_budget_shrinks_with_output_ratio():
+    accountant = _make_accountant(max_request_tokens=100000, max_output_tokens=8000,
+                                  safety_margin=1.0, refit_interval=10 ** 6, save_interval=10 ** 6)
+    assert accountant.get_request_token_budget() == int(8000 / accountant.settings['default_output_ratio'])
+
+    for _ in range(10):
+        accountant.record_usage(GREEK, 400, kind='output', input_tokens=100)
+    assert accountant.get_output_ratio() == 4.0
+    assert accountant.get_request_token_budget() == 2000
+    assert accountant.get_chunk_token_budget() <= 2000
+
+
+def test_rate_limiter_tracks_tokens_per_minute():
+    limiter = TokenRateLimiter(1000)
+    assert limiter.can_consume(800)
+    limiter.consume(800)
+    assert limiter.can_consume(200)
+    assert not limiter.can_consume(201)
+
+    unlimited = TokenRateLimiter(0)
+    unlimited.consume(10 ** 9)
+    assert unlimited.can_consume(10 ** 9)
+
+
+def test_groups_and_chunks_respect_token_budget():
+    accountant = get_token_accountant()
+    processor = SmartGroupingProcessor()
+    processor.max_group_size = 10 ** 6
+    processor.max_items_per_group = 1000
+    items = [{'text': GREEK * 3, 'page_num': 1, 'block_num': i, 'type': 'paragraph'} for i in range(200)]
+    budget = accountant.get_request_token_budget()
+
+    groups = processor.create_smart_groups(items)
+    assert len(groups) > 1
+    assert sum(len(group) for group in groups) == len(items)
+    assert all(sum(accountant.count_tokens(item['text']) for item in group) <= budget for group in groups)
+
+    chunker = SemanticTextChunker(max_chunk_size=10 ** 6, overlap_size=0, max_chunk_tokens=200)
+    chunks = chunker._chunk_paragraph_content(GREEK * 60)
+    assert len(chunks) > 1
+    assert all(accountant.count_tokens(chunk.text) <= 200 for chunk in chunks)
+
+
+if __name__ == "__main__":
+    test_greek_is_denser_than_len_over_four()
+    test_calibration_recovers_synthetic_weights()
+    test_request_budget_shrinks_with_output_ratio()
+    test_rate_limiter_tracks_tokens_per_minute()
+    test_groups_and_chunks_respect_token_budget()
+    logger.info("✅ Token accounting tests passed")
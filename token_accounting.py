@@ -0,0 +1,409 @@
+"""
+Token Accounting for Ultimate PDF Translator
+
+Sizes requests, chunks and quota in model tokens instead of characters:
+- Pluggable local tokenizer (registered callable, SentencePiece model file
+  or tiktoken encoding) with a per-script estimator as the default
+- The estimator weights characters by script (Latin, Greek, Cyrillic, CJK,
+  digits, punctuation, ...) and is refitted from the usage metadata the API
+  returns, so Greek output is no longer counted like English
+- Token budgets for request packing, semantic chunking and rate limiting
+- Calibration report from past runs: python token_accounting.py
+"""
+
+import os
+import re
+import json
+import math
+import time
+import logging
+import threading
+from collections import deque
+from typing import Any, Callable, Deque, Dict, List, Optional, Tuple
+
+from config_manager import config_manager
+from lazy_imports import LazySingleton, is_module_available
+
+logger = logging.getLogger(__name__)
+
+SENTENCEPIECE_AVAILABLE = is_module_available('sentencepiece')
+TIKTOKEN_AVAILABLE = is_module_available('tiktoken')
+NUMPY_AVAILABLE = is_module_available('numpy')
+
+# Character classes counted by the estimator; 'other' is whatever no pattern matches
+SCRIPT_CLASSES = ['space', 'digit', 'latin', 'greek', 'cyrillic', 'cjk', 'punct', 'other']
+
+_SCRIPT_PATTERNS = {
+    'space': re.compile(r'\s'),
+    'digit': re.compile(r'[0-9]'),
+    'latin': re.compile(r'[A-Za-z\u00c0-\u00d6\u00d8-\u00f6\u00f8-\u024f]'),
+    'greek': re.compile(r'[\u0370-\u03ff\u1f00-\u1fff]'),
+    'cyrillic': re.compile(r'[\u0400-\u04ff]'),
+    'cjk': re.compile(r'[\u3040-\u30ff\u3400-\u4dbf\u4e00-\u9fff\uac00-\ud7af]'),
+    'punct': re.compile(r'[!-/:-@\[-`{-~\u00a1-\u00bf\u00d7\u00f7\u2000-\u206f]'),
+}
+
+# Starting tokens-per-character weights for SentencePiece-style vocabularies;
+# calibration replaces them with values fitted from real usage.
+DEFAULT_TOKENS_PER_CHAR = {
+    'space': 0.05,
+    'digit': 0.5,
+    'latin': 0.25,
+    'greek': 0.45,
+    'cyrillic': 0.35,
+    'cjk': 0.9,
+    'punct': 0.6,
+    'other': 0.5,
+}
+
+# Context windows (input tokens) per model
+MODEL_CONTEXT_LIMITS = {
+    'gemini-1.5-flash-latest': 1000000,
+    'gemini-1.5-pro-latest': 2000000,
+    'models/gemini-2.5-pro-preview-03-25': 2000000,
+}
+DEFAULT_CONTEXT_LIMIT = 100000
+
+MIN_OBSERVATIONS_FOR_FIT = 10
+MIN_CLASS_CHARS_FOR_FIT = 200
+MAX_STORED_OBSERVATIONS = 2000
+
+
+def count_script_characters(text: str) -> Dict[str, int]:
+    """Count characters of text per script class"""
+    counts = {}
+    remaining = len(text)
+    for script, pattern in _SCRIPT_PATTERNS.items():
+        count = len(pattern.findall(text)) if remaining else 0
+        counts[script] = count
+        remaining -= count
+    counts['other'] = max(0, remaining)
+    return counts
+
+
+class ScriptTokenEstimator:
+    """Estimates token counts as a weighted sum of per-script character counts"""
+
+    def __init__(self, tokens_per_char: Optional[Dict[str, float]] = None):
+        self.tokens_per_char = dict(DEFAULT_TOKENS_PER_CHAR)
+        if tokens_per_char:
+            self.tokens_per_char.update(tokens_per_char)
+
+    def estimate_from_counts(self, counts: Dict[str, int]) -> float:
+        return sum(counts.get(script, 0) * weight for script, weight in self.tokens_per_char.items())
+
+    def count(self, text: str) -> int:
+        if not text:
+            return 0
+        return int(math.ceil(self.estimate_from_counts(count_script_characters(text))))
+
+
+def _load_sentencepiece_counter(model_path: str) -> Optional[Callable[[str], int]]:
+    if not SENTENCEPIECE_AVAILABLE or not model_path or not os.path.exists(model_path):
+        return None
+    import sentencepiece
+    processor = sentencepiece.SentencePieceProcessor(model_file=model_path)
+    return lambda text: len(processor.encode(text))
+
+
+def _load_tiktoken_counter(encoding_name: str) -> Optional[Callable[[str], int]]:
+    if not TIKTOKEN_AVAILABLE:
+        return None
+    import tiktoken
+    encoding = tiktoken.get_encoding(encoding_name)
+    return lambda text: len(encoding.encode(text, disallowed_special=()))
+
+
+class TokenAccountant:
+    """
+    Counts tokens, keeps the calibration history and hands out token budgets.
+
+    Counting uses, in order: a tokenizer registered with register_tokenizer(),
+    the configured local tokenizer, or the calibrated per-script estimator.
+    Local tokenizers are corrected by a single fitted scale factor, since
+    their vocabulary rarely matches the API model exactly.
+    """
+
+    def __init__(self, settings: Optional[Dict[str, Any]] = None):
+        self.settings = settings or config_manager.token_accounting_settings
+        self.calibration_path = self.settings['calibration_path']
+        self.estimator = ScriptTokenEstimator()
+        self.tokenizer_name = 'script_estimator'
+        self._tokenizer: Optional[Callable[[str], int]] = None
+        self.tokenizer_scale = 1.0
+
+        self._lock = threading.Lock()
+        self._observations: List[Dict[str, Any]] = []
+        self._unsaved_observations = 0
+        self._observations_since_fit = 0
+
+        self._load_calibration()
+        self._load_configured_tokenizer()
+
+    # ------------------------------------------------------------------
+    # Counting
+    # ------------------------------------------------------------------
+
+    def register_tokenizer(self, name: str, count_func: Callable[[str], int]):
+        """Use count_func(text) -> int for all counting from now on"""
+        self._tokenizer = count_func
+        self.tokenizer_name = name
+        self.tokenizer_scale = 1.0
+        logger.info(f"🔢 Token accounting uses tokenizer: {name}")
+
+    def count_tokens(self, text: str) -> int:
+        """Estimated number of model tokens in text"""
+        if not text:
+            return 0
+        if self._tokenizer is not None:
+            return int(math.ceil(self._tokenizer(text) * self.tokenizer_scale))
+        return self.estimator.count(text)
+
+    def get_context_limit(self, model_name: Optional[str] = None) -> int:
+        return MODEL_CONTEXT_LIMITS.get(model_name, DEFAULT_CONTEXT_LIMIT)
+
+    # ------------------------------------------------------------------
+    # Budgets
+    # ------------------------------------------------------------------
+
+    def get_output_ratio(self) -> float:
+        """Observed output tokens per input token for translations (default from config)"""
+        ratios = [obs['output_tokens'] / obs['input_tokens'] for obs in self._observations
+                  if obs.get('output_tokens') and obs.get('input_tokens')]
+        if len(ratios) < MIN_OBSERVATIONS_FOR_FIT:
+            return self.settings['default_output_ratio']
+        ratios.sort()
+        return ratios[len(ratios) // 2]
+
+    def get_request_token_budget(self) -> int:
+        """
+        Input tokens one translation request may carry: limited by the request
+        budget and by the output limit, since the translation must fit the
+        model's maximum output.
+        """
+        output_limited = self.settings['max_output_tokens'] * self.settings['safety_margin'] / max(self.get_output_ratio(), 0.1)
+        return max(1, int(min(self.settings['max_request_tokens'], output_limited)))
+
+    def get_chunk_token_budget(self) -> int:
+        """Tokens per semantic chunk"""
+        return max(1, min(self.settings['chunk_max_tokens'], self.get_request_token_budget()))
+
+    def get_tokens_per_minute(self) -> int:
+        """Token rate limit for the quota manager (0 = unlimited)"""
+        return self.settings['tokens_per_minute']
+
+    # ------------------------------------------------------------------
+    # Calibration
+    # ------------------------------------------------------------------
+
+    def record_usage(self, text: str, actual_tokens: Optional[int], kind: str = 'output',
+                     input_tokens: Optional[int] = None):
+        """
+        Log an observed token count for text (from the API's usage metadata).
+        kind is 'prompt' or 'output'; for outputs, input_tokens is the prompt's
+        count so the output/input ratio can be learned.
+        """
+        if not text or not actual_tokens or actual_tokens <= 0:
+            return
+        observation = {
+            'kind': kind,
+            'counts': count_script_characters(text),
+            'tokens': int(actual_tokens),
+            'timestamp': time.time()
+        }
+        if self._tokenizer is not None:
+            observation['tokenizer_tokens'] = self._tokenizer(text)
+        if kind == 'output' and input_tokens:
+            observation['input_tokens'] = int(input_tokens)
+            observation['output_tokens'] = int(actual_tokens)
+
+        with self._lock:
+            self._observations.append(observation)
+            if len(self._observations) > MAX_STORED_OBSERVATIONS:
+                self._observations = self._observations[-MAX_STORED_OBSERVATIONS:]
+            self._unsaved_observations += 1
+            self._observations_since_fit += 1
+            refit = self._observations_since_fit >= self.settings['refit_interval']
+            save = self._unsaved_observations >= self.settings['save_interval']
+
+        if refit:
+            self.fit()
+        if save:
+            self.save_calibration()
+
+    def fit(self) -> Dict[str, float]:
+        """Refit estimator weights (and the tokenizer scale) from logged observations"""
+        with self._lock:
+            observations = list(self._observations)
+            self._observations_since_fit = 0
+        if len(observations) < MIN_OBSERVATIONS_FOR_FIT:
+            return dict(self.estimator.tokens_per_char)
+
+        weights = _fit_tokens_per_char(observations, self.estimator.tokens_per_char)
+        self.estimator.tokens_per_char = weights
+
+        scaled = [obs for obs in observations if obs.get('tokenizer_tokens')]
+        if scaled:
+            self.tokenizer_scale = (sum(obs['tokens'] for obs in scaled) /
+                                    max(1, sum(obs['tokenizer_tokens'] for obs in scaled)))
+        logger.debug(f"Token estimator refitted from {len(observations)} observations")
+        return dict(weights)
+
+    def save_calibration(self):
+        """Persist observations and fitted weights"""
+        with self._lock:
+            data = {
+                'tokens_per_char': self.estimator.tokens_per_char,
+                'tokenizer_scale': self.tokenizer_scale,
+                'observations': self._observations
+            }
+            self._unsaved_observations = 0
+        try:
+            directory = os.path.dirname(self.calibration_path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            temp_path = f"{self.calibration_path}.{os.getpid()}.tmp"
+            with open(temp_path, 'w', encoding='utf-8') as f:
+                json.dump(data, f)
+            os.replace(temp_path, self.calibration_path)
+        except OSError as e:
+            logger.warning(f"Could not save token calibration: {e}")
+
+    def _load_calibration(self):
+        if not os.path.exists(self.calibration_path):
+            return
+        try:
+            with open(self.calibration_path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            self.estimator = ScriptTokenEstimator(data.get('tokens_per_char'))
+            self.tokenizer_scale = data.get('tokenizer_scale', 1.0)
+            self._observations = data.get('observations', [])[-MAX_STORED_OBSERVATIONS:]
+        except (OSError, ValueError) as e:
+            logger.warning(f"Ignoring unreadable token calibration {self.calibration_path}: {e}")
+
+    def _load_configured_tokenizer(self):
+        tokenizer = self.settings['tokenizer']
+        count_func = None
+        if tokenizer == 'sentencepiece':
+            count_func = _load_sentencepiece_counter(self.settings['tokenizer_model_path'])
+        elif tokenizer == 'tiktoken':
+            count_func = _load_tiktoken_counter(self.settings['tiktoken_encoding'])
+        elif tokenizer != 'estimator':
+            logger.warning(f"Unknown tokenizer '{tokenizer}', using the per-script estimator")
+
+        if count_func is not None:
+            scale = self.tokenizer_scale
+            self.register_tokenizer(tokenizer, count_func)
+            self.tokenizer_scale = scale
+        elif tokenizer in ('sentencepiece', 'tiktoken'):
+            logger.warning(f"Tokenizer '{tokenizer}' unavailable, using the per-script estimator")
+
+    # ------------------------------------------------------------------
+    # Reporting
+    # ------------------------------------------------------------------
+
+    def get_calibration_report(self) -> str:
+        """Compare default and fitted estimates against logged usage"""
+        observations = list(self._observations)
+        lines = [f"📊 Token calibration report ({len(observations)} observations)",
+                 f"   Counting with: {self.tokenizer_name}"
+                 + (f" (scale {self.tokenizer_scale:.3f})" if self._tokenizer is not None else "")]
+
+        totals = {script: sum(obs['counts'].get(script, 0) for obs in observations) for script in SCRIPT_CLASSES}
+        lines.append("   Tokens per character (default → fitted, characters observed):")
+        for script in SCRIPT_CLASSES:
+            lines.append(f"      • {script:<9} {DEFAULT_TOKENS_PER_CHAR[script]:.3f} → "
+                         f"{self.estimator.tokens_per_char[script]:.3f}  ({totals[script]} chars)")
+
+        if observations:
+            default_estimator = ScriptTokenEstimator()
+            for label, estimator in (('default', default_estimator), ('fitted', self.estimator)):
+                errors = [abs(estimator.estimate_from_counts(obs['counts']) - obs['tokens']) / obs['tokens']
+                          for obs in observations]
+                lines.append(f"   Mean absolute error ({label}): {sum(errors) / len(errors):.1%}")
+
+        lines.append(f"   Output/input token ratio: {self.get_output_ratio():.2f}")
+        lines.append(f"   Request budget: {self.get_request_token_budget()} tokens, "
+                     f"chunk budget: {self.get_chunk_token_budget()} tokens, "
+                     f"rate limit: {self.get_tokens_per_minute() or 'unlimited'} tokens/min")
+        return "\n".join(lines)
+
+
+def _fit_tokens_per_char(observations: List[Dict[str, Any]], current: Dict[str, float]) -> Dict[str, float]:
+    """
+    Least-squares fit of tokens-per-character weights. Scripts with too few
+    observed characters keep their current weight; fitted weights are clipped
+    to a plausible range.
+    """
+    totals = {script: sum(obs['counts'].get(script, 0) for obs in observations) for script in SCRIPT_CLASSES}
+    active = [script for script in SCRIPT_CLASSES if totals[script] >= MIN_CLASS_CHARS_FOR_FIT]
+    if not active:
+        return dict(current)
+
+    fixed = [script for script in SCRIPT_CLASSES if script not in active]
+    rows = [[obs['counts'].get(script, 0) for script in active] for obs in observations]
+    targets = [obs['tokens'] - sum(obs['counts'].get(script, 0) * current[script] for script in fixed)
+               for obs in observations]
+
+    if NUMPY_AVAILABLE:
+        import numpy as np
+        solution = np.linalg.lstsq(np.array(rows, dtype=float), np.array(targets, dtype=float), rcond=None)[0]
+        fitted = dict(zip(active, solution.tolist()))
+    else:
+        # Without numpy, rescale the active weights by a single factor
+        predicted = sum(sum(c * current[s] for c, s in zip(row, active)) for row in rows)
+        factor = sum(targets) / predicted if predicted > 0 else 1.0
+        fitted = {script: current[script] * factor for script in active}
+
+    weights = dict(current)
+    for script, value in fitted.items():
+        weights[script] = min(4.0, max(0.01, value))
+    return weights
+
+
+class TokenRateLimiter:
+    """Sliding one-minute window over request token counts"""
+
+    def __init__(self, tokens_per_minute: int):
+        self.tokens_per_minute = tokens_per_minute
+        self._window: Deque[Tuple[float, int]] = deque()
+        self._window_tokens = 0
+
+    def _expire(self, now: float):
+        while self._window and now - self._window[0][0] >= 60:
+            self._window_tokens -= self._window.popleft()[1]
+
+    def can_consume(self, tokens: int) -> bool:
+        if self.tokens_per_minute <= 0:
+            return True
+        self._expire(time.time())
+        # A single oversized request is let through once the window is empty
+        return self._window_tokens + tokens <= self.tokens_per_minute or not self._window
+
+    def consume(self, tokens: int):
+        if self.tokens_per_minute <= 0 or tokens <= 0:
+            return
+        now = time.time()
+        self._expire(now)
+        self._window.append((now, tokens))
+        self._window_tokens += tokens
+
+
+_token_accountant = LazySingleton(TokenAccountant, name='token_accountant')
+
+
+def get_token_accountant() -> TokenAccountant:
+    """Process-wide token accountant (created on first use)"""
+    return _token_accountant.get_instance()
+
+
+def count_tokens(text: str) -> int:
+    """Convenience wrapper around the process-wide accountant"""
+    return get_token_accountant().count_tokens(text)
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format='%(message)s')
+    accountant = get_token_accountant()
+    accountant.fit()
+    print(accountant.get_calibration_report())
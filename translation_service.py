@@ -11,12 +11,22 @@ import time
 import logging
 import hashlib
 from collections import defaultdict
-import google.generativeai as genai
 
 from config_manager import config_manager
 from utils import get_cache_key
+from shared_cache import get_shared_namespace, get_shared_cache
+from lazy_imports import lazy_import, LazySingleton
+from token_accounting import get_token_accountant, TokenRateLimiter
+from hot_path_logging import get_hot_path_logger
+from request_coalescing import request_key, get_translation_single_flight
+
+# The Gemini SDK is imported when the first model is created
+genai = lazy_import('google.generativeai')
 
 logger = logging.getLogger(__name__)
+hot_log = get_hot_path_logger(__name__)
+# Progress lines: every completion is eligible, at most one line per second
+progress_log = get_hot_path_logger(f"{__name__}.progress", sampling=False, max_events_per_second=1.0)
 
 # Import structured document model for Document translation
 try:
@@ -33,6 +43,39 @@ except ImportError:
     class Caption: pass
     logger.warning("Structured document model not available")
 
+# Blocks that get translated; footnotes and everything else keep their original text
+_TRANSLATED_BLOCK_TYPES = (
+    {ContentType.HEADING, ContentType.PARAGRAPH, ContentType.LIST_ITEM, ContentType.CAPTION}
+    if STRUCTURED_MODEL_AVAILABLE else set()
+)
+
+
+def _block_text(block):
+    return getattr(block, 'content', None) or block.original_text or ""
+
+
+class _PageQueue:
+    """Hands extracted pages from the extraction thread to the event loop"""
+
+    _END = object()
+
+    def __init__(self, loop):
+        self.loop = loop
+        self.queue = asyncio.Queue()
+
+    def publish(self, page_num, page_blocks):
+        self.loop.call_soon_threadsafe(self.queue.put_nowait, (page_num, list(page_blocks)))
+
+    def close(self):
+        self.loop.call_soon_threadsafe(self.queue.put_nowait, self._END)
+
+    async def pages(self):
+        while True:
+            item = await self.queue.get()
+            if item is self._END:
+                return
+            yield item
+
 # Import markdown translator (with fallback if not available)
 try:
     from markdown_aware_translator import markdown_translator
@@ -49,6 +92,9 @@ class TranslationCache:
         self.cache = {}
         self.cache_file = self.settings['translation_cache_file_path']
         self.enabled = self.settings['use_translation_cache']
+
+        # Cross-process store so parallel workers and runs share translations
+        self.shared = get_shared_namespace('translations') if self.enabled else None
         
         if self.enabled:
             self.load_cache()
@@ -85,7 +131,12 @@ class TranslationCache:
             return None
             
         cache_key = get_cache_key(text, target_language, model_name)
-        return self.cache.get(cache_key)
+        cached = self.cache.get(cache_key)
+        if cached is None and self.shared is not None:
+            cached = self.shared.get(cache_key)
+            if cached is not None:
+                self.cache[cache_key] = cached
+        return cached
     
     def cache_translation(self, text, target_language, model_name, translation):
         """Cache a translation"""
@@ -94,6 +145,8 @@ class TranslationCache:
             
         cache_key = get_cache_key(text, target_language, model_name)
         self.cache[cache_key] = translation
+        if self.shared is not None:
+            self.shared.set(cache_key, translation)
 
 class GlossaryManager:
     """Manages translation glossary functionality"""
@@ -142,19 +195,22 @@ class QuotaManager:
         self.request_times = []
         self.max_requests_per_minute = 60
         self.retry_delays = [1, 2, 5, 10, 30]
+        self.token_limiter = TokenRateLimiter(get_token_accountant().get_tokens_per_minute())
         
-    def can_make_request(self):
-        """Check if we can make a request without hitting quota limits"""
+    def can_make_request(self, tokens=0):
+        """Check if we can make a request (of an estimated token size) without hitting quota limits"""
         current_time = time.time()
         
         # Remove requests older than 1 minute
         self.request_times = [t for t in self.request_times if current_time - t < 60]
         
-        return len(self.request_times) < self.max_requests_per_minute
+        return (len(self.request_times) < self.max_requests_per_minute and
+                self.token_limiter.can_consume(tokens))
     
-    def record_request(self):
+    def record_request(self, tokens=0):
         """Record that a request was made"""
         self.request_times.append(time.time())
+        self.token_limiter.consume(tokens)
     
     def get_retry_delay(self, attempt):
         """Get retry delay for failed requests"""
@@ -375,6 +431,19 @@ class TranslationService:
     async def _translate_raw_text(self, text, target_language, style_guide="",
                                 prev_context="", next_context="", item_type="text block"):
         """Internal method for raw text translation (without Markdown processing)"""
+        single_flight = get_translation_single_flight()
+        if single_flight is None:
+            return await self._translate_raw_text_once(text, target_language, style_guide,
+                                                       prev_context, next_context, item_type)
+
+        # Identical requests share one translation, whoever asks first supplies the context
+        key = request_key(text, target_language, self.gemini_settings['model_name'], style_guide)
+        return await single_flight.do(key, lambda: self._translate_raw_text_once(
+            text, target_language, style_guide, prev_context, next_context, item_type))
+
+    async def _translate_raw_text_once(self, text, target_language, style_guide="",
+                                       prev_context="", next_context="", item_type="text block"):
+        """Cache lookup and API request for one text"""
 
         # Check advanced cache first if available
         if self.use_advanced_cache and self.advanced_cache:
@@ -404,12 +473,14 @@ class TranslationService:
         )
 
         # Wait for quota if needed
-        while not self.quota_manager.can_make_request():
+        token_accountant = get_token_accountant()
+        prompt_tokens = token_accountant.count_tokens(prompt)
+        while not self.quota_manager.can_make_request(prompt_tokens):
             await asyncio.sleep(1)
 
         # Make translation request with retry
         async def make_request():
-            self.quota_manager.record_request()
+            self.quota_manager.record_request(prompt_tokens)
 
             response = await self.model.generate_content_async(
                 prompt,
@@ -434,6 +505,8 @@ class TranslationService:
                     elif finish_reason == 4:  # OTHER
                         raise Exception(f"Content blocked for other reasons. Text: {text[:100]}...")
 
+            self._record_token_usage(prompt, text, response)
+
             # Check if response has valid text
             if hasattr(response, 'text') and response.text:
                 return response.text.strip()
@@ -482,11 +555,29 @@ class TranslationService:
             logger.error(f"  Model: {error_details['model_name']}")
             raise
 
-    async def translate_document(self, document, target_language=None, style_guide=""):
+    def _record_token_usage(self, prompt, source_text, response):
+        """Feed the API's usage metadata to token accounting calibration"""
+        usage = getattr(response, 'usage_metadata', None)
+        if not usage:
+            return
+        try:
+            token_accountant = get_token_accountant()
+            token_accountant.record_usage(prompt, getattr(usage, 'prompt_token_count', 0), kind='prompt')
+            output_text = response.text if getattr(response, 'text', None) else ''
+            token_accountant.record_usage(
+                output_text, getattr(usage, 'candidates_token_count', 0), kind='output',
+                input_tokens=token_accountant.count_tokens(source_text)
+            )
+        except Exception as e:
+            logger.debug(f"Could not record token usage: {e}")
+
+    async def translate_document(self, document, target_language=None, style_guide="", request_semaphore=None):
         """
         Translate a structured Document object.
         Only translates content blocks that should be translated (headings, paragraphs, etc.)
         Preserves non-translatable blocks (images, tables, code, etc.) unchanged.
+        request_semaphore, when given, bounds concurrent requests across several
+        documents or languages translated at the same time.
         """
         if not STRUCTURED_MODEL_AVAILABLE:
             raise Exception("Structured document model not available for Document translation")
@@ -500,40 +591,33 @@ class TranslationService:
         logger.info(f"🌐 Translating Document '{document.title}' to {target_language}")
         logger.info(f"📊 Document has {len(document.content_blocks)} content blocks")
 
-        # Get translatable and non-translatable blocks
-        translatable_blocks = document.get_translatable_blocks()
+        # Get translatable and non-translatable blocks (footnotes stay in the original language)
+        translatable_blocks = [block for block in document.get_translatable_blocks()
+                               if block.block_type in _TRANSLATED_BLOCK_TYPES]
         non_translatable_blocks = document.get_non_translatable_blocks()
 
         logger.info(f"📝 Translating {len(translatable_blocks)} blocks, preserving {len(non_translatable_blocks)} blocks")
 
         # Translate blocks in parallel for much faster processing
         translated_blocks = await self._translate_blocks_parallel(
-            translatable_blocks, target_language, style_guide
+            translatable_blocks, target_language, style_guide, request_semaphore
         )
 
-        # Create new Document with translated content blocks
-        # Merge translated and non-translatable blocks in original order
-        all_translated_blocks = []
-        translated_iter = iter(translated_blocks)
-
-        for original_block in document.content_blocks:
-            if original_block.block_type in {ContentType.HEADING, ContentType.PARAGRAPH,
-                                           ContentType.LIST_ITEM, ContentType.CAPTION}:
-                # Use translated version
-                try:
-                    all_translated_blocks.append(next(translated_iter))
-                except StopIteration:
-                    # Fallback to original if we run out of translated blocks
-                    all_translated_blocks.append(original_block)
-            elif original_block.block_type == ContentType.FOOTNOTE:
-                # Keep footnotes in original language
-                all_translated_blocks.append(original_block)
-            else:
-                # Keep non-translatable block as-is
-                all_translated_blocks.append(original_block)
+        translated_document = self._assemble_translated_document(
+            document, {id(original): translated for original, translated in zip(translatable_blocks, translated_blocks)},
+            target_language
+        )
 
-        # Create translated document
-        translated_document = Document(
+        logger.info(f"✅ Document translation completed: {len(translated_blocks)} blocks translated")
+        return translated_document
+
+    def _assemble_translated_document(self, document, translated_by_block, target_language):
+        """
+        Build the translated Document: every block replaced by its translation
+        (looked up by id() of the original block), all others kept as-is
+        """
+        all_translated_blocks = [translated_by_block.get(id(block), block) for block in document.content_blocks]
+        return Document(
             title=f"{document.title} ({target_language})",
             content_blocks=all_translated_blocks,
             source_filepath=document.source_filepath,
@@ -546,10 +630,140 @@ class TranslationService:
             }
         )
 
-        logger.info(f"✅ Document translation completed: {len(translated_blocks)} blocks translated")
-        return translated_document
+    async def translate_document_streaming(self, extract, target_language=None, style_guide="",
+                                           request_semaphore=None, context_blocks=None):
+        """
+        Translate a document while it is being extracted.
+
+        extract(on_page) runs in a worker thread; it must call
+        on_page(page_num, page_blocks) as each page is finished and return
+        the complete Document. Blocks are translated as soon as their page
+        arrives, so only the last pages' translations remain when extraction
+        ends. Each block is given up to `context_blocks` already-seen blocks
+        before it and the following blocks of its own page as context; blocks
+        of pages not extracted yet are simply not part of the window.
+
+        Returns (document, translated_document).
+        """
+        if not STRUCTURED_MODEL_AVAILABLE:
+            raise Exception("Structured document model not available for Document translation")
 
-    async def _translate_blocks_parallel(self, translatable_blocks, target_language, style_guide):
+        if target_language is None:
+            target_language = self.translation_settings['target_language']
+        if context_blocks is None:
+            context_blocks = config_manager.get_config_value(
+                'TranslationEnhancements', 'streaming_context_blocks', 1, int)
+        if request_semaphore is None:
+            request_semaphore = asyncio.Semaphore(max(1, config_manager.gemini_settings['max_concurrent_calls']))
+
+        loop = asyncio.get_running_loop()
+        page_queue = _PageQueue(loop)
+
+        def run_extraction():
+            try:
+                return extract(page_queue.publish)
+            finally:
+                page_queue.close()
+
+        logger.info(f"🌊 Translating to {target_language} while extracting "
+                    f"(context window: {context_blocks} block(s))")
+        extraction = loop.run_in_executor(None, run_extraction)
+
+        translations = {}
+        previous_texts = []
+        pages_seen = 0
+        blocks_seen = 0
+        completed = 0
+
+        async def translate_block(block, block_index, prev_context, next_context):
+            nonlocal completed
+            try:
+                async with request_semaphore:
+                    return await self._translate_single_block(block, target_language, style_guide, block_index,
+                                                              prev_context, next_context)
+            except Exception as e:
+                hot_log.event('block_failed', "Translation failed for block %d: %s", block_index + 1, e,
+                              level=logging.WARNING)
+                return block
+            finally:
+                completed += 1
+                progress_log.event('streaming_progress', "📊 Streaming translation: %d/%d blocks (%d pages extracted)",
+                                   completed, blocks_seen, pages_seen)
+
+        try:
+            async for page_num, page_blocks in page_queue.pages():
+                pages_seen += 1
+                page_texts = [block for block in page_blocks if block.block_type in _TRANSLATED_BLOCK_TYPES]
+                for position, block in enumerate(page_texts):
+                    next_context = "\n".join(_block_text(following)
+                                             for following in page_texts[position + 1:position + 1 + context_blocks])
+                    prev_context = "\n".join(previous_texts[-context_blocks:]) if context_blocks else ""
+                    translations[id(block)] = asyncio.ensure_future(
+                        translate_block(block, blocks_seen, prev_context, next_context if context_blocks else ""))
+                    previous_texts.append(_block_text(block))
+                    blocks_seen += 1
+            document = await extraction
+        except BaseException:
+            for task in translations.values():
+                task.cancel()
+            raise
+
+        if not document or not document.content_blocks:
+            for task in translations.values():
+                task.cancel()
+            return document, None
+
+        logger.info(f"📄 Extraction finished: {blocks_seen} blocks from {pages_seen} pages queued, "
+                    f"{completed} already translated; waiting for the tail")
+        results = await asyncio.gather(*translations.values())
+        progress_log.flush(level=logging.DEBUG)
+        hot_log.flush("Streaming translation")
+
+        translated_document = self._assemble_translated_document(
+            document, dict(zip(translations.keys(), results)), target_language)
+        logger.info(f"✅ Document translation completed: {len(results)} blocks translated while extracting")
+        return document, translated_document
+
+    async def translate_document_multi(self, document, target_languages, style_guide="",
+                                       max_concurrent_requests=None, on_translated=None):
+        """
+        Translate one Document into several languages concurrently.
+        All languages share one request semaphore (and this service's quota
+        manager), so the API sees the same load as a single large document.
+        on_translated(language, translated_document) is awaited as each
+        language finishes. Returns {language: translated Document}; languages
+        that fail are logged and left out.
+        """
+        import asyncio
+
+        if max_concurrent_requests is None:
+            max_concurrent_requests = config_manager.gemini_settings['max_concurrent_calls']
+        request_semaphore = asyncio.Semaphore(max(1, max_concurrent_requests))
+
+        logger.info(f"🌍 Fanning out '{document.title}' to {len(target_languages)} languages: "
+                    f"{', '.join(target_languages)} ({max_concurrent_requests} concurrent requests)")
+
+        async def translate_language(language):
+            translated_document = await self.translate_document(
+                document, language, style_guide, request_semaphore=request_semaphore
+            )
+            if on_translated is not None:
+                await on_translated(language, translated_document)
+            return translated_document
+
+        results = await asyncio.gather(*[translate_language(language) for language in target_languages],
+                                       return_exceptions=True)
+
+        translated_documents = {}
+        for language, result in zip(target_languages, results):
+            if isinstance(result, Exception):
+                logger.error(f"❌ Translation to {language} failed: {result}")
+            else:
+                translated_documents[language] = result
+        return translated_documents
+
+    async def _translate_blocks_parallel(self, translatable_blocks, target_language, style_guide,
+                                         semaphore=None):
         """
         Translate content blocks in parallel for much faster processing.
         """
@@ -562,18 +776,33 @@ class TranslationService:
 
         logger.info(f"🚀 Starting parallel translation of {len(translatable_blocks)} blocks...")
 
+        # Translate each distinct text once; repeats reuse the representative's result
+        representatives, duplicates_of = self._dedupe_blocks(translatable_blocks, target_language, style_guide)
+        if duplicates_of:
+            logger.info(f"♻️ {len(duplicates_of)} repeated blocks reuse the translation of an identical block")
+
         # Create translation tasks
         tasks = []
-        for i, block in enumerate(translatable_blocks):
-            task = self._translate_single_block(block, target_language, style_guide, i)
+        for i in representatives:
+            task = self._translate_single_block(translatable_blocks[i], target_language, style_guide, i)
             tasks.append(task)
 
         # Use semaphore to limit concurrent requests (avoid rate limiting)
-        semaphore = asyncio.Semaphore(5)  # Max 5 concurrent translations
+        if semaphore is None:
+            semaphore = asyncio.Semaphore(5)  # Max 5 concurrent translations
+
+        total_blocks = len(tasks)
+        completed_blocks = 0
 
         async def translate_with_semaphore(task):
-            async with semaphore:
-                return await task
+            nonlocal completed_blocks
+            try:
+                async with semaphore:
+                    return await task
+            finally:
+                completed_blocks += 1
+                progress_log.event('translation_progress', "📊 Translation progress: %.1f%% (%d/%d blocks)",
+                                   completed_blocks * 100.0 / total_blocks, completed_blocks, total_blocks)
 
         # Execute with progress tracking
         results = []
@@ -588,20 +817,20 @@ class TranslationService:
             results = await asyncio.gather(*[translate_with_semaphore(task) for task in tasks],
                                          return_exceptions=True)
 
-            # Manual progress logging for smaller batches
-            for i in range(0, len(tasks), max(1, len(tasks) // 10)):
-                progress = (i / len(tasks)) * 100
-                logger.info(f"📊 Translation progress: {progress:.1f}% ({i}/{len(tasks)} blocks)")
-
         # Process results and maintain order
         translated_blocks = []
         successful_translations = 0
         failed_translations = 0
 
-        for i, result in enumerate(results):
-            original_block = translatable_blocks[i]
+        results_by_index = dict(zip(representatives, results))
+        for i, original_block in enumerate(translatable_blocks):
+            if i in results_by_index:
+                result = results_by_index[i]
+            else:
+                result = self._reuse_translation(original_block, results_by_index[duplicates_of[i]])
             if isinstance(result, Exception):
-                logger.warning(f"Translation failed for block {i+1}: {str(result)}")
+                hot_log.event('block_failed', "Translation failed for block %d: %s", i + 1, result,
+                              level=logging.WARNING)
                 translated_blocks.append(original_block)  # Keep original on failure
                 failed_translations += 1
             else:
@@ -609,9 +838,42 @@ class TranslationService:
                 successful_translations += 1
 
         logger.info(f"✅ Parallel translation completed: {successful_translations} successful, {failed_translations} failed")
+        progress_log.flush(level=logging.DEBUG)
+        hot_log.flush("Parallel translation")
         return translated_blocks
 
-    async def _translate_single_block(self, block, target_language, style_guide, block_index):
+    def _dedupe_blocks(self, blocks, target_language, style_guide):
+        """
+        Indices of the blocks to translate (first of each distinct request) and,
+        for every other block, the index of the block whose translation it reuses
+        """
+        representatives = []
+        duplicates_of = {}
+        if get_translation_single_flight() is None:
+            return list(range(len(blocks))), duplicates_of
+
+        first_by_key = {}
+        for i, block in enumerate(blocks):
+            text = _block_text(block)
+            if not text.strip():
+                representatives.append(i)
+                continue
+            key = request_key(text, target_language, self.gemini_settings['model_name'], style_guide)
+            if key in first_by_key:
+                duplicates_of[i] = first_by_key[key]
+            else:
+                first_by_key[key] = i
+                representatives.append(i)
+        return representatives, duplicates_of
+
+    def _reuse_translation(self, block, representative_result):
+        """The translated copy of a repeated block, or the representative's error"""
+        if isinstance(representative_result, Exception):
+            return representative_result
+        return self._create_translated_block(block, _block_text(representative_result))
+
+    async def _translate_single_block(self, block, target_language, style_guide, block_index,
+                                      prev_context="", next_context=""):
         """
         Translate a single content block with enhanced error handling and retry logic.
         """
@@ -621,7 +883,7 @@ class TranslationService:
 
         for attempt in range(max_retries + 1):
             try:
-                logger.debug(f"Translating block {block_index+1}: {type(block).__name__}")
+                logger.debug("Translating block %d: %s", block_index + 1, type(block).__name__)
 
                 # Get content to translate based on block type
                 if isinstance(block, Heading):
@@ -640,7 +902,8 @@ class TranslationService:
 
                 # Skip empty content
                 if not content_to_translate or not content_to_translate.strip():
-                    logger.debug(f"Skipping empty content block: {type(block).__name__}")
+                    hot_log.event('empty_block', "Skipping empty content block: %s", type(block).__name__,
+                                  level=logging.DEBUG)
                     return block
 
                 # Translate the content with improved prompt structure
@@ -648,7 +911,9 @@ class TranslationService:
                     content_to_translate,
                     target_language,
                     style_guide,
-                    type(block).__name__.lower()
+                    type(block).__name__.lower(),
+                    prev_context,
+                    next_context
                 )
 
                 # Create new block with translated content
@@ -657,13 +922,15 @@ class TranslationService:
 
             except Exception as e:
                 if attempt < max_retries:
-                    logger.debug(f"Translation attempt {attempt + 1} failed for block {block_index+1}, retrying: {str(e)}")
+                    hot_log.event('block_retry', "Translation attempt %d failed for block %d, retrying: %s",
+                                  attempt + 1, block_index + 1, e, level=logging.DEBUG)
                     await asyncio.sleep(retry_delay * (attempt + 1))  # Exponential backoff
                 else:
                     logger.error(f"All translation attempts failed for block {block_index+1}: {str(e)}")
                     raise e
 
-    async def _translate_content_block(self, content, target_language, style_guide, block_type):
+    async def _translate_content_block(self, content, target_language, style_guide, block_type,
+                                       prev_context="", next_context=""):
         """Translate content with improved prompt structure to prevent leakage"""
 
         # Create structured prompt with clear delimiters
@@ -678,7 +945,7 @@ class TranslationService:
 
         # Use existing translation infrastructure
         return await self._translate_raw_text(
-            content, target_language, style_guide, "", "", block_type
+            content, target_language, style_guide, prev_context, next_context, block_type
         )
 
     def _create_translated_block(self, original_block, translated_content):
@@ -765,7 +1032,11 @@ class TranslationService:
         if self.use_advanced_cache and self.advanced_cache:
             stats['advanced_cache'] = self.advanced_cache.get_cache_statistics()
 
+        shared_cache = get_shared_cache()
+        if shared_cache is not None:
+            stats['shared_cache'] = shared_cache.get_statistics()
+
         return stats
 
-# Global translation service instance
-translation_service = TranslationService()
+# Global translation service instance (built on first use)
+translation_service = LazySingleton(TranslationService)
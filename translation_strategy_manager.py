@@ -17,6 +17,9 @@ import re
 from enum import Enum
 from typing import Dict, List, Optional, Tuple, Any
 from config_manager import config_manager
+from lazy_imports import LazySingleton
+from classification_rules import get_classification_engine
+from hot_path_logging import get_hot_path_logger, flush_hot_path_logs, preview
 
 # Optional imports for enhanced functionality
 try:
@@ -34,6 +37,7 @@ except ImportError:
     logging.warning("ONNX image classifier not available - using basic image filtering")
 
 logger = logging.getLogger(__name__)
+hot_log = get_hot_path_logger(__name__)
 
 class ImportanceLevel(Enum):
     """Content importance levels for translation strategy"""
@@ -99,27 +103,8 @@ class TranslationStrategyManager:
             }
         }
         
-        # Patterns for content that should be skipped
-        self.skip_patterns = [
-            r'^\s*all rights reserved\s*$',
-            r'^\s*copyright\s+\d{4}',
-            r'^\s*confidential\s*$',
-            r'^\s*εμπιστευτικό\s*$',
-            r'^\s*page\s+\d+\s*$',
-            r'^\s*σελίδα\s+\d+\s*$',
-            r'^\s*\d+\s*$',  # Just numbers
-            r'^\s*[ivxlcdm]+\s*$',  # Roman numerals only
-        ]
-        
-        # Patterns for code detection
-        self.code_patterns = [
-            r'^\s*(def|class|import|from|if|for|while|try|except)\s+',
-            r'^\s*[a-zA-Z_][a-zA-Z0-9_]*\s*=\s*',
-            r'^\s*#.*$',  # Comments
-            r'^\s*//.*$',  # C++ style comments
-            r'^\s*/\*.*\*/\s*$',  # Block comments
-            r'^\s*<[^>]+>\s*$',  # HTML/XML tags
-        ]
+        # Page profiles by 1-based page number, shared by routing decisions
+        self.page_profiles: Dict[int, Any] = {}
     
     def analyze_content_importance(self, content_item):
         """
@@ -130,7 +115,8 @@ class TranslationStrategyManager:
         text = content_item.get('text', '').strip()
         page_num = content_item.get('page_num', 1)
 
-        logger.info(f"🔍 Analyzing content: type={content_type}, text_length={len(text)}, page={page_num}")
+        hot_log.event('analyze_content', "🔍 Analyzing content: type=%s, text_length=%d, page=%s",
+                      content_type, len(text), page_num)
         
         # Skip empty content (but not for images, which don't have text)
         if not text and content_type != 'image':
@@ -138,7 +124,7 @@ class TranslationStrategyManager:
         
         # Check for skip patterns first (but not for images)
         if content_type != 'image' and self._should_skip_translation(text):
-            logger.info(f"🚫 Skipping due to skip patterns: {text[:50]}...")
+            hot_log.event('skip_pattern', "🚫 Skipping due to skip patterns: %s", preview(text, 50))
             return ImportanceLevel.SKIP
         
         # Heading importance based on level
@@ -164,7 +150,7 @@ class TranslationStrategyManager:
             extract_images = config_manager.pdf_processing_settings.get('extract_images', True)
             filename = content_item.get('filename', 'unknown')
 
-            logger.info(f"🖼️ Processing image {filename}: extract_images={extract_images}")
+            hot_log.event('analyze_image', "🖼️ Processing image %s: extract_images=%s", filename, extract_images)
 
             if extract_images:
                 # Always include images when extraction is enabled, regardless of OCR content
@@ -173,43 +159,27 @@ class TranslationStrategyManager:
                 ocr_word_count = len(ocr_text.split()) if ocr_text else 0
 
                 if ocr_text and ocr_word_count >= 5:
-                    logger.info(f"Image {filename}: MEDIUM importance (has OCR text: {ocr_word_count} words)")
+                    hot_log.event('image_medium', "Image %s: MEDIUM importance (has OCR text: %d words)",
+                                  filename, ocr_word_count)
                     return ImportanceLevel.MEDIUM  # Images with substantial OCR text
                 else:
-                    logger.info(f"Image {filename}: LOW importance (diagram/figure, OCR words: {ocr_word_count})")
+                    hot_log.event('image_low', "Image %s: LOW importance (diagram/figure, OCR words: %d)",
+                                  filename, ocr_word_count)
                     return ImportanceLevel.LOW     # Images without OCR text (diagrams, figures)
             else:
                 # Only skip images if extraction is explicitly disabled
-                logger.info(f"Image {filename}: SKIPPED (image extraction disabled in config)")
+                hot_log.event('image_skipped', "Image %s: SKIPPED (image extraction disabled in config)", filename)
                 return ImportanceLevel.SKIP
         
         # Default for other types
         return ImportanceLevel.MEDIUM
     
     def _should_skip_translation(self, text):
-        """Check if text matches skip patterns"""
-        text_lower = text.lower().strip()
-        
-        # Check skip patterns
-        for pattern in self.skip_patterns:
-            if re.match(pattern, text_lower, re.IGNORECASE):
-                return True
-        
-        # Check for code patterns
-        for pattern in self.code_patterns:
-            if re.match(pattern, text, re.MULTILINE):
-                return True
-        
-        # Skip very short non-meaningful text
-        if len(text.strip()) < 3:
-            return True
-        
-        # Skip if mostly numbers and symbols
-        alpha_chars = sum(1 for c in text if c.isalpha())
-        if len(text) > 0 and (alpha_chars / len(text)) < 0.3:
-            return True
-        
-        return False
+        """
+        Check if text matches skip patterns (boilerplate, page numbers, code) or is
+        too short or mostly numbers and symbols; see classification_rules.
+        """
+        return get_classification_engine().features(text).skip_translation
     
     def _analyze_paragraph_importance(self, text, page_num):
         """Analyze paragraph importance based on content and position"""
@@ -258,6 +228,10 @@ class TranslationStrategyManager:
         
         return ImportanceLevel.MEDIUM
 
+    def register_page_profiles(self, page_profiles: List[Any]):
+        """Register already-computed page profiles for use in routing decisions"""
+        self.page_profiles = {profile.page_number: profile for profile in page_profiles}
+
     def route_content_intelligently(self, content_item: Dict, page_profile: Optional[Any] = None) -> ProcessingTool:
         """
         Intelligently route content to the optimal processing tool based on
@@ -266,6 +240,10 @@ class TranslationStrategyManager:
         content_type = content_item.get('type', 'paragraph')
         text = content_item.get('text', '').strip()
 
+        # Fall back to registered profiles instead of re-profiling the page
+        if page_profile is None and self.page_profiles:
+            page_profile = self.page_profiles.get(content_item.get('page_num'))
+
         # Handle images with ONNX classification if available
         if content_type == 'image':
             return self._route_image_content(content_item)
@@ -285,8 +263,8 @@ class TranslationStrategyManager:
 
         try:
             import os
-            from onnx_image_classifier import create_image_classifier, RelevanceLevel
-            classifier = create_image_classifier()
+            from onnx_image_classifier import get_image_classifier, RelevanceLevel
+            classifier = get_image_classifier()
 
             image_path = image_item.get('filepath', '')
             if not image_path or not os.path.exists(image_path):
@@ -296,13 +274,15 @@ class TranslationStrategyManager:
 
             # Route based on classification
             if classification.relevance == RelevanceLevel.SKIP:
-                logger.info(f"🚫 Skipping image {image_path}: {classification.reasoning}")
+                hot_log.event('route_image_skip', "🚫 Skipping image %s: %s", image_path, classification.reasoning)
                 return ProcessingTool.SKIP
             elif classification.relevance == RelevanceLevel.HIGH:
-                logger.info(f"🔥 High-priority image {image_path}: {classification.reasoning}")
+                hot_log.event('route_image_high', "🔥 High-priority image %s: %s", image_path,
+                              classification.reasoning)
                 return ProcessingTool.ENHANCED_IMAGE_PROCESSING
             else:
-                logger.info(f"📷 Standard image {image_path}: {classification.reasoning}")
+                hot_log.event('route_image_standard', "📷 Standard image %s: %s", image_path,
+                              classification.reasoning)
                 return ProcessingTool.ENHANCED_IMAGE_PROCESSING
 
         except Exception as e:
@@ -320,24 +300,24 @@ class TranslationStrategyManager:
                 if hasattr(content_type, 'value'):
                     content_type_value = content_type.value
                     if content_type_value in ['math_heavy', 'formula_dense']:
-                        logger.debug(f"📐 Math-heavy content detected - routing to Nougat")
+                        hot_log.event('route_math_heavy', "📐 Math-heavy content detected - routing to Nougat", level=logging.DEBUG)
                         return ProcessingTool.NOUGAT
                     elif content_type_value in ['table_heavy', 'diagram_heavy']:
-                        logger.debug(f"📊 Complex layout detected - routing to Nougat")
+                        hot_log.event('route_complex_layout', "📊 Complex layout detected - routing to Nougat", level=logging.DEBUG)
                         return ProcessingTool.NOUGAT
                     elif content_type_value == 'image_dominant':
-                        logger.debug(f"🖼️ Image-dominant content - routing to enhanced image processing")
+                        hot_log.event('route_image_dominant', "🖼️ Image-dominant content - routing to enhanced image processing", level=logging.DEBUG)
                         return ProcessingTool.ENHANCED_IMAGE_PROCESSING
                     elif content_type_value == 'mixed_content':
-                        logger.debug(f"🔀 Mixed content - routing to Gemini Pro")
+                        hot_log.event('route_mixed', "🔀 Mixed content - routing to Gemini Pro", level=logging.DEBUG)
                         return ProcessingTool.GEMINI_PRO
 
             # Check complexity score
             if hasattr(page_profile, 'complexity_score') and page_profile.complexity_score > 0.7:
-                logger.debug(f"🧠 High complexity content - routing to Nougat")
+                hot_log.event('route_high_complexity', "🧠 High complexity content - routing to Nougat", level=logging.DEBUG)
                 return ProcessingTool.NOUGAT
             elif hasattr(page_profile, 'complexity_score') and page_profile.complexity_score > 0.4:
-                logger.debug(f"⚖️ Medium complexity content - routing to Gemini Pro")
+                hot_log.event('route_medium_complexity', "⚖️ Medium complexity content - routing to Gemini Pro", level=logging.DEBUG)
                 return ProcessingTool.GEMINI_PRO
 
         except Exception as e:
@@ -353,22 +333,22 @@ class TranslationStrategyManager:
 
         # Mathematical content detection
         if self._contains_mathematical_content(text):
-            logger.debug(f"🔢 Mathematical content detected - routing to Nougat")
+            hot_log.event('route_math', "🔢 Mathematical content detected - routing to Nougat", level=logging.DEBUG)
             return ProcessingTool.NOUGAT
 
         # Complex table detection
         if self._contains_complex_tables(text):
-            logger.debug(f"📋 Complex table detected - routing to Nougat")
+            hot_log.event('route_complex_table', "📋 Complex table detected - routing to Nougat", level=logging.DEBUG)
             return ProcessingTool.NOUGAT
 
         # High-importance content gets Pro model
         importance = self.analyze_content_importance(content_item)
         if importance == ImportanceLevel.HIGH:
-            logger.debug(f"⭐ High importance content - routing to Gemini Pro")
+            hot_log.event('route_high_importance', "⭐ High importance content - routing to Gemini Pro", level=logging.DEBUG)
             return ProcessingTool.GEMINI_PRO
 
         # Default to cost-effective Flash model
-        logger.debug(f"💰 Standard content - routing to Gemini Flash")
+        hot_log.event('route_standard', "💰 Standard content - routing to Gemini Flash", level=logging.DEBUG)
         return ProcessingTool.GEMINI_FLASH
 
     def _contains_mathematical_content(self, text: str) -> bool:
@@ -481,6 +461,21 @@ class TranslationStrategyManager:
         else:
             return 3  # Can be in larger batches
     
+    def _prime_image_classifications(self, content_items):
+        """Classify all images in one batch so per-item routing hits the cache"""
+        if not ONNX_CLASSIFIER_AVAILABLE:
+            return
+        import os
+        image_paths = [item.get('filepath') for item in content_items
+                       if item.get('type') == 'image' and item.get('filepath') and os.path.exists(item['filepath'])]
+        if not image_paths:
+            return
+        try:
+            from onnx_image_classifier import get_image_classifier
+            get_image_classifier().classify_images(image_paths)
+        except Exception as e:
+            logger.warning(f"Batch image classification failed: {e}")
+
     def optimize_content_for_strategy(self, content_items):
         """
         Optimize content items based on translation strategy,
@@ -500,6 +495,11 @@ class TranslationStrategyManager:
         
         optimized_items = []
         
+        # Evaluate the skip rules for all items in one batch pass
+        get_classification_engine().classify_batch(
+            item.get('text', '').strip() for item in content_items if item.get('type') != 'image')
+        self._prime_image_classifications(content_items)
+        
         for item in content_items:
             strategy = self.get_translation_strategy(item)
             
@@ -522,6 +522,7 @@ class TranslationStrategyManager:
         strategy_stats['cost_savings_estimate'] = ((original_cost - optimized_cost) / original_cost) * 100
         
         self._log_strategy_report(strategy_stats)
+        flush_hot_path_logs("Translation strategy")
         
         return optimized_items, strategy_stats
     
@@ -545,5 +546,5 @@ class TranslationStrategyManager:
 """
         logger.info(report)
 
-# Global translation strategy manager instance
-translation_strategy_manager = TranslationStrategyManager()
+# Global translation strategy manager instance (built on first use)
+translation_strategy_manager = LazySingleton(TranslationStrategyManager)
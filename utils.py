@@ -10,8 +10,6 @@ import time
 import json
 import hashlib
 import logging
-import tkinter as tk
-from tkinter import filedialog
 
 logger = logging.getLogger(__name__)
 
@@ -113,6 +111,9 @@ def choose_input_path():
     """Choose input file or directory using file dialog"""
     root = None
     try:
+        # tkinter is only needed for the interactive dialogs
+        import tkinter as tk
+        from tkinter import filedialog
         root = tk.Tk()
         root.withdraw()
         root.attributes('-topmost', True)
@@ -149,6 +150,8 @@ def choose_base_output_directory(initial_dir=None):
     chosen_directory = None
     
     try:
+        import tkinter as tk
+        from tkinter import filedialog
         root = tk.Tk()
         root.withdraw()
         root.attributes('-topmost', True)
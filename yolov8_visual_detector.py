@@ -24,6 +24,9 @@ from pathlib import Path
 import io
 import base64
 
+from spatial_index import bbox_area, bbox_intersection_area, non_maximum_suppression
+from stage_cache import get_stage_cache
+
 # Import image processing
 try:
     from PIL import Image
@@ -138,6 +141,14 @@ class YOLOv8VisualDetector:
         """
         self.logger.info(f"🔍 Starting YOLOv8 visual detection: {os.path.basename(pdf_path)}")
         
+        # Detections (and their crops) depend only on the PDF and the detection config
+        stage_cache = get_stage_cache()
+        images_dir = os.path.join(output_dir, "yolo_detected_images")
+        cache_config = {'config': self.config, 'service_url': self.service_url}
+        cached_detections = stage_cache.get(pdf_path, 'yolo_detection', cache_config, files_dir=images_dir)
+        if cached_detections is not None:
+            return cached_detections
+        
         # Check if YOLOv8 service is available
         if not await self._check_service_availability():
             self.logger.error("❌ YOLOv8 service not available - falling back to heuristic detection")
@@ -150,7 +161,6 @@ class YOLOv8VisualDetector:
             doc = fitz.open(pdf_path)
             
             # Create output directory for cropped images
-            images_dir = os.path.join(output_dir, "yolo_detected_images")
             os.makedirs(images_dir, exist_ok=True)
             
             # Process each page
@@ -215,6 +225,8 @@ class YOLOv8VisualDetector:
             filtered_detections = self._filter_and_validate_detections(all_detections)
             
             self.stats['detections_found'] = len(filtered_detections)
+            stage_cache.put(pdf_path, 'yolo_detection', filtered_detections, cache_config,
+                            files_dir=images_dir, attach_files=True)
             
             self.logger.info(f"✅ YOLOv8 detection completed:")
             self.logger.info(f"   📊 Pages processed: {self.stats['pages_processed']}")
@@ -237,22 +249,19 @@ class YOLOv8VisualDetector:
         if not detections:
             return []
             
-        # Sort by confidence (highest first)
-        sorted_detections = sorted(detections, key=lambda x: x.confidence, reverse=True)
-        resolved = []
-        
-        for detection in sorted_detections:
-            # Check if this detection overlaps with any already resolved detection
-            overlaps = False
-            for resolved_detection in resolved:
-                if detection.overlaps_with(resolved_detection, self.config['overlap_threshold']):
-                    overlaps = True
-                    break
-            
-            if not overlaps:
-                resolved.append(detection)
-        
-        return resolved
+        threshold = self.config['overlap_threshold']
+
+        def overlaps(bbox, other_bbox):
+            intersection = bbox_intersection_area(bbox, other_bbox)
+            if intersection <= 0:
+                return False
+            return intersection / min(bbox_area(bbox), bbox_area(other_bbox)) >= threshold
+
+        # Highest confidence first; each detection is only compared with the
+        # already kept detections that share grid cells with it
+        return non_maximum_suppression(
+            detections, lambda d: d.bounding_box, lambda d: d.confidence, overlaps
+        )
     
     def _render_page_to_image(self, page, dpi: int = 300) -> Image.Image:
         """Render PDF page to high-resolution PIL Image"""